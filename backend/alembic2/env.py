@@ -36,6 +36,8 @@ from app.models.invoice import Invoice
 from app.models.salary import Salary
 from app.models.misc import Misc
 from app.models.estimate import Estimate
+from app.models.job import Job
+from app.models.document_snapshot import DocumentSnapshot
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
@@ -0,0 +1,51 @@
+"""add jobs table
+
+Revision ID: a1b2c3d4e5f6
+Revises: expand_facture_text
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a1b2c3d4e5f6'
+down_revision = 'expand_facture_text'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'jobs' not in inspector.get_table_names():
+        op.create_table(
+            'jobs',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False, autoincrement=True),
+            sa.Column('kind', sa.String(length=100), nullable=False),
+            sa.Column('payload', sa.JSON(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False, server_default='queued'),
+            sa.Column('priority', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='3'),
+            sa.Column('run_after', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column('locked_by', sa.String(length=100), nullable=True),
+            sa.Column('locked_at', sa.DateTime(), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('result_path', sa.String(length=255), nullable=True),
+            sa.Column('result_media_type', sa.String(length=100), nullable=True),
+            sa.Column('result_filename', sa.String(length=255), nullable=True),
+            sa.Column('result_size', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+        )
+        op.create_index('ix_jobs_id', 'jobs', ['id'])
+        op.create_index('ix_jobs_claim', 'jobs', ['status', 'priority', 'run_after'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_claim', table_name='jobs')
+    op.drop_index('ix_jobs_id', table_name='jobs')
+    op.drop_table('jobs')
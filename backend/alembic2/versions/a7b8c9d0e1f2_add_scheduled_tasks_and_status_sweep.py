@@ -0,0 +1,40 @@
+"""add scheduled_tasks and the status sweep index on estimates
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7b8c9d0e1f2'
+down_revision = 'f6a7b8c9d0e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if 'scheduled_tasks' not in inspector.get_table_names():
+        op.create_table(
+            'scheduled_tasks',
+            sa.Column('name', sa.String(length=100), primary_key=True, nullable=False),
+            sa.Column('locked_by', sa.String(length=100), nullable=True),
+            sa.Column('locked_until', sa.DateTime(), nullable=True),
+            sa.Column('last_started_at', sa.DateTime(), nullable=True),
+            sa.Column('last_finished_at', sa.DateTime(), nullable=True),
+            sa.Column('last_result', sa.JSON(), nullable=True),
+            sa.Column('last_error', sa.Text(), nullable=True),
+        )
+
+    # The sweep flips open estimates by expiration date
+    if 'ix_estimates_status_expiration_date' not in {index['name'] for index in inspector.get_indexes('estimates')}:
+        op.create_index('ix_estimates_status_expiration_date', 'estimates', ['status', 'expiration_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_estimates_status_expiration_date', table_name='estimates')
+    op.drop_table('scheduled_tasks')
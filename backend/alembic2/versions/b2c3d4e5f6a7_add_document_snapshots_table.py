@@ -0,0 +1,40 @@
+"""add document snapshots table
+
+Revision ID: b2c3d4e5f6a7
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b2c3d4e5f6a7'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'document_snapshots' not in inspector.get_table_names():
+        op.create_table(
+            'document_snapshots',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False, autoincrement=True),
+            sa.Column('document_type', sa.String(length=50), nullable=False),
+            sa.Column('document_id', sa.Integer(), nullable=False),
+            sa.Column('data', sa.JSON(), nullable=False),
+            sa.Column('content_sha256', sa.String(length=64), nullable=True),
+            sa.Column('content_size', sa.Integer(), nullable=True),
+            sa.Column('profile', sa.String(length=20), nullable=True),
+            sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.UniqueConstraint('document_type', 'document_id', name='uq_document_snapshots_document'),
+        )
+        op.create_index('ix_document_snapshots_id', 'document_snapshots', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_document_snapshots_id', table_name='document_snapshots')
+    op.drop_table('document_snapshots')
@@ -0,0 +1,59 @@
+"""add updated_at columns and tombstones table
+
+Revision ID: c3d4e5f6a7b8
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c3d4e5f6a7b8'
+down_revision = 'b2c3d4e5f6a7'
+branch_labels = None
+depends_on = None
+
+TRACKED_TABLES = (
+    'clients', 'contracts', 'contract_details', 'estimates', 'factures', 'invoices', 'miscellaneous', 'salaries',
+)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    for table in TRACKED_TABLES:
+        if table not in tables:
+            continue
+        columns = {c['name'] for c in inspector.get_columns(table)}
+        if 'updated_at' not in columns:
+            op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+            start = 'COALESCE(created_at, CURRENT_TIMESTAMP)' if 'created_at' in columns else 'CURRENT_TIMESTAMP'
+            op.execute(f'UPDATE {table} SET updated_at = {start}')
+        indexes = {i['name'] for i in inspector.get_indexes(table)}
+        if f'ix_{table}_updated_at' not in indexes:
+            op.create_index(f'ix_{table}_updated_at', table, ['updated_at'])
+
+    if 'tombstones' not in tables:
+        op.create_table(
+            'tombstones',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False, autoincrement=True),
+            sa.Column('entity', sa.String(length=50), nullable=False),
+            sa.Column('entity_id', sa.Integer(), nullable=False),
+            sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        )
+        op.create_index('ix_tombstones_id', 'tombstones', ['id'])
+        op.create_index('ix_tombstones_entity_deleted_at', 'tombstones', ['entity', 'deleted_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tombstones_entity_deleted_at', table_name='tombstones')
+    op.drop_index('ix_tombstones_id', table_name='tombstones')
+    op.drop_table('tombstones')
+    for table in TRACKED_TABLES:
+        op.drop_index(f'ix_{table}_updated_at', table_name=table)
+    # clients and contract_details had updated_at before this revision
+    for table in ('contracts', 'estimates', 'factures', 'invoices', 'miscellaneous', 'salaries'):
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,67 @@
+"""add invoice and facture archive tables
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd4e5f6a7b8c9'
+down_revision = 'c3d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    if 'invoices_archive' not in tables:
+        op.create_table(
+            'invoices_archive',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False, autoincrement=False),
+            sa.Column('invoice_number', sa.String(length=255), nullable=False),
+            sa.Column('contract_id', sa.Integer(), nullable=False),
+            sa.Column('amount', sa.Float(), nullable=False),
+            sa.Column('due_date', sa.Date(), nullable=False),
+            sa.Column('status', sa.String(length=50), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('paid_amount', sa.Numeric(10, 2), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.Column('archived_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+            sa.UniqueConstraint('invoice_number'),
+        )
+        op.create_index('ix_invoices_archive_contract_id', 'invoices_archive', ['contract_id'])
+        op.create_index('ix_invoices_archive_due_date', 'invoices_archive', ['due_date'])
+
+    if 'factures_archive' not in tables:
+        op.create_table(
+            'factures_archive',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False, autoincrement=False),
+            sa.Column('contract_id', sa.Integer(), nullable=False),
+            sa.Column('description', sa.Text(), nullable=False),
+            sa.Column('qty', sa.Float(), nullable=False),
+            sa.Column('qty_unit', sa.String(length=20), nullable=True),
+            sa.Column('unit_price', sa.Float(), nullable=False),
+            sa.Column('tva', sa.Float(), nullable=False),
+            sa.Column('total_ht', sa.Float(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('invoice_id', sa.Integer(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.Column('archived_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        )
+        op.create_index('ix_factures_archive_contract_id', 'factures_archive', ['contract_id'])
+        op.create_index('ix_factures_archive_invoice_id', 'factures_archive', ['invoice_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_factures_archive_invoice_id', table_name='factures_archive')
+    op.drop_index('ix_factures_archive_contract_id', table_name='factures_archive')
+    op.drop_table('factures_archive')
+    op.drop_index('ix_invoices_archive_due_date', table_name='invoices_archive')
+    op.drop_index('ix_invoices_archive_contract_id', table_name='invoices_archive')
+    op.drop_table('invoices_archive')
@@ -0,0 +1,106 @@
+"""add monthly report rollup tables
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+# Monthly rollups are computed over created_at ranges
+CREATED_AT_INDEXES = (
+    ('ix_factures_created_at', 'factures'),
+    ('ix_invoices_created_at', 'invoices'),
+    ('ix_factures_archive_created_at', 'factures_archive'),
+    ('ix_invoices_archive_created_at', 'invoices_archive'),
+)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    for index, table in CREATED_AT_INDEXES:
+        if index not in {existing['name'] for existing in inspector.get_indexes(table)}:
+            op.create_index(index, table, ['created_at'])
+
+    if 'monthly_revenue' not in tables:
+        op.create_table(
+            'monthly_revenue',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('month', sa.Date(), nullable=False),
+            sa.Column('client_id', sa.Integer(), nullable=False),
+            sa.Column('tva', sa.Float(), nullable=False),
+            sa.Column('lines', sa.Integer(), nullable=False),
+            sa.Column('total_ht', sa.Float(), nullable=False),
+            sa.Column('total_tva', sa.Float(), nullable=False),
+            sa.UniqueConstraint('month', 'client_id', 'tva', name='uq_monthly_revenue_month_client_tva'),
+        )
+        op.create_index('ix_monthly_revenue_id', 'monthly_revenue', ['id'])
+        op.create_index('ix_monthly_revenue_client_id', 'monthly_revenue', ['client_id'])
+
+    if 'monthly_receivables' not in tables:
+        op.create_table(
+            'monthly_receivables',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('month', sa.Date(), nullable=False),
+            sa.Column('client_id', sa.Integer(), nullable=False),
+            sa.Column('invoices', sa.Integer(), nullable=False),
+            sa.Column('invoiced', sa.Float(), nullable=False),
+            sa.Column('paid', sa.Float(), nullable=False),
+            sa.Column('outstanding', sa.Float(), nullable=False),
+            sa.UniqueConstraint('month', 'client_id', name='uq_monthly_receivables_month_client'),
+        )
+        op.create_index('ix_monthly_receivables_id', 'monthly_receivables', ['id'])
+        op.create_index('ix_monthly_receivables_client_id', 'monthly_receivables', ['client_id'])
+
+    if 'rollup_dirty' not in tables:
+        op.create_table(
+            'rollup_dirty',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('month', sa.Date(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+        )
+        op.create_index('ix_rollup_dirty_id', 'rollup_dirty', ['id'])
+        op.create_index('ix_rollup_dirty_month', 'rollup_dirty', ['month'])
+
+        # Queue every month with data: the first report (or python -m app.jobs.rollups) computes them
+        bounds = []
+        for name in ('factures', 'invoices', 'factures_archive', 'invoices_archive'):
+            created_at = sa.table(name, sa.column('created_at', sa.DateTime())).c.created_at
+            bounds.extend(conn.execute(sa.select(sa.func.min(created_at), sa.func.max(created_at))).one())
+        bounds = [value for value in bounds if value is not None]
+        if bounds:
+            first, last, now = min(bounds), max(bounds), datetime.utcnow()
+            month, rows = date(first.year, first.month, 1), []
+            while month <= last.date():
+                rows.append({'month': month, 'created_at': now})
+                month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+            rollup_dirty = sa.table(
+                'rollup_dirty', sa.column('month', sa.Date()), sa.column('created_at', sa.DateTime())
+            )
+            op.bulk_insert(rollup_dirty, rows)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rollup_dirty_month', table_name='rollup_dirty')
+    op.drop_index('ix_rollup_dirty_id', table_name='rollup_dirty')
+    op.drop_table('rollup_dirty')
+    op.drop_index('ix_monthly_receivables_client_id', table_name='monthly_receivables')
+    op.drop_index('ix_monthly_receivables_id', table_name='monthly_receivables')
+    op.drop_table('monthly_receivables')
+    op.drop_index('ix_monthly_revenue_client_id', table_name='monthly_revenue')
+    op.drop_index('ix_monthly_revenue_id', table_name='monthly_revenue')
+    op.drop_table('monthly_revenue')
+    for index, table in CREATED_AT_INDEXES:
+        op.drop_index(index, table_name=table)
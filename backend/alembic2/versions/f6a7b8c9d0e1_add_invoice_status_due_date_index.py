@@ -0,0 +1,26 @@
+"""add invoices (status, due_date) index
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f6a7b8c9d0e1'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The aging report reads the open invoices by status, bucketed by due_date
+    inspector = sa.inspect(op.get_bind())
+    if 'ix_invoices_status_due_date' not in {index['name'] for index in inspector.get_indexes('invoices')}:
+        op.create_index('ix_invoices_status_due_date', 'invoices', ['status', 'due_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_invoices_status_due_date', table_name='invoices')
@@ -0,0 +1,343 @@
+"""Admission control for the expensive endpoints.
+
+Each policy (``pdf``, ``export``) combines:
+
+- a token bucket per caller, keyed by the ``sub`` of a bearer token or else
+  the client IP: ``rate_per_minute`` requests per minute with bursts of
+  ``burst``. Over that the request gets ``429`` with ``Retry-After``.
+- a concurrency limit: at most ``concurrency`` requests of the policy run
+  at once per server worker (0 means unlimited); the others wait their turn.
+  One caller may have at most ``ADMISSION_PER_CALLER_CONCURRENCY`` requests
+  running or waiting, so repeated clicks cannot fill the queue (``429``).
+  Callers known by IP only get ``ADMISSION_PER_IP_CONCURRENCY``: the frontend
+  sends no bearer token, so one address may be a whole office behind NAT.
+- load shedding: when ``ADMISSION_QUEUE_LIMIT`` requests are already waiting,
+  or a request has waited ``ADMISSION_QUEUE_TIMEOUT`` seconds, it gets
+  ``503`` with ``Retry-After`` instead of piling up behind the others.
+
+State is kept in-process by default, so each worker enforces the limits on
+its own. With ``ADMISSION_SHARED_DIR`` the buckets and concurrency slots are
+lock files in that directory (``fcntl``), shared by all workers of the host;
+a slot held by a worker that dies is released by the kernel. Queues stay
+per worker. Shared buckets are read and written in the thread pool, not on
+the event loop.
+
+Routers opt in with ``dependencies=[Depends(admit("pdf"))]``. Counters are
+served by ``GET /api/metrics``.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+from app.core.auth import token_subject
+from app.core.config import settings
+
+# Idle callers are forgotten once this many buckets are tracked
+MAX_BUCKETS = 10000
+SHARED_BUCKET_SHARDS = 64
+
+
+@dataclass(frozen=True)
+class Policy:
+    name: str
+    rate_per_minute: float
+    burst: int
+    concurrency: int = 0
+
+
+POLICIES = {
+    "pdf": Policy(
+        "pdf",
+        rate_per_minute=settings.ADMISSION_PDF_RATE_PER_MINUTE,
+        burst=settings.ADMISSION_PDF_BURST,
+        concurrency=settings.ADMISSION_PDF_CONCURRENCY,
+    ),
+    "export": Policy(
+        "export",
+        rate_per_minute=settings.ADMISSION_EXPORT_RATE_PER_MINUTE,
+        burst=settings.ADMISSION_EXPORT_BURST,
+        concurrency=settings.ADMISSION_EXPORT_CONCURRENCY,
+    ),
+}
+
+
+def caller_key(request: Request) -> str:
+    """``user:<sub>`` for a valid bearer token, else ``ip:<client address>``."""
+    auth = request.headers.get("authorization", "")
+    if auth[:7].lower() == "bearer ":
+        subject = token_subject(auth[7:].strip())
+        if subject:
+            return f"user:{subject}"
+    client = request.client
+    return f"ip:{client.host if client else 'unknown'}"
+
+
+def caller_concurrency(key: str) -> int:
+    """Requests ``key`` may have running or waiting per policy, 0 for no limit."""
+    if key.startswith("ip:"):
+        return settings.ADMISSION_PER_IP_CONCURRENCY
+    return settings.ADMISSION_PER_CALLER_CONCURRENCY
+
+
+def _refill(tokens: float, updated: float, now: float, policy: Policy) -> float:
+    return min(policy.burst, tokens + (now - updated) * policy.rate_per_minute / 60)
+
+
+def _take(tokens: float, policy: Policy) -> Tuple[float, float]:
+    """(tokens left, seconds to wait) after trying to spend one token."""
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) * 60 / policy.rate_per_minute
+
+
+class LocalBuckets:
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, policy: Policy, key: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get((policy.name, key), (policy.burst, now))
+            tokens, wait = _take(_refill(tokens, updated, now, policy), policy)
+            self._buckets[(policy.name, key)] = (tokens, now)
+            if len(self._buckets) > MAX_BUCKETS:
+                self._prune(now)
+        return wait
+
+    def _prune(self, now: float):
+        # A bucket that has refilled completely is the same as no bucket
+        for bucket_key, (tokens, updated) in list(self._buckets.items()):
+            policy = POLICIES.get(bucket_key[0])
+            if policy is None or _refill(tokens, updated, now, policy) >= policy.burst:
+                del self._buckets[bucket_key]
+
+
+class SharedBuckets:
+    """Buckets in JSON files under ``directory``, one ``flock``-ed file per shard."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def take(self, policy: Policy, key: str) -> float:
+        import fcntl
+
+        shard = int(hashlib.sha1(key.encode()).hexdigest()[:8], 16) % SHARED_BUCKET_SHARDS
+        path = os.path.join(self.directory, f"{policy.name}.bucket{shard}")
+        now = time.time()
+        with open(path, "a+") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            fh.seek(0)
+            try:
+                buckets = json.loads(fh.read() or "{}")
+            except ValueError:
+                buckets = {}
+            tokens, updated = buckets.get(key, (policy.burst, now))
+            tokens, wait = _take(_refill(tokens, updated, now, policy), policy)
+            buckets = {k: v for k, v in buckets.items() if _refill(v[0], v[1], now, policy) < policy.burst}
+            buckets[key] = (tokens, now)
+            fh.seek(0)
+            fh.truncate()
+            fh.write(json.dumps(buckets))
+        return wait
+
+
+@dataclass
+class PolicyCounters:
+    admitted: int = 0
+    rate_limited: int = 0
+    caller_limited: int = 0
+    shed_queue_full: int = 0
+    shed_timeout: int = 0
+    in_flight: int = 0
+    queued: int = 0
+    peak_in_flight: int = 0
+    peak_queued: int = 0
+
+
+class ConcurrencyLimit:
+    """FIFO semaphore for the event loop that sheds load instead of queueing forever."""
+
+    def __init__(self, policy: Policy, counters: PolicyCounters, shared_dir: Optional[str] = None):
+        self.policy = policy
+        self.counters = counters
+        self.shared_dir = shared_dir
+        self._waiters = deque()
+        self._callers = Counter()  # requests running or waiting per caller
+
+    async def acquire(self, key: str):
+        """Slot handle to pass to ``release``; raises 429/503 when the request is refused."""
+        counters = self.counters
+        if self._callers[key] >= caller_concurrency(key) > 0:
+            counters.caller_limited += 1
+            raise HTTPException(
+                status_code=429,
+                detail=f"Your previous {self.policy.name} requests are still in progress",
+                headers={"Retry-After": "1"},
+            )
+        slot = self._try_acquire() if not self._waiters else None
+        if slot is None:
+            if len(self._waiters) >= settings.ADMISSION_QUEUE_LIMIT:
+                counters.shed_queue_full += 1
+                raise _overloaded(self.policy)
+            self._callers[key] += 1
+            try:
+                slot = await self._wait()
+            except BaseException:
+                self._release_caller(key)
+                raise
+        else:
+            self._callers[key] += 1
+        counters.in_flight += 1
+        counters.peak_in_flight = max(counters.peak_in_flight, counters.in_flight)
+        return slot
+
+    def release(self, slot, key: str):
+        self._release_caller(key)
+        self.counters.in_flight -= 1
+        if slot is not True:
+            slot.close()  # drops the shared slot's lock
+        self._wake()
+
+    async def _wait(self):
+        counters = self.counters
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        counters.queued += 1
+        counters.peak_queued = max(counters.peak_queued, counters.queued)
+        deadline = time.monotonic() + settings.ADMISSION_QUEUE_TIMEOUT
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    counters.shed_timeout += 1
+                    raise _overloaded(self.policy)
+                # Shared slots are also freed by other processes, so poll for them
+                timeout = min(remaining, 0.05) if self.shared_dir else remaining
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                if self._waiters[0] is waiter:
+                    slot = self._try_acquire()
+                    if slot is not None:
+                        return slot
+                if waiter.done():
+                    # Woken, but the slot went elsewhere: wait again in the same place
+                    index = self._waiters.index(waiter)
+                    waiter = loop.create_future()
+                    self._waiters[index] = waiter
+        finally:
+            counters.queued -= 1
+            self._waiters.remove(waiter)
+            self._wake()
+
+    def _release_caller(self, key: str):
+        self._callers[key] -= 1
+        if self._callers[key] <= 0:
+            del self._callers[key]
+
+    def _wake(self):
+        if self._waiters and not self._waiters[0].done():
+            self._waiters[0].set_result(None)
+
+    def _try_acquire(self):
+        if not self.shared_dir:
+            return True if self.counters.in_flight < self.policy.concurrency else None
+        import fcntl
+
+        for i in range(self.policy.concurrency):
+            fh = open(os.path.join(self.shared_dir, f"{self.policy.name}.slot{i}"), "a")
+            try:
+                fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fh
+            except OSError:
+                fh.close()
+        return None
+
+
+def _overloaded(policy: Policy) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"Too many {policy.name} requests in progress, retry shortly",
+        headers={"Retry-After": str(max(1, round(settings.ADMISSION_QUEUE_TIMEOUT)))},
+    )
+
+
+class AdmissionController:
+    def __init__(self, policies: Dict[str, Policy], shared_dir: str = ""):
+        self.shared_dir = shared_dir or None
+        if self.shared_dir:
+            os.makedirs(self.shared_dir, exist_ok=True)
+            self.buckets = SharedBuckets(self.shared_dir)
+        else:
+            self.buckets = LocalBuckets()
+        self.policies = policies
+        self.counters = {name: PolicyCounters() for name in policies}
+        self.limits = {
+            name: ConcurrencyLimit(policy, self.counters[name], self.shared_dir)
+            for name, policy in policies.items()
+            if policy.concurrency > 0
+        }
+
+    async def check_rate(self, policy: Policy, key: str):
+        if policy.rate_per_minute <= 0:
+            return
+        if self.shared_dir:
+            # flock and a JSON read/write per request: keep them off the event loop
+            wait = await run_in_threadpool(self.buckets.take, policy, key)
+        else:
+            wait = self.buckets.take(policy, key)
+        if wait > 0:
+            self.counters[policy.name].rate_limited += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, slow down",
+                headers={"Retry-After": str(max(1, round(wait + 0.5)))},
+            )
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.ADMISSION_ENABLED,
+            "shared": bool(self.shared_dir),
+            "pid": os.getpid(),
+            "policies": {name: vars(counters).copy() for name, counters in self.counters.items()},
+        }
+
+
+admission = AdmissionController(POLICIES, settings.ADMISSION_SHARED_DIR)
+
+
+def admit(policy_name: str):
+    """Router dependency applying the ``policy_name`` policy to each request."""
+    policy = POLICIES[policy_name]
+
+    async def dependency(request: Request):
+        if not settings.ADMISSION_ENABLED:
+            yield
+            return
+        key = caller_key(request)
+        await admission.check_rate(policy, key)
+        limit = admission.limits.get(policy_name)
+        if limit is None:
+            admission.counters[policy_name].admitted += 1
+            yield
+            return
+        slot = await limit.acquire(key)
+        admission.counters[policy_name].admitted += 1
+        try:
+            yield
+        finally:
+            limit.release(slot, key)
+
+    return dependency
@@ -0,0 +1,194 @@
+"""Authentication dependency for the API routers.
+
+``authenticate`` checks the bearer token issued by ``/auth/login`` and loads
+its user, with two caches so that an authenticated request costs a couple
+of dictionary lookups instead of a JWT decode and a SELECT:
+
+- validated tokens: a bounded LRU (``AUTH_TOKEN_CACHE_SIZE``) keyed by the
+  token's sha256, each entry kept until the token's ``exp``;
+- users by email: cleared whenever a ``User`` row is inserted, updated or
+  deleted through this process, and reloaded after ``AUTH_USER_CACHE_TTL``
+  seconds so changes made by other workers are picked up.
+
+The user is stored on ``request.state.user``. With ``AUTH_REQUIRED`` off (the
+default: the frontend signs in with Firebase and does not send these tokens)
+requests without a valid token go through anonymously; with it on they get
+401. All routers but ``/auth`` use it (see ``app.main``).
+
+``EventSource`` cannot send headers, so the change event stream also takes
+``?ticket=``: a token minted by ``POST /api/events/ticket`` (:func:`stream_ticket`)
+that is valid ``EVENTS_TICKET_SECONDS`` and only for opening a stream
+(:func:`authenticate_stream`). Tickets end up in access logs, hence the short
+life and the ``scope`` claim: a ticket is refused as a bearer token, and an
+access token is refused as a ticket.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from sqlalchemy import event
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.user import get_user_by_email
+from app.models.user import User
+from app.utils.security import create_access_token, decode_access_token
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    id: int
+    email: str
+    full_name: str
+
+
+# ``scope`` claim of stream tickets; access tokens have none
+STREAM_SCOPE = "events"
+
+
+class TokenCache:
+    """LRU of token sha256 -> ((subject, scope), expiry timestamp)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: str) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, digest: str, subject: tuple, expires: float):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[digest] = (subject, expires)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class UserCache:
+    def __init__(self):
+        self._users: Dict[str, Tuple[Optional[AuthUser], float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, email: str):
+        """``(found, user)``; ``user`` is ``None`` for an email known to have no user."""
+        with self._lock:
+            entry = self._users.get(email)
+        if entry is None or time.monotonic() - entry[1] > settings.AUTH_USER_CACHE_TTL:
+            return False, None
+        return True, entry[0]
+
+    def put(self, email: str, user: Optional[AuthUser]):
+        with self._lock:
+            self._users[email] = (user, time.monotonic())
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+user_cache = UserCache()
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _forget_users(mapper, connection, target):
+    # Users change rarely; dropping them all also covers a changed email
+    user_cache.clear()
+
+
+def _load_user(email: str) -> Optional[AuthUser]:
+    with SessionLocal() as db:
+        user = get_user_by_email(db, email)
+        return AuthUser(user.id, user.email, user.full_name) if user else None
+
+
+def token_subject(token: str, scope: Optional[str] = None) -> Optional[str]:
+    """``sub`` of a valid, unexpired token (cached) issued for ``scope``, else ``None``."""
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    cached = token_cache.get(digest)
+    if cached is None:
+        payload = decode_access_token(token)
+        if not payload or not payload.get("sub") or not payload.get("exp"):
+            return None
+        cached = (payload["sub"], payload.get("scope"))
+        token_cache.put(digest, cached, float(payload["exp"]))
+    subject, token_scope = cached
+    return subject if token_scope == scope else None
+
+
+async def _user(email: Optional[str]) -> Optional[AuthUser]:
+    if email is None:
+        return None
+    found, user = user_cache.get(email)
+    if not found:
+        user = await run_in_threadpool(_load_user, email)
+        user_cache.put(email, user)
+    return user
+
+
+async def current_user(request: Request) -> Optional[AuthUser]:
+    """User of the request's bearer token, or ``None`` (no, invalid or expired token, unknown user)."""
+    auth = request.headers.get("authorization", "")
+    if auth[:7].lower() != "bearer ":
+        return None
+    return await _user(token_subject(auth[7:].strip()))
+
+
+def _require(request: Request, user: Optional[AuthUser]):
+    if user is None and settings.AUTH_REQUIRED:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    request.state.user = user
+
+
+async def authenticate(request: Request):
+    """Router dependency: sets ``request.state.user``; 401 without one when ``AUTH_REQUIRED``."""
+    _require(request, await current_user(request))
+
+
+async def authenticate_stream(request: Request):
+    """:func:`authenticate` for ``GET /api/events``: the bearer header or a ``?ticket=`` from :func:`stream_ticket`."""
+    user = await current_user(request)
+    ticket = request.query_params.get("ticket")
+    if user is None and ticket:
+        user = await _user(token_subject(ticket, STREAM_SCOPE))
+    _require(request, user)
+
+
+def stream_ticket(user: AuthUser) -> str:
+    """Token that opens one change event stream for ``user`` within ``EVENTS_TICKET_SECONDS``."""
+    return create_access_token({"sub": user.email, "scope": STREAM_SCOPE},
+                               timedelta(seconds=settings.EVENTS_TICKET_SECONDS))
+
+
+def auth_stats() -> dict:
+    return {"required": settings.AUTH_REQUIRED, "tokens": token_cache.stats()}
@@ -0,0 +1,47 @@
+"""Generation number of the data written through this process.
+
+``generation()`` goes up each time a transaction that ran an INSERT, UPDATE
+or DELETE commits on ``app.core.database.engine``. Read endpoints put it in
+their coalescing keys (``app.core.singleflight``), so a request that arrives
+after a write never shares a result computed before it. Writes made by other
+processes are not seen.
+"""
+import itertools
+import threading
+
+from sqlalchemy import event
+
+from app.core.database import engine
+
+_WRITES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_lock = threading.Lock()
+_counter = itertools.count(1)
+_generation = 0
+
+
+def generation() -> int:
+    return _generation
+
+
+def _bump():
+    global _generation
+    with _lock:
+        _generation = next(_counter)
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _mark_write(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip()[:7].upper().startswith(_WRITES):
+        conn.info["wrote"] = True
+
+
+@event.listens_for(engine, "commit")
+def _commit(conn):
+    if conn.info.pop("wrote", False):
+        _bump()
+
+
+@event.listens_for(engine, "rollback")
+def _rollback(conn):
+    conn.info.pop("wrote", None)
@@ -10,4 +10,127 @@ class Settings:
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
+    # Authentication (see app/core/auth.py). Off: tokens are checked when sent, but not required
+    AUTH_REQUIRED: bool = os.getenv("AUTH_REQUIRED", "false").lower() in ("1", "true", "yes")
+    # Validated tokens kept in memory (0 disables), and seconds a cached user is trusted
+    AUTH_TOKEN_CACHE_SIZE: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 4096))
+    AUTH_USER_CACHE_TTL: float = float(os.getenv("AUTH_USER_CACHE_TTL", 60))
+
+    # Default loading strategy of model relationships (app/models/base.py): raise_on_sql
+    # turns an unplanned lazy load into an error, select allows them again
+    ORM_LAZY_LOAD: str = os.getenv("ORM_LAZY_LOAD", "raise_on_sql")
+
+    # Delta sync (?since= on list endpoints, see app/core/sync.py): rows updated this many seconds
+    # before a watermark are sent again, and tombstones older than the retention are dropped
+    SYNC_OVERLAP_SECONDS: float = float(os.getenv("SYNC_OVERLAP_SECONDS", 5))
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+
+    # PDF generation
+    PDF_LOG_FILE: str = os.getenv("PDF_LOG_FILE", "pdf_generation.log")
+    PDF_SQL_LOGGING: bool = os.getenv("PDF_SQL_LOGGING", "false").lower() in ("1", "true", "yes")
+    # Import ReportLab at startup instead of on the first PDF request
+    PDF_WARMUP: bool = os.getenv("PDF_WARMUP", "false").lower() in ("1", "true", "yes")
+    # In-process cache of rendered PDFs keyed by document version (0 disables)
+    PDF_CACHE_MAX_ENTRIES: int = int(os.getenv("PDF_CACHE_MAX_ENTRIES", 256))
+    PDF_CACHE_MAX_MB: int = int(os.getenv("PDF_CACHE_MAX_MB", 64))
+    # Output profile when a request has no ?profile= (screen, email, archive; see app/pdf/profiles.py)
+    PDF_DEFAULT_PROFILE: str = os.getenv("PDF_DEFAULT_PROFILE", "screen")
+    # Extra directory searched for the Liberation Sans fonts embedded by the archive profile
+    PDF_FONT_DIR: str = os.getenv("PDF_FONT_DIR", "")
+    # ReportLab invariant mode: no timestamp or random ID in the file, same document -> same bytes
+    PDF_INVARIANT: bool = os.getenv("PDF_INVARIANT", "true").lower() in ("1", "true", "yes")
+    # Issued documents: content-addressed store of rendered PDFs (sha256 file names)
+    DOCUMENT_STORE_DIR: str = os.getenv("DOCUMENT_STORE_DIR", "document_store")
+    # Also keep the rendered bytes of the snapshot, not only its data
+    SNAPSHOT_STORE_PDF: bool = os.getenv("SNAPSHOT_STORE_PDF", "true").lower() in ("1", "true", "yes")
+
+    # Admission control for /pdf and export endpoints (see app/core/admission.py)
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Token bucket per user (or IP without a token): sustained rate and burst size, 0 disables
+    ADMISSION_PDF_RATE_PER_MINUTE: float = float(os.getenv("ADMISSION_PDF_RATE_PER_MINUTE", 60))
+    ADMISSION_PDF_BURST: int = int(os.getenv("ADMISSION_PDF_BURST", 10))
+    # Renders running at once per worker, 0 for no limit
+    ADMISSION_PDF_CONCURRENCY: int = int(os.getenv("ADMISSION_PDF_CONCURRENCY", 4))
+    ADMISSION_EXPORT_RATE_PER_MINUTE: float = float(os.getenv("ADMISSION_EXPORT_RATE_PER_MINUTE", 10))
+    ADMISSION_EXPORT_BURST: int = int(os.getenv("ADMISSION_EXPORT_BURST", 5))
+    ADMISSION_EXPORT_CONCURRENCY: int = int(os.getenv("ADMISSION_EXPORT_CONCURRENCY", 2))
+    # Requests one caller may have running or waiting per policy, 0 for no limit
+    ADMISSION_PER_CALLER_CONCURRENCY: int = int(os.getenv("ADMISSION_PER_CALLER_CONCURRENCY", 2))
+    # Same for callers without a bearer token, keyed by IP: an office behind NAT shares one address
+    ADMISSION_PER_IP_CONCURRENCY: int = int(os.getenv("ADMISSION_PER_IP_CONCURRENCY", 8))
+    # Requests waiting for a slot beyond this many, or for longer than this, get a 503
+    ADMISSION_QUEUE_LIMIT: int = int(os.getenv("ADMISSION_QUEUE_LIMIT", 8))
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 10))
+    # Directory shared by the workers of a host; empty keeps the limits per process
+    ADMISSION_SHARED_DIR: str = os.getenv("ADMISSION_SHARED_DIR", "")
+
+    # Concurrent identical PDF and dashboard requests share one computation (see app/core/singleflight.py)
+    SINGLEFLIGHT_ENABLED: bool = os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Directory shared by the workers of a host to coalesce PDF renders across them; empty for per-process only
+    SINGLEFLIGHT_SHARED_DIR: str = os.getenv("SINGLEFLIGHT_SHARED_DIR", "")
+    # Seconds a finished render stays readable by the other workers
+    SINGLEFLIGHT_SHARED_TTL: float = float(os.getenv("SINGLEFLIGHT_SHARED_TTL", 5))
+
+    # Archival of closed invoices (python -m app.jobs.archive): fully paid invoices due more than this many
+    # days ago move, with their factures, to invoices_archive / factures_archive, this many per transaction
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", 365))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+
+    # Monthly report rollups (app/crud/rollups.py): recompute the months a write touched right after its commit;
+    # off, they stay queued until the next GET /reports/monthly or python -m app.jobs.rollups
+    ROLLUPS_REFRESH_ON_COMMIT: bool = os.getenv("ROLLUPS_REFRESH_ON_COMMIT", "true").lower() in ("1", "true", "yes")
+
+    # In-app scheduler (app/core/scheduler.py): each server worker polls the scheduled_tasks table and the one
+    # that claims a due task runs it; a claim left by a crashed worker expires after the lease
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+    SCHEDULER_POLL_SECONDS: float = float(os.getenv("SCHEDULER_POLL_SECONDS", 60))
+    SCHEDULER_LEASE_SECONDS: float = float(os.getenv("SCHEDULER_LEASE_SECONDS", 900))
+    # Status sweep (python -m app.jobs.sweep): overdue invoices and expired estimates, this many rows per transaction
+    SWEEP_INTERVAL_SECONDS: float = float(os.getenv("SWEEP_INTERVAL_SECONDS", 3600))
+    SWEEP_BATCH_SIZE: int = int(os.getenv("SWEEP_BATCH_SIZE", 500))
+    # Tombstones past SYNC_TOMBSTONE_RETENTION_DAYS are deleted this often (python -m app.jobs.tombstones)
+    SYNC_TOMBSTONE_PRUNE_SECONDS: float = float(os.getenv("SYNC_TOMBSTONE_PRUNE_SECONDS", 3600))
+
+    # Change events for open tabs, GET /api/events (see app/core/events.py)
+    EVENTS_ENABLED: bool = os.getenv("EVENTS_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Directory shared by the workers of a host so that each one streams the others' events; empty for per-process
+    EVENTS_SHARED_DIR: str = os.getenv("EVENTS_SHARED_DIR", "")
+    # Custom fan-out class ("package.module:Class"), e.g. over Redis for several hosts; overrides EVENTS_SHARED_DIR
+    EVENTS_FANOUT: str = os.getenv("EVENTS_FANOUT", "")
+    # Events queued per connection before it is told to resync, and kept for Last-Event-ID replay
+    EVENTS_QUEUE_SIZE: int = int(os.getenv("EVENTS_QUEUE_SIZE", 100))
+    EVENTS_HISTORY: int = int(os.getenv("EVENTS_HISTORY", 256))
+    # Changed rows of one table listed by id in an event; above, the table is sent as {"many": true}
+    EVENTS_MAX_IDS: int = int(os.getenv("EVENTS_MAX_IDS", 100))
+    # Life of the ?ticket= that opens a stream when AUTH_REQUIRED (EventSource cannot send a bearer header)
+    EVENTS_TICKET_SECONDS: int = int(os.getenv("EVENTS_TICKET_SECONDS", 60))
+    # Seconds between keep-alive comments on idle streams
+    EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", 15))
+
+    # Production server (python -m app.server)
+    SERVER_BIND: str = os.getenv("SERVER_BIND", "0.0.0.0:8000")
+    # 0 sizes the pool from the CPUs available to the container
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", 0))
+    WORKERS_PER_CORE: float = float(os.getenv("WORKERS_PER_CORE", 2))
+    MAX_WORKERS: int = int(os.getenv("MAX_WORKERS", 0))
+    SERVER_PRELOAD: bool = os.getenv("SERVER_PRELOAD", "true").lower() in ("1", "true", "yes")
+    # Recycle a worker after this many requests (0 disables), with jitter so they don't all restart together
+    SERVER_MAX_REQUESTS: int = int(os.getenv("SERVER_MAX_REQUESTS", 1000))
+    SERVER_MAX_REQUESTS_JITTER: int = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", 100))
+    SERVER_TIMEOUT: int = int(os.getenv("SERVER_TIMEOUT", 120))
+    SERVER_GRACEFUL_TIMEOUT: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", 30))
+    SERVER_KEEPALIVE: int = int(os.getenv("SERVER_KEEPALIVE", 5))
+    SERVER_LOG_LEVEL: str = os.getenv("SERVER_LOG_LEVEL", "info")
+
+    # Background jobs (python -m app.jobs.worker)
+    JOB_RESULT_DIR: str = os.getenv("JOB_RESULT_DIR", "job_results")
+    JOB_WORKER_PROCESSES: int = int(os.getenv("JOB_WORKER_PROCESSES", 1))
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", 1.0))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    # Seconds before the first retry, doubled on each further attempt
+    JOB_RETRY_BACKOFF: float = float(os.getenv("JOB_RETRY_BACKOFF", 10))
+    # A running job whose worker has not finished it after this long is handed to another worker
+    JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", 900))
+    JOB_RESULT_TTL_HOURS: int = int(os.getenv("JOB_RESULT_TTL_HOURS", 48))
+
 settings = Settings()
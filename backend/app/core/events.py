@@ -0,0 +1,312 @@
+"""Change events pushed to open tabs: ``GET /api/events`` (Server-Sent Events).
+
+Each commit that inserted, updated or deleted rows of the synced tables
+(``app.models.tombstone.SYNCED_MODELS``) through an ORM session publishes one
+compact event, ids only::
+
+    {"at": "<watermark>", "changes": {"invoices": {"updated": [3]}, "factures": {"created": [41]}}}
+
+A screen applies it by fetching just those rows with the list endpoint's
+``?since=`` (``app.core.sync``) or by refetching a summary such as the
+dashboard. A table with more than ``EVENTS_MAX_IDS`` changed rows comes as
+``{"many": true}``. Bulk statements bypass the session hooks: their callers
+add the rows with :func:`record_changes`.
+
+The :class:`Broker` hands events to the subscribers of this process, each
+with a bounded queue; one that falls behind gets a single ``resync`` (reload
+everything) instead of a growing backlog. Events reach the brokers through
+a fan-out: in process by default, through ``EVENTS_SHARED_DIR`` for the
+workers of a host (a JSON-lines file per minute that each worker tails), or
+any class named by ``EVENTS_FANOUT`` (``"package.module:Class"``, e.g. a
+Redis pub/sub one) with the ``start(deliver)`` and ``publish(event)``
+methods of :class:`LocalFanOut`.
+"""
+import asyncio
+import importlib
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.sync import format_watermark
+from app.models.facture import Facture
+from app.models.invoice import Invoice
+from app.models.tombstone import SYNCED_MODELS
+
+ENTITIES = frozenset(model.__tablename__ for model in SYNCED_MODELS)
+
+# Marker queued for a subscriber that has to reload everything
+RESYNC = {"resync": True}
+# Marker queued for every subscriber when the process shuts down: its stream ends
+CLOSE = {"close": True}
+
+# Shared-dir segments older than this many minutes are removed by the writers
+SEGMENT_KEEP_MINUTES = 5
+
+_MERGE = {
+    ("created", "updated"): "created",
+    ("created", "deleted"): "deleted",
+    ("updated", "deleted"): "deleted",
+    ("deleted", "created"): "updated",
+}
+
+
+class LocalFanOut:
+    """Events stay in this process."""
+
+    def __init__(self):
+        self._deliver: Optional[Callable[[dict], None]] = None
+
+    def start(self, deliver: Callable[[dict], None]):
+        self._deliver = deliver
+
+    def publish(self, event: dict):
+        if self._deliver is not None:
+            self._deliver(event)
+
+
+class SharedDirFanOut:
+    """Workers of a host append events to ``events-<minute>.jsonl`` and each one tails the files."""
+
+    def __init__(self, directory: str, poll_interval: float = 0.1):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        os.makedirs(directory, exist_ok=True)
+        self._thread: Optional[threading.Thread] = None
+        self._last_prune = 0
+
+    def _segment(self, minute: int) -> str:
+        return os.path.join(self.directory, f"events-{minute}.jsonl")
+
+    def publish(self, event: dict):
+        data = (json.dumps(event, separators=(",", ":")) + "\n").encode()
+        minute = int(time.time() // 60)
+        # One O_APPEND write per event, so lines of concurrent workers do not interleave
+        fd = os.open(self._segment(minute), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        if minute != self._last_prune:
+            self._last_prune = minute
+            self._prune(minute)
+
+    def _prune(self, minute: int):
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.name.startswith("events-") and int(entry.name[7:].split(".")[0]) < minute - SEGMENT_KEEP_MINUTES:
+                    os.unlink(entry.path)
+            except (OSError, ValueError):
+                pass
+
+    def start(self, deliver: Callable[[dict], None]):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._tail, args=(deliver,), name="events-tail", daemon=True)
+            self._thread.start()
+
+    def _tail(self, deliver: Callable[[dict], None]):
+        minute = int(time.time() // 60)
+        try:
+            offset = os.path.getsize(self._segment(minute))
+        except OSError:
+            offset = 0
+        buffer = b""
+        while True:
+            try:
+                with open(self._segment(minute), "rb") as fh:
+                    fh.seek(offset)
+                    chunk = fh.read()
+            except OSError:
+                chunk = b""
+            offset += len(chunk)
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                try:
+                    deliver(json.loads(line))
+                except ValueError:
+                    pass
+            # Move to the next segment once writers that took the old minute are done with it
+            if not chunk and time.time() >= (minute + 1) * 60 + 1:
+                minute, offset, buffer = minute + 1, 0, b""
+                continue
+            time.sleep(self.poll_interval)
+
+
+class Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, entities: Optional[frozenset], size: int):
+        self.loop = loop
+        self.entities = entities
+        self.queue: asyncio.Queue = asyncio.Queue(size)
+
+    def offer(self, item: dict):
+        """Queue ``item`` (on the subscriber's loop); a full queue is replaced by ``RESYNC`` (or ``CLOSE``)."""
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(CLOSE if item is CLOSE else RESYNC)
+
+    def select(self, event: dict) -> Optional[dict]:
+        if self.entities is None:
+            return event
+        changes = {k: v for k, v in event["changes"].items() if k in self.entities}
+        return {**event, "changes": changes} if changes else None
+
+
+class Broker:
+    def __init__(self, fanout, history: int = 256):
+        self.fanout = fanout
+        # Event ids are "<boot>-<seq>": a Last-Event-ID from another process or run means resync
+        self.boot = secrets.token_hex(4)
+        self._seq = 0
+        self._history: deque = deque(maxlen=history)
+        self._subscribers: set = set()
+        self._lock = threading.Lock()
+        self._started = False
+        self.published = 0
+        self.delivered = 0
+
+    def publish(self, changes: Dict[str, Dict[str, List[int]]]):
+        with self._lock:
+            self.published += 1
+        self.fanout.publish({"at": format_watermark(datetime.utcnow()), "changes": changes})
+
+    def deliver(self, event: dict):
+        """Number ``event`` and queue it for every interested subscriber (any thread)."""
+        with self._lock:
+            self._seq += 1
+            event = {**event, "id": f"{self.boot}-{self._seq}"}
+            self._history.append((self._seq, event))
+            subscribers = list(self._subscribers)
+            self.delivered += 1
+        for subscriber in subscribers:
+            selected = subscriber.select(event)
+            if selected is not None:
+                try:
+                    subscriber.loop.call_soon_threadsafe(subscriber.offer, selected)
+                except RuntimeError:  # its loop is closed
+                    self.unsubscribe(subscriber)
+
+    def subscribe(self, entities: Optional[Iterable[str]] = None, last_event_id: Optional[str] = None) -> Subscriber:
+        """A subscriber on the running loop; events after ``last_event_id`` are replayed (else ``RESYNC``)."""
+        subscriber = Subscriber(
+            asyncio.get_running_loop(), frozenset(entities) if entities else None, settings.EVENTS_QUEUE_SIZE
+        )
+        with self._lock:
+            if not self._started:
+                self._started = True
+                self.fanout.start(self.deliver)
+            self._subscribers.add(subscriber)
+            if last_event_id:
+                boot, _, seq = last_event_id.partition("-")
+                history = list(self._history)
+                if boot == self.boot and seq.isdigit() and (not history or history[0][0] <= int(seq) + 1):
+                    for number, item in history:
+                        selected = subscriber.select(item) if number > int(seq) else None
+                        if selected is not None:
+                            subscriber.offer(selected)
+                else:
+                    subscriber.offer(RESYNC)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def close(self):
+        """End the streams open now (worker shutdown): each subscriber gets ``CLOSE``."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, CLOSE)
+            except RuntimeError:
+                self.unsubscribe(subscriber)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "delivered": self.delivered,
+                "fanout": type(self.fanout).__name__,
+            }
+
+
+def shared_fanout() -> bool:
+    """Whether events leave this process, i.e. reach the streams served by the other workers."""
+    return bool(settings.EVENTS_FANOUT or settings.EVENTS_SHARED_DIR)
+
+
+def _make_fanout():
+    if settings.EVENTS_FANOUT:
+        module, _, name = settings.EVENTS_FANOUT.partition(":")
+        return getattr(importlib.import_module(module), name)()
+    if settings.EVENTS_SHARED_DIR:
+        return SharedDirFanOut(settings.EVENTS_SHARED_DIR)
+    return LocalFanOut()
+
+
+broker = Broker(_make_fanout(), settings.EVENTS_HISTORY)
+
+
+def record_changes(session: Session, entity: str, ids: Iterable[int], op: str):
+    """Add rows written outside the ORM unit of work to the event of ``session``'s next commit."""
+    pending = session.info.setdefault("change_events", {})
+    rows = pending.setdefault(entity, {})
+    for row_id in ids:
+        previous = rows.get(row_id)
+        rows[row_id] = op if previous is None else _MERGE.get((previous, op), previous)
+
+
+def _compact(pending: Dict[str, Dict[int, str]]) -> Dict[str, dict]:
+    changes = {}
+    for entity, rows in pending.items():
+        if len(rows) > settings.EVENTS_MAX_IDS:
+            changes[entity] = {"many": True}
+            continue
+        by_op: Dict[str, List[int]] = {}
+        for row_id, op in sorted(rows.items()):
+            by_op.setdefault(op, []).append(row_id)
+        changes[entity] = by_op
+    return changes
+
+
+@event.listens_for(Session, "after_flush")
+def _collect(session, flush_context):
+    for op, objects in (("created", session.new), ("updated", session.dirty), ("deleted", session.deleted)):
+        for obj in objects:
+            entity = getattr(obj, "__tablename__", None)
+            if entity not in ENTITIES:
+                continue
+            if op == "updated" and not session.is_modified(obj, include_collections=False):
+                continue
+            record_changes(session, entity, (obj.id,), op)
+            if isinstance(obj, Facture):
+                # Its invoice's amount changed too (see app.models.tombstone._touch_invoice)
+                invoice_ids = {obj.invoice_id, *inspect(obj).attrs.invoice_id.history.deleted} - {None}
+                record_changes(session, Invoice.__tablename__, invoice_ids, "updated")
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session):
+    pending = session.info.pop("change_events", None)
+    if pending and settings.EVENTS_ENABLED:
+        broker.publish(_compact(pending))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard(session, previous_transaction):
+    # A savepoint rollback keeps the rest: publishing a row that did not change is harmless
+    if not previous_transaction.nested:
+        session.info.pop("change_events", None)
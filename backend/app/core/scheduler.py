@@ -0,0 +1,123 @@
+"""In-app scheduler for periodic maintenance (``SCHEDULER_ENABLED``).
+
+Tasks are functions registered with :func:`schedule` under a name and an
+interval. Every server worker runs one scheduler thread that wakes every
+``SCHEDULER_POLL_SECONDS`` and tries to claim each task in the
+``scheduled_tasks`` table (:func:`app.crud.scheduled_task.claim_task`): the
+claim only succeeds when the task last started more than its interval ago
+and no worker holds it, so however many workers poll, one runs each round.
+No broker and no dedicated process are needed; the database elects the
+runner. A worker that dies mid-run holds the task until
+``SCHEDULER_LEASE_SECONDS`` have passed.
+
+The counts a run returns (or its error) are stored in the task's row and
+listed by ``GET /api/jobs/scheduled``.
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.scheduler")
+
+
+@dataclass
+class Task:
+    name: str
+    interval: float  # seconds between the starts of two runs
+    func: Callable[[threading.Event], dict]
+
+
+TASKS: Dict[str, Task] = {}
+
+
+def schedule(name: str, interval: float):
+    """Register ``func(stop)`` to run every ``interval`` seconds on one of the workers."""
+    def decorator(func):
+        TASKS[name] = Task(name, interval, func)
+        return func
+    return decorator
+
+
+class Scheduler:
+    def __init__(self, name: str = None, poll_interval: float = None, lease: float = None):
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = settings.SCHEDULER_POLL_SECONDS if poll_interval is None else poll_interval
+        self.lease = settings.SCHEDULER_LEASE_SECONDS if lease is None else lease
+        self.stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.runs = self.failures = 0
+        self.last: Dict[str, dict] = {}
+
+    def start(self):
+        import app.jobs.sweep  # noqa: F401  (registers the tasks)
+        import app.jobs.tombstones  # noqa: F401
+
+        if self._thread is None:
+            self.stopping.clear()
+            self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self.stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self):
+        # Workers started together would all poll at the same instant
+        if self.stopping.wait(random.uniform(0, min(self.poll_interval, 5.0))):
+            return
+        while not self.stopping.is_set():
+            try:
+                self.run_due()
+            except Exception:
+                # Database unavailable or similar; try again on the next poll
+                logger.exception(f"{self.name}: scheduler poll failed")
+            self.stopping.wait(self.poll_interval)
+
+    def run_due(self) -> Dict[str, dict]:
+        """Run the tasks this worker could claim; returns their results by name."""
+        from app.core.database import SessionLocal
+        from app.crud.scheduled_task import claim_task, ensure_tasks, finish_task
+
+        done = {}
+        with SessionLocal() as db:
+            ensure_tasks(db, TASKS)
+            for task in list(TASKS.values()):
+                if self.stopping.is_set():
+                    break
+                if not claim_task(db, task.name, self.name, task.interval, self.lease):
+                    continue
+                result, error = None, None
+                try:
+                    result = task.func(self.stopping)
+                    logger.info(f"{self.name}: {task.name} done: {result}")
+                    self.runs += 1
+                except Exception:
+                    db.rollback()
+                    error = traceback.format_exc(limit=5)
+                    logger.exception(f"{self.name}: {task.name} failed")
+                    self.failures += 1
+                finish_task(db, task.name, self.name, result, error)
+                self.last[task.name] = result if error is None else {"error": error.strip().splitlines()[-1]}
+                done[task.name] = self.last[task.name]
+        return done
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.SCHEDULER_ENABLED,
+            "running": self._thread is not None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last": dict(self.last),
+        }
+
+
+scheduler = Scheduler()
@@ -0,0 +1,155 @@
+"""Request coalescing: one computation for concurrent identical requests.
+
+A :class:`SingleFlight` group runs ``fn`` once per key at a time. Callers
+that ask for a key already being computed wait for that computation and get
+its result (or its exception) instead of repeating the work. Nothing is kept
+once the flight lands, so keys must capture everything the result depends
+on: the route, its parameters and a data version, i.e. a content hash of the
+document (``app.pdf.cache.document_version``) or the change generation of
+``app.core.changes``.
+
+Both sync endpoints (worker threads, :meth:`SingleFlight.do_sync`) and async
+ones (:meth:`SingleFlight.do`, which computes in the thread pool) can share a
+group. With ``shared_dir`` (``SINGLEFLIGHT_SHARED_DIR``) the workers of a
+host also take an ``fcntl`` lock per key, and the result is left in that
+directory for ``SINGLEFLIGHT_SHARED_TTL`` seconds, so a worker that waited on
+another one's lock reuses its result. Only groups whose keys carry a content
+version may use it: the change generation is per process.
+
+Counters, including the coalescing ratio, are served by ``GET /api/metrics``.
+"""
+import asyncio
+import hashlib
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+# Lock and result files older than this are removed by the next leader
+SHARED_FILE_MAX_AGE = 600
+
+FLIGHTS: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    def __init__(self, name: str, shared_dir: str = ""):
+        self.name = name
+        self.shared_dir = shared_dir or None
+        if self.shared_dir:
+            os.makedirs(self.shared_dir, exist_ok=True)
+        self._flights: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.shared_hits = 0
+        self.errors = 0
+        FLIGHTS[name] = self
+
+    def do_sync(self, key: Hashable, fn: Callable, *args):
+        """``fn(*args)``, or the result of the identical call already running."""
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, fn, args)
+        return future.result()
+
+    async def do(self, key: Hashable, fn: Callable, *args):
+        """Async variant of :meth:`do_sync`; ``fn`` runs in the thread pool."""
+        future, leader = self._join(key)
+        if leader:
+            await run_in_threadpool(self._run, key, future, fn, args)
+        # Shielded: a caller that disconnects must not cancel the flight for the others
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _join(self, key) -> Tuple[Future, bool]:
+        with self._lock:
+            self.calls += 1
+            if not settings.SINGLEFLIGHT_ENABLED:
+                return Future(), True
+            future = self._flights.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._flights[key] = Future()
+            return future, True
+
+    def _run(self, key, future: Future, fn: Callable, args):
+        try:
+            value = self._compute(key, fn, args)
+        except BaseException as exc:
+            with self._lock:
+                self.errors += 1
+            future.set_exception(exc)
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                if self._flights.get(key) is future:
+                    del self._flights[key]
+
+    def _execute(self, fn: Callable, args):
+        with self._lock:
+            self.executions += 1
+        return fn(*args)
+
+    def _compute(self, key, fn: Callable, args):
+        if not self.shared_dir or not settings.SINGLEFLIGHT_ENABLED:
+            return self._execute(fn, args)
+        import fcntl
+
+        base = os.path.join(self.shared_dir, f"{self.name}-{hashlib.sha1(repr(key).encode()).hexdigest()}")
+        with open(base + ".lock", "a") as lock:
+            # Blocks while another worker computes the same key
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if time.time() - os.stat(base + ".result").st_mtime < settings.SINGLEFLIGHT_SHARED_TTL:
+                    with open(base + ".result", "rb") as fh:
+                        value = pickle.load(fh)
+                    with self._lock:
+                        self.shared_hits += 1
+                    return value
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            value = self._execute(fn, args)
+            tmp = f"{base}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, base + ".result")
+        self._prune()
+        return value
+
+    def _prune(self):
+        now = time.time()
+        if now - self._last_prune < SHARED_FILE_MAX_AGE:
+            return
+        self._last_prune = now
+        for entry in os.scandir(self.shared_dir):
+            try:
+                if entry.name.startswith(f"{self.name}-") and now - entry.stat().st_mtime > SHARED_FILE_MAX_AGE:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "shared_hits": self.shared_hits,
+                "errors": self.errors,
+                "in_flight": len(self._flights),
+                "coalescing_ratio": round((self.coalesced + self.shared_hits) / self.calls, 3) if self.calls else 0.0,
+                "shared": bool(self.shared_dir),
+            }
+
+
+def flights_stats() -> dict:
+    return {name: flight.stats() for name, flight in FLIGHTS.items()}
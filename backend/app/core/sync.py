@@ -0,0 +1,95 @@
+"""Delta sync for the list endpoints: ``?since=<watermark>``.
+
+Every synced table has an indexed ``updated_at`` (set on insert and update)
+and leaves a ``Tombstone`` row when one of its rows is deleted
+(``app.models.tombstone``). A list endpoint called with ``since`` answers::
+
+    {"changed": [<rows, as the plain list>], "deleted": [<ids>], "watermark": "<next since>"}
+
+``since=0`` is a full load (every row, no deletions). The watermark is the
+server's UTC time taken before reading, and rows updated up to
+``SYNC_OVERLAP_SECONDS`` before ``since`` are sent again: a transaction that
+committed late (or a worker whose clock is slightly behind) is not missed,
+at the cost of a few rows the client already has. Clients apply
+``deleted`` then upsert ``changed`` by id. Tombstones are kept
+``SYNC_TOMBSTONE_RETENTION_DAYS``; an older watermark gets 410 and the
+client has to reload with ``since=0``. Older tombstones are deleted by the
+scheduler (``app.jobs.tombstones``), so list reads never write.
+"""
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.tombstone import Tombstone
+
+class SyncWindow(NamedTuple):
+    # Lower bound of updated_at / deleted_at (since minus the overlap); None for a full load
+    lower: Optional[datetime]
+    watermark: datetime
+
+
+def format_watermark(value: datetime) -> str:
+    return value.isoformat(timespec="microseconds") + "Z"
+
+
+def sync_window(since: str) -> SyncWindow:
+    """Window of a ``since`` parameter: 400 if it is not a watermark, 410 if tombstones expired."""
+    now = datetime.utcnow()
+    if since.strip() == "0":
+        return SyncWindow(None, now)
+    try:
+        value = datetime.fromisoformat(since.strip())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since must be a watermark returned by the API, or 0")
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    if value < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+        raise HTTPException(status_code=410, detail="Watermark has expired, reload with since=0")
+    return SyncWindow(value - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS), now)
+
+
+def deleted_since(db: Session, entity: str, lower: Optional[datetime]) -> List[int]:
+    """Ids of ``entity`` (table name) rows deleted at or after ``lower``."""
+    if lower is None:
+        return []
+    stmt = (
+        select(Tombstone.entity_id)
+        .where(Tombstone.entity == entity, Tombstone.deleted_at >= lower)
+        .distinct()
+    )
+    return list(db.execute(stmt).scalars())
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def delta_response(db: Session, model, rows, schema, window: SyncWindow) -> JSONResponse:
+    """The ``{"changed", "deleted", "watermark"}`` body for ``model``'s ``rows`` (already filtered on the window).
+
+    ``schema`` is the endpoint's ``*Out`` model (``None`` for rows that are plain dicts).
+    """
+    if schema is None:
+        changed = jsonable_encoder(rows)
+    else:
+        adapter = _adapter(schema)
+        changed = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    # An id deleted then reused (and in ``changed``) exists again
+    present = {row["id"] for row in changed if "id" in row}
+    deleted = [i for i in deleted_since(db, model.__tablename__, window.lower) if i not in present]
+    return JSONResponse({"changed": changed, "deleted": deleted, "watermark": format_watermark(window.watermark)})
+
+
+def prune_tombstones(db: Session) -> int:
+    """Drop tombstones past the retention; their watermarks get 410 anyway."""
+    cutoff = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    return db.execute(delete(Tombstone).where(Tombstone.deleted_at < cutoff)).rowcount
@@ -0,0 +1,198 @@
+"""Receivables aging: outstanding invoice balances per client by days past due.
+
+An invoice is outstanding while its status is open (:data:`OPEN_STATUSES`)
+and ``amount`` exceeds ``paid_amount``; the balance goes to a bucket by the
+days between ``due_date`` and the report date: ``current`` (not due yet),
+0–30, 31–60, 61–90 and 90+. The summary is one grouped query over the
+``(status, due_date)`` index; :func:`client_aging` lists the invoices of one
+client from the same index. Archived invoices are paid, so only ``invoices`` is read.
+
+Results are cached per report date and client, keyed by :func:`data_version`:
+the newest ``updated_at`` of invoices (a payment, or a facture changing an
+invoice's amount, updates it), contracts and clients and the newest invoice
+tombstone, read with one query on their indexes. Any worker sees a write
+made by another one on the next request.
+"""
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.invoice import Invoice
+from app.models.tombstone import Tombstone
+
+OPEN_STATUSES = ("unpaid", "partial", "overdue")
+
+# (name, fewest days past due, most days past due); None: unbounded
+BUCKETS = (
+    ("current", None, -1),
+    ("days_0_30", 0, 30),
+    ("days_31_60", 31, 60),
+    ("days_61_90", 61, 90),
+    ("days_90_plus", 91, None),
+)
+# Column and bucket labels of the exports (CSV and PDF)
+BUCKET_LABELS = {
+    "current": "Non échu",
+    "days_0_30": "0-30 j",
+    "days_31_60": "31-60 j",
+    "days_61_90": "61-90 j",
+    "days_90_plus": "+90 j",
+}
+
+CACHE_SIZE = 64
+
+
+def _outstanding():
+    return Invoice.amount - func.coalesce(Invoice.paid_amount, 0)
+
+
+def _open_invoices():
+    return and_(Invoice.status.in_(OPEN_STATUSES), Invoice.amount > func.coalesce(Invoice.paid_amount, 0))
+
+
+def _in_bucket(as_of: date, fewest: Optional[int], most: Optional[int]):
+    # Days past due = as_of - due_date, compared as dates so the index and every dialect work alike
+    conditions = []
+    if fewest is not None:
+        conditions.append(Invoice.due_date <= as_of - timedelta(days=fewest))
+    if most is not None:
+        conditions.append(Invoice.due_date >= as_of - timedelta(days=most))
+    return and_(*conditions)
+
+
+def bucket_of(days_overdue: int) -> str:
+    for name, fewest, most in BUCKETS:
+        if (fewest is None or days_overdue >= fewest) and (most is None or days_overdue <= most):
+            return name
+    raise ValueError(days_overdue)
+
+
+def _figures(row) -> dict:
+    figures = {name: round(float(getattr(row, name) or 0.0), 2) for name, _, _ in BUCKETS}
+    figures["total"] = round(sum(figures.values()), 2)
+    return figures
+
+
+def _summary(db: Session, as_of: date) -> List[dict]:
+    outstanding = _outstanding()
+    stmt = (
+        select(
+            Client.id.label("client_id"), Client.client_name, func.count().label("invoices"),
+            *(func.sum(case((_in_bucket(as_of, fewest, most), outstanding), else_=0)).label(name)
+              for name, fewest, most in BUCKETS),
+        )
+        .select_from(Invoice)
+        .join(Contract, Contract.id == Invoice.contract_id)
+        .join(Client, Client.id == Contract.client_id)
+        .where(_open_invoices())
+        .group_by(Client.id, Client.client_name)
+    )
+    clients = [
+        {"client_id": row.client_id, "client_name": row.client_name, "invoices": row.invoices, **_figures(row)}
+        for row in db.execute(stmt)
+    ]
+    # Collections start with the largest and oldest balances
+    clients.sort(key=lambda c: (-c["total"], -c["days_90_plus"], c["client_id"]))
+    return clients
+
+
+def _totals(clients: List[dict]) -> dict:
+    totals = {name: round(sum(c[name] for c in clients), 2) for name, _, _ in BUCKETS}
+    totals["total"] = round(sum(totals.values()), 2)
+    totals["invoices"] = sum(c["invoices"] for c in clients)
+    return totals
+
+
+def data_version(db: Session) -> tuple:
+    """Newest change to the rows the report reads; a different value means recompute."""
+    return db.execute(select(
+        select(func.max(Invoice.updated_at)).scalar_subquery(),
+        select(func.max(Contract.updated_at)).scalar_subquery(),
+        select(func.max(Client.updated_at)).scalar_subquery(),
+        select(func.max(Tombstone.deleted_at)).where(Tombstone.entity == Invoice.__tablename__).scalar_subquery(),
+    )).one().tuple()
+
+
+class AgingCache:
+    """Last reports per (kind, date, client), valid while :func:`data_version` is unchanged."""
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self._size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, db: Session, key: tuple, compute: Callable[[], dict]) -> dict:
+        version = data_version(db)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        result = compute()
+        with self._lock:
+            self._entries[key] = (version, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+aging_cache = AgingCache()
+
+
+def aging_report(db: Session, as_of: date) -> dict:
+    """Outstanding balances per client and bucket, largest first, with the totals."""
+    def compute():
+        clients = _summary(db, as_of)
+        return {"as_of": as_of, "clients": clients, "totals": _totals(clients)}
+
+    return aging_cache.get(db, ("summary", as_of, None), compute)
+
+
+def client_aging(db: Session, client_id: int, as_of: date) -> Optional[dict]:
+    """One client's buckets and outstanding invoices, oldest due first; ``None`` if the client does not exist."""
+    def compute():
+        client = db.execute(select(Client.id, Client.client_name).where(Client.id == client_id)).first()
+        if client is None:
+            return None
+        rows = db.execute(
+            select(
+                Invoice.id, Invoice.invoice_number, Invoice.contract_id, Contract.command_number, Invoice.due_date,
+                Invoice.status, Invoice.amount, func.coalesce(Invoice.paid_amount, 0).label("paid_amount"),
+            )
+            .join(Contract, Contract.id == Invoice.contract_id)
+            .where(Contract.client_id == client_id, _open_invoices())
+            .order_by(Invoice.due_date, Invoice.id)
+        )
+        invoices = []
+        figures = dict.fromkeys((name for name, _, _ in BUCKETS), 0.0)
+        for row in rows:
+            days_overdue = (as_of - row.due_date).days
+            outstanding = float(row.amount) - float(row.paid_amount)
+            bucket = bucket_of(days_overdue)
+            figures[bucket] += outstanding
+            invoices.append({
+                "id": row.id, "invoice_number": row.invoice_number, "contract_id": row.contract_id,
+                "contract_number": row.command_number, "due_date": row.due_date, "status": row.status,
+                "amount": round(float(row.amount), 2), "paid_amount": round(float(row.paid_amount), 2),
+                "outstanding": round(outstanding, 2), "days_overdue": days_overdue, "bucket": bucket,
+            })
+        summary = {"client_id": client.id, "client_name": client.client_name, "invoices": len(invoices)}
+        summary.update({name: round(value, 2) for name, value in figures.items()})
+        summary["total"] = round(sum(figures.values()), 2)
+        return {"as_of": as_of, "client": summary, "invoices": invoices}
+
+    return aging_cache.get(db, ("client", as_of, client_id), compute)
@@ -0,0 +1,126 @@
+"""Archive of closed invoices: ``invoices_archive`` and ``factures_archive``.
+
+A fully paid invoice (status ``paid``) due more than ``ARCHIVE_AFTER_DAYS``
+ago is moved there with its factures by :func:`archive_batch` (run by
+``python -m app.jobs.archive``), so that ``invoices`` and ``factures`` and
+their indexes, the pages the database keeps in memory, only hold the open
+and recent rows. Rows keep their ids, so snapshots and links stay valid.
+Each batch copies then deletes in one transaction: the mover can be stopped
+at any point and resumes where it was by running again.
+
+Reads that cover the whole history (reports, exports, ``GET
+/invoices/?include_archived=true``) select from :func:`all_invoices` and
+:func:`all_factures`, ``UNION ALL`` of the hot and archive tables, or from
+:func:`union_factures` / :func:`union_invoices` when a filter must apply to
+both sides.
+"""
+from datetime import date
+from typing import Callable, List, NamedTuple, Sequence
+
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.events import record_changes
+from app.models.archive import FactureArchive, InvoiceArchive
+from app.models.facture import Facture
+from app.models.invoice import Invoice
+from app.models.tombstone import record_deleted
+
+INVOICE_FIELDS = tuple(column.name for column in Invoice.__table__.columns)
+FACTURE_FIELDS = tuple(column.name for column in Facture.__table__.columns)
+
+
+class ArchiveBatch(NamedTuple):
+    invoices: int
+    factures: int
+
+
+def _union(hot, archive, fields: Sequence[str], where: Callable = None):
+    selects = []
+    for table in (hot.__table__, archive.__table__):
+        stmt = select(*(table.c[name] for name in fields))
+        selects.append(stmt.where(where(table.c)) if where is not None else stmt)
+    return union_all(*selects)
+
+
+def all_invoices():
+    """Hot and archived invoices, as a subquery with the ``invoices`` columns."""
+    return _union(Invoice, InvoiceArchive, INVOICE_FIELDS).subquery("all_invoices")
+
+
+def all_factures():
+    """Hot and archived factures, as a subquery with the ``factures`` columns."""
+    return _union(Facture, FactureArchive, FACTURE_FIELDS).subquery("all_factures")
+
+
+def union_factures(fields: Sequence[str], where: Callable):
+    """``fields`` of the hot and archived factures matching ``where(columns)``, filtered on each side."""
+    return _union(Facture, FactureArchive, fields, where)
+
+
+def union_invoices(fields: Sequence[str], where: Callable):
+    """``fields`` of the hot and archived invoices matching ``where(columns)``, filtered on each side."""
+    return _union(Invoice, InvoiceArchive, fields, where)
+
+
+def archivable(cutoff: date):
+    """Ids of the invoices to archive: paid and due before ``cutoff``.
+
+    The newest invoice, and the invoice of the newest facture, stay: SQLite
+    (and MySQL before 8.0, after a restart) hands out ``max(id) + 1``, which
+    could reuse the id of an archived row.
+    """
+    newest_facture = select(func.max(Facture.id)).scalar_subquery()
+    return (
+        select(Invoice.id)
+        .where(
+            Invoice.status == "paid",
+            Invoice.due_date < cutoff,
+            Invoice.id < select(func.max(Invoice.id)).scalar_subquery(),
+            ~select(Facture.id)
+            .where(Facture.invoice_id == Invoice.id, Facture.id == newest_facture)
+            .exists(),
+        )
+        .order_by(Invoice.id)
+    )
+
+
+def count_archivable(db: Session, cutoff: date) -> int:
+    return db.scalar(select(func.count()).select_from(archivable(cutoff).order_by(None).subquery())) or 0
+
+
+def archive_batch(db: Session, cutoff: date, batch_size: int) -> ArchiveBatch:
+    """Move up to ``batch_size`` archivable invoices and their factures, and commit."""
+    ids: List[int] = db.execute(archivable(cutoff).limit(batch_size)).scalars().all()
+    if not ids:
+        return ArchiveBatch(0, 0)
+    facture_ids = db.execute(select(Facture.id).where(Facture.invoice_id.in_(ids))).scalars().all()
+
+    invoices, factures = Invoice.__table__, Facture.__table__
+    db.execute(insert(InvoiceArchive.__table__).from_select(
+        INVOICE_FIELDS, select(*(invoices.c[name] for name in INVOICE_FIELDS)).where(invoices.c.id.in_(ids))
+    ))
+    db.execute(insert(FactureArchive.__table__).from_select(
+        FACTURE_FIELDS, select(*(factures.c[name] for name in FACTURE_FIELDS)).where(factures.c.invoice_id.in_(ids))
+    ))
+    db.execute(delete(factures).where(factures.c.invoice_id.in_(ids)))
+    db.execute(delete(invoices).where(invoices.c.id.in_(ids)))
+    # Gone from the hot lists: delta sync and change events drop them like deleted rows
+    record_deleted(db.connection(), factures.name, facture_ids)
+    record_deleted(db.connection(), invoices.name, ids)
+    record_changes(db, factures.name, facture_ids, "deleted")
+    record_changes(db, invoices.name, ids, "deleted")
+    db.commit()
+    return ArchiveBatch(len(ids), len(facture_ids))
+
+
+def invoice_number_exists(db: Session, invoice_number: str) -> bool:
+    """Whether a hot or archived invoice has this number (numbers stay unique across both)."""
+    stmt = _union(Invoice, InvoiceArchive, ("id",), lambda c: c.invoice_number == invoice_number)
+    return db.execute(stmt.limit(1)).first() is not None
+
+
+def delete_contract_archive(db: Session, contract_id: int):
+    """Archived invoices and factures of a contract being deleted."""
+    db.execute(delete(FactureArchive.__table__).where(FactureArchive.__table__.c.contract_id == contract_id))
+    db.execute(delete(InvoiceArchive.__table__).where(InvoiceArchive.__table__.c.contract_id == contract_id))
@@ -0,0 +1,49 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from typing import Optional
+from app.models.document_snapshot import DocumentSnapshot
+
+def get_snapshot(db: Session, document_type: str, document_id: int) -> Optional[DocumentSnapshot]:
+    return db.execute(
+        select(DocumentSnapshot).where(
+            DocumentSnapshot.document_type == document_type,
+            DocumentSnapshot.document_id == document_id,
+        )
+    ).scalar_one_or_none()
+
+def create_snapshot(
+    db: Session,
+    document_type: str,
+    document_id: int,
+    data: dict,
+    content_sha256: Optional[str] = None,
+    content_size: Optional[int] = None,
+    profile: Optional[str] = None,
+) -> Optional[DocumentSnapshot]:
+    """Store the snapshot. Returns None if the document already has one (concurrent issue)."""
+    snapshot = DocumentSnapshot(
+        document_type=document_type,
+        document_id=document_id,
+        data=data,
+        content_sha256=content_sha256,
+        content_size=content_size,
+        profile=profile,
+    )
+    db.add(snapshot)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    db.refresh(snapshot)
+    return snapshot
+
+def delete_snapshot(db: Session, document_type: str, document_id: int) -> None:
+    """Drop the snapshot row; stored bytes may be shared and are left in place."""
+    db.execute(
+        delete(DocumentSnapshot).where(
+            DocumentSnapshot.document_type == document_type,
+            DocumentSnapshot.document_id == document_id,
+        )
+    )
@@ -3,6 +3,7 @@ from sqlalchemy import func
 from datetime import datetime, timedelta
 from typing import List, Optional
 from .. import models, schemas
+from .sweep import invoice_status
 
 def get_facture(db: Session, facture_id: int):
     return db.query(models.Facture).filter(models.Facture.id == facture_id).first()
@@ -12,11 +13,19 @@ def get_factures_by_contract(db: Session, contract_id: int, skip: int = 0, limit
         models.Facture.contract_id == contract_id
     ).order_by(models.Facture.created_at.desc()).offset(skip).limit(limit).all()
 
+def _archived_total(db: Session, contract_id: int) -> float:
+    # Factures of archived invoices still count against the contract amount
+    return db.query(
+        func.coalesce(func.sum(models.FactureArchive.total_ht), 0.0)
+    ).filter(
+        models.FactureArchive.contract_id == contract_id
+    ).scalar() or 0.0
+
 def update_contract_total(db: Session, contract_id: int):
     # Calculate total from all factures for this contract
-    total = db.query(func.sum(models.Facture.total_ht)).filter(
+    total = (db.query(func.sum(models.Facture.total_ht)).filter(
         models.Facture.contract_id == contract_id
-    ).scalar() or 0.0
+    ).scalar() or 0.0) + _archived_total(db, contract_id)
     
     # Get the contract (without modifying its price)
     db_contract = db.query(models.Contract).filter(models.Contract.id == contract_id).first()
@@ -39,6 +48,7 @@ def create_facture(db: Session, facture: schemas.FactureCreate):
     ).filter(
         models.Facture.contract_id == facture.contract_id
     ).scalar() or 0.0
+    existing_factures_total += _archived_total(db, facture.contract_id)
     
     # Check if adding this facture would exceed contract amount
     # Skip validation if contract price is very large (temporary PDF generation)
@@ -71,7 +81,7 @@ def create_facture(db: Session, facture: schemas.FactureCreate):
         ).order_by(models.Invoice.id.asc()).first()
         # If no invoice exists, create a new one
         if not invoice:
-            invoice_count = db.query(models.Invoice).count()
+            invoice_count = db.query(models.Invoice).count() + db.query(models.InvoiceArchive).count()
             invoice_number = f"INV-{invoice_count + 1:05d}"
             due_date = datetime.utcnow() + timedelta(days=30)
             
@@ -110,13 +120,7 @@ def create_facture(db: Session, facture: schemas.FactureCreate):
     ).scalar() or 0.0
 
     # Preserve existing paid_amount and update status based on new amount
-    current_paid = float(getattr(invoice, 'paid_amount', 0.0) or 0.0)
-    if current_paid >= invoice.amount:
-        invoice.status = 'paid'
-    elif current_paid > 0:
-        invoice.status = 'partial'
-    else:
-        invoice.status = 'unpaid'
+    invoice.status = invoice_status(invoice.amount, invoice.paid_amount, invoice.due_date)
 
     db.add(invoice)
     db.commit()
@@ -168,13 +172,7 @@ def update_facture(db: Session, facture_id: int, facture: schemas.FactureUpdate)
             ).filter(
                 models.Facture.invoice_id == invoice.id
             ).scalar() or 0.0
-            current_paid = float(getattr(invoice, 'paid_amount', 0.0) or 0.0)
-            if current_paid >= invoice.amount:
-                invoice.status = 'paid'
-            elif current_paid > 0:
-                invoice.status = 'partial'
-            else:
-                invoice.status = 'unpaid'
+            invoice.status = invoice_status(invoice.amount, invoice.paid_amount, invoice.due_date)
             db.add(invoice)
             db.commit()
             db.refresh(invoice)
@@ -203,13 +201,7 @@ def delete_facture(db: Session, facture_id: int):
             ).filter(
                 models.Facture.invoice_id == invoice.id
             ).scalar() or 0.0
-            current_paid = float(getattr(invoice, 'paid_amount', 0.0) or 0.0)
-            if current_paid >= invoice.amount:
-                invoice.status = 'paid'
-            elif current_paid > 0:
-                invoice.status = 'partial'
-            else:
-                invoice.status = 'unpaid'
+            invoice.status = invoice_status(invoice.amount, invoice.paid_amount, invoice.due_date)
             db.add(invoice)
             db.commit()
             db.refresh(invoice)
@@ -0,0 +1,103 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete, or_, and_
+from datetime import datetime, timedelta
+from typing import Optional
+from app.core.config import settings
+from app.models.job import Job
+
+def enqueue_job(db: Session, kind: str, payload: dict, priority: int = 0, max_attempts: Optional[int] = None) -> Job:
+    job = Job(
+        kind=kind,
+        payload=payload,
+        status="queued",
+        priority=priority,
+        attempts=0,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=datetime.utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def get_job(db: Session, job_id: int) -> Optional[Job]:
+    return db.get(Job, job_id)
+
+def _claimable(now: datetime):
+    # Queued jobs that are due, plus running jobs whose worker lease expired (crashed worker)
+    lease_cutoff = now - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    return or_(
+        and_(Job.status == "queued", Job.run_after <= now),
+        and_(Job.status == "running", Job.locked_at < lease_cutoff),
+    )
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[Job]:
+    """Lock the highest priority due job for ``worker_id`` and mark it running.
+
+    On MySQL the candidate row is selected with ``FOR UPDATE SKIP LOCKED`` so
+    concurrent workers never wait on each other. The conditional UPDATE makes
+    the claim safe on databases without row locks too (SQLite): if another
+    worker got there first, no row matches and we try the next candidate.
+    """
+    for _ in range(5):
+        now = datetime.utcnow()
+        job_id = db.execute(
+            select(Job.id)
+            .where(_claimable(now))
+            .order_by(Job.priority.desc(), Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).scalar()
+        if job_id is None:
+            db.rollback()
+            return None
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, _claimable(now))
+            .values(
+                status="running",
+                locked_by=worker_id,
+                locked_at=now,
+                started_at=now,
+                attempts=Job.attempts + 1,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(Job, job_id, populate_existing=True)
+    return None
+
+def complete_job(db: Session, job: Job, result_path: str, media_type: str, filename: str, size: int) -> Job:
+    job.status = "succeeded"
+    job.result_path = result_path
+    job.result_media_type = media_type
+    job.result_filename = filename
+    job.result_size = size
+    job.error = None
+    job.locked_by = None
+    job.finished_at = datetime.utcnow()
+    db.commit()
+    return job
+
+def fail_job(db: Session, job: Job, error: str, retry: bool = True) -> Job:
+    """Record a failed attempt; requeue with exponential backoff while attempts remain."""
+    job.error = error
+    job.locked_by = None
+    if retry and job.attempts < job.max_attempts:
+        job.status = "queued"
+        delay = settings.JOB_RETRY_BACKOFF * (2 ** (job.attempts - 1))
+        job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+    else:
+        job.status = "failed"
+        job.finished_at = datetime.utcnow()
+    db.commit()
+    return job
+
+def purge_finished_jobs(db: Session, older_than: datetime) -> list:
+    """Delete finished jobs older than ``older_than``; returns their result paths."""
+    finished = (Job.status.in_(("succeeded", "failed")), Job.finished_at < older_than)
+    paths = [p for p in db.execute(select(Job.result_path).where(*finished)).scalars() if p]
+    db.execute(delete(Job).where(*finished))
+    db.commit()
+    return paths
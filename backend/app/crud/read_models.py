@@ -0,0 +1,372 @@
+"""Read models for the list endpoints.
+
+Lists are read with ``select(<columns>)`` into named tuples instead of ORM
+instances: no identity map entries, attribute instrumentation or
+relationship loaders, just the columns the response shows. Each DTO keeps
+the model's column names, so the ``*Out`` schemas serialize it unchanged
+(FastAPI reads it by attribute, like an ORM object). Named tuples rather
+than dataclasses: FastAPI would run ``dataclasses.asdict`` on every row.
+
+The PDF loaders (``app.pdf.loaders``) follow the same approach with their
+slotted document views.
+
+The lists take ``changed_since`` for delta sync (``app.core.sync``): only
+rows whose ``updated_at`` -- or that of a joined row the DTO shows, such as
+a contract's client -- is at or after it.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.crud.archive import all_factures, all_invoices
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.contract_detail import ContractDetail
+from app.models.estimate import Estimate
+from app.models.facture import Facture
+from app.models.invoice import Invoice
+from app.models.misc import Misc
+from app.models.salary import Salary
+
+
+class ClientRow(NamedTuple):
+    id: int
+    client_number: Optional[str]
+    client_name: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+    tva_number: Optional[str]
+    tsa_number: Optional[str]
+    contact_person: Optional[str]
+    contact_person_phone: Optional[str]
+    contact_person_designation: Optional[str]
+    client_address: Optional[str]
+
+
+class ClientInfoRow(NamedTuple):
+    id: int
+    client_name: Optional[str]
+    client_number: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+
+
+class ContractRow(NamedTuple):
+    id: int
+    command_number: str
+    price: float
+    date: date
+    deadline: date
+    guarantee_percentage: Optional[float]
+    contact_person: Optional[str]
+    contact_phone: Optional[str]
+    contact_email: Optional[str]
+    contact_address: Optional[str]
+    name: Optional[str]
+    client_id: int
+    client: Optional[ClientInfoRow]
+
+
+class ContractRefRow(NamedTuple):
+    """The contract columns the pickers and lookups of the screens use."""
+    id: int
+    command_number: str
+    name: Optional[str]
+    price: float
+    date: date
+    client_id: int
+
+
+class InvoiceRow(NamedTuple):
+    id: int
+    invoice_number: str
+    contract_id: int
+    amount: float
+    due_date: date
+    status: str
+    paid_amount: float
+    created_at: Optional[datetime]
+    client_id: Optional[int]
+    client_name: Optional[str]
+    contract_number: Optional[str]
+
+
+class EstimateRow(NamedTuple):
+    id: int
+    estimate_number: str
+    client_id: int
+    amount: float
+    creation_date: date
+    expiration_date: Optional[date]
+    status: str
+    client_name: Optional[str]
+
+
+class FactureRow(NamedTuple):
+    id: int
+    contract_id: int
+    invoice_id: Optional[int]
+    description: str
+    qty: float
+    qty_unit: Optional[str]
+    unit_price: float
+    tva: float
+    total_ht: float
+    created_at: Optional[datetime]
+
+
+class DetailRow(NamedTuple):
+    """A contract detail: devis line of a contract or of an estimate."""
+    id: int
+    contract_id: Optional[int]
+    estimate_id: Optional[int]
+    description: Optional[str]
+    qty: Optional[float]
+    qty_unit: Optional[str]
+    unit_price: Optional[float]
+    tva: Optional[float]
+    total_ht: Optional[float]
+
+
+class SalaryRow(NamedTuple):
+    id: int
+    employee_name: str
+    working_days: int
+    leaves: int
+    salary_per_day: float
+    total_salary: float
+
+
+class MiscRow(NamedTuple):
+    id: int
+    description: str
+    price: float
+    units: int
+    created_at: Optional[datetime]
+
+
+def _columns(model, dto, skip=()):
+    return tuple(getattr(model, name) for name in dto._fields if name not in skip)
+
+
+CLIENT_COLUMNS = _columns(Client, ClientRow)
+CLIENT_INFO_COLUMNS = _columns(Client, ClientInfoRow)
+CONTRACT_COLUMNS = _columns(Contract, ContractRow, skip=("client",))
+FACTURE_COLUMNS = _columns(Facture, FactureRow)
+DETAIL_COLUMNS = _columns(ContractDetail, DetailRow)
+CONTRACT_REF_COLUMNS = _columns(Contract, ContractRefRow)
+SALARY_COLUMNS = _columns(Salary, SalaryRow)
+MISC_COLUMNS = _columns(Misc, MiscRow)
+
+
+def _changed(stmt, changed_since: Optional[datetime], *models):
+    if changed_since is None:
+        return stmt
+    return stmt.where(or_(*(model.updated_at >= changed_since for model in models)))
+
+
+def list_clients(db: Session, changed_since: Optional[datetime] = None) -> List[ClientRow]:
+    stmt = _changed(select(*CLIENT_COLUMNS), changed_since, Client)
+    return [ClientRow._make(row) for row in db.execute(stmt)]
+
+
+# Sortable client columns; NULLs sort as "" so that the keyset cursor stays comparable
+CLIENT_SORTS = ("id", "client_number", "client_name", "email")
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values: Sequence) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Values of an :func:`encode_cursor` string; ``ValueError`` if it is malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def page_clients(
+    db: Session,
+    fields: Optional[Sequence[str]] = None,
+    ids: Optional[Sequence[int]] = None,
+    sort: str = "id",
+    descending: bool = False,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    changed_since: Optional[datetime] = None,
+) -> Tuple[list, Optional[str]]:
+    """A page of clients and the cursor of the next one (``None`` on the last page).
+
+    Only the ``fields`` columns are selected (rows are then dicts of those
+    fields, else :class:`ClientRow`). Rows are ordered by ``sort`` then id and
+    paginated by keyset: ``cursor`` holds the sort key of the previous page's
+    last row. ``ValueError`` for an unknown field or sort, or a bad cursor.
+    """
+    if sort not in CLIENT_SORTS:
+        raise ValueError(f"Unknown sort field: {sort}")
+    if fields is not None:
+        unknown = [f for f in fields if f not in ClientRow._fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    column = getattr(Client, sort)
+    key = column if sort == "id" else func.coalesce(column, "")
+    selected = CLIENT_COLUMNS if fields is None else tuple(getattr(Client, f) for f in fields)
+
+    stmt = _changed(select(*selected, key, Client.id), changed_since, Client)
+    if ids is not None:
+        stmt = stmt.where(Client.id.in_(ids))
+    if cursor:
+        after, after_id = decode_cursor(cursor)
+        if descending:
+            stmt = stmt.where(or_(key < after, and_(key == after, Client.id < after_id)))
+        else:
+            stmt = stmt.where(or_(key > after, and_(key == after, Client.id > after_id)))
+    stmt = stmt.order_by(key.desc(), Client.id.desc()) if descending else stmt.order_by(key, Client.id)
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+
+    rows = db.execute(stmt).all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][-2:])
+    n = len(selected)
+    if fields is None:
+        return [ClientRow._make(row[:n]) for row in rows], next_cursor
+    return [dict(zip(fields, row[:n])) for row in rows], next_cursor
+
+
+def list_contracts(db: Session, changed_since: Optional[datetime] = None) -> List[ContractRow]:
+    """Contracts with their client summary, in one outer-joined query."""
+    n = len(CONTRACT_COLUMNS)
+    stmt = select(*CONTRACT_COLUMNS, *CLIENT_INFO_COLUMNS).outerjoin(Client, Client.id == Contract.client_id)
+    stmt = _changed(stmt, changed_since, Contract, Client)
+    return [
+        ContractRow(*row[:n], ClientInfoRow._make(row[n:]) if row[n] is not None else None)
+        for row in db.execute(stmt)
+    ]
+
+
+def list_contract_refs(db: Session) -> List[ContractRefRow]:
+    stmt = select(*CONTRACT_REF_COLUMNS).order_by(Contract.id)
+    return [ContractRefRow._make(row) for row in db.execute(stmt)]
+
+
+def list_invoices(
+    db: Session, changed_since: Optional[datetime] = None, include_archived: bool = False
+) -> List[InvoiceRow]:
+    """Invoices with their contract number, client and amount (sum of their factures).
+
+    A facture write also bumps its invoice's ``updated_at`` (see ``app.models.tombstone``).
+    ``include_archived`` adds the archived ones (``app.crud.archive``).
+    """
+    if include_archived:
+        invoices, factures = all_invoices(), all_factures()
+    else:
+        invoices, factures = Invoice.__table__, Facture.__table__
+    totals = (
+        select(factures.c.invoice_id, func.sum(factures.c.total_ht).label("total"))
+        .where(factures.c.invoice_id.is_not(None))
+        .group_by(factures.c.invoice_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            invoices.c.id, invoices.c.invoice_number, invoices.c.contract_id, totals.c.total, invoices.c.due_date,
+            invoices.c.status, invoices.c.paid_amount, invoices.c.created_at,
+            Contract.id, Contract.command_number, Client.id, Client.client_name,
+        )
+        .select_from(invoices)
+        .outerjoin(totals, totals.c.invoice_id == invoices.c.id)
+        .outerjoin(Contract, Contract.id == invoices.c.contract_id)
+        .outerjoin(Client, Client.id == Contract.client_id)
+        .order_by(invoices.c.id)
+    )
+    stmt = _changed(stmt, changed_since, invoices.c, Contract, Client)
+    return [
+        InvoiceRow(
+            id=invoice_id,
+            invoice_number=number,
+            contract_id=contract_id if contract_id is not None else invoice_contract_id,
+            # Derived from the factures rather than the stored amount, which can be stale
+            amount=float(total or 0.0),
+            due_date=due_date,
+            status=status or "unpaid",
+            paid_amount=float(paid or 0.0),
+            created_at=created_at,
+            client_id=client_id,
+            client_name=client_name,
+            contract_number=command_number,
+        )
+        for (invoice_id, number, invoice_contract_id, total, due_date, status, paid, created_at,
+             contract_id, command_number, client_id, client_name) in db.execute(stmt)
+    ]
+
+
+def list_estimates(db: Session, changed_since: Optional[datetime] = None) -> List[EstimateRow]:
+    stmt = (
+        select(
+            Estimate.id, Estimate.estimate_number, Estimate.client_id, Estimate.amount,
+            Estimate.creation_date, Estimate.expiration_date, Estimate.status, Client.client_name,
+        )
+        .outerjoin(Client, Client.id == Estimate.client_id)
+    )
+    stmt = _changed(stmt, changed_since, Estimate, Client)
+    return [
+        EstimateRow(id, number, client_id, amount or 0.0, created, expires, status or "draft", client_name)
+        for id, number, client_id, amount, created, expires, status, client_name in db.execute(stmt)
+    ]
+
+
+def list_factures_by_contract(
+    db: Session, contract_id: int, skip: int = 0, limit: int = 100, changed_since: Optional[datetime] = None
+) -> List[FactureRow]:
+    stmt = _changed(select(*FACTURE_COLUMNS).where(Facture.contract_id == contract_id), changed_since, Facture)
+    stmt = stmt.order_by(Facture.created_at.desc()).offset(skip).limit(limit)
+    return [FactureRow._make(row) for row in db.execute(stmt)]
+
+
+def list_invoiced_factures(db: Session) -> List[FactureRow]:
+    """Factures of every contract that has an invoice, by contract then newest first."""
+    invoiced = select(Invoice.contract_id).distinct()
+    stmt = (
+        select(*FACTURE_COLUMNS)
+        .where(Facture.contract_id.in_(invoiced))
+        .order_by(Facture.contract_id, Facture.created_at.desc())
+    )
+    return [FactureRow._make(row) for row in db.execute(stmt)]
+
+
+def list_estimate_items(db: Session) -> List[DetailRow]:
+    """Items of every estimate, in one query."""
+    stmt = select(*DETAIL_COLUMNS).where(ContractDetail.estimate_id.is_not(None)).order_by(ContractDetail.id)
+    return [DetailRow._make(row) for row in db.execute(stmt)]
+
+
+def list_details(db: Session, contract_id: Optional[int] = None, estimate_id: Optional[int] = None) -> List[DetailRow]:
+    """Devis lines of a contract or of an estimate."""
+    stmt = select(*DETAIL_COLUMNS)
+    if contract_id is not None:
+        stmt = stmt.where(ContractDetail.contract_id == contract_id)
+    if estimate_id is not None:
+        stmt = stmt.where(ContractDetail.estimate_id == estimate_id)
+    return [DetailRow._make(row) for row in db.execute(stmt)]
+
+
+def list_salaries(db: Session, changed_since: Optional[datetime] = None) -> List[SalaryRow]:
+    stmt = _changed(select(*SALARY_COLUMNS), changed_since, Salary).order_by(Salary.created_at.desc())
+    return [SalaryRow._make(row) for row in db.execute(stmt)]
+
+
+def list_misc(db: Session, changed_since: Optional[datetime] = None) -> List[MiscRow]:
+    stmt = _changed(select(*MISC_COLUMNS), changed_since, Misc).order_by(Misc.created_at.desc())
+    return [MiscRow._make(row) for row in db.execute(stmt)]
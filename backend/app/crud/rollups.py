@@ -0,0 +1,347 @@
+"""Monthly report rollups: ``monthly_revenue`` and ``monthly_receivables``.
+
+``GET /reports/monthly`` reads these summary tables, a few rows per month
+and client, instead of aggregating ``factures`` and ``invoices``:
+
+- revenue: factures by month of ``created_at``, client and TVA rate;
+- receivables: invoices by month of issue (``created_at``) and client, with
+  the invoiced amount (``amount``, HT like the invoices), paid and
+  outstanding.
+
+Archived rows (``app.crud.archive``) are counted, so archiving changes nothing.
+
+Rollups are recomputed per month rather than adjusted by deltas: a commit
+that writes factures, invoices or the client of a contract queues the months
+it touched in ``rollup_dirty``, in its own transaction, and right after it
+(``ROLLUPS_REFRESH_ON_COMMIT``) :func:`refresh_months` recomputes them from
+the source rows, one grouped query per table on an indexed ``created_at``
+range. A refresh first locks the queue rows of its months, so two refreshes
+of a month run one after the other and the second sees both writes. Months
+left queued (refresh failed, setting off) are refreshed by the report before
+it reads them, and :func:`rebuild` (``python -m app.jobs.rollups``)
+recomputes any range.
+
+Writes that bypass the ORM (bulk ``DELETE``) call :func:`record_months` or
+:func:`record_contract`.
+"""
+import logging
+from datetime import date, datetime, time
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Date, and_, case, delete, event, func, insert, inspect, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.archive import union_factures, union_invoices
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.facture import Facture
+from app.models.invoice import Invoice
+from app.models.rollup import MonthlyReceivables, MonthlyRevenue, RollupDirty
+
+logger = logging.getLogger(__name__)
+
+# session.info keys: months and contracts touched since the last commit, months to refresh after it
+_MONTHS = "rollup_months"
+_CONTRACTS = "rollup_contracts"
+_REFRESH = "rollup_refresh"
+
+# Columns that change the rollups; other updates (a description, updated_at) leave them alone
+_TRACKED = {
+    Facture: ("total_ht", "tva", "contract_id", "created_at"),
+    Invoice: ("amount", "paid_amount", "contract_id", "created_at"),
+}
+
+REVENUE_FIELDS = ("month", "client_id", "tva", "lines", "total_ht", "total_tva")
+RECEIVABLES_FIELDS = ("month", "client_id", "invoices", "invoiced", "paid", "outstanding")
+
+
+def month_of(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def months_between(start: date, end: date) -> List[date]:
+    """First days of the months from ``start``'s to ``end``'s, both included."""
+    months, month, last = [], month_of(start), month_of(end)
+    while month <= last:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def _in_month(month: date):
+    start, end = datetime.combine(month, time.min), datetime.combine(next_month(month), time.min)
+    return lambda c: and_(c.created_at >= start, c.created_at < end)
+
+
+def _revenue(month: date):
+    factures = union_factures(("contract_id", "tva", "total_ht"), _in_month(month)).subquery()
+    return (
+        select(
+            literal(month, Date), Contract.client_id, factures.c.tva, func.count(),
+            func.sum(factures.c.total_ht), func.sum(factures.c.total_ht * factures.c.tva / 100),
+        )
+        .select_from(factures)
+        .join(Contract, Contract.id == factures.c.contract_id)
+        .group_by(Contract.client_id, factures.c.tva)
+    )
+
+
+def _receivables(month: date):
+    invoices = union_invoices(("contract_id", "amount", "paid_amount"), _in_month(month)).subquery()
+    paid = func.coalesce(invoices.c.paid_amount, 0)
+    return (
+        select(
+            literal(month, Date), Contract.client_id, func.count(), func.sum(invoices.c.amount), func.sum(paid),
+            func.sum(case((invoices.c.amount > paid, invoices.c.amount - paid), else_=0)),
+        )
+        .select_from(invoices)
+        .join(Contract, Contract.id == invoices.c.contract_id)
+        .group_by(Contract.client_id)
+    )
+
+
+def refresh_months(db, months: Iterable[date]) -> int:
+    """Recompute the rollups of ``months`` and clear their queue rows; the caller commits.
+
+    ``db`` is a Session or a Connection.
+    """
+    months = sorted(set(months))
+    if not months:
+        return 0
+    queued = db.execute(
+        select(RollupDirty.id).where(RollupDirty.month.in_(months)).with_for_update()
+    ).scalars().all()
+    db.execute(delete(MonthlyRevenue).where(MonthlyRevenue.month.in_(months)))
+    db.execute(delete(MonthlyReceivables).where(MonthlyReceivables.month.in_(months)))
+    for month in months:
+        db.execute(insert(MonthlyRevenue).from_select(REVENUE_FIELDS, _revenue(month)))
+        db.execute(insert(MonthlyReceivables).from_select(RECEIVABLES_FIELDS, _receivables(month)))
+    if queued:
+        db.execute(delete(RollupDirty).where(RollupDirty.id.in_(queued)))
+    return len(months)
+
+
+def refresh_queued(db: Session, start: date, end: date) -> int:
+    """Refresh and commit the queued months between ``start`` and ``end`` (first days of months)."""
+    months = db.execute(
+        select(RollupDirty.month).where(RollupDirty.month.between(start, end)).distinct()
+    ).scalars().all()
+    if months:
+        refresh_months(db, months)
+        db.commit()
+    return len(months)
+
+
+def data_range(db: Session) -> Optional[Tuple[date, date]]:
+    """First and last month with factures, invoices or rollups, ``None`` when there is nothing."""
+    bounds = []
+    for stmt in (
+        union_factures(("created_at",), lambda c: c.created_at.is_not(None)),
+        union_invoices(("created_at",), lambda c: c.created_at.is_not(None)),
+    ):
+        rows = stmt.subquery()
+        bounds.extend(db.execute(select(func.min(rows.c.created_at), func.max(rows.c.created_at))).one())
+    for model in (MonthlyRevenue, MonthlyReceivables):
+        bounds.extend(db.execute(select(func.min(model.month), func.max(model.month))).one())
+    bounds = [month_of(value) for value in bounds if value is not None]
+    return (min(bounds), max(bounds)) if bounds else None
+
+
+def rebuild(db: Session, start: date, end: date, months_per_commit: int = 12) -> int:
+    """Recompute every month from ``start`` to ``end``, committing every ``months_per_commit``."""
+    months = months_between(start, end)
+    for i in range(0, len(months), months_per_commit):
+        refresh_months(db, months[i:i + months_per_commit])
+        db.commit()
+    return len(months)
+
+
+def record_months(session: Session, values: Iterable):
+    """Queue the months of ``values`` (dates or datetimes) for ``session``'s next commit."""
+    session.info.setdefault(_MONTHS, set()).update(month_of(value) for value in values if value is not None)
+
+
+def record_contract(session: Session, contract_id: int):
+    """Queue every month with factures or invoices of a contract (client changed, contract deleted)."""
+    for stmt in (
+        union_factures(("created_at",), lambda c: c.contract_id == contract_id),
+        union_invoices(("created_at",), lambda c: c.contract_id == contract_id),
+    ):
+        record_months(session, session.execute(stmt).scalars())
+
+
+def _months(state) -> List:
+    history = state.attrs.created_at.history
+    values = [value for value in chain(history.added, history.unchanged, history.deleted) if value is not None]
+    # Not loaded: a new row whose created_at is the database's now(), in UTC or in local time
+    return values or [datetime.utcnow(), datetime.now()]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect(session, flush_context):
+    for updated, objects in ((False, session.new), (True, session.dirty), (False, session.deleted)):
+        for obj in objects:
+            state = inspect(obj)
+            if isinstance(obj, Contract):
+                # Its rows now count for another client
+                if updated and state.attrs.client_id.history.deleted:
+                    session.info.setdefault(_CONTRACTS, set()).add(obj.id)
+                continue
+            tracked = _TRACKED.get(type(obj))
+            if tracked is None:
+                continue
+            if updated and not any(state.attrs[name].history.has_changes() for name in tracked):
+                continue
+            record_months(session, _months(state))
+
+
+@event.listens_for(Session, "before_commit")
+def _queue(session):
+    session.flush()
+    for contract_id in session.info.pop(_CONTRACTS, ()):
+        record_contract(session, contract_id)
+    months = session.info.pop(_MONTHS, None)
+    if months:
+        session.execute(insert(RollupDirty), [{"month": month} for month in sorted(months)])
+        session.info.setdefault(_REFRESH, set()).update(months)
+
+
+@event.listens_for(Session, "after_commit")
+def _refresh(session):
+    months = session.info.pop(_REFRESH, None)
+    if not months or not settings.ROLLUPS_REFRESH_ON_COMMIT:
+        return
+    try:
+        with session.get_bind().begin() as connection:
+            refresh_months(connection, months)
+    except Exception:
+        # Still queued: the report or the rebuild job refreshes them
+        logger.exception("Rollup refresh of %s failed", ", ".join(str(month) for month in sorted(months)))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard(session, previous_transaction):
+    if not previous_transaction.nested:
+        for key in (_MONTHS, _CONTRACTS, _REFRESH):
+            session.info.pop(key, None)
+
+
+def _blank() -> dict:
+    return {"total_ht": 0.0, "tva": {}, "invoices": 0, "invoiced": 0.0, "paid": 0.0, "outstanding": 0.0}
+
+
+def _add_revenue(figures: dict, rate: float, lines: int, total_ht: float, total_tva: float):
+    figures["total_ht"] += total_ht or 0.0
+    line = figures["tva"].setdefault(rate, [0.0, 0.0])
+    line[0] += total_ht or 0.0
+    line[1] += total_tva or 0.0
+
+
+def _add_receivables(figures: dict, invoices: int, invoiced: float, paid: float, outstanding: float):
+    figures["invoices"] += invoices or 0
+    figures["invoiced"] += float(invoiced or 0.0)
+    figures["paid"] += float(paid or 0.0)
+    figures["outstanding"] += float(outstanding or 0.0)
+
+
+def _finish(figures: dict, **extra) -> dict:
+    total_tva = sum(line[1] for line in figures["tva"].values())
+    return {
+        **extra,
+        "total_ht": round(figures["total_ht"], 2),
+        "tva": [
+            {"rate": rate, "total_ht": round(base, 2), "tva": round(amount, 2)}
+            for rate, (base, amount) in sorted(figures["tva"].items())
+        ],
+        "total_tva": round(total_tva, 2),
+        "total_ttc": round(figures["total_ht"] + total_tva, 2),
+        "invoices": figures["invoices"],
+        "invoiced": round(figures["invoiced"], 2),
+        "paid": round(figures["paid"], 2),
+        "outstanding": round(figures["outstanding"], 2),
+    }
+
+
+def monthly_report(
+    db: Session, start: date, end: date, client_id: Optional[int] = None, by_client: bool = False
+) -> dict:
+    """Revenue, TVA per rate, TTC, invoiced, paid and outstanding per month from ``start`` to ``end``.
+
+    Every month of the range is listed, empty ones with zeros. ``by_client``
+    adds the figures per client to each month and to the totals.
+    """
+    refresh_queued(db, start, end)
+    months = months_between(start, end)
+    per_month: Dict[date, dict] = {month: _blank() for month in months}
+    per_client: Dict[date, Dict[int, dict]] = {month: {} for month in months}
+    client_totals: Dict[int, dict] = {}
+    names: Dict[int, Optional[str]] = {}
+
+    revenue_keys = [MonthlyRevenue.month, MonthlyRevenue.tva]
+    receivables_keys = [MonthlyReceivables.month]
+    if by_client:
+        revenue_keys[1:1] = [MonthlyRevenue.client_id, Client.client_name]
+        receivables_keys += [MonthlyReceivables.client_id, Client.client_name]
+    revenue = (
+        select(*revenue_keys, func.sum(MonthlyRevenue.lines), func.sum(MonthlyRevenue.total_ht),
+               func.sum(MonthlyRevenue.total_tva))
+        .where(MonthlyRevenue.month.between(start, end))
+        .group_by(*revenue_keys)
+    )
+    receivables = (
+        select(*receivables_keys, func.sum(MonthlyReceivables.invoices), func.sum(MonthlyReceivables.invoiced),
+               func.sum(MonthlyReceivables.paid), func.sum(MonthlyReceivables.outstanding))
+        .where(MonthlyReceivables.month.between(start, end))
+        .group_by(*receivables_keys)
+    )
+    if by_client:
+        revenue = revenue.outerjoin(Client, Client.id == MonthlyRevenue.client_id)
+        receivables = receivables.outerjoin(Client, Client.id == MonthlyReceivables.client_id)
+    if client_id is not None:
+        revenue = revenue.where(MonthlyRevenue.client_id == client_id)
+        receivables = receivables.where(MonthlyReceivables.client_id == client_id)
+
+    def targets(row):
+        month = month_of(row[0])
+        yield per_month[month]
+        if by_client:
+            key, names[row[1]] = row[1], row[2]
+            yield per_client[month].setdefault(key, _blank())
+            yield client_totals.setdefault(key, _blank())
+
+    for row in db.execute(revenue):
+        rate, values = row[-4], row[-3:]
+        for figures in targets(row):
+            _add_revenue(figures, rate, *values)
+    for row in db.execute(receivables):
+        for figures in targets(row):
+            _add_receivables(figures, *row[-4:])
+
+    totals = _blank()
+    for figures in per_month.values():
+        for rate, (base, amount) in figures["tva"].items():
+            _add_revenue(totals, rate, 0, base, amount)
+        _add_receivables(totals, figures["invoices"], figures["invoiced"], figures["paid"], figures["outstanding"])
+
+    def clients_of(by_id: Dict[int, dict]) -> List[dict]:
+        return [_finish(figures, client_id=key, client_name=names.get(key)) for key, figures in sorted(by_id.items())]
+
+    report = {
+        "start": start.strftime("%Y-%m"),
+        "end": end.strftime("%Y-%m"),
+        "months": [
+            _finish(per_month[month], month=month.strftime("%Y-%m"),
+                    **({"clients": clients_of(per_client[month])} if by_client else {}))
+            for month in months
+        ],
+        "totals": _finish(totals),
+    }
+    if by_client:
+        report["clients"] = clients_of(client_totals)
+    return report
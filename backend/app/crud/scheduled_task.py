@@ -0,0 +1,54 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, or_
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
+from typing import Iterable, List
+from app.models.scheduled_task import ScheduledTask
+
+def ensure_tasks(db: Session, names: Iterable[str]):
+    """Create the rows of tasks run for the first time; another worker may be doing the same."""
+    existing = set(db.scalars(select(ScheduledTask.name)).all())
+    for name in names:
+        if name in existing:
+            continue
+        try:
+            db.add(ScheduledTask(name=name))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+
+def claim_task(db: Session, name: str, worker_id: str, interval: float, lease: float) -> bool:
+    """Take ``name`` for ``worker_id`` if it is due and no other worker holds it.
+
+    One conditional UPDATE: of the workers that try at the same time, exactly
+    one matches the row. A worker that died while holding it blocks the task
+    until ``lease`` seconds have passed.
+    """
+    now = datetime.utcnow()
+    claimed = db.execute(
+        update(ScheduledTask)
+        .where(
+            ScheduledTask.name == name,
+            or_(ScheduledTask.locked_until.is_(None), ScheduledTask.locked_until < now),
+            or_(ScheduledTask.last_started_at.is_(None),
+                ScheduledTask.last_started_at <= now - timedelta(seconds=interval)),
+        )
+        .values(locked_by=worker_id, locked_until=now + timedelta(seconds=lease), last_started_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return bool(claimed)
+
+def finish_task(db: Session, name: str, worker_id: str, result: dict = None, error: str = None):
+    """Record the outcome of a run and release the task."""
+    db.execute(
+        update(ScheduledTask)
+        .where(ScheduledTask.name == name, ScheduledTask.locked_by == worker_id)
+        .values(locked_by=None, locked_until=None, last_finished_at=datetime.utcnow(),
+                last_result=result, last_error=error)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+def list_tasks(db: Session) -> List[ScheduledTask]:
+    return db.scalars(select(ScheduledTask).order_by(ScheduledTask.name)).all()
@@ -0,0 +1,105 @@
+"""Statuses that change with the date: overdue invoices and expired estimates.
+
+An open invoice (``unpaid`` or ``partial``) whose ``due_date`` has passed is
+``overdue``, and goes back to ``unpaid``/``partial`` if its due date is moved
+past today again; :func:`invoice_status` gives the status wherever a payment
+or an amount change recomputes it. An estimate still ``draft``, ``sent`` or
+``pending`` after its ``expiration_date`` is ``expired``.
+
+No write happens when a date passes, so :func:`sweep` flips the rows in bulk
+(run by the scheduler, see app/jobs/sweep.py). Each batch selects the next
+``batch_size`` matching ids in primary key order, then updates that id range
+with one ``UPDATE ... WHERE id BETWEEN :first AND :last AND <condition>`` and
+commits, so rows stay locked for one batch only. Flipped rows get a new
+``updated_at`` and go into the change event (app/core/events.py): delta
+sync, open tabs and the aging cache see them like any other write.
+"""
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Callable, Optional
+
+from sqlalchemy import and_, case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.events import record_changes
+from app.models.estimate import Estimate
+from app.models.invoice import Invoice
+
+OPEN_INVOICE_STATUSES = ("unpaid", "partial")
+OPEN_ESTIMATE_STATUSES = ("draft", "sent", "pending")
+
+
+def invoice_status(amount, paid_amount, due_date: Optional[date], today: Optional[date] = None) -> str:
+    """``paid``, ``partial`` or ``unpaid`` from the amounts; a balance left after ``due_date`` is ``overdue``."""
+    paid = float(paid_amount or 0)
+    if paid >= amount:
+        return "paid"
+    if due_date is not None and due_date < (today or date.today()):
+        return "overdue"
+    return "partial" if paid > 0 else "unpaid"
+
+
+def overdue_invoices(today: date):
+    """Invoices past due on ``today``, whether or not the sweep has flipped them yet."""
+    return and_(Invoice.status.in_(OPEN_INVOICE_STATUSES + ("overdue",)), Invoice.due_date < today)
+
+
+@dataclass(frozen=True)
+class Sweep:
+    name: str
+    model: type
+    condition: Callable[[date], object]
+    values: dict
+
+
+SWEEPS = (
+    Sweep("invoices_overdue", Invoice,
+          lambda today: and_(Invoice.status.in_(OPEN_INVOICE_STATUSES), Invoice.due_date < today),
+          {"status": "overdue"}),
+    Sweep("invoices_reopened", Invoice,
+          lambda today: and_(Invoice.status == "overdue", Invoice.due_date >= today),
+          {"status": case((func.coalesce(Invoice.paid_amount, 0) > 0, "partial"), else_="unpaid")}),
+    Sweep("estimates_expired", Estimate,
+          lambda today: and_(Estimate.status.in_(OPEN_ESTIMATE_STATUSES), Estimate.expiration_date < today),
+          {"status": "expired"}),
+)
+
+
+def sweep_batch(db: Session, sweep: Sweep, today: date, after_id: int, batch_size: int) -> tuple:
+    """Flip the next ``batch_size`` rows with an id above ``after_id`` and commit; ``(ids, updated)``."""
+    model, condition = sweep.model, sweep.condition(today)
+    ids = db.scalars(
+        select(model.id).where(condition, model.id > after_id).order_by(model.id).limit(batch_size)
+        .with_for_update()
+    ).all()
+    if not ids:
+        db.rollback()
+        return [], 0
+    updated = db.execute(
+        update(model)
+        .where(model.id.between(ids[0], ids[-1]), condition)
+        .values(**sweep.values, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    record_changes(db, model.__tablename__, ids, "updated")
+    db.commit()
+    return ids, updated if updated >= 0 else len(ids)
+
+
+def sweep(db: Session, today: Optional[date] = None, batch_size: int = 500,
+          stop: threading.Event = None) -> dict:
+    """Run every sweep until nothing matches or ``stop`` is set; returns the rows flipped per sweep."""
+    today = today or date.today()
+    counts = {"today": today.isoformat(), "batches": 0}
+    for item in SWEEPS:
+        counts[item.name] = 0
+        after_id = 0
+        while not (stop and stop.is_set()):
+            ids, updated = sweep_batch(db, item, today, after_id, batch_size)
+            if not ids:
+                break
+            counts[item.name] += updated
+            counts["batches"] += 1
+            after_id = ids[-1]
+    return counts
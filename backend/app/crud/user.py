@@ -1,22 +1,22 @@
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+from sqlalchemy.orm import Session
+from sqlalchemy import select
 from app.models.user import User
 from app.utils.security import get_password_hash, verify_password
 
-async def get_user_by_email(db: AsyncSession, email: str):
-    result = await db.execute(select(User).where(User.email == email))
+def get_user_by_email(db: Session, email: str):
+    result = db.execute(select(User).where(User.email == email))
     return result.scalars().first()
 
-async def create_user(db: AsyncSession, email: str, password: str, full_name: str, phone: str = None):
+def create_user(db: Session, email: str, password: str, full_name: str, phone: str = None):
     hashed_password = get_password_hash(password)
     user = User(email=email, hashed_password=hashed_password, full_name=full_name, phone=phone)
     db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    db.commit()
+    db.refresh(user)
     return user
 
-async def authenticate_user(db: AsyncSession, email: str, password: str):
-    user = await get_user_by_email(db, email)
+def authenticate_user(db: Session, email: str, password: str):
+    user = get_user_by_email(db, email)
     if not user:
         return None
     if not verify_password(password, user.hashed_password):
@@ -0,0 +1,71 @@
+"""Database-backed background jobs.
+
+Jobs are rows in the ``jobs`` table, picked up by ``python -m app.jobs.worker``
+processes; no broker is needed. A job ``kind`` maps to a handler registered
+with :func:`register`. Handlers get a DB session and the job payload and
+return a :class:`JobResult`, whose bytes the worker writes under
+``settings.JOB_RESULT_DIR``.
+
+Endpoints opt into running as a job with the :func:`job_mode` dependency:
+``?mode=job`` (or a ``Prefer: respond-async`` header) makes them enqueue the
+work and answer ``202`` with the job's status URL instead of rendering inline.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+
+@dataclass
+class JobResult:
+    content: bytes  # or a memoryview of the rendered buffer
+    media_type: str = "application/pdf"
+    filename: Optional[str] = None
+
+
+class PermanentJobError(Exception):
+    """Raised by handlers for failures that retrying cannot fix (e.g. missing rows)."""
+
+
+HANDLERS: Dict[str, Callable] = {}
+
+
+def register(kind: str):
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def job_mode(request: Request) -> Optional[dict]:
+    """Dependency: enqueue options when the caller asked for a job, else ``None``."""
+    wants_job = (
+        request.query_params.get("mode") == "job"
+        or "respond-async" in request.headers.get("prefer", "")
+    )
+    if not wants_job:
+        return None
+    try:
+        priority = int(request.query_params.get("priority", 0))
+    except ValueError:
+        priority = 0
+    return {"priority": priority}
+
+
+def job_status_url(job_id: int) -> str:
+    return f"/api/jobs/{job_id}"
+
+
+def enqueue_response(db: Session, kind: str, payload: dict, options: dict) -> JSONResponse:
+    """Queue ``kind`` and answer 202 pointing at the job status endpoint."""
+    from app.crud.job import enqueue_job
+
+    job = enqueue_job(db, kind, payload, priority=options.get("priority", 0))
+    url = job_status_url(job.id)
+    return JSONResponse(
+        status_code=202,
+        content={"id": job.id, "kind": job.kind, "status": job.status, "status_url": url},
+        headers={"Location": url},
+    )
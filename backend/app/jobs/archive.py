@@ -0,0 +1,75 @@
+"""Archive mover: ``python -m app.jobs.archive [--after-days N] [--batch-size N] [--dry-run]``.
+
+Moves fully paid invoices due more than ``--after-days`` ago (default
+``ARCHIVE_AFTER_DAYS``), with their factures, to the archive tables, one
+committed batch of ``--batch-size`` invoices at a time (see
+``app.crud.archive``). Safe to interrupt: a batch is moved entirely or not
+at all, and the next run continues with what is left. ``--pause`` spaces
+the batches out to leave the database to the application on a busy server.
+"""
+import argparse
+import logging
+import signal
+import threading
+from datetime import date, timedelta
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.archive import archive_batch, count_archivable
+
+logger = logging.getLogger("app.jobs.archive")
+
+
+def run(after_days: int, batch_size: int, max_batches: int = 0, pause: float = 0.0, dry_run: bool = False,
+        stop: threading.Event = None) -> dict:
+    """Archive until nothing is left, ``max_batches`` or ``stop`` is set; returns the moved counts."""
+    cutoff = date.today() - timedelta(days=after_days)
+    stop = stop or threading.Event()
+    moved = {"invoices": 0, "factures": 0, "batches": 0}
+    with SessionLocal() as db:
+        pending = count_archivable(db, cutoff)
+        logger.info("%d invoice(s) paid and due before %s to archive", pending, cutoff)
+        if dry_run:
+            return {**moved, "pending": pending}
+        while not stop.is_set() and (not max_batches or moved["batches"] < max_batches):
+            batch = archive_batch(db, cutoff, batch_size)
+            if not batch.invoices:
+                break
+            moved["invoices"] += batch.invoices
+            moved["factures"] += batch.factures
+            moved["batches"] += 1
+            logger.info("Batch %d: %d invoice(s), %d facture(s) archived (%d/%d)", moved["batches"],
+                        batch.invoices, batch.factures, moved["invoices"], pending)
+            if pause:
+                stop.wait(pause)
+    return moved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move closed invoices and their factures to the archive tables.")
+    parser.add_argument("--after-days", type=int, default=settings.ARCHIVE_AFTER_DAYS,
+                        help="archive paid invoices due more than this many days ago")
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE, help="invoices per transaction")
+    parser.add_argument("--max-batches", type=int, default=0, help="stop after this many batches (0: no limit)")
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds between batches")
+    parser.add_argument("--dry-run", action="store_true", help="only count the invoices to archive")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    stop = threading.Event()
+
+    def on_sigterm(signum, frame):
+        logger.info("Stopping after the current batch")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, on_sigterm)
+    try:
+        moved = run(args.after_days, args.batch_size, args.max_batches, args.pause, args.dry_run, stop)
+    except KeyboardInterrupt:
+        logger.info("Interrupted; committed batches stay archived, run again to continue")
+        return
+    logger.info("Done: %s", moved)
+
+
+if __name__ == "__main__":
+    main()
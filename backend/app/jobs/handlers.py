@@ -0,0 +1,129 @@
+"""Job handlers for the ``/pdf`` generators.
+
+Each handler calls the route function directly with ``job=None`` so the
+rendering code is shared with the synchronous endpoints. The PDF profile
+(``?profile=``) travels in the payload under ``profile``.
+"""
+import asyncio
+import re
+from datetime import date
+
+from fastapi import HTTPException
+from starlette.responses import FileResponse
+
+from app.jobs import JobResult, PermanentJobError, register
+
+_FILENAME = re.compile(r'filename="?([^";]+)"?')
+
+
+def _render(func, *args, **kwargs):
+    try:
+        response = func(*args, **kwargs)
+        if asyncio.iscoroutine(response):
+            response = asyncio.run(response)
+    except HTTPException as exc:
+        # 4xx (unknown contract, missing factures...) will not fix itself on retry
+        if exc.status_code < 500:
+            raise PermanentJobError(f"{exc.status_code}: {exc.detail}") from exc
+        raise
+    return response
+
+
+def _result(response, default_filename: str) -> JobResult:
+    if isinstance(response, FileResponse):
+        # Issued documents are served from the document store
+        with open(response.path, "rb") as fh:
+            content = fh.read()
+    else:
+        content = response.body  # written to disk as is, no need for a bytes copy
+    filename = getattr(response, "filename", None)
+    if not filename:
+        match = _FILENAME.search(response.headers.get("content-disposition", ""))
+        filename = match.group(1) if match else default_filename
+    return JobResult(
+        content=content,
+        media_type=response.media_type or "application/pdf",
+        filename=filename,
+    )
+
+
+@register("pdf.invoice")
+def render_invoice(db, payload):
+    from app.routes.pdf import generate_invoice_pdf
+
+    response = _render(
+        generate_invoice_pdf,
+        str(payload["invoice_id"]),
+        invoice_number=payload.get("invoice_number"),
+        issue_date=payload.get("issue_date"),
+        expiration_date=payload.get("expiration_date"),
+        profile=payload.get("profile"),
+        db=db,
+        job=None,
+    )
+    return _result(response, f"invoice_{payload['invoice_id']}.pdf")
+
+
+@register("pdf.estimate")
+def render_estimate(db, payload):
+    from app.routes.pdf import generate_estimate_pdf
+
+    response = _render(
+        generate_estimate_pdf, int(payload["contract_id"]), profile=payload.get("profile"), db=db, job=None
+    )
+    return _result(response, f"estimate_{payload['contract_id']}.pdf")
+
+
+@register("pdf.saved_estimate")
+def render_saved_estimate(db, payload):
+    from starlette.requests import Request
+    from app.routes.pdf import generate_saved_estimate_pdf
+
+    # The endpoint only reads request headers (If-None-Match); give it an empty request
+    request = Request({"type": "http", "method": "GET", "headers": [], "query_string": b""})
+    response = _render(
+        generate_saved_estimate_pdf, int(payload["estimate_id"]), request,
+        profile=payload.get("profile"), db=db, job=None,
+    )
+    return _result(response, f"devis_{payload['estimate_id']}.pdf")
+
+
+@register("pdf.facture_by_contract")
+def render_facture_by_contract(db, payload):
+    from app.routes.pdf import generate_facture_pdf_by_contract
+
+    response = _render(
+        generate_facture_pdf_by_contract, int(payload["contract_id"]), profile=payload.get("profile"), db=db, job=None
+    )
+    return _result(response, f"facture_{payload['contract_id']}.pdf")
+
+
+@register("pdf.facture")
+def render_facture(db, payload):
+    from app.routes.pdf import generate_facture_pdf
+
+    payload = dict(payload)
+    profile = payload.pop("profile", None)
+    response = _render(generate_facture_pdf, payload, profile=profile, db=db, job=None)
+    return _result(response, f"facture_{payload.get('id', 'document')}.pdf")
+
+
+@register("pdf.devis")
+def render_devis(db, payload):
+    from app.routes.pdf import generate_devis_pdf
+
+    payload = dict(payload)
+    profile = payload.pop("profile", None)
+    response = _render(generate_devis_pdf, payload, profile=profile, db=db, job=None)
+    return _result(response, "devis.pdf")
+
+
+@register("pdf.aging")
+def render_aging(db, payload):
+    from app.routes.pdf import generate_aging_pdf
+
+    response = _render(
+        generate_aging_pdf, date.fromisoformat(payload["as_of"]), payload.get("client_id"),
+        profile=payload.get("profile"), db=db, job=None,
+    )
+    return _result(response, f"aging_{payload['as_of']}.pdf")
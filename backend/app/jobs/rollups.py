@@ -0,0 +1,47 @@
+"""Rebuild the monthly report rollups: ``python -m app.jobs.rollups [--start YYYY-MM] [--end YYYY-MM]``.
+
+Recomputes ``monthly_revenue`` and ``monthly_receivables`` from the factures
+and invoices (archive included) for every month of the range, by default
+from the first to the last month with data (see ``app.crud.rollups``). Run
+it after loading data outside the application, or to check the rollups.
+"""
+import argparse
+import logging
+from datetime import datetime
+
+from app.core.database import SessionLocal
+from app.crud.rollups import data_range, rebuild
+
+logger = logging.getLogger("app.jobs.rollups")
+
+
+def _month(value: str):
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def run(start=None, end=None) -> int:
+    """Rebuild ``start`` to ``end`` (first days of months, default: all the data); returns the months rebuilt."""
+    with SessionLocal() as db:
+        if start is None or end is None:
+            bounds = data_range(db)
+            if bounds is None:
+                logger.info("No factures or invoices, nothing to rebuild")
+                return 0
+            start, end = start or bounds[0], end or bounds[1]
+        months = rebuild(db, start, end)
+    logger.info("Rebuilt %d month(s), %s to %s", months, start.strftime("%Y-%m"), end.strftime("%Y-%m"))
+    return months
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the monthly report rollups.")
+    parser.add_argument("--start", type=_month, help="first month, YYYY-MM (default: first month with data)")
+    parser.add_argument("--end", type=_month, help="last month, YYYY-MM (default: last month with data)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    run(args.start, args.end)
+
+
+if __name__ == "__main__":
+    main()
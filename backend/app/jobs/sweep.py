@@ -0,0 +1,53 @@
+"""Status sweep: ``python -m app.jobs.sweep [--date YYYY-MM-DD] [--batch-size N]``.
+
+Flips open invoices past their due date to ``overdue`` (and back when the
+due date moved), and estimates past their expiration date to ``expired``,
+``--batch-size`` rows per transaction (see ``app.crud.sweep``). The server
+workers run it every ``SWEEP_INTERVAL_SECONDS`` through the in-app scheduler
+(``app.core.scheduler``); this command runs it once, e.g. from cron with
+``SCHEDULER_ENABLED=false``.
+"""
+import argparse
+import logging
+import signal
+import threading
+from datetime import date
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.scheduler import schedule
+from app.crud.sweep import sweep
+
+logger = logging.getLogger("app.jobs.sweep")
+
+
+def run(today: date = None, batch_size: int = None, stop: threading.Event = None) -> dict:
+    """Sweep until nothing is left to flip or ``stop`` is set; returns the rows flipped per sweep."""
+    with SessionLocal() as db:
+        return sweep(db, today, batch_size or settings.SWEEP_BATCH_SIZE, stop)
+
+
+@schedule("sweep", settings.SWEEP_INTERVAL_SECONDS)
+def scheduled(stop: threading.Event) -> dict:
+    return run(stop=stop)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flip overdue invoices and expired estimates.")
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="sweep as of this day (default: today)")
+    parser.add_argument("--batch-size", type=int, default=settings.SWEEP_BATCH_SIZE, help="rows per transaction")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    stop = threading.Event()
+
+    def on_sigterm(signum, frame):
+        logger.info("Stopping after the current batch")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, on_sigterm)
+    logger.info("Done: %s", run(args.date, args.batch_size, stop))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Tombstone pruning: ``python -m app.jobs.tombstones``.
+
+Deletes the tombstones older than ``SYNC_TOMBSTONE_RETENTION_DAYS``: delta
+sync answers 410 to watermarks that old anyway (see ``app.core.sync``). The
+server workers run it every ``SYNC_TOMBSTONE_PRUNE_SECONDS`` through the
+in-app scheduler (``app.core.scheduler``); this command runs it once, e.g.
+from cron with ``SCHEDULER_ENABLED=false``.
+"""
+import logging
+import threading
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.scheduler import schedule
+from app.core.sync import prune_tombstones
+
+logger = logging.getLogger("app.jobs.tombstones")
+
+
+def run() -> dict:
+    """Delete the expired tombstones; returns how many."""
+    with SessionLocal() as db:
+        deleted = prune_tombstones(db)
+        db.commit()
+    return {"tombstones_deleted": deleted}
+
+
+@schedule("tombstones", settings.SYNC_TOMBSTONE_PRUNE_SECONDS)
+def scheduled(stop: threading.Event) -> dict:
+    return run()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logger.info("Done: %s", run())
+
+
+if __name__ == "__main__":
+    main()
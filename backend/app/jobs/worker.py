@@ -0,0 +1,196 @@
+"""Job worker: ``python -m app.jobs.worker [--processes N]``.
+
+Each process polls the ``jobs`` table, claims the highest priority due job,
+runs its handler and stores the result file under ``settings.JOB_RESULT_DIR``.
+Failed jobs are retried with exponential backoff up to ``max_attempts``.
+
+SIGTERM/SIGINT stop the worker gracefully: the job in progress is finished
+and recorded before the process exits. A worker that dies mid-job (SIGKILL,
+OOM) leaves the job ``running``; it is picked up again once its lease
+(``JOB_LEASE_SECONDS``) has expired.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.job import claim_next_job, complete_job, fail_job, purge_finished_jobs
+from app.jobs import HANDLERS, PermanentJobError
+
+logger = logging.getLogger("app.jobs.worker")
+
+PURGE_INTERVAL = 600  # seconds between clean-ups of expired results
+
+
+def result_path(relative_path: str) -> str:
+    return os.path.join(settings.JOB_RESULT_DIR, relative_path)
+
+
+def store_result(job, result) -> str:
+    """Write the result atomically and return its path relative to JOB_RESULT_DIR."""
+    extension = os.path.splitext(result.filename or "")[1] or ".bin"
+    relative = f"{job.id}{extension}"
+    target = result_path(relative)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(result.content)
+    os.replace(tmp, target)
+    return relative
+
+
+class Worker:
+    def __init__(self, name: str = None, poll_interval: float = None):
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.stopping = threading.Event()
+        self._last_purge = 0.0
+
+    def install_signal_handlers(self):
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+    def _handle_stop(self, signum, frame):
+        if not self.stopping.is_set():
+            logger.info(f"{self.name}: received signal {signum}, stopping after the current job")
+        self.stopping.set()
+
+    def run(self):
+        import app.jobs.handlers  # noqa: F401  (registers the handlers)
+        # Importing app.core.events also publishes the changes jobs commit to open tabs
+        from app.core.events import shared_fanout
+        from app.pdf import setup_runtime
+
+        if settings.EVENTS_ENABLED and not shared_fanout():
+            logger.warning(f"{self.name}: EVENTS_SHARED_DIR and EVENTS_FANOUT are not set, "
+                           "open tabs will not be told about rows written by jobs")
+
+        setup_runtime(sql_logging=False)
+        os.makedirs(settings.JOB_RESULT_DIR, exist_ok=True)
+        logger.info(f"{self.name}: started, handlers: {', '.join(sorted(HANDLERS))}")
+        while not self.stopping.is_set():
+            try:
+                worked = self.run_once()
+            except Exception:
+                # Database unavailable or similar; back off and keep the process alive
+                logger.exception(f"{self.name}: error while polling for jobs")
+                worked = False
+            if not worked:
+                self.stopping.wait(self.poll_interval)
+            self.maybe_purge()
+        logger.info(f"{self.name}: stopped")
+
+    def run_once(self) -> bool:
+        """Claim and run one job. Returns False when nothing was due."""
+        with SessionLocal() as db:
+            job = claim_next_job(db, self.name)
+            if job is None:
+                return False
+            self.execute(db, job)
+            return True
+
+    def execute(self, db, job):
+        start = time.perf_counter()
+        logger.info(f"{self.name}: job {job.id} ({job.kind}) attempt {job.attempts}/{job.max_attempts}")
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            fail_job(db, job, f"Unknown job kind: {job.kind}", retry=False)
+            return
+        try:
+            result = handler(db, job.payload)
+            relative = store_result(job, result)
+        except PermanentJobError as exc:
+            db.rollback()
+            fail_job(db, job, str(exc), retry=False)
+            logger.warning(f"{self.name}: job {job.id} failed permanently: {exc}")
+            return
+        except Exception:
+            db.rollback()
+            fail_job(db, job, traceback.format_exc(limit=5))
+            logger.exception(f"{self.name}: job {job.id} failed ({job.status})")
+            return
+        complete_job(db, job, relative, result.media_type, result.filename, len(result.content))
+        logger.info(f"{self.name}: job {job.id} done in {time.perf_counter() - start:.2f}s "
+                    f"({len(result.content) / 1024:.1f} KB)")
+
+    def maybe_purge(self):
+        if settings.JOB_RESULT_TTL_HOURS <= 0 or time.monotonic() - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(hours=settings.JOB_RESULT_TTL_HOURS)
+        try:
+            with SessionLocal() as db:
+                paths = purge_finished_jobs(db, cutoff)
+        except Exception:
+            logger.exception(f"{self.name}: failed to purge expired jobs")
+            return
+        for relative in paths:
+            try:
+                os.remove(result_path(relative))
+            except FileNotFoundError:
+                pass
+
+
+def _run_worker():
+    from app.core.database import engine
+
+    # Never reuse connections inherited from the parent process
+    engine.dispose(close=False)
+    worker = Worker()
+    worker.install_signal_handlers()
+    worker.run()
+
+
+def run_pool(processes: int):
+    """Supervise ``processes`` worker processes, restarting any that crash."""
+    stopping = threading.Event()
+    children = {}
+
+    def spawn(slot):
+        proc = multiprocessing.Process(target=_run_worker, name=f"job-worker-{slot}")
+        proc.start()
+        children[slot] = proc
+
+    def handle_stop(signum, frame):
+        stopping.set()
+        for proc in children.values():
+            if proc.is_alive():
+                os.kill(proc.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+    for slot in range(processes):
+        spawn(slot)
+    while not stopping.is_set():
+        for slot, proc in list(children.items()):
+            if not proc.is_alive() and not stopping.is_set():
+                logger.warning(f"worker {proc.pid} exited with {proc.exitcode}, restarting")
+                spawn(slot)
+        stopping.wait(1.0)
+    for proc in children.values():
+        proc.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run background job workers.")
+    parser.add_argument("--processes", type=int, default=settings.JOB_WORKER_PROCESSES)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.processes <= 1:
+        worker = Worker()
+        worker.install_signal_handlers()
+        worker.run()
+    else:
+        run_pool(args.processes)
+
+
+if __name__ == "__main__":
+    main()
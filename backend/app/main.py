@@ -1,12 +1,31 @@
-from fastapi import FastAPI, APIRouter
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, APIRouter, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.auth import authenticate, authenticate_stream
+from app.core.config import settings
 from app.routes import (
-    auth_router, client_router, contract_router, contract_detail_router,
-    dashboard_router, facture_router, invoice_router, estimate_router, misc_router,
-    pdf_router, salary_router
+    auth_router, bootstrap_router, client_router, contract_router, contract_detail_router,
+    dashboard_router, facture_router, invoice_router, jobs_router, estimate_router, events_router, metrics_router,
+    misc_router, pdf_router, reports_router, salary_router
 )
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The PDF subsystem normally loads on the first /pdf request
+    if settings.PDF_WARMUP:
+        from app.pdf import warm_up
+        warm_up()
+    if settings.SCHEDULER_ENABLED:
+        from app.core.scheduler import scheduler
+        scheduler.start()
+    yield
+    # Open event streams would otherwise hold the shutdown until they are cancelled
+    from app.core.events import broker
+    broker.close()
+    if settings.SCHEDULER_ENABLED:
+        scheduler.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 # List of allowed origins
 origins = [
@@ -53,12 +72,23 @@ routers = [
     pdf_router,
     misc_router,
     invoice_router,
-    estimate_router
+    estimate_router,
+    jobs_router,
+    metrics_router,
+    bootstrap_router,
+    events_router,
+    reports_router
 ]
 
-# Include all routers with proper prefixing
+# Include all routers with proper prefixing; everything but /auth goes through authentication
 for router in routers:
-    api_router.include_router(router)
+    if router is auth_router:
+        api_router.include_router(router)
+    elif router is events_router:
+        # EventSource cannot send the bearer header: streams also accept a ?ticket=
+        api_router.include_router(router, dependencies=[Depends(authenticate_stream)])
+    else:
+        api_router.include_router(router, dependencies=[Depends(authenticate)])
 
 # Mount the API router with /api prefix
 app.include_router(api_router, prefix="/api")
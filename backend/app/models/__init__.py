@@ -9,6 +9,12 @@ from .salary import Salary
 from .invoice import Invoice
 from .misc import Misc  # Changed from Miscellaneous to Misc
 from .estimate import Estimate
+from .job import Job
+from .document_snapshot import DocumentSnapshot
+from .tombstone import Tombstone
+from .archive import InvoiceArchive, FactureArchive
+from .rollup import MonthlyRevenue, MonthlyReceivables, RollupDirty
+from .scheduled_task import ScheduledTask
 
 # This makes the models available when importing from app.models
 __all__ = [
@@ -22,5 +28,14 @@ __all__ = [
     'Salary',
     'Invoice',
     'Misc',  # Changed from 'Miscellaneous' to 'Misc'
-    'Estimate'
+    'Estimate',
+    'Job',
+    'DocumentSnapshot',
+    'Tombstone',
+    'InvoiceArchive',
+    'FactureArchive',
+    'MonthlyRevenue',
+    'MonthlyReceivables',
+    'RollupDirty',
+    'ScheduledTask'
 ]
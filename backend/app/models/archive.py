@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Numeric, Text, Index
+from sqlalchemy.sql import func
+from .base import Base
+
+class InvoiceArchive(Base):
+    """Closed invoice moved out of ``invoices`` by the archive mover (app/jobs/archive.py).
+
+    Same columns and ids as ``invoices``; read together with it through
+    ``app.crud.archive`` (lists with ``include_archived``, PDFs, reports).
+    """
+    __tablename__ = "invoices_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    invoice_number = Column(String(255), unique=True, nullable=False)
+    contract_id = Column(Integer, nullable=False, index=True)
+    amount = Column(Float, nullable=False)
+    due_date = Column(Date, nullable=False)
+    status = Column(String(50))
+    created_at = Column(DateTime, index=True)
+    paid_amount = Column(Numeric(10, 2))
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_invoices_archive_due_date", "due_date"),
+    )
+
+
+class FactureArchive(Base):
+    """Facture of an archived invoice, moved with it."""
+    __tablename__ = "factures_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    contract_id = Column(Integer, nullable=False, index=True)
+    description = Column(Text, nullable=False)
+    qty = Column(Float, nullable=False)
+    qty_unit = Column(String(20))
+    unit_price = Column(Float, nullable=False)
+    tva = Column(Float, nullable=False)
+    total_ht = Column(Float, nullable=False)
+    created_at = Column(DateTime, index=True)
+    invoice_id = Column(Integer, nullable=True, index=True)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -1,13 +1,36 @@
 from datetime import datetime
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Column, Integer, DateTime, String
+from sqlalchemy.orm import relationship as _relationship
+
+from app.core.config import settings
 
 Base = declarative_base()
 
+
+def relationship(*args, **kwargs):
+    """``sqlalchemy.orm.relationship`` with ``ORM_LAZY_LOAD`` as default loading strategy.
+
+    Queries load the relationships they need explicitly (``joinedload``,
+    ``selectinload``). With the default ``raise_on_sql`` a lazy load that
+    would emit SQL, i.e. an N+1 hidden in a serializer, raises instead.
+    Flushes (cascades, foreign key updates) are not affected.
+    """
+    kwargs.setdefault("lazy", settings.ORM_LAZY_LOAD)
+    return _relationship(*args, **kwargs)
+
+class ChangeTracked:
+    """``updated_at`` (UTC) set on insert and on every UPDATE, for ``?since=`` sync (app/core/sync.py).
+
+    Deletes leave a ``Tombstone`` (app/models/tombstone.py).
+    """
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+
 class BaseModel:
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Add a default string length for MySQL compatibility
     @classmethod
@@ -1,6 +1,5 @@
 from sqlalchemy import Column, Integer, String, Text, ForeignKey
-from sqlalchemy.orm import relationship
-from .base import Base, BaseModel
+from .base import Base, BaseModel, relationship
 
 class Client(Base, BaseModel):
     __tablename__ = "clients"
@@ -1,9 +1,8 @@
 from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from .base import Base
+from .base import Base, ChangeTracked, relationship
 
-class Contract(Base):
+class Contract(Base, ChangeTracked):
     __tablename__ = "contracts"
     id = Column(Integer, primary_key=True, index=True)
     command_number = Column(String(50), unique=True, index=True, nullable=False)
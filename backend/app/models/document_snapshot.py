@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, UniqueConstraint
+from sqlalchemy.sql import func
+from .base import Base
+
+class DocumentSnapshot(Base):
+    """Frozen content of an issued document (see app/pdf/snapshots.py).
+
+    ``data`` holds everything the document prints, so reprints never read the
+    live contract, client or factures. The rendered PDF, when kept, is in the
+    content store under ``content_sha256``.
+    """
+    __tablename__ = "document_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_type = Column(String(50), nullable=False)  # "invoice"
+    document_id = Column(Integer, nullable=False)
+    data = Column(JSON, nullable=False)
+    content_sha256 = Column(String(64), nullable=True)
+    content_size = Column(Integer, nullable=True)
+    profile = Column(String(20), nullable=True)  # PDF profile of the stored bytes
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("document_type", "document_id", name="uq_document_snapshots_document"),
+    )
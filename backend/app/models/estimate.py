@@ -1,9 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
-from .base import Base
+from .base import Base, ChangeTracked, relationship
 
-class Estimate(Base):
+class Estimate(Base, ChangeTracked):
     __tablename__ = "estimates"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -21,3 +20,8 @@ class Estimate(Base):
     # Relationships
     client = relationship("Client")
     items = relationship("ContractDetail", back_populates="estimate", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Status sweep (app/crud/sweep.py): open estimates by expiration date
+        Index("ix_estimates_status_expiration_date", "status", "expiration_date"),
+    )
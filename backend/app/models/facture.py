@@ -1,9 +1,8 @@
 from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
-from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from .base import Base
+from .base import Base, ChangeTracked, relationship
 
-class Facture(Base):
+class Facture(Base, ChangeTracked):
     __tablename__ = "factures"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -14,7 +13,7 @@ class Facture(Base):
     unit_price = Column(Float, nullable=False)
     tva = Column(Float, nullable=False)
     total_ht = Column(Float, nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), index=True)
     invoice_id = Column(Integer, ForeignKey("invoices.id"), nullable=True)
 
     # Relationships
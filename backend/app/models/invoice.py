@@ -1,9 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Numeric
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Numeric, Index
 from sqlalchemy.sql import func
-from .base import Base
+from .base import Base, ChangeTracked, relationship
 
-class Invoice(Base):
+class Invoice(Base, ChangeTracked):
     __tablename__ = "invoices"
     id = Column(Integer, primary_key=True, index=True)
     invoice_number = Column(String(255), unique=True, nullable=False)
@@ -11,9 +10,14 @@ class Invoice(Base):
     amount = Column(Float, nullable=False)
     due_date = Column(Date, nullable=False)
     status = Column(String(50), default="unpaid")
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), index=True)
     paid_amount = Column(Numeric(10, 2), default=0.00)
     
     # Relationships
     contract = relationship("Contract", back_populates="invoices")
-    factures = relationship("Facture", back_populates="invoice")
\ No newline at end of file
+    factures = relationship("Facture", back_populates="invoice")
+
+    __table_args__ = (
+        # Receivables aging (app/crud/aging.py): open invoices by due date
+        Index("ix_invoices_status_due_date", "status", "due_date"),
+    )
\ No newline at end of file
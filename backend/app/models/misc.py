@@ -1,8 +1,8 @@
 from sqlalchemy import Column, Integer, String, Float, DateTime
 from sqlalchemy.sql import func
-from .base import Base
+from .base import Base, ChangeTracked
 
-class Misc(Base):
+class Misc(Base, ChangeTracked):
     __tablename__ = "miscellaneous"
     id = Column(Integer, primary_key=True, index=True)
     description = Column(String(500), nullable=False)
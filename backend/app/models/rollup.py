@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, Float, Date, DateTime, Index, UniqueConstraint
+from .base import Base
+
+
+class MonthlyRevenue(Base):
+    """Factures of one month (by ``created_at``), client and TVA rate, for ``GET /reports/monthly``.
+
+    Maintained by ``app.crud.rollups``: recomputed from the factures (archive
+    included) of every month a commit touched, or rebuilt for a range.
+    """
+    __tablename__ = "monthly_revenue"
+
+    id = Column(Integer, primary_key=True, index=True)
+    month = Column(Date, nullable=False)  # first day of the month
+    client_id = Column(Integer, nullable=False, index=True)
+    tva = Column(Float, nullable=False)  # rate, in percent
+    lines = Column(Integer, nullable=False, default=0)
+    total_ht = Column(Float, nullable=False, default=0.0)
+    total_tva = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        UniqueConstraint("month", "client_id", "tva", name="uq_monthly_revenue_month_client_tva"),
+    )
+
+
+class MonthlyReceivables(Base):
+    """Invoices issued in one month (by ``created_at``) per client: invoiced, paid and outstanding."""
+    __tablename__ = "monthly_receivables"
+
+    id = Column(Integer, primary_key=True, index=True)
+    month = Column(Date, nullable=False)
+    client_id = Column(Integer, nullable=False, index=True)
+    invoices = Column(Integer, nullable=False, default=0)
+    invoiced = Column(Float, nullable=False, default=0.0)
+    paid = Column(Float, nullable=False, default=0.0)
+    outstanding = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        UniqueConstraint("month", "client_id", name="uq_monthly_receivables_month_client"),
+    )
+
+
+class RollupDirty(Base):
+    """A month whose rollups are out of date, queued in the transaction of the write that changed it."""
+    __tablename__ = "rollup_dirty"
+
+    id = Column(Integer, primary_key=True, index=True)
+    month = Column(Date, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_rollup_dirty_month", "month"),
+    )
@@ -1,8 +1,8 @@
 from sqlalchemy import Column, Integer, String, Float, Date, DateTime
 from sqlalchemy.sql import func
-from .base import Base
+from .base import Base, ChangeTracked
 
-class Salary(Base):
+class Salary(Base, ChangeTracked):
     __tablename__ = "salaries"
     id = Column(Integer, primary_key=True, index=True)
     employee_name = Column(String(100), nullable=False)
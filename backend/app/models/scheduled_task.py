@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime, Text, JSON
+from .base import Base
+
+class ScheduledTask(Base):
+    """A periodic task of the in-app scheduler (app/core/scheduler.py), one row per task name.
+
+    The worker that runs it holds the row (``locked_by`` until ``locked_until``);
+    the outcome of the last run stays in the row for every worker to read.
+    """
+    __tablename__ = "scheduled_tasks"
+
+    name = Column(String(100), primary_key=True)
+    locked_by = Column(String(100), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    last_started_at = Column(DateTime, nullable=True)
+    last_finished_at = Column(DateTime, nullable=True)
+    last_result = Column(JSON, nullable=True)
+    last_error = Column(Text, nullable=True)
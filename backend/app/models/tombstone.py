@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, Index, event, insert, inspect, update
+from .base import Base
+from .client import Client
+from .contract import Contract
+from .contract_detail import ContractDetail
+from .estimate import Estimate
+from .facture import Facture
+from .invoice import Invoice
+from .misc import Misc
+from .salary import Salary
+
+
+class Tombstone(Base):
+    """A deleted row of a synced table, for ``?since=`` delta sync (app/core/sync.py).
+
+    Written by the ``after_delete`` listeners below (and by ``record_deleted``
+    for bulk deletes); kept ``SYNC_TOMBSTONE_RETENTION_DAYS``.
+    """
+    __tablename__ = "tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String(50), nullable=False)  # table name
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_tombstones_entity_deleted_at", "entity", "deleted_at"),
+    )
+
+
+SYNCED_MODELS = (Client, Contract, ContractDetail, Estimate, Facture, Invoice, Misc, Salary)
+
+
+def record_deleted(connection, entity: str, ids):
+    """Tombstones for rows removed by a bulk ``DELETE`` (no ORM events)."""
+    ids = list(ids)
+    if ids:
+        now = datetime.utcnow()
+        connection.execute(
+            insert(Tombstone.__table__),
+            [{"entity": entity, "entity_id": entity_id, "deleted_at": now} for entity_id in ids],
+        )
+
+
+def _record_delete(mapper, connection, target):
+    record_deleted(connection, mapper.local_table.name, [target.id])
+
+
+for _model in SYNCED_MODELS:
+    event.listen(_model, "after_delete", _record_delete)
+
+
+@event.listens_for(Facture, "after_insert")
+@event.listens_for(Facture, "after_update")
+@event.listens_for(Facture, "after_delete")
+def _touch_invoice(mapper, connection, target):
+    # An invoice's amount is the sum of its factures: a facture change is an invoice change
+    ids = {target.invoice_id, *inspect(target).attrs.invoice_id.history.deleted}
+    ids.discard(None)
+    if ids:
+        invoices = Invoice.__table__
+        connection.execute(update(invoices).where(invoices.c.id.in_(ids)).values(updated_at=datetime.utcnow()))
@@ -0,0 +1,104 @@
+"""PDF rendering support.
+
+Nothing in this package is imported at application startup: ReportLab, the
+PDF log file and the SQL statement logging used while rendering are all set
+up on the first PDF request (``ensure_runtime`` is a dependency of the
+``/pdf`` router), or eagerly from the lifespan hook when ``PDF_WARMUP`` is on.
+
+SQL logging (``PDF_SQL_LOGGING``, off by default) only logs the statements
+of PDF requests: the listeners sit on the shared engine but skip anything
+run outside a context marked by ``ensure_runtime``.
+"""
+import contextvars
+import logging
+import threading
+
+from app.core.config import settings
+
+PDF_LOGGER_NAME = "app.routes.pdf"
+
+_runtime_lock = threading.Lock()
+_runtime_ready = False
+# Set for the duration of a PDF request; render threads inherit it
+_in_pdf_request = contextvars.ContextVar("in_pdf_request", default=False)
+
+
+def _configure_logging():
+    logger = logging.getLogger(PDF_LOGGER_NAME)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [logging.StreamHandler()]
+    if settings.PDF_LOG_FILE:
+        handlers.append(logging.FileHandler(settings.PDF_LOG_FILE))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def _register_sql_logging(logger):
+    from sqlalchemy import event
+    from app.core.database import engine
+
+    # SQL query logging
+    @event.listens_for(engine, 'before_cursor_execute')
+    def receive_before_cursor_execute(conn, cursor, statement, params, context, executemany):
+        if _in_pdf_request.get() and not statement.startswith('SELECT 1'):  # Ignore connection test queries
+            logger.info(f"\n--- SQL QUERY ---\n{statement}")
+            if params:
+                logger.info(f"Parameters: {params}")
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def receive_after_cursor_execute(conn, cursor, statement, params, context, executemany):
+        if _in_pdf_request.get() and not statement.startswith('SELECT 1'):
+            if cursor.rowcount >= 0:
+                logger.info(f"Rows affected: {cursor.rowcount}")
+            if cursor.description:
+                columns = [desc[0] for desc in cursor.description]
+                logger.info(f"Returned columns: {columns}")
+
+
+def setup_runtime(sql_logging: bool = None):
+    """Set up PDF logging once per process. Cheap after the first call.
+
+    ``sql_logging`` defaults to ``settings.PDF_SQL_LOGGING``; the job worker
+    turns it off so its polling queries do not flood the PDF log.
+    """
+    global _runtime_ready
+    if _runtime_ready:
+        return
+    with _runtime_lock:
+        if _runtime_ready:
+            return
+        logger = _configure_logging()
+        if settings.PDF_SQL_LOGGING if sql_logging is None else sql_logging:
+            _register_sql_logging(logger)
+        _runtime_ready = True
+
+
+async def ensure_runtime():
+    """Router dependency: set up the PDF runtime on the first PDF request.
+
+    Async so that the flag set here is in the request's own context, which
+    the endpoint and the threads it starts copy; cleared after the response.
+    """
+    setup_runtime()
+    token = _in_pdf_request.set(True)
+    try:
+        yield
+    finally:
+        _in_pdf_request.reset(token)
+
+
+def import_renderer():
+    """Import ReportLab and the canvas classes without touching logging."""
+    from reportlab.lib.pagesizes import letter  # noqa: F401
+    from reportlab.lib.utils import ImageReader  # noqa: F401
+    from app.pdf.canvas import NumberedCanvas  # noqa: F401
+
+
+def warm_up():
+    """Import ReportLab and prepare the PDF runtime ahead of the first request."""
+    setup_runtime()
+    import_renderer()
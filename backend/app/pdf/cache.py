@@ -0,0 +1,65 @@
+"""Per-process LRU cache of rendered PDFs.
+
+Entries are keyed by a document *version* (a hash of everything the renderer
+reads), so a cached PDF is never stale: editing the document changes the key
+and the old entry simply ages out.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import settings
+
+
+def document_version(data) -> str:
+    """Stable hash of the data a PDF is rendered from."""
+    encoded = json.dumps(data, sort_keys=True, default=str, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+class PDFCache:
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            content = self._entries.get(key)
+            if content is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return content
+
+    def put(self, key, content: bytes):
+        if self.max_entries <= 0 or len(content) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = content
+            self._size += len(content)
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+
+pdf_cache = PDFCache(settings.PDF_CACHE_MAX_ENTRIES, settings.PDF_CACHE_MAX_MB * 1024 * 1024)
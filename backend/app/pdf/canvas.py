@@ -0,0 +1,96 @@
+from reportlab.pdfgen import canvas
+
+from app.core.config import settings
+
+
+class DocumentCanvas(canvas.Canvas):
+    """Canvas writing with the settings of a PDF profile (see ``app.pdf.profiles``).
+
+    Stream compression comes from the profile, and the standard font names
+    used by the generators are swapped for the profile's embedded fonts.
+    With ``PDF_INVARIANT`` the file carries no creation time or random ID,
+    so the same drawing always produces the same bytes.
+    """
+
+    def __init__(self, *args, profile=None, **kwargs):
+        self._font_map = profile.font_map() if profile is not None else {}
+        if profile is not None:
+            kwargs.setdefault("pageCompression", int(profile.page_compression))
+        kwargs.setdefault("invariant", int(settings.PDF_INVARIANT))
+        if "Helvetica" in self._font_map:
+            # Otherwise the default font would still be referenced, unembedded
+            kwargs.setdefault("initialFontName", self._font_map["Helvetica"])
+        super().__init__(*args, **kwargs)
+
+    def setFont(self, psfontname, size, leading=None):
+        super().setFont(self._font_map.get(psfontname, psfontname), size, leading)
+
+    def stringWidth(self, text, fontName=None, fontSize=None):
+        if fontName is not None:
+            fontName = self._font_map.get(fontName, fontName)
+        return super().stringWidth(text, fontName, fontSize)
+
+
+# Canvas subclass to add page X/Y footer with doc number
+class NumberedCanvas(DocumentCanvas):
+    """Canvas that stamps "footer_left ... DOCNUM · page/total" on every page.
+
+    Pages are handed to ReportLab as soon as they are finished. The part of
+    the footer that needs the page count is a small form XObject per page:
+    the page references it when it is emitted and the form itself is only
+    written in ``save()``, once the total is known (ReportLab resolves form
+    references at save time). Only the doc number of each page is kept until
+    then, so memory no longer grows with a copy of every page's state.
+    """
+
+    def __init__(self, *args, footer_left: str = "", doc_number: str = "", **kwargs):
+        super().__init__(*args, **kwargs)
+        self._footer_left = footer_left
+        self._doc_number = doc_number
+        self._page_labels = []  # doc number in effect on each emitted page
+
+    def showPage(self):
+        self._draw_footer()
+        super().showPage()
+
+    def save(self):
+        # Like Canvas.save, emit the current page only if something was drawn on it
+        if len(self._code) or not self._page_labels:
+            self.showPage()
+        total_pages = len(self._page_labels)
+        for page_num, doc_number in enumerate(self._page_labels, 1):
+            self.beginForm(self._label_form(page_num))
+            self._draw_page_label(page_num, total_pages, doc_number)
+            self.endForm()
+        canvas.Canvas.save(self)
+
+    @staticmethod
+    def _label_form(page_num: int) -> str:
+        return f"NumberedCanvasLabel{page_num}"
+
+    def _draw_footer(self):
+        # Footer styling
+        left_margin = 40
+        y = 30
+        self.saveState()
+        self.setFont("Helvetica", 8)
+        self.setFillGray(0.35)
+        # Left text
+        if self._footer_left:
+            self.drawString(left_margin, y, self._footer_left)
+        self.restoreState()
+        # Right text is drawn by a form defined in save()
+        self._page_labels.append(self._doc_number)
+        self.doForm(self._label_form(len(self._page_labels)))
+
+    def _draw_page_label(self, page_num: int, total_pages: int, doc_number: str):
+        right_margin_x = 570  # approx page width - 42
+        y = 30
+        self.setFont("Helvetica", 8)
+        self.setFillGray(0.35)
+        # Right text: DOCNUM · page/total
+        if doc_number:
+            right_text = f"{doc_number}  ·  {page_num}/{total_pages}"
+        else:
+            right_text = f"{page_num}/{total_pages}"
+        self.drawRightString(right_margin_x, y, right_text)
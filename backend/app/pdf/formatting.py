@@ -0,0 +1,35 @@
+"""Value formatting shared by the PDF generators."""
+from datetime import date, datetime
+
+
+# Helper to format quantity with a unit label like "432 unités", "1 unité", "100 m", "2 ensembles"
+def format_qty(qty, unit: str) -> str:
+    unit_key = (unit or "unite").lower()
+    if unit_key in ["unite", "unité", "unity", "unit"]:
+        label = "unité" if float(qty) == 1 else "unités"
+    elif unit_key in ["ensemble", "set"]:
+        label = "ensemble" if float(qty) == 1 else "ensembles"
+    else:  # meters or other
+        label = "m"
+    try:
+        # Render 1 without trailing .0, keep integers clean
+        qty_str = ("%g" % float(qty))
+    except Exception:
+        qty_str = str(qty)
+    return f"{qty_str} {label}"
+
+
+# Documents take their dates from the request or the data, so rendering the same
+# document twice gives the same bytes; the clock is only used when there is no date.
+def parse_date(value):
+    """datetime from an ISO date or datetime string (trailing 'Z' allowed), else None."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
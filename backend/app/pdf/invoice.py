@@ -0,0 +1,442 @@
+"""Invoice PDF, rendered from an ``InvoiceDocument``.
+
+Used by ``GET /pdf/invoice/{id}`` for live invoices and for reprints of
+issued ones in another profile, and by ``app.pdf.snapshots`` to store the
+PDF of an invoice when it is issued. ReportLab is imported on first render.
+"""
+import logging
+from datetime import date, datetime, timedelta
+from io import BytesIO
+
+from fastapi import Response
+
+from app.pdf import PDF_LOGGER_NAME
+from app.pdf.formatting import format_qty, parse_date
+from app.pdf.loaders import InvoiceDocument
+from app.pdf.profiles import logo_image
+from app.pdf.responses import PDFResponse
+
+logger = logging.getLogger(PDF_LOGGER_NAME)
+
+
+def invoice_fields(doc: InvoiceDocument, invoice_number=None, issue_date=None, expiration_date=None):
+    """Printed invoice number, issue and expiration datetimes, from the parameters or the data."""
+    invoice, contract = doc.invoice, doc.contract
+    # Use provided invoice number, else DB value, else derived from the id
+    invoice_num = invoice_number or invoice.invoice_number or f"INV-{invoice.id}"
+    # Issue date: parameter, else invoice creation, else contract date
+    issue_dt = parse_date(issue_date) or parse_date(invoice.created_at) or parse_date(contract.date) \
+        or datetime.combine(date.today(), datetime.min.time())
+    # Expiration date: parameter, else invoice due date, else contract deadline, else issue + 30 days
+    expiration_dt = parse_date(expiration_date) or parse_date(invoice.due_date) \
+        or parse_date(contract.deadline) or issue_dt + timedelta(days=30)
+    return invoice_num, issue_dt, expiration_dt
+
+
+def render_invoice_pdf(doc: InvoiceDocument, invoice_number, issue_date, expiration_date, pdf_profile) -> Response:
+    from reportlab.lib.pagesizes import letter
+    from app.pdf.canvas import NumberedCanvas
+
+    contract, client, factures = doc.contract, doc.client, doc.lines
+    invoice_num, issue_dt, expiration_dt = invoice_fields(doc, invoice_number, issue_date, expiration_date)
+
+    buffer = BytesIO()
+    # Use NumberedCanvas with footer; set doc number after computing invoice_num
+    footer_left_text = "NEXT NR-GIE, SAS avec un capital de 5 000,00 € • 930 601 547 Evry B"
+    p = NumberedCanvas(buffer, pagesize=letter, footer_left=footer_left_text, doc_number="", profile=pdf_profile)
+
+    # Page-break helper (align with old template)
+    def ensure_space(current_y: int, min_y: int = 140) -> int:
+        if current_y < min_y:
+            p.showPage()
+            return 760
+        return current_y
+
+    # Margins and layout
+    left = 40
+    right = 320
+    y = 740
+    line_height = 22
+
+    # Title
+    p.setFont("Helvetica-Bold", 28)
+    p.drawString(left, y, "Facture")
+    y -= 2 * line_height
+
+    # Invoice info (left col)
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(left, y, "Numéro de facture")
+    p.setFont("Helvetica", 12)
+    p.drawString(left + 170, y, f"{invoice_num}")
+    # Update footer doc number (shown at right with page x/y)
+    try:
+        p._doc_number = str(invoice_num)
+    except Exception:
+        pass
+    y -= line_height
+    
+    # Get dates from parameters or fall back to invoice fields then contract
+    def to_ddmmyyyy(dt):
+        try:
+            return dt.strftime('%d/%m/%Y') if dt else ''
+        except Exception:
+            return ''
+    
+    issue_date_str = to_ddmmyyyy(issue_dt)
+    expiration_date_str = to_ddmmyyyy(expiration_dt)
+    
+    # Draw issue date
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(left, y, "Date d'émission")
+    p.setFont("Helvetica", 12)
+    p.drawString(left + 170, y, issue_date_str)
+    y -= line_height
+    
+    # Draw expiration date
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(left, y, "Date d'expiration")
+    p.setFont("Helvetica", 12)
+    p.drawString(left + 170, y, expiration_date_str)
+    y -= line_height
+    
+    # Numéro de contrat
+    p.setFont("Helvetica-Bold", 11)
+    p.drawString(left, y, "Numéro de contrat")
+    p.setFont("Helvetica", 12)
+    p.drawString(left + 170, y, f"{contract.command_number}" if hasattr(contract, 'command_number') else "")
+    y -= line_height
+    
+
+
+    # Logo (top right)
+    logo_y = 700
+    logo_x = 440
+    logo_width = 150
+    logo_height = 55
+    # Resolved from app/static or frontend/public, resampled for the profile
+    logo = logo_image(pdf_profile, logo_width, logo_height)
+    if logo:
+        p.drawImage(logo, logo_x, logo_y, width=logo_width, height=logo_height, mask='auto')
+    else:
+        logger.warning("Logo not found")
+
+    # Addresses and info
+    y -= 2 * line_height
+    left_col_y = y
+    right_col_y = y
+    # LEFT: Supplier
+    p.setFont("Helvetica-Bold", 11)
+    p.drawString(left, left_col_y, "NEXT NR–GIE")
+    p.setFont("Helvetica", 10)
+    p.drawString(left, left_col_y - 15, "2 Rue Des Frênes")
+    p.drawString(left, left_col_y - 30, "91100 Corbeil-Essonnes, FR")
+    p.drawString(left, left_col_y - 45, "nextrngie@gmail.com")
+    p.drawString(left, left_col_y - 60, "93060154700019")
+    p.drawString(left, left_col_y - 75, "Numéro de TVA: FR26930601547")
+
+    # RIGHT: Client
+    p.setFont("Helvetica-Bold", 11)
+    if client:
+        # Draw client name with word wrapping
+        y_pos = right_col_y
+        name_text = (client.client_name or "").strip()
+        p.setFont("Helvetica-Bold", 11)
+        if name_text:
+            max_width = 200
+            words = name_text.split()
+            line = ""
+            lines = []
+            for w in words:
+                test = (line + (" " if line else "") + w)
+                if p.stringWidth(test, "Helvetica-Bold", 11) <= max_width:
+                    line = test
+                else:
+                    if line:
+                        lines.append(line)
+                    line = w
+            if line:
+                lines.append(line)
+            for ln in lines:
+                p.drawString(right, y_pos, ln)
+                y_pos -= 15
+        else:
+            p.drawString(right, y_pos, "Client")
+            y_pos -= 15
+        
+        # Details
+        p.setFont("Helvetica", 10)
+        
+        # Address (multi-line)
+        addr = getattr(client, 'client_address', None)
+        if addr:
+            for line_txt in str(addr).replace('\r\n','\n').replace('\r','\n').split('\n'):
+                if line_txt.strip():
+                    p.drawString(right, y_pos, line_txt.strip())
+                    y_pos -= 15
+        # SIRET from TSA number (if available)
+        if getattr(client, 'tsa_number', None):
+            p.drawString(right, y_pos, f"SIRET: {client.tsa_number}")
+            y_pos -= 15
+        
+        # Email (keep if available)
+        if getattr(client, 'email', None):
+            p.drawString(right, y_pos, client.email)
+            y_pos -= 15
+        
+        # TVA number
+        if getattr(client, 'tva_number', None):
+            p.drawString(right, y_pos, f"Numéro de TVA: {client.tva_number}")
+    else:
+        p.drawString(right, right_col_y, "Client")
+        p.setFont("Helvetica", 10)
+        p.drawString(right, right_col_y - 15, "")
+        p.drawString(right, right_col_y - 30, "")
+        p.drawString(right, right_col_y - 45, "")
+
+    # Chantier (site/project)
+    # Anchor the table safely below the address blocks to prevent overlap
+    # Estimate bottoms of both columns and position the table below the lowest point
+    left_bottom = left_col_y - 90
+    right_bottom = right_col_y - 120
+    y_after_blocks = min(left_bottom, right_bottom) - 10
+    chantier_y = y_after_blocks
+
+    # Add table header below chantier
+    table_y = chantier_y - 30  # Position below chantier
+    table_header_y = table_y + 20
+    
+    # Draw header baseline
+    p.setLineWidth(0.7)
+    p.line(40, table_header_y, 550, table_header_y)
+    
+    # Table headers
+    p.setFont("Helvetica-Bold", 10)
+    
+    headers = [
+        {"text": "Description", "width": 250},  
+        {"text": "Qté", "width": 70},       
+        {"text": "Prix unitaire", "width": 100},  
+        {"text": "TVA (%)", "width": 60},    
+        {"text": "Total HT", "width": 60}     
+    ]
+    
+    # Calculate total width of all headers
+    total_width = sum(header["width"] for header in headers)
+    
+    # Calculate centered position
+    page_width = 550  # Page width from 40 to 550
+    header_x = (page_width - total_width) / 2 + 40  # Centered position
+    
+    # Draw black background for entire header area
+    p.setLineWidth(0.7)
+    p.setFillColorRGB(0, 0, 0)  # Black
+    p.rect(header_x, table_header_y - 20, total_width, 20, fill=1)
+    
+    # Draw white text
+    p.setFillColorRGB(1, 1, 1)  # White
+    current_x = header_x
+    for header in headers:
+        if header["text"] == "Total HT":
+            # Right-align Total HT
+            text_width = p.stringWidth(header["text"], "Helvetica-Bold", 10)
+            p.drawString(current_x + header["width"] - text_width - 5, table_header_y - 15, header["text"])
+        else:
+            # Left-align other columns
+            p.drawString(current_x + 5, table_header_y - 15, header["text"])
+        current_x += header["width"]
+    
+    # Prepare for dynamic per-page borders
+    # Column X positions (including left and right boundaries)
+    col_x = [header_x]
+    for h in headers:
+        col_x.append(col_x[-1] + h["width"])
+    # Track top Y of the table area on the current page
+    page_top = table_header_y
+    # Stroke/text colors
+    p.setStrokeColorRGB(0, 0, 0)
+    p.setFillColorRGB(0, 0, 0)
+
+    # Helper: close current page table borders
+    def close_table_borders(top_y: float, bottom_y: float):
+        p.setLineWidth(0.7)
+        for x in col_x:  # draw all verticals including rightmost
+            p.line(x, top_y, x, bottom_y)
+        # bottom line
+        p.line(header_x, bottom_y, header_x + total_width, bottom_y)
+    
+    padding_top = 6
+    padding_bottom = 4
+    line_height = 12
+    y_position = table_header_y - 20
+    total_ht_sum = 0.0
+    tva_sum = 0.0
+
+    if factures:
+        for detail in factures:
+            desc = str(detail.description or '')
+            max_width = headers[0]["width"] - 10  # 5px padding on each side
+            # Preserve explicit newlines by splitting into paragraphs first
+            paragraphs = str(desc).replace('\r\n','\n').replace('\r','\n').split('\n')
+            lines = []
+            for para in paragraphs:
+                words = para.split()
+                if not words:
+                    # Preserve blank line
+                    lines.append('')
+                    continue
+                current_line = []
+                for word in words:
+                    test_line = ' '.join(current_line + [word])
+                    if p.stringWidth(test_line, "Helvetica", 9) <= max_width:
+                        current_line.append(word)
+                    else:
+                        if current_line:
+                            lines.append(' '.join(current_line))
+                        current_line = [word]
+                if current_line:
+                    lines.append(' '.join(current_line))
+            if not lines:
+                lines = [""]
+
+            content_height = max(len(lines) * line_height, line_height)
+            row_height = content_height + padding_top + padding_bottom
+
+            if y_position - row_height < 100:
+                close_table_borders(page_top, y_position)
+                p.showPage()
+                p.setFont("Helvetica", 10)
+                y_position = 750
+                p.setLineWidth(0.7)
+                p.setFillColorRGB(0, 0, 0)
+                p.rect(header_x, y_position, total_width, 20, fill=1)
+                p.setFillColorRGB(1, 1, 1)
+                current_x = header_x
+                for header in headers:
+                    if header["text"] == "Total HT":
+                        text_width = p.stringWidth(header["text"], "Helvetica-Bold", 10)
+                        p.drawString(current_x + header["width"] - text_width - 5, y_position - 15, header["text"])
+                    else:
+                        p.drawString(current_x + 5, y_position - 15, header["text"])
+                    current_x += header["width"]
+                y_position -= 20
+                page_top = y_position + 20
+                p.setFillColorRGB(0, 0, 0)
+
+            row_top = y_position
+            baseline = row_top - padding_top - 2
+
+            current_x = header_x
+            p.setFont("Helvetica", 9)
+            desc_y = baseline
+            for line in lines:
+                p.drawString(header_x + 5, desc_y, line)
+                desc_y -= line_height
+
+            current_x += headers[0]["width"]
+
+            qty_text = format_qty(detail.qty, getattr(detail, 'qty_unit', 'unite'))
+            qty_width = p.stringWidth(qty_text, "Helvetica", 9)
+            p.drawString(current_x + headers[1]["width"] - qty_width - 5, baseline, qty_text)
+            current_x += headers[1]["width"]
+
+            unit_price_text = f"€ {detail.unit_price:.2f}"
+            unit_price_width = p.stringWidth(unit_price_text, "Helvetica", 9)
+            p.drawString(current_x + headers[2]["width"] - unit_price_width - 5, baseline, unit_price_text)
+            current_x += headers[2]["width"]
+
+            tva_rate = detail.tva if hasattr(detail, 'tva') else 0.0
+            tva_text = f"{tva_rate:.2f}%"
+            tva_width = p.stringWidth(tva_text, "Helvetica", 9)
+            p.drawString(current_x + headers[3]["width"] - tva_width - 5, baseline, tva_text)
+            current_x += headers[3]["width"]
+
+            try:
+                row_ht = float(detail.qty or 0) * float(detail.unit_price or 0)
+            except Exception:
+                row_ht = 0.0
+            row_ht_text = f"€ {row_ht:.2f}"
+            row_ht_width = p.stringWidth(row_ht_text, "Helvetica", 9)
+            p.drawString(current_x + headers[4]["width"] - row_ht_width - 5, baseline, row_ht_text)
+
+            total_ht_sum += row_ht
+            try:
+                item_tva_rate = float(getattr(detail, 'tva', 0.0) or 0.0)
+            except Exception:
+                item_tva_rate = 0.0
+            tva_sum += row_ht * (item_tva_rate / 100.0)
+
+            line_y = row_top - row_height
+            p.setLineWidth(0.7)
+            p.line(header_x, line_y, header_x + total_width, line_y)
+            y_position = line_y
+    else:
+        total_ht_sum = 0.0
+        tva_sum = 0.0
+    
+    # Close borders for the final page section
+    close_table_borders(page_top, y_position)
+    
+    # Add totals section
+    y_position = ensure_space(y_position - 20, 160)
+    p.setFont("Helvetica-Bold", 10)
+    
+    # Total HT
+    p.drawString(header_x + 5, y_position - 15, "Total HT:")
+    total_text = f"{total_ht_sum:.2f} €"
+    total_width_text = p.stringWidth(total_text, "Helvetica-Bold", 10)
+    p.drawString(header_x + total_width - total_width_text - 5, y_position - 15, total_text)
+    
+    # Calculate total TVA from all factures (sum of qty * unit_price * tva%)
+    y_position = ensure_space(y_position - 20, 140)
+    tva_amount = tva_sum
+    p.drawString(header_x + 5, y_position - 15, "TVA:")
+    tva_text = f"{tva_amount:.2f} €"
+    tva_width_text = p.stringWidth(tva_text, "Helvetica-Bold", 10)
+    p.drawString(header_x + total_width - tva_width_text - 5, y_position - 15, tva_text)
+    
+    # Total TTC (HT + TVA)
+    y_position = ensure_space(y_position - 20, 140)
+    total_ttc = total_ht_sum + tva_amount
+    p.drawString(header_x + 5, y_position - 15, "Total TTC:")
+    ttc_text = f"{total_ttc:.2f} €"
+    ttc_width_text = p.stringWidth(ttc_text, "Helvetica-Bold", 10)
+    p.drawString(header_x + total_width - ttc_width_text - 5, y_position - 15, ttc_text)
+    
+    # Legal notes and payment details (from old working template)
+    y_position = ensure_space(y_position - 30, 200)
+    p.setFont("Helvetica", 8)
+    p.drawString(left, y_position, "TVA non applicable - Section 283 du CGI - Autoliquidation des services")
+    y_position -= 12
+    p.drawString(left, y_position, "Type de transaction : Services")
+    y_position -= 12
+    p.drawString(left, y_position, "Pas d'escompte accordé pour paiement anticipé.")
+    y_position -= 12
+    p.drawString(left, y_position, "En cas de non-paiement à la date d'échéance, des pénalités calculées à trois fois le taux d'intérêt légal seront appliquées.")
+    y_position -= 12
+    p.drawString(left, y_position, "Tout retard de paiement entraînera une indemnité forfaitaire pour frais de recouvrement de 40€.")
+    
+    # Spacing before payment details
+    y_position -= (6 * 8)
+    
+    # Payment details
+    y_position = ensure_space(y_position - 30, 150)
+    p.setFont("Helvetica-Bold", 11)
+    p.drawString(left, y_position, "Détails du paiement")
+    y_position -= 16
+    p.setFont("Helvetica", 9)
+    label_x = left
+    value_x = left + 150
+    p.drawString(label_x, y_position, "Nom du bénéficiaire")
+    p.drawString(value_x, y_position, "NEXT NR-GIE")
+    y_position -= 14
+    p.drawString(label_x, y_position, "BIC")
+    p.drawString(value_x, y_position, "CMCIFR2A")
+    y_position -= 14
+    p.drawString(label_x, y_position, "IBAN")
+    p.drawString(value_x, y_position, "FR7610278062310002236670146")
+    y_position -= 14
+    # p.drawString(label_x, y_position, "Référence")
+    # p.drawString(value_x, y_position, "QECVZDX")
+
+    p.save()
+    return PDFResponse(buffer, filename=f"invoice_{invoice_num}.pdf")
@@ -0,0 +1,249 @@
+"""Document loaders for the PDF generators.
+
+Each loader fetches everything one document type needs in one or two
+queries (a joined header row, then the lines) and returns a frozen, slotted
+view (no per-instance ``__dict__``). Renderers only read these views; they
+never touch the session, so a document costs a fixed number of queries
+however it is rendered.
+
+View attributes keep the model column names (``client_name``,
+``command_number``...) so rendering code reads the same as with ORM objects.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import case, or_, select
+from sqlalchemy.orm import Session
+
+from app.crud.archive import union_factures
+from app.models.archive import FactureArchive, InvoiceArchive
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.contract_detail import ContractDetail
+from app.models.estimate import Estimate
+from app.models.facture import Facture
+from app.models.invoice import Invoice
+
+
+@dataclass(frozen=True, slots=True)
+class ClientView:
+    id: int
+    client_name: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+    tva_number: Optional[str]
+    tsa_number: Optional[str]
+    client_address: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class ContractView:
+    id: int
+    command_number: Optional[str]
+    name: Optional[str]
+    price: float
+    date: Optional[date]
+    deadline: Optional[date]
+    client_id: Optional[int]
+
+
+@dataclass(frozen=True, slots=True)
+class LineView:
+    """A facture or a contract detail (devis item)."""
+    id: int
+    description: Optional[str]
+    qty: float
+    qty_unit: Optional[str]
+    unit_price: float
+    tva: float
+    total_ht: float
+    created_at: Optional[datetime] = None
+
+
+@dataclass(frozen=True, slots=True)
+class InvoiceView:
+    id: int
+    invoice_number: Optional[str]
+    contract_id: int
+    due_date: Optional[date]
+    status: Optional[str]
+    created_at: Optional[datetime]
+
+
+@dataclass(frozen=True, slots=True)
+class InvoiceDocument:
+    invoice: InvoiceView
+    contract: ContractView
+    client: Optional[ClientView]
+    lines: Tuple[LineView, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class ContractDocument:
+    contract: ContractView
+    client: Optional[ClientView]
+    lines: Tuple[LineView, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class EstimateDocument:
+    id: int
+    estimate_number: str
+    creation_date: Optional[date]
+    expiration_date: Optional[date]
+    status: Optional[str]
+    client: Optional[ClientView]
+    items: Tuple[LineView, ...]
+
+
+CLIENT_COLUMNS = (
+    Client.id, Client.client_name, Client.email, Client.phone,
+    Client.tva_number, Client.tsa_number, Client.client_address,
+)
+CONTRACT_COLUMNS = (
+    Contract.id, Contract.command_number, Contract.name, Contract.price,
+    Contract.date, Contract.deadline, Contract.client_id,
+)
+INVOICE_COLUMNS = (
+    Invoice.id, Invoice.invoice_number, Invoice.contract_id,
+    Invoice.due_date, Invoice.status, Invoice.created_at,
+)
+FACTURE_COLUMNS = (
+    Facture.id, Facture.description, Facture.qty, Facture.qty_unit,
+    Facture.unit_price, Facture.tva, Facture.total_ht, Facture.created_at,
+)
+DETAIL_COLUMNS = (
+    ContractDetail.id, ContractDetail.description, ContractDetail.qty, ContractDetail.qty_unit,
+    ContractDetail.unit_price, ContractDetail.tva, ContractDetail.total_ht,
+)
+
+
+def _split(row, *groups):
+    """Cut a flat result row into one tuple per column group."""
+    parts, start = [], 0
+    for group in groups:
+        parts.append(tuple(row[start:start + len(group)]))
+        start += len(group)
+    return parts
+
+
+def _client(values) -> Optional[ClientView]:
+    # Outer-joined client columns are all NULL when the client is missing
+    return ClientView(*values) if values[0] is not None else None
+
+
+def _lines(db: Session, stmt) -> Tuple[LineView, ...]:
+    return tuple(LineView(*row) for row in db.execute(stmt))
+
+
+def _columns_of(model, columns):
+    """The same columns on ``model`` (an archive table)."""
+    return tuple(getattr(model, column.key) for column in columns)
+
+
+def load_invoice_document(db: Session, invoice_id: int) -> Optional[InvoiceDocument]:
+    """Invoice, contract and client in one joined query, then the factures.
+
+    Archived invoices (``app.crud.archive``) are looked up when the invoice
+    is not in ``invoices``. Returns ``None`` when the invoice does not exist;
+    ``contract`` is ``None`` in the result only if the invoice points at a
+    missing contract.
+    """
+    for invoice_model, facture_model in ((Invoice, Facture), (InvoiceArchive, FactureArchive)):
+        row = db.execute(
+            select(*_columns_of(invoice_model, INVOICE_COLUMNS), *CONTRACT_COLUMNS, *CLIENT_COLUMNS)
+            .select_from(invoice_model)
+            .outerjoin(Contract, Contract.id == invoice_model.contract_id)
+            .outerjoin(Client, Client.id == Contract.client_id)
+            .where(invoice_model.id == invoice_id)
+        ).first()
+        if row is not None:
+            break
+    else:
+        return None
+    invoice, contract, client = _split(row, INVOICE_COLUMNS, CONTRACT_COLUMNS, CLIENT_COLUMNS)
+    lines = _lines(
+        db,
+        select(*_columns_of(facture_model, FACTURE_COLUMNS))
+        .where(facture_model.invoice_id == invoice_id)
+        .order_by(facture_model.id),
+    )
+    return InvoiceDocument(
+        invoice=InvoiceView(*invoice),
+        contract=ContractView(*contract) if contract[0] is not None else None,
+        client=_client(client),
+        lines=lines,
+    )
+
+
+def load_contract_document(db: Session, contract_id: int) -> Optional[ContractDocument]:
+    """Contract and client in one joined query, then its factures (archived ones too) by creation time."""
+    row = db.execute(
+        select(*CONTRACT_COLUMNS, *CLIENT_COLUMNS)
+        .select_from(Contract)
+        .outerjoin(Client, Client.id == Contract.client_id)
+        .where(Contract.id == contract_id)
+    ).first()
+    if row is None:
+        return None
+    contract, client = _split(row, CONTRACT_COLUMNS, CLIENT_COLUMNS)
+    fields = [column.key for column in FACTURE_COLUMNS]
+    lines = _lines(
+        db, union_factures(fields, lambda c: c.contract_id == contract_id).order_by("created_at", "id")
+    )
+    return ContractDocument(contract=ContractView(*contract), client=_client(client), lines=lines)
+
+
+def load_estimate_document(db: Session, estimate_id: int) -> Optional[EstimateDocument]:
+    """Estimate and client in one joined query, then its items."""
+    header = (Estimate.id, Estimate.estimate_number, Estimate.creation_date, Estimate.expiration_date, Estimate.status)
+    row = db.execute(
+        select(*header, *CLIENT_COLUMNS)
+        .select_from(Estimate)
+        .outerjoin(Client, Client.id == Estimate.client_id)
+        .where(Estimate.id == estimate_id)
+    ).first()
+    if row is None:
+        return None
+    estimate, client = _split(row, header, CLIENT_COLUMNS)
+    items = _lines(
+        db, select(*DETAIL_COLUMNS).where(ContractDetail.estimate_id == estimate_id).order_by(ContractDetail.id)
+    )
+    return EstimateDocument(*estimate, client=_client(client), items=items)
+
+
+def load_contract_items(db: Session, contract_id: int) -> Tuple[LineView, ...]:
+    """Contract details attached directly to a contract (devis drafts)."""
+    return _lines(
+        db, select(*DETAIL_COLUMNS).where(ContractDetail.contract_id == contract_id).order_by(ContractDetail.id)
+    )
+
+
+def find_devis_client(
+    db: Session,
+    devis_number: Optional[str] = None,
+    contract_id: Optional[int] = None,
+    tsa_number: Optional[str] = None,
+    email: Optional[str] = None,
+) -> Optional[ClientView]:
+    """Resolve the client of a query-string devis in a single query.
+
+    Candidates are, in order of preference: the client of the estimate
+    numbered ``devis_number``, the client of ``contract_id``, then a client
+    matching the SIRET (``tsa_number``) or the email.
+    """
+    rules = []
+    if devis_number:
+        rules.append(Client.id.in_(select(Estimate.client_id).where(Estimate.estimate_number == devis_number)))
+    if contract_id:
+        rules.append(Client.id.in_(select(Contract.client_id).where(Contract.id == int(contract_id))))
+    if tsa_number:
+        rules.append(Client.tsa_number == tsa_number)
+    if email:
+        rules.append(Client.email == email)
+    if not rules:
+        return None
+    rank = case(*((rule, i) for i, rule in enumerate(rules)), else_=len(rules))
+    row = db.execute(select(*CLIENT_COLUMNS).where(or_(*rules)).order_by(rank, Client.id).limit(1)).first()
+    return ClientView(*row) if row else None
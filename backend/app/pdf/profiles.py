@@ -0,0 +1,151 @@
+"""Named PDF output profiles.
+
+A profile decides how a document is written, not what it shows:
+
+- ``screen`` (default): compressed page streams, logo resampled to 150 DPI.
+- ``email``: compressed, logo at 96 DPI and stronger JPEG compression; the
+  smallest files, meant for attachments.
+- ``archive``: compressed, original logo, and the Helvetica family replaced
+  by embedded Liberation Sans (metrically identical, so layouts do not move)
+  when the TTF files are available, so the document renders the same
+  anywhere. Without them it falls back to the standard, non-embedded fonts.
+
+Endpoints take ``?profile=``; ``PDF_DEFAULT_PROFILE`` sets the default.
+The processed logo is built once per process and size.
+"""
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.routes.pdf")
+
+_BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+LOGO_PATHS = (
+    os.path.join(_BASE_DIR, "app", "static", "logonr.jpg"),
+    os.path.join(_BASE_DIR, "..", "frontend", "public", "logonr.jpg"),
+)
+FONT_DIRS = (
+    "/usr/share/fonts/truetype/liberation",
+    "/usr/share/fonts/liberation",
+)
+# Standard font -> Liberation Sans file with the same metrics
+ARCHIVE_FONTS = {
+    "Helvetica": "LiberationSans-Regular.ttf",
+    "Helvetica-Bold": "LiberationSans-Bold.ttf",
+    "Helvetica-Oblique": "LiberationSans-Italic.ttf",
+    "Helvetica-BoldOblique": "LiberationSans-BoldItalic.ttf",
+}
+
+
+@dataclass(frozen=True)
+class PDFProfile:
+    name: str
+    page_compression: bool = True
+    logo_dpi: Optional[int] = None  # None embeds the logo file unchanged
+    logo_quality: int = 85
+    embed_fonts: bool = False
+
+    def font_map(self) -> Dict[str, str]:
+        return _archive_font_map() if self.embed_fonts else {}
+
+
+PROFILES = {
+    "screen": PDFProfile("screen", logo_dpi=150, logo_quality=85),
+    "email": PDFProfile("email", logo_dpi=96, logo_quality=70),
+    "archive": PDFProfile("archive", embed_fonts=True),
+}
+
+
+def get_profile(name: Optional[str] = None) -> PDFProfile:
+    """Profile called ``name`` (default ``PDF_DEFAULT_PROFILE``); 400 if unknown."""
+    profile = PROFILES.get((name or settings.PDF_DEFAULT_PROFILE).lower())
+    if profile is None:
+        raise HTTPException(status_code=400, detail=f"Unknown PDF profile. Available: {', '.join(PROFILES)}")
+    return profile
+
+
+_fonts_lock = threading.Lock()
+_font_map = None
+
+
+def _archive_font_map() -> Dict[str, str]:
+    """Register the Liberation Sans fonts once; empty map when they are missing."""
+    global _font_map
+    with _fonts_lock:
+        if _font_map is None:
+            _font_map = _register_archive_fonts()
+        return _font_map
+
+
+def archive_font_files() -> Dict[str, str]:
+    """Standard font -> path of the Liberation Sans file replacing it, for the files found."""
+    dirs = [settings.PDF_FONT_DIR] if settings.PDF_FONT_DIR else []
+    dirs.extend(FONT_DIRS)
+    files = {}
+    for base_font, filename in ARCHIVE_FONTS.items():
+        path = next((os.path.join(d, filename) for d in dirs if os.path.exists(os.path.join(d, filename))), None)
+        if path is not None:
+            files[base_font] = path
+    return files
+
+
+def _register_archive_fonts() -> Dict[str, str]:
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    font_map = {}
+    for base_font, path in archive_font_files().items():
+        name = os.path.splitext(os.path.basename(path))[0]
+        pdfmetrics.registerFont(TTFont(name, path))
+        font_map[base_font] = name
+    if len(font_map) < len(ARCHIVE_FONTS):
+        logger.warning("Liberation Sans fonts not found (set PDF_FONT_DIR); "
+                       "archive PDFs use the standard fonts for: "
+                       + ", ".join(sorted(set(ARCHIVE_FONTS) - set(font_map))))
+    return font_map
+
+
+def logo_path() -> Optional[str]:
+    return next((path for path in LOGO_PATHS if os.path.exists(path)), None)
+
+
+@lru_cache(maxsize=16)
+def _logo_bytes(path: str, width_px: int, height_px: int, quality: int) -> Optional[bytes]:
+    try:
+        from PIL import Image
+    except ImportError:  # Pillow is optional; the original file is used instead
+        return None
+    with Image.open(path) as image:
+        if image.width <= width_px and image.height <= height_px:
+            return None
+        resized = image.convert("RGB").resize((width_px, height_px), Image.LANCZOS)
+    out = BytesIO()
+    resized.save(out, format="JPEG", quality=quality, optimize=True)
+    return out.getvalue()
+
+
+def logo_image(profile: PDFProfile, width: float, height: float):
+    """Company logo for a ``width`` x ``height`` point box, or ``None`` if missing."""
+    from reportlab.lib.utils import ImageReader
+
+    path = logo_path()
+    if path is None:
+        return None
+    if profile.logo_dpi:
+        data = _logo_bytes(
+            path,
+            round(width * profile.logo_dpi / 72),
+            round(height * profile.logo_dpi / 72),
+            profile.logo_quality,
+        )
+        if data is not None:
+            return ImageReader(BytesIO(data))
+    return ImageReader(path)
@@ -0,0 +1,208 @@
+"""HTTP responses for generated documents.
+
+``PDFResponse`` sends a rendered buffer without copying it: the body is a
+memoryview over the ``BytesIO`` the canvas wrote to (or over cached bytes).
+``PDFFileResponse`` streams a stored document from disk in fixed-size chunks.
+
+Both send an exact Content-Length, advertise ``Accept-Ranges: bytes`` and
+answer a single ``Range: bytes=...`` request with 206 (416 when it starts
+past the end), so browser PDF viewers can fetch large documents piece by
+piece. Multiple ranges are answered with the whole document, which HTTP
+allows. ``If-Range`` is honoured against the response ETag.
+"""
+import os
+import re
+import stat
+import unicodedata
+from io import BytesIO
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.responses import FileResponse, Response
+
+_RANGE = re.compile(r"^\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*$", re.IGNORECASE)
+_UNSAFE_FILENAME = re.compile(r'["\\/\r\n;]')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def content_disposition(filename: str, disposition: str = "inline") -> str:
+    """``inline; filename="..."`` header value for ``filename``.
+
+    Names that are not plain ASCII get an ASCII fallback plus the RFC 5987
+    ``filename*`` form, so accents in client names survive the download.
+    """
+    filename = _UNSAFE_FILENAME.sub("_", filename)
+    fallback = unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode("ascii") or "document.pdf"
+    value = f'{disposition}; filename="{fallback}"'
+    if fallback != filename:
+        value += f"; filename*=UTF-8''{quote(filename)}"
+    return value
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive ``(first, last)`` byte positions of a single-range header.
+
+    Returns ``None`` when the whole document should be sent (no header, a
+    syntax we do not serve, several ranges). Raises ``RangeNotSatisfiable``
+    when the range lies entirely past the end of the document.
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header)
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+def _request_range(scope, response: Response, size: int) -> Optional[Tuple[int, int]]:
+    if response.status_code != 200 or scope.get("method", "GET").upper() not in ("GET", "HEAD"):
+        return None
+    request_headers = {k.lower(): v for k, v in scope.get("headers", [])}
+    header = request_headers.get(b"range")
+    if header is None:
+        return None
+    if_range = request_headers.get(b"if-range")
+    if if_range is not None and if_range.decode("latin-1").strip() != response.headers.get("etag"):
+        # The client's copy is outdated: send the current document in full
+        return None
+    return parse_range(header.decode("latin-1"), size)
+
+
+def _partial_headers(raw_headers: List[Tuple[bytes, bytes]], content_range: str, length: int):
+    headers = [(k, v) for k, v in raw_headers if k not in (b"content-length", b"content-range")]
+    headers.append((b"content-range", content_range.encode("latin-1")))
+    headers.append((b"content-length", str(length).encode("latin-1")))
+    return headers
+
+
+async def _send_not_satisfiable(send, raw_headers, size: int):
+    headers = [(k, v) for k, v in _partial_headers(raw_headers, f"bytes */{size}", 0) if k != b"content-type"]
+    await send({"type": "http.response.start", "status": 416, "headers": headers})
+    await send({"type": "http.response.body", "body": b""})
+
+
+class PDFResponse(Response):
+    media_type = "application/pdf"
+
+    def __init__(
+        self,
+        content=None,
+        filename: Optional[str] = None,
+        disposition: str = "inline",
+        status_code: int = 200,
+        headers: Optional[dict] = None,
+        background=None,
+    ):
+        headers = dict(headers or {})
+        if filename:
+            headers["Content-Disposition"] = content_disposition(filename, disposition)
+        if status_code == 200:
+            headers["Accept-Ranges"] = "bytes"
+        self.filename = filename
+        super().__init__(content, status_code=status_code, headers=headers, background=background)
+
+    def render(self, content):
+        if isinstance(content, BytesIO):
+            # View of the buffer's own memory; getvalue() would copy the whole document
+            return content.getbuffer()
+        if isinstance(content, (bytearray, memoryview)):
+            return memoryview(content)
+        return super().render(content)
+
+    async def __call__(self, scope, receive, send):
+        size = len(self.body)
+        try:
+            byte_range = _request_range(scope, self, size)
+        except RangeNotSatisfiable:
+            await _send_not_satisfiable(send, self.raw_headers, size)
+            return
+        if byte_range is None:
+            await super().__call__(scope, receive, send)
+            return
+        start, end = byte_range
+        headers = _partial_headers(self.raw_headers, f"bytes {start}-{end}/{size}", end - start + 1)
+        await send({"type": "http.response.start", "status": 206, "headers": headers})
+        body = b"" if scope.get("method") == "HEAD" else memoryview(self.body)[start:end + 1]
+        await send({"type": "http.response.body", "body": body})
+        if self.background is not None:
+            await self.background()
+
+
+class PDFFileResponse(FileResponse):
+    """Stored document served in chunks, with the same headers and ranges as ``PDFResponse``."""
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        filename: Optional[str] = None,
+        media_type: str = "application/pdf",
+        disposition: str = "inline",
+        headers: Optional[dict] = None,
+    ):
+        headers = dict(headers or {})
+        if filename:
+            headers["Content-Disposition"] = content_disposition(filename, disposition)
+        headers["Accept-Ranges"] = "bytes"
+        super().__init__(path, headers=headers, media_type=media_type)
+        self.filename = filename
+
+    async def __call__(self, scope, receive, send):
+        try:
+            stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+        except FileNotFoundError:
+            raise RuntimeError(f"File at path {self.path} does not exist.")
+        if not stat.S_ISREG(stat_result.st_mode):
+            raise RuntimeError(f"File at path {self.path} is not a file.")
+        self.set_stat_headers(stat_result)
+        size = stat_result.st_size
+        try:
+            byte_range = _request_range(scope, self, size)
+        except RangeNotSatisfiable:
+            await _send_not_satisfiable(send, self.raw_headers, size)
+            return
+        if byte_range is None:
+            start, end, status, headers = 0, size - 1, self.status_code, self.raw_headers
+        else:
+            start, end = byte_range
+            status = 206
+            headers = _partial_headers(self.raw_headers, f"bytes {start}-{end}/{size}", end - start + 1)
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        if scope.get("method") == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+        elif byte_range is None and "http.response.pathsend" in scope.get("extensions", {}):
+            # The server sends the file itself (sendfile where available)
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        else:
+            remaining = end - start + 1
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(start)
+                while True:
+                    chunk = await file.read(min(self.chunk_size, remaining)) if remaining > 0 else b""
+                    remaining -= len(chunk)
+                    more_body = remaining > 0 and len(chunk) > 0
+                    await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                    if not more_body:
+                        break
+        if self.background is not None:
+            await self.background()
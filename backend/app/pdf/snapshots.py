@@ -0,0 +1,105 @@
+"""Frozen snapshots of issued documents.
+
+Issuing an invoice (``POST /invoices/{id}/issue``) stores everything its PDF
+prints: the invoice, contract and client views, the facture lines and the
+resolved number and dates. With ``SNAPSHOT_STORE_PDF`` it also keeps the
+rendered bytes in the content store. From then on ``/pdf/invoice/{id}`` reads
+only the snapshot row: it serves the stored file, or renders from the
+snapshot data for another profile. Edits to the client or the factures no
+longer change a document that has been sent.
+"""
+from dataclasses import asdict, fields
+from datetime import date, datetime
+from typing import Optional, Tuple, get_args
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.document_snapshot import create_snapshot, get_snapshot
+from app.pdf.invoice import invoice_fields, render_invoice_pdf
+from app.pdf.loaders import ClientView, ContractView, InvoiceDocument, InvoiceView, LineView, load_invoice_document
+
+SNAPSHOT_SCHEMA = 1
+
+
+def _encode(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _view(cls, values: Optional[dict]):
+    """Rebuild a frozen view, parsing the date fields back from ISO strings."""
+    if values is None:
+        return None
+    kwargs = {}
+    for field in fields(cls):
+        value = values.get(field.name)
+        types = get_args(field.type) or (field.type,)
+        if isinstance(value, str):
+            if datetime in types:
+                value = datetime.fromisoformat(value)
+            elif date in types:
+                value = date.fromisoformat(value)
+        kwargs[field.name] = value
+    return cls(**kwargs)
+
+
+def _view_data(view) -> Optional[dict]:
+    return None if view is None else {k: _encode(v) for k, v in asdict(view).items()}
+
+
+def document_data(doc: InvoiceDocument) -> dict:
+    """JSON-ready copy of an invoice document (dates as ISO strings)."""
+    return {
+        "invoice": _view_data(doc.invoice),
+        "contract": _view_data(doc.contract),
+        "client": _view_data(doc.client),
+        "lines": [_view_data(line) for line in doc.lines],
+    }
+
+
+def invoice_from_snapshot(data: dict) -> Tuple[InvoiceDocument, dict]:
+    """The document view and the printed fields (number, ISO dates) of a snapshot."""
+    doc = data["document"]
+    return InvoiceDocument(
+        invoice=_view(InvoiceView, doc["invoice"]),
+        contract=_view(ContractView, doc["contract"]),
+        client=_view(ClientView, doc["client"]),
+        lines=tuple(_view(LineView, line) for line in doc["lines"]),
+    ), data["printed"]
+
+
+def issue_invoice(db: Session, invoice_id: int, invoice_number: Optional[str] = None,
+                  issue_date: Optional[date] = None, expiration_date: Optional[date] = None):
+    """Snapshot invoice ``invoice_id``; returns ``(snapshot, created)``, or ``(None, False)`` if missing.
+
+    Issuing is idempotent: an invoice that already has a snapshot keeps it.
+    """
+    from app.pdf import setup_runtime
+    from app.pdf.profiles import get_profile
+    from app.pdf.store import content_store
+
+    existing = get_snapshot(db, "invoice", invoice_id)
+    if existing is not None:
+        return existing, False
+    doc = load_invoice_document(db, invoice_id)
+    if doc is None or doc.contract is None:
+        return None, False
+
+    number, issued, expires = invoice_fields(doc, invoice_number, _encode(issue_date), _encode(expiration_date))
+    printed = {"invoice_number": number, "issue_date": issued.date().isoformat(),
+               "expiration_date": expires.date().isoformat()}
+    data = {"schema": SNAPSHOT_SCHEMA, "printed": printed, "document": document_data(doc)}
+
+    digest = size = profile = None
+    if settings.SNAPSHOT_STORE_PDF:
+        setup_runtime()
+        pdf_profile = get_profile()
+        response = render_invoice_pdf(doc, number, printed["issue_date"], printed["expiration_date"], pdf_profile)
+        digest, size, profile = content_store.put(response.body), len(response.body), pdf_profile.name
+    snapshot = create_snapshot(db, "invoice", invoice_id, data, digest, size, profile)
+    if snapshot is None:
+        # Issued concurrently by another request; theirs is the one that counts
+        return get_snapshot(db, "invoice", invoice_id), False
+    return snapshot, True
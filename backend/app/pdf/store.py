@@ -0,0 +1,42 @@
+"""Content-addressed file store for rendered documents.
+
+Files are named by the sha256 of their bytes (``ab/abcdef...``), so the same
+PDF is stored once however many snapshots point at it, and a stored file is
+never rewritten. Writes go through a temporary file and ``os.replace``.
+"""
+import hashlib
+import os
+import tempfile
+
+from app.core.config import settings
+
+
+class ContentStore:
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def put(self, content) -> str:
+        """Store ``content`` (bytes or memoryview) and return its sha256."""
+        digest = hashlib.sha256(content).hexdigest()
+        target = self.path(digest)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # A temporary file of its own: a job and a request may store the same digest at once
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=f"{digest}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(content)
+                os.replace(tmp, target)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        return digest
+
+
+content_store = ContentStore(settings.DOCUMENT_STORE_DIR)
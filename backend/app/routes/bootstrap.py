@@ -0,0 +1,57 @@
+from collections import defaultdict
+from datetime import date, datetime
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.changes import generation
+from app.core.database import get_db
+from app.core.sync import format_watermark
+from app.crud import read_models
+from app.routes.dashboard import _contract_growth, _dashboard_stats, _recent_activity, dashboard_flights
+from app.schemas.bootstrap import BalanceBootstrap, DashboardBootstrap, DevisBootstrap, FacturesBootstrap
+
+# One request per screen: the rows and lookups a page needs on mount, already joined,
+# from a handful of set-based queries instead of one request per list (and per row)
+router = APIRouter(prefix="/bootstrap", tags=["bootstrap"])
+
+
+@router.get("/balance", response_model=BalanceBootstrap)
+def balance_bootstrap(db: Session = Depends(get_db)):
+    watermark = format_watermark(datetime.utcnow())
+    return {"invoices": read_models.list_invoices(db), "watermark": watermark}
+
+
+@router.get("/factures", response_model=FacturesBootstrap)
+def factures_bootstrap(db: Session = Depends(get_db)):
+    return {
+        "contracts": read_models.list_contract_refs(db),
+        "invoices": read_models.list_invoices(db),
+        "factures": read_models.list_invoiced_factures(db),
+    }
+
+
+@router.get("/devis", response_model=DevisBootstrap)
+def devis_bootstrap(db: Session = Depends(get_db)):
+    items = defaultdict(list)
+    for item in read_models.list_estimate_items(db):
+        items[item.estimate_id].append(item)
+    return {
+        "clients": read_models.list_clients(db),
+        "contracts": read_models.list_contract_refs(db),
+        "estimates": read_models.list_estimates(db),
+        "items": items,
+    }
+
+
+@router.get("/dashboard", response_model=DashboardBootstrap)
+def dashboard_bootstrap(db: Session = Depends(get_db)):
+    # Same flight keys as the /dashboard widgets, so both coalesce together
+    version = generation()
+    return {
+        "stats": dashboard_flights.do_sync(("stats", version), _dashboard_stats, db),
+        "recent_activity": dashboard_flights.do_sync(("recent-activity", version), _recent_activity, db),
+        "contract_growth": dashboard_flights.do_sync(
+            ("contract-growth", date.today(), version), _contract_growth, db
+        ),
+    }
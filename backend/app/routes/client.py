@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import select, and_
-from typing import List
+from typing import List, Optional
 
 from app.core.database import get_db
+from app.core.sync import delta_response, sync_window
+from app.crud.read_models import MAX_PAGE_SIZE, page_clients
 from app.schemas.client import ClientCreate, ClientOut
 from app.models.client import Client
 
@@ -49,13 +53,60 @@ def add_client(client: ClientCreate, db: Session = Depends(get_db)):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    return None if value is None else [v.strip() for v in value.split(",") if v.strip()]
+
+
 # Get all clients
 @router.get("", response_model=List[ClientOut])
 @router.get("/", response_model=List[ClientOut])
-def get_clients(db: Session = Depends(get_db)):
-    result = db.execute(select(Client))
-    clients = result.scalars().all()
-    return clients
+def get_clients(
+    response: Response,
+    fields: Optional[str] = None,
+    ids: Optional[str] = None,
+    sort: str = "id",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """All clients as ``ClientOut`` by default. Optional parameters:
+
+    - ``fields=id,client_name``: only these columns are read and returned;
+    - ``ids=1,2,3``: batch fetch of these clients;
+    - ``sort=client_name`` (``-client_name`` descending): id, client_number, client_name, email;
+    - ``limit=50``: page size; the ``X-Next-Cursor`` response header, sent back as
+      ``cursor=``, gives the next page (no header on the last one);
+    - ``since=<watermark>`` (or 0): only the changes, see ``app.core.sync``; not with ``limit``.
+    """
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    try:
+        id_list = None if ids is None else [int(i) for i in _split(ids)]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma separated integers")
+    if id_list is not None and len(id_list) > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PAGE_SIZE} ids per request")
+    if since is not None and (limit is not None or cursor):
+        raise HTTPException(status_code=400, detail="since cannot be combined with limit or cursor")
+    window = sync_window(since) if since is not None else None
+    field_list = _split(fields)
+    try:
+        rows, next_cursor = page_clients(
+            db, fields=field_list, ids=id_list, sort=sort.lstrip("-"), descending=sort.startswith("-"),
+            limit=limit, cursor=cursor, changed_since=window.lower if window else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if window is not None:
+        return delta_response(db, Client, rows, ClientOut if field_list is None else None, window)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if field_list is not None:
+        # Partial rows do not match ClientOut
+        return JSONResponse(jsonable_encoder(rows), headers=headers)
+    response.headers.update(headers)
+    return rows
 
 # Get client names for dropdown
 @router.get("/names/")
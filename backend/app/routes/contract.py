@@ -1,17 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import select, and_
 from app.core.database import get_db
+from app.core.sync import delta_response, sync_window
+from app.crud.archive import delete_contract_archive
+from app.crud.read_models import list_contracts
+from app.crud.rollups import record_contract
 from app.schemas.contract import ContractCreate, ContractOut
 from app.models.contract import Contract
 from app.models.client import Client
 from app.models.invoice import Invoice
 from app.models.contract_detail import ContractDetail
-from typing import List
+from typing import List, Optional
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/contracts", tags=["contracts"])
 
+
+def _get_contract_with_client(db: Session, contract_id: int):
+    """Contract with its client joined in, as ``ContractOut`` serializes it."""
+    result = db.execute(
+        select(Contract).options(joinedload(Contract.client)).where(Contract.id == contract_id)
+    )
+    return result.scalars().first()
+
+
 @router.post("/", response_model=ContractOut)
 def add_contract(contract: ContractCreate, db: Session = Depends(get_db)):
     try:
@@ -41,10 +54,7 @@ def add_contract(contract: ContractCreate, db: Session = Depends(get_db)):
         db.refresh(db_contract)
         
         # Fetch the complete contract with client info
-        result = db.execute(select(Contract).where(Contract.id == db_contract.id))
-        complete_contract = result.scalars().first()
-        
-        return complete_contract
+        return _get_contract_with_client(db, db_contract.id)
 
     except HTTPException:
         raise
@@ -55,15 +65,16 @@ def add_contract(contract: ContractCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/", response_model=List[ContractOut])
-def get_contracts(db: Session = Depends(get_db)):
-    result = db.execute(select(Contract))
-    contracts = result.scalars().all()
-    return contracts
+def get_contracts(since: Optional[str] = None, db: Session = Depends(get_db)):
+    """All contracts; with ``since`` (a watermark, or 0) only the changes, see ``app.core.sync``."""
+    if since is None:
+        return list_contracts(db)
+    window = sync_window(since)
+    return delta_response(db, Contract, list_contracts(db, window.lower), ContractOut, window)
 
 @router.get("/{contract_id}", response_model=ContractOut)
 def get_contract(contract_id: int, db: Session = Depends(get_db)):
-    result = db.execute(select(Contract).where(Contract.id == contract_id))
-    contract = result.scalars().first()
+    contract = _get_contract_with_client(db, contract_id)
     if contract is None:
         raise HTTPException(status_code=404, detail="Contract not found")
     return contract
@@ -110,6 +121,10 @@ def delete_contract(contract_id: int, db: Session = Depends(get_db)):
             for invoice in invoices:
                 db.delete(invoice)
         
+        # Archived invoices and factures of the contract too (bulk delete: their report months by hand)
+        record_contract(db, contract_id)
+        delete_contract_archive(db, contract_id)
+
         # Now delete the contract
         db.delete(contract)
         db.commit()
@@ -144,9 +159,8 @@ def update_contract(contract_id: int, contract: ContractCreate, db: Session = De
         setattr(db_contract, key, value)
     
     db.commit()
-    db.refresh(db_contract)
     
-    return db_contract
+    return _get_contract_with_client(db, contract_id)
 
 @router.get("/{contract_id}/details")
 def get_contract_details(contract_id: int, db: Session = Depends(get_db)):
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.crud.read_models import list_details
 from app.schemas.contract_detail import ContractDetailCreate, ContractDetailOut
 from app.models.contract_detail import ContractDetail
 from app.models.contract import Contract
@@ -31,8 +32,7 @@ def get_contract_details(contract_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Contract not found")
     
     # Get contract details
-    details = db.query(ContractDetail).filter(ContractDetail.contract_id == contract_id).all()
-    return details
+    return list_details(db, contract_id=contract_id)
 
 @router.delete("/{detail_id}")
 def delete_contract_detail(detail_id: int, db: Session = Depends(get_db)):
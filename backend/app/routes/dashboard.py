@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import func, select, desc, extract
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from app.core.changes import generation
 from app.core.database import get_db
+from app.core.singleflight import SingleFlight
+from app.crud.sweep import overdue_invoices
 from app.models.client import Client
 from app.models.contract import Contract
 from app.models.invoice import Invoice
@@ -10,15 +13,22 @@ from app.models.salary import Salary
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
+# Every open dashboard polls these; concurrent requests between two writes share one query run
+dashboard_flights = SingleFlight("dashboard")
+
 @router.get("/stats")
 def get_dashboard_stats(db: Session = Depends(get_db)):
+    return dashboard_flights.do_sync(("stats", generation()), _dashboard_stats, db)
+
+def _dashboard_stats(db: Session):
     try:
         from sqlalchemy import text
         
         # Simple queries to count records
         clients_count = db.execute(text("SELECT COUNT(*) FROM clients")).scalar() or 0
         contracts_count = db.execute(text("SELECT COUNT(*) FROM contracts")).scalar() or 0
-        invoices_count = db.execute(text("SELECT COUNT(*) FROM invoices WHERE status = 'unpaid'")).scalar() or 0
+        # Past due and not paid, counted by date so it is right before the status sweep flips them to overdue
+        invoices_count = db.execute(select(func.count()).select_from(Invoice).where(overdue_invoices(date.today()))).scalar() or 0
         salaries_count = db.execute(text("SELECT COUNT(*) FROM salaries")).scalar() or 0
         
         return {
@@ -38,6 +48,9 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
 
 @router.get("/recent-activity")
 def get_recent_activity(db: Session = Depends(get_db)):
+    return dashboard_flights.do_sync(("recent-activity", generation()), _recent_activity, db)
+
+def _recent_activity(db: Session):
     try:
         from sqlalchemy import text
         
@@ -59,6 +72,9 @@ def get_recent_activity(db: Session = Depends(get_db)):
 
 @router.get("/contract-growth")
 def get_contract_growth(db: Session = Depends(get_db)):
+    return dashboard_flights.do_sync(("contract-growth", date.today(), generation()), _contract_growth, db)
+
+def _contract_growth(db: Session):
     try:
         from sqlalchemy import text
         
@@ -4,6 +4,8 @@ from typing import List, Optional
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.sync import delta_response, sync_window
+from app.crud import read_models
 from app.models.estimate import Estimate
 from app.models.client import Client
 from app.models.contract_detail import ContractDetail
@@ -45,22 +47,12 @@ def create_estimate(payload: EstimateCreate, db: Session = Depends(get_db)):
     return out
 
 @router.get("/", response_model=List[EstimateOut])
-def list_estimates(db: Session = Depends(get_db)):
-    rows = db.query(Estimate).all()
-    out: List[EstimateOut] = []
-    for r in rows:
-        client = db.query(Client).filter(Client.id == r.client_id).first()
-        out.append(EstimateOut(
-            id=r.id,
-            estimate_number=r.estimate_number,
-            client_id=r.client_id,
-            amount=r.amount or 0.0,
-            creation_date=r.creation_date,
-            expiration_date=r.expiration_date,
-            status=r.status or "draft",
-            client_name=(client.client_name if client else None),
-        ))
-    return out
+def list_estimates(since: Optional[str] = None, db: Session = Depends(get_db)):
+    """All estimates; with ``since`` (a watermark, or 0) only the changes, see ``app.core.sync``."""
+    if since is None:
+        return read_models.list_estimates(db)
+    window = sync_window(since)
+    return delta_response(db, Estimate, read_models.list_estimates(db, window.lower), EstimateOut, window)
 
 @router.put("/{estimate_id}", response_model=EstimateOut)
 def update_estimate(estimate_id: int, payload: EstimateUpdate, db: Session = Depends(get_db)):
@@ -126,10 +118,7 @@ def get_estimate_items(estimate_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Estimate not found")
         
     # Get items for this estimate
-    items = db.query(ContractDetail)\
-             .filter(ContractDetail.estimate_id == estimate_id)\
-             .all()
-    return items
+    return read_models.list_details(db, estimate_id=estimate_id)
 
 @router.post("/{estimate_id}/items", response_model=ContractDetailSchema)
 def add_estimate_item(
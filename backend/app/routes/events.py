@@ -0,0 +1,81 @@
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.auth import authenticate, stream_ticket
+from app.core.config import settings
+from app.core.events import CLOSE, ENTITIES, RESYNC, broker
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# Browsers reconnect after this many ms, sending the last id they got
+RETRY = "retry: 3000\n\n"
+
+
+def _message(event: dict) -> str:
+    if event is RESYNC:
+        return "event: resync\ndata: {}\n\n"
+    body = json.dumps({"at": event["at"], "changes": event["changes"]}, separators=(",", ":"))
+    return f"id: {event['id']}\nevent: change\ndata: {body}\n\n"
+
+
+# Only the bearer header can mint a ticket: a ticket cannot be renewed with itself
+@router.post("/ticket", dependencies=[Depends(authenticate)])
+def create_stream_ticket(request: Request):
+    """``{"ticket"}`` for ``GET /api/events?ticket=``; ``null`` when signed out and auth is not required."""
+    user = request.state.user
+    return {
+        "ticket": stream_ticket(user) if user is not None else None,
+        "expires_in": settings.EVENTS_TICKET_SECONDS,
+    }
+
+
+@router.get("")
+@router.get("/")
+async def stream_events(request: Request, entities: Optional[str] = None):
+    """Server-Sent Events stream of committed changes (see ``app.core.events``).
+
+    ``entities=invoices,factures`` keeps only those tables. With
+    ``AUTH_REQUIRED``, pass ``ticket=`` from ``POST /events/ticket``
+    (``app.core.auth.authenticate_stream``); it is checked when the stream
+    opens, so a reconnect needs a new one. ``change`` events
+    carry ``{"at", "changes": {table: {"created"|"updated"|"deleted": [ids]}}}``;
+    ``resync`` means events were missed and the screen has to reload.
+    The stream ends when the worker shuts down (``broker.close()``).
+    """
+    wanted = None
+    if entities:
+        wanted = {e.strip() for e in entities.split(",") if e.strip()}
+        unknown = wanted - ENTITIES
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown entities: {', '.join(sorted(unknown))}")
+    if not settings.EVENTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Change events are disabled")
+    subscriber = broker.subscribe(wanted, request.headers.get("last-event-id"))
+
+    async def stream():
+        try:
+            yield RETRY
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), settings.EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is CLOSE:
+                    # The worker is shutting down: the browser reconnects to another one
+                    yield RETRY
+                    return
+                yield _message(event)
+        finally:
+            broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        # No proxy buffering (nginx) or caching of the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from .. import models, schemas, crud
 from ..core.database import get_db
+from ..core.sync import delta_response, sync_window
+from ..crud.read_models import list_factures_by_contract
 
 router = APIRouter(prefix="/factures", tags=["factures"])
 
@@ -54,11 +56,13 @@ def read_factures_by_contract(
     contract_id: int, 
     skip: int = 0, 
     limit: int = 100, 
+    since: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
     Get all factures for a specific contract.
     Returns an empty list if no factures are found.
+    With ``since`` only the changes (``deleted`` lists every deleted facture), see ``app.core.sync``.
     """
     # Verify contract exists
     db_contract = db.query(models.Contract).filter(models.Contract.id == contract_id).first()
@@ -68,7 +72,14 @@ def read_factures_by_contract(
             detail=f"Contract with id {contract_id} not found"
         )
         
-    factures = crud.get_factures_by_contract(
+    if since is not None:
+        window = sync_window(since)
+        factures = list_factures_by_contract(
+            db, contract_id=contract_id, skip=skip, limit=limit, changed_since=window.lower
+        )
+        return delta_response(db, models.Facture, factures, schemas.Facture, window)
+
+    factures = list_factures_by_contract(
         db, contract_id=contract_id, skip=skip, limit=limit
     )
     
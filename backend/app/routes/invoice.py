@@ -1,22 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from datetime import datetime
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from sqlalchemy.orm import Session
+from typing import List, Optional
 
 from app.core.database import get_db
+from app.core.events import record_changes
+from app.core.sync import delta_response, sync_window
+from app.crud.archive import invoice_number_exists
+from app.crud.read_models import list_invoices
+from app.crud.rollups import record_months
+from app.crud.sweep import invoice_status
 from app.schemas.invoice import InvoiceCreate, InvoiceOut
+from app.schemas.document_snapshot import DocumentSnapshotOut, InvoiceIssue
+from app.crud.document_snapshot import delete_snapshot, get_snapshot
 from app.models.invoice import Invoice
 from app.models.contract import Contract
 from app.models.client import Client
 from app.models.facture import Facture
+from app.models.tombstone import record_deleted
 
 router = APIRouter(prefix="/invoices", tags=["invoices"])
 
 @router.post("/", response_model=InvoiceOut)
 def add_invoice(invoice: InvoiceCreate, db: Session = Depends(get_db)):
-    # Check if invoice number already exists
-    if db.query(Invoice).filter(Invoice.invoice_number == invoice.invoice_number).first():
+    # Check if invoice number already exists, archived invoices included
+    if invoice_number_exists(db, invoice.invoice_number):
         raise HTTPException(status_code=400, detail="Invoice number already exists")
     
     # Create new invoice
@@ -28,64 +38,18 @@ def add_invoice(invoice: InvoiceCreate, db: Session = Depends(get_db)):
     return db_invoice
 
 @router.get("/", response_model=List[InvoiceOut])
-def get_invoices(db: Session = Depends(get_db)):
-    try:
-        # Query invoices with related contract, client, and factures data
-        invoices_data = db.query(Invoice)\
-            .options(
-                joinedload(Invoice.contract)
-                .joinedload(Contract.client),
-                joinedload(Invoice.factures)
-            )\
-            .all()
-        
-        invoices = []
-        for invoice in invoices_data:
-            # Use persisted paid_amount from DB (defaults to 0.0 if None)
-            paid_amount = float(getattr(invoice, 'paid_amount', 0.0) or 0.0)
-
-            # Derive amount from sum of related factures to avoid stale data
-            factures_total = 0.0
-            if hasattr(invoice, 'factures') and invoice.factures:
-                factures_total = float(sum((f.total_ht or 0.0) for f in invoice.factures))
-
-            # Keep backend status as-is (default to unpaid if missing)
-            status = invoice.status or 'unpaid'
-
-            invoice_dict = {
-                'id': invoice.id,
-                'invoice_number': invoice.invoice_number,
-                'contract_id': invoice.contract_id,
-                'amount': factures_total,
-                'due_date': invoice.due_date.isoformat() if invoice.due_date else None,
-                'status': status,
-                'paid_amount': paid_amount,
-                'created_at': invoice.created_at.isoformat() if invoice.created_at else None,
-                'client_name': None,
-                'client_id': None,
-                'contract_number': None
-            }
-            
-            # Add client and contract data if available
-            if hasattr(invoice, 'contract') and invoice.contract:
-                contract = invoice.contract
-                invoice_dict['contract_number'] = contract.command_number
-                invoice_dict['contract_id'] = contract.id
-                
-                if hasattr(contract, 'client') and contract.client:
-                    client = contract.client
-                    invoice_dict['client_name'] = client.client_name
-                    invoice_dict['client_id'] = client.id
-            
-            invoices.append(invoice_dict)
-
-        return invoices
-        
-    except Exception as e:
-        import traceback
-        print(f"Error in get_invoices: {str(e)}")
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=str(e))
+def get_invoices(since: Optional[str] = None, include_archived: bool = False, db: Session = Depends(get_db)):
+    """All invoices; with ``since`` (a watermark, or 0) only the changes, see ``app.core.sync``.
+
+    ``include_archived=true`` adds the closed invoices moved to the archive (``app.crud.archive``).
+    """
+    if since is None:
+        return list_invoices(db, include_archived=include_archived)
+    if include_archived:
+        # Delta sync follows the hot list: archiving an invoice shows up as its deletion
+        raise HTTPException(status_code=400, detail="since cannot be combined with include_archived")
+    window = sync_window(since)
+    return delta_response(db, Invoice, list_invoices(db, window.lower), InvoiceOut, window)
 
 @router.put("/{invoice_id}", response_model=InvoiceOut)
 def update_invoice(
@@ -122,16 +86,6 @@ def update_invoice(
     if 'paid_amount' in invoice_data:
         db_invoice.paid_amount = min(max(0, float(invoice_data['paid_amount'])), db_invoice.amount)
     
-    # If status wasn't provided but paid_amount was, update status accordingly
-    if 'status' not in invoice_data and 'paid_amount' in invoice_data:
-        paid_amount = float(invoice_data['paid_amount'])
-        if paid_amount >= db_invoice.amount:
-            db_invoice.status = 'paid'
-        elif paid_amount > 0:
-            db_invoice.status = 'partial'
-        else:
-            db_invoice.status = 'unpaid'
-
     # Update invoice_number if provided
     if 'invoice_number' in invoice_data:
         new_number = invoice_data['invoice_number']
@@ -166,6 +120,10 @@ def update_invoice(
         except Exception:
             raise HTTPException(status_code=422, detail="Invalid issue date format, expected YYYY-MM-DD")
 
+    # If status wasn't provided but paid_amount was, update status accordingly (after due_date: overdue or not)
+    if 'status' not in invoice_data and 'paid_amount' in invoice_data:
+        db_invoice.status = invoice_status(db_invoice.amount, db_invoice.paid_amount, db_invoice.due_date)
+
     print(f"Updated invoice - Status: {db_invoice.status}, Paid: {db_invoice.paid_amount}")  # Debug log
     
     # Save changes to the database
@@ -200,6 +158,29 @@ def update_invoice(
     finally:
         db.close()
 
+@router.post("/{invoice_id}/issue", response_model=DocumentSnapshotOut, status_code=201)
+def issue_invoice(invoice_id: int, response: Response, issue: InvoiceIssue = None, db: Session = Depends(get_db)):
+    """Freeze what the invoice PDF prints; later /pdf/invoice/{id} requests reprint this snapshot.
+
+    Idempotent: an already issued invoice answers 200 with its existing snapshot.
+    """
+    from app.pdf.snapshots import issue_invoice as snapshot_invoice
+
+    issue = issue or InvoiceIssue()
+    snapshot, created = snapshot_invoice(db, invoice_id, issue.invoice_number, issue.issue_date, issue.expiration_date)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    if not created:
+        response.status_code = 200
+    return snapshot
+
+@router.get("/{invoice_id}/snapshot", response_model=DocumentSnapshotOut)
+def read_invoice_snapshot(invoice_id: int, db: Session = Depends(get_db)):
+    snapshot = get_snapshot(db, "invoice", invoice_id)
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="Invoice has not been issued")
+    return snapshot
+
 @router.delete("/{invoice_id}", status_code=204)
 def delete_invoice(invoice_id: int, db: Session = Depends(get_db)):
     """Delete an invoice and its related factures to keep DB consistent."""
@@ -208,8 +189,16 @@ def delete_invoice(invoice_id: int, db: Session = Depends(get_db)):
         if not db_invoice:
             raise HTTPException(status_code=404, detail="Invoice not found")
 
-        # Delete related factures first to avoid FK issues
+        # Delete related factures first to avoid FK issues (bulk delete: no ORM events, tombstones by hand)
+        factures = db.execute(select(Facture.id, Facture.created_at).where(Facture.invoice_id == invoice_id)).all()
+        facture_ids = [facture.id for facture in factures]
         db.query(Facture).filter(Facture.invoice_id == invoice_id).delete(synchronize_session=False)
+        record_deleted(db.connection(), Facture.__tablename__, facture_ids)
+        record_changes(db, Facture.__tablename__, facture_ids, "deleted")
+        record_months(db, (facture.created_at for facture in factures))
+
+        # Its snapshot too: ids can be reused and a new invoice must not reprint the old one
+        delete_snapshot(db, "invoice", invoice_id)
 
         # Delete the invoice itself
         db.delete(db_invoice)
@@ -0,0 +1,54 @@
+import os
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.admission import admit
+from app.core.config import settings
+from app.core.database import get_db
+from app.crud.job import enqueue_job, get_job
+from app.crud.scheduled_task import list_tasks
+from app.jobs import HANDLERS, job_status_url
+from app.pdf.responses import PDFFileResponse
+from app.schemas.job import JobCreate, JobOut, ScheduledTaskOut
+import app.jobs.handlers  # noqa: F401  (registers the job kinds)
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+def _job_out(job) -> JobOut:
+    out = JobOut.model_validate(job)
+    if job.status == "succeeded":
+        out.result_url = f"{job_status_url(job.id)}/result"
+    return out
+
+# Each job is a bulk render or export, so submissions count against the export limits
+@router.post("/", response_model=JobOut, status_code=202, dependencies=[Depends(admit("export"))])
+def create_job(job_in: JobCreate, db: Session = Depends(get_db)):
+    if job_in.kind not in HANDLERS:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind. Available: {', '.join(sorted(HANDLERS))}")
+    job = enqueue_job(db, job_in.kind, job_in.payload, priority=job_in.priority, max_attempts=job_in.max_attempts)
+    return _job_out(job)
+
+# Periodic tasks of the in-app scheduler (app/core/scheduler.py) and the counts of their last run
+@router.get("/scheduled", response_model=List[ScheduledTaskOut])
+def read_scheduled_tasks(db: Session = Depends(get_db)):
+    return list_tasks(db)
+
+@router.get("/{job_id}", response_model=JobOut)
+def read_job(job_id: int, db: Session = Depends(get_db)):
+    job = get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_out(job)
+
+@router.get("/{job_id}/result")
+def read_job_result(job_id: int, db: Session = Depends(get_db)):
+    job = get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    path = os.path.join(settings.JOB_RESULT_DIR, job.result_path)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=410, detail="Job result has expired")
+    return PDFFileResponse(path, filename=job.result_filename, media_type=job.result_media_type)
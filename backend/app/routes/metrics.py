@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+
+from app.core.admission import admission
+from app.core.auth import auth_stats
+from app.core.events import broker
+from app.core.scheduler import scheduler
+from app.core.singleflight import flights_stats
+from app.crud.aging import aging_cache
+from app.pdf.cache import pdf_cache
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+# Counters are per server worker; "pid" tells the workers apart
+@router.get("/")
+def read_metrics():
+    return {
+        "admission": admission.stats(),
+        "aging_cache": aging_cache.stats(),
+        "auth": auth_stats(),
+        "events": broker.stats(),
+        "pdf_cache": pdf_cache.stats(),
+        "scheduler": scheduler.stats(),
+        "singleflight": flights_stats(),
+    }
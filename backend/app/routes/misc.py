@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.sync import delta_response, sync_window
+from app.crud.read_models import list_misc
 from app.schemas.misc import MiscCreate, MiscOut
 from app.models.misc import Misc
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
 
 router = APIRouter(prefix="/misc", tags=["misc"])
 
@@ -17,9 +19,12 @@ def add_misc(misc: MiscCreate, db: Session = Depends(get_db)):
     return db_misc
 
 @router.get("/", response_model=List[MiscOut])
-def get_misc(db: Session = Depends(get_db)):
-    result = db.execute(select(Misc).order_by(Misc.created_at.desc()))
-    return result.scalars().all()
+def get_misc(since: Optional[str] = None, db: Session = Depends(get_db)):
+    """All misc expenses; with ``since`` (a watermark, or 0) only the changes, see ``app.core.sync``."""
+    if since is None:
+        return list_misc(db)
+    window = sync_window(since)
+    return delta_response(db, Misc, list_misc(db, window.lower), MiscOut, window)
 
 @router.get("/{misc_id}", response_model=MiscOut)
 def get_misc_by_id(misc_id: int, db: Session = Depends(get_db)):
@@ -1,115 +1,57 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException, Response, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import event, select
-from sqlalchemy.engine import Engine
+from app.core.admission import admit
+from app.core.config import settings
 from app.core.database import get_db
-from app.models.invoice import Invoice
-from app.models.contract import Contract
-from app.models.client import Client
-from app.models.contract_detail import ContractDetail
-from app.models.facture import Facture
-from app.models.estimate import Estimate
-from app.schemas.facture import Facture as FactureSchema
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from io import BytesIO
-from datetime import datetime, timedelta
-import os
-
-# Helper to format quantity with a unit label like "432 unités", "1 unité", "100 m", "2 ensembles"
-def format_qty(qty, unit: str) -> str:
-    unit_key = (unit or "unite").lower()
-    if unit_key in ["unite", "unité", "unity", "unit"]:
-        label = "unité" if float(qty) == 1 else "unités"
-    elif unit_key in ["ensemble", "set"]:
-        label = "ensemble" if float(qty) == 1 else "ensembles"
-    else:  # meters or other
-        label = "m"
-    try:
-        # Render 1 without trailing .0, keep integers clean
-        qty_str = ("%g" % float(qty))
-    except Exception:
-        qty_str = str(qty)
-    return f"{qty_str} {label}"
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('pdf_generation.log')
-    ]
+from app.core.singleflight import SingleFlight
+from app.pdf import ensure_runtime
+from app.pdf.cache import pdf_cache, document_version
+from app.pdf.formatting import format_qty, parse_date
+from app.pdf.invoice import render_invoice_pdf
+from app.pdf.profiles import get_profile, logo_image
+from app.pdf.responses import PDFFileResponse, PDFResponse
+from app.pdf.snapshots import invoice_from_snapshot
+from app.pdf.store import content_store
+from app.crud.document_snapshot import get_snapshot
+from app.pdf.loaders import (
+    ContractDocument, EstimateDocument, find_devis_client, load_contract_document, load_contract_items,
+    load_estimate_document, load_invoice_document
 )
+from app.jobs import job_mode, enqueue_response
+from io import BytesIO
+from dataclasses import asdict
+from datetime import date, datetime
+
+# ReportLab and app.pdf.canvas are imported inside the handlers so that
+# loading this router at startup stays cheap; see app/pdf/__init__.py.
+
+# Handlers are attached on first use by app.pdf.ensure_runtime
 logger = logging.getLogger(__name__)
 
-# SQL query logging
-@event.listens_for(Engine, 'before_cursor_execute')
-def receive_before_cursor_execute(conn, cursor, statement, params, context, executemany):
-    if not statement.startswith('SELECT 1'):  # Ignore connection test queries
-        logger.info(f"\n--- SQL QUERY ---\n{statement}")
-        if params:
-            logger.info(f"Parameters: {params}")
-
-@event.listens_for(Engine, 'after_cursor_execute')
-def receive_after_cursor_execute(conn, cursor, statement, params, context, executemany):
-    if not statement.startswith('SELECT 1'):
-        if cursor.rowcount >= 0:
-            logger.info(f"Rows affected: {cursor.rowcount}")
-        if cursor.description:
-            columns = [desc[0] for desc in cursor.description]
-            logger.info(f"Returned columns: {columns}")
-
-router = APIRouter(prefix="/pdf", tags=["pdf"])
-
-# Canvas subclass to add page X/Y footer with doc number
-class NumberedCanvas(canvas.Canvas):
-    def __init__(self, *args, footer_left: str = "", doc_number: str = "", **kwargs):
-        super().__init__(*args, **kwargs)
-        self._saved_page_states = []
-        self._footer_left = footer_left
-        self._doc_number = doc_number
-
-    def showPage(self):
-        # Save the current page state but do NOT finalize the page yet with showPage
-        self._saved_page_states.append(dict(self.__dict__))
-        # Start a new page without emitting one to the output yet
-        self._startPage()
-
-    def save(self):
-        # Include the current (last) page state
-        self._saved_page_states.append(dict(self.__dict__))
-        total_pages = len(self._saved_page_states)
-        for state in self._saved_page_states:
-            self.__dict__.update(state)
-            self._draw_footer(total_pages)
-            canvas.Canvas.showPage(self)
-        canvas.Canvas.save(self)
-
-    def _draw_footer(self, total_pages: int):
-        # Footer styling
-        left_margin = 40
-        right_margin_x = 570  # approx page width - 42
-        y = 30
-        self.saveState()
-        self.setFont("Helvetica", 8)
-        self.setFillGray(0.35)
-        # Left text
-        if self._footer_left:
-            self.drawString(left_margin, y, self._footer_left)
-        # Right text: DOCNUM · page/total
-        try:
-            page_num = self.getPageNumber()
-        except Exception:
-            page_num = 1
-        right_text = ""
-        if self._doc_number:
-            right_text = f"{self._doc_number}  ·  {page_num}/{total_pages}"
-        else:
-            right_text = f"{page_num}/{total_pages}"
-        self.drawRightString(right_margin_x, y, right_text)
-        self.restoreState()
+# Admission runs first, so rejected requests cost neither the runtime setup nor a query
+router = APIRouter(prefix="/pdf", tags=["pdf"], dependencies=[Depends(admit("pdf")), Depends(ensure_runtime)])
+
+# Concurrent requests for the same document share one render. Keys end with
+# the document version, so they are valid across workers too.
+pdf_flights = SingleFlight("pdf", settings.SINGLEFLIGHT_SHARED_DIR)
+
+def _rendered(render, *args):
+    response = render(*args)
+    # Results shared between workers are pickled, which a memoryview cannot be
+    body = bytes(response.body) if pdf_flights.shared_dir else response.body
+    return body, response.headers.get("content-disposition")
+
+def _flight_response(result) -> PDFResponse:
+    body, disposition = result
+    return PDFResponse(body, headers={"Content-Disposition": disposition} if disposition else None)
+
+async def _render_once(key, render, *args) -> PDFResponse:
+    """``render(*args)`` as a fresh response, rendered once for concurrent identical requests."""
+    return _flight_response(await pdf_flights.do(key, _rendered, render, *args))
+
+def _render_once_sync(key, render, *args) -> PDFResponse:
+    return _flight_response(pdf_flights.do_sync(key, _rendered, render, *args))
 
 @router.get("/generate_devis")
 async def generate_devis_pdf_get(
@@ -119,7 +61,9 @@ async def generate_devis_pdf_get(
     expiration: str = None,
     creation_date: str = None,
     contract_id: int | None = None,
-    db: Session = Depends(get_db)
+    profile: str | None = None,
+    db: Session = Depends(get_db),
+    job: dict | None = Depends(job_mode)
 ):
     """
     Generate a Devis PDF from query parameters.
@@ -127,16 +71,14 @@ async def generate_devis_pdf_get(
     """
     from urllib.parse import unquote
     
+    get_profile(profile)  # reject unknown profiles before parsing anything
     # Parse query parameters
     query_params = dict(request.query_params)
     
-    # Log incoming request
-    logger.info(f"Received PDF generation request with params: {query_params}")
-    
-    # Debug: Print all query parameters
-    logger.info("\n=== Raw Query Parameters ===")
-    for key, value in query_params.items():
-        logger.info(f"{key}: {value}")
+    logger.info(f"Received devis PDF request with {len(query_params)} query parameters")
+    if logger.isEnabledFor(logging.DEBUG):
+        for key, value in query_params.items():
+            logger.debug(f"{key}: {value}")
         
     # Extract client info (support alternate keys from UI)
     client = {}
@@ -159,49 +101,20 @@ async def generate_devis_pdf_get(
     # Enrich missing client fields (especially name) from DB
     try:
         if not client.get('name'):
-            # 0) If devis_number is provided, resolve client via Estimate
-            if devis_number:
-                est = db.execute(select(Estimate).where(Estimate.estimate_number == devis_number)).scalars().first()
-                if est:
-                    db_client = db.execute(select(Client).where(Client.id == est.client_id)).scalars().first()
-                    if db_client:
-                        client.setdefault('name', getattr(db_client, 'client_name', '') or '')
-                        client.setdefault('email', getattr(db_client, 'email', '') or '')
-                        client.setdefault('client_address', getattr(db_client, 'client_address', '') or '')
-                        if not client.get('tva') and getattr(db_client, 'tva_number', None):
-                            client['tva'] = db_client.tva_number
-                        client.setdefault('tsa_number', getattr(db_client, 'tsa_number', '') or '')
-            # 1) If contract_id provided, load client from contract
-            if contract_id:
-                contract_row = db.execute(select(Contract).where(Contract.id == int(contract_id))).scalars().first()
-                if contract_row:
-                    db_client = db.execute(select(Client).where(Client.id == contract_row.client_id)).scalars().first()
-                    if db_client:
-                        client.setdefault('name', getattr(db_client, 'client_name', '') or '')
-                        client.setdefault('email', getattr(db_client, 'email', '') or '')
-                        client.setdefault('client_address', getattr(db_client, 'client_address', '') or '')
-                        # normalize TVA and SIRET
-                        if not client.get('tva') and getattr(db_client, 'tva_number', None):
-                            client['tva'] = db_client.tva_number
-                        client.setdefault('tsa_number', getattr(db_client, 'tsa_number', '') or '')
-            # 2) Else try lookup by SIRET/TSA number
-            if not client.get('name') and client.get('tsa_number'):
-                db_client = db.execute(select(Client).where(Client.tsa_number == client.get('tsa_number'))).scalars().first()
-                if db_client:
-                    client.setdefault('name', getattr(db_client, 'client_name', '') or '')
-                    client.setdefault('email', getattr(db_client, 'email', '') or '')
-                    client.setdefault('client_address', getattr(db_client, 'client_address', '') or '')
-                    if not client.get('tva') and getattr(db_client, 'tva_number', None):
-                        client['tva'] = db_client.tva_number
-            # 3) Else try lookup by email
-            if not client.get('name') and client.get('email'):
-                db_client = db.execute(select(Client).where(Client.email == client.get('email'))).scalars().first()
-                if db_client:
-                    client.setdefault('name', getattr(db_client, 'client_name', '') or '')
-                    client.setdefault('client_address', getattr(db_client, 'client_address', '') or '')
-                    if not client.get('tva') and getattr(db_client, 'tva_number', None):
-                        client['tva'] = db_client.tva_number
-                    client.setdefault('tsa_number', getattr(db_client, 'tsa_number', '') or '')
+            db_client = find_devis_client(
+                db,
+                devis_number=devis_number,
+                contract_id=contract_id,
+                tsa_number=client.get('tsa_number'),
+                email=client.get('email'),
+            )
+            if db_client:
+                client.setdefault('name', db_client.client_name or '')
+                client.setdefault('email', db_client.email or '')
+                client.setdefault('client_address', db_client.client_address or '')
+                if not client.get('tva') and db_client.tva_number:
+                    client['tva'] = db_client.tva_number
+                client.setdefault('tsa_number', db_client.tsa_number or '')
     except Exception as e:
         logger.warning(f"Failed to enrich client info for devis PDF: {e}")
             
@@ -261,16 +174,7 @@ async def generate_devis_pdf_get(
     # If no items provided but a contract_id is available, load from ContractDetail
     if (not items) and contract_id:
         try:
-            details = db.execute(select(ContractDetail).where(ContractDetail.contract_id == contract_id)).scalars().all()
-            for d in details:
-                items.append({
-                    'description': getattr(d, 'description', '') or '',
-                    'qty': float(getattr(d, 'qty', 0) or 0),
-                    'qty_unit': getattr(d, 'qty_unit', 'unite') or 'unite',
-                    'unit_price': float(getattr(d, 'unit_price', 0) or 0),
-                    'tva': float(getattr(d, 'tva', 0) or 0),
-                    'total_ht': float(getattr(d, 'total_ht', 0) or 0),
-                })
+            items = [_devis_item(d) for d in load_contract_items(db, contract_id)]
         except Exception as e:
             logger.warning(f"Failed to load ContractDetail for contract_id={contract_id}: {e}")
 
@@ -285,11 +189,86 @@ async def generate_devis_pdf_get(
         'contract_id': contract_id
     }
     
-    logger.info("\n=== Final Payload ===")
-    logger.info(payload)
+    logger.debug(f"Devis payload: {payload}")
     
+    if job is not None:
+        return enqueue_response(db, "pdf.devis", dict(payload, profile=profile) if profile else payload, job)
+
     # Call the internal function with the parsed payload
-    return await generate_devis_pdf(payload)
+    return await generate_devis_pdf(payload, profile=profile, db=db, job=None)
+
+def _devis_item(line) -> dict:
+    return {
+        'description': line.description or '',
+        'qty': float(line.qty or 0),
+        'qty_unit': line.qty_unit or 'unite',
+        'unit_price': float(line.unit_price or 0),
+        'tva': float(line.tva or 0),
+        'total_ht': float(line.total_ht or 0),
+    }
+
+def _saved_estimate_payload(doc: EstimateDocument) -> dict:
+    """_render_devis_pdf payload for a saved estimate."""
+    client = doc.client
+    return {
+        # No name: _render_devis_pdf would take the number from "Devis <n> - ..." and
+        # cut numbers that contain a dash; devis_number is then used as is
+        'name': '',
+        'devis_number': doc.estimate_number,
+        'creation_date': doc.creation_date.isoformat() if doc.creation_date else None,
+        'expiration': doc.expiration_date.isoformat() if doc.expiration_date else '',
+        'client': {
+            'name': client.client_name or '',
+            'email': client.email or '',
+            'phone': client.phone or '',
+            'tva': client.tva_number or '',
+            'tsa_number': client.tsa_number or '',
+            'client_address': client.client_address or '',
+        } if client else {},
+        'items': [_devis_item(d) for d in doc.items],
+    }
+
+def _render_saved_estimate(payload: dict, pdf_profile, cache_key) -> Response:
+    rendered = _render_devis_pdf(payload, pdf_profile)
+    pdf_cache.put(cache_key, rendered.body)
+    return rendered
+
+@router.get("/estimates/{estimate_id}")
+@router.get("/estimates/{estimate_id}/", include_in_schema=False)  # getApiUrl adds a trailing slash in production
+async def generate_saved_estimate_pdf(
+    estimate_id: int,
+    request: Request,
+    profile: str | None = None,
+    db: Session = Depends(get_db),
+    job: dict | None = Depends(job_mode)
+):
+    """
+    Render a saved estimate (devis) from the database.
+
+    The PDF is identified by a hash of the estimate, its items and its client:
+    it is served with that hash as ETag (so browsers revalidate with a 304)
+    and kept in the in-process PDF cache until the estimate changes.
+    """
+    pdf_profile = get_profile(profile)
+    if job is not None:
+        return enqueue_response(db, "pdf.saved_estimate", {"estimate_id": estimate_id, "profile": profile}, job)
+
+    estimate = load_estimate_document(db, estimate_id)
+    if not estimate:
+        raise HTTPException(status_code=404, detail="Estimate not found")
+
+    payload = _saved_estimate_payload(estimate)
+    version = document_version(payload)
+    etag = f'"estimate-{estimate_id}-{version}-{pdf_profile.name}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    cache_key = ("estimate", estimate_id, version, pdf_profile.name)
+    content = pdf_cache.get(cache_key)
+    if content is None:
+        content, _ = await pdf_flights.do(cache_key, _rendered, _render_saved_estimate, payload, pdf_profile, cache_key)
+    return PDFResponse(content, filename=f"devis_{estimate.estimate_number}.pdf", headers=headers)
 
 @router.get("/invoice/{invoice_id}")
 async def generate_invoice_pdf(
@@ -297,10 +276,20 @@ async def generate_invoice_pdf(
     invoice_number: str = None,
     issue_date: str = None,
     expiration_date: str = None,
-    db: Session = Depends(get_db)
+    profile: str | None = None,
+    db: Session = Depends(get_db),
+    job: dict | None = Depends(job_mode)
 ):
-    from reportlab.lib.utils import ImageReader
-    import os
+    pdf_profile = get_profile(profile)
+    if job is not None:
+        return enqueue_response(db, "pdf.invoice", {
+            "invoice_id": invoice_id,
+            "invoice_number": invoice_number,
+            "issue_date": issue_date,
+            "expiration_date": expiration_date,
+            "profile": profile,
+        }, job)
+
     import re
 
     logger.info(f"\n=== Starting PDF Generation for Invoice ID: {invoice_id} ===")
@@ -316,520 +305,65 @@ async def generate_invoice_pdf(
         logger.error(f"Invalid invoice ID format: {invoice_id}")
         raise HTTPException(status_code=400, detail="Invalid invoice ID format. Expected format: number or 'INV-{number}'")
     
-    # Log the SQL query for invoice
-    logger.info("\n[1/3] Fetching invoice data...")
-    result = db.execute(select(Invoice).where(Invoice.id == numeric_id))
-    invoice = result.scalars().first()
-    if not invoice:
+    snapshot = get_snapshot(db, "invoice", numeric_id)
+    if snapshot is not None:
+        # Issued invoice: print the frozen snapshot, never the live rows (query overrides are ignored)
+        return await _reprint_invoice(snapshot, pdf_profile)
+
+    doc = load_invoice_document(db, numeric_id)
+    if not doc:
         logger.error(f"Invoice with ID {numeric_id} not found")
         raise HTTPException(status_code=404, detail="Invoice not found")
-        
-    logger.info(f"Found invoice: ID={invoice.id}, Contract ID={invoice.contract_id}")
-    # Fetch the related contract (needed for dates and contract details)
-    logger.info("\n[2/3] Fetching contract data...")
-    contract_result = db.execute(select(Contract).where(Contract.id == invoice.contract_id))
-    contract = contract_result.scalars().first()
-    if not contract:
-        logger.error(f"Contract with ID {invoice.contract_id} not found for invoice {invoice_id}")
+    if not doc.contract:
+        logger.error(f"Contract with ID {doc.invoice.contract_id} not found for invoice {invoice_id}")
         raise HTTPException(status_code=404, detail="Contract not found for invoice")
+    invoice, client, factures = doc.invoice, doc.client, doc.lines
+    logger.info(f"Found invoice: ID={invoice.id}, Contract ID={invoice.contract_id}, "
+                f"{len(factures)} facture(s), client: {client.client_name if client else None}")
+    key = ("invoice", invoice_number, issue_date, expiration_date, pdf_profile.name, document_version(asdict(doc)))
+    return await _render_once(key, render_invoice_pdf, doc, invoice_number, issue_date, expiration_date, pdf_profile)
+
+
+async def _reprint_invoice(snapshot, pdf_profile) -> Response:
+    doc, printed = invoice_from_snapshot(snapshot.data)
+    digest = snapshot.content_sha256
+    if digest and snapshot.profile == pdf_profile.name and content_store.exists(digest):
+        return PDFFileResponse(
+            content_store.path(digest),
+            filename=f"invoice_{printed['invoice_number']}.pdf",
+            headers={"ETag": f'"{digest}"'},
+        )
+    # Another profile, or the stored file is gone: render from the snapshot like a live invoice
+    key = ("invoice-snapshot", snapshot.document_id, pdf_profile.name, document_version(snapshot.data))
+    return await _render_once(key, render_invoice_pdf, doc, printed["invoice_number"], printed["issue_date"],
+                              printed["expiration_date"], pdf_profile)
 
-    # Log the SQL query for factures - prefer invoice-linked, fallback to contract-linked
-    logger.info("\n[3/3] Fetching factures data...")
-    factures_result = db.execute(select(Facture).where(Facture.invoice_id == invoice.id))
-    factures = factures_result.scalars().all()
-    logger.info(f"Found {len(factures)} facture(s) linked to invoice for rendering")
-    
-    # Log detailed facture information
-    logger.info("\n=== FACTURE DETAILS ===")
-    for i, facture in enumerate(factures, 1):
-        logger.info(f"Facture #{i}:")
-        logger.info(f"  ID: {facture.id}")
-        logger.info(f"  Description: {facture.description}")
-        logger.info(f"  Quantity: {facture.qty}")
-        logger.info(f"  Unit Price: {facture.unit_price} €")
-        logger.info(f"  TVA: {facture.tva}%")
-        logger.info(f"  Total HT: {facture.total_ht} €")
-        logger.info(f"  Created At: {facture.created_at}")
-    logger.info("=====================\n")
-    
-    # Get client data (from contract's client_id)
-    client_result = db.execute(select(Client).where(Client.id == contract.client_id))
-    client = client_result.scalars().first()
-    if client:
-        logger.info(f"Found client: ID={client.id}, Name={client.client_name}")
-    else:
-        logger.warning("No client found for this invoice")
-
-    buffer = BytesIO()
-    # Use NumberedCanvas with footer; set doc number after computing invoice_num
-    footer_left_text = "NEXT NR-GIE, SAS avec un capital de 5 000,00 € • 930 601 547 Evry B"
-    p = NumberedCanvas(buffer, pagesize=letter, footer_left=footer_left_text, doc_number="")
-
-    # Page-break helper (align with old template)
-    def ensure_space(current_y: int, min_y: int = 140) -> int:
-        if current_y < min_y:
-            p.showPage()
-            return 760
-        return current_y
-
-    # Margins and layout
-    left = 40
-    right = 320
-    y = 740
-    line_height = 22
-
-    # Title
-    p.setFont("Helvetica-Bold", 28)
-    p.drawString(left, y, "Facture")
-    y -= 2 * line_height
-
-    # Invoice info (left col)
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(left, y, "Numéro de facture")
-    p.setFont("Helvetica", 12)
-    # Use provided invoice number, else DB value, else auto-generated
-    try:
-        db_invoice_number = getattr(invoice, 'invoice_number', None)
-    except Exception:
-        db_invoice_number = None
-    invoice_num = invoice_number or db_invoice_number or datetime.now().strftime('%Y%m%d')
-    p.drawString(left + 170, y, f"{invoice_num}")
-    # Update footer doc number (shown at right with page x/y)
-    try:
-        p._doc_number = str(invoice_num)
-    except Exception:
-        pass
-    y -= line_height
-    
-    # Get dates from parameters or fall back to invoice fields then contract
-    def to_ddmmyyyy(dt):
-        try:
-            return dt.strftime('%d/%m/%Y') if dt else ''
-        except Exception:
-            return ''
-    
-    # Issue date
-    if issue_date:
-        try:
-            issue_date_dt = datetime.strptime(issue_date, '%Y-%m-%d')
-            issue_date_str = issue_date_dt.strftime('%d/%m/%Y')
-        except ValueError:
-            issue_date_str = datetime.now().strftime('%d/%m/%Y')
-    else:
-        # Prefer invoice.created_at if available, else contract.date, else today
-        created_at = getattr(invoice, 'created_at', None)
-        if created_at:
-            try:
-                issue_date_str = to_ddmmyyyy(created_at)
-            except Exception:
-                issue_date_str = datetime.now().strftime('%d/%m/%Y')
-        else:
-            issue_date_str = contract.date.strftime('%d/%m/%Y') if hasattr(contract, 'date') and contract.date else datetime.now().strftime('%d/%m/%Y')
-    
-    # Expiration date
-    if expiration_date:
-        try:
-            exp_date_dt = datetime.strptime(expiration_date, '%Y-%m-%d')
-            expiration_date_str = exp_date_dt.strftime('%d/%m/%Y')
-        except ValueError:
-            expiration_date_str = (datetime.now() + timedelta(days=30)).strftime('%d/%m/%Y')
-    else:
-        # Prefer invoice.due_date if available, else contract.deadline, else +30 days
-        due_date = getattr(invoice, 'due_date', None)
-        if due_date:
-            try:
-                expiration_date_str = to_ddmmyyyy(due_date)
-            except Exception:
-                expiration_date_str = (datetime.now() + timedelta(days=30)).strftime('%d/%m/%Y')
-        else:
-            expiration_date_str = contract.deadline.strftime('%d/%m/%Y') if hasattr(contract, 'deadline') and contract.deadline else (datetime.now() + timedelta(days=30)).strftime('%d/%m/%Y')
-    
-    # Draw issue date
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(left, y, "Date d'émission")
-    p.setFont("Helvetica", 12)
-    p.drawString(left + 170, y, issue_date_str)
-    y -= line_height
-    
-    # Draw expiration date
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(left, y, "Date d'expiration")
-    p.setFont("Helvetica", 12)
-    p.drawString(left + 170, y, expiration_date_str)
-    y -= line_height
-    
-    # Numéro de contrat
-    p.setFont("Helvetica-Bold", 11)
-    p.drawString(left, y, "Numéro de contrat")
-    p.setFont("Helvetica", 12)
-    p.drawString(left + 170, y, f"{contract.command_number}" if hasattr(contract, 'command_number') else "")
-    y -= line_height
-    
-
-
-    # Logo (top right)
-    logo_y = 700
-    logo_x = 440
-    logo_width = 150
-    logo_height = 55
-    # Resolve logo from multiple possible locations to work across environments
-    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    candidate_paths = [
-        os.path.join(base_dir, "app", "static", "logonr.jpg"),
-        os.path.join(base_dir, "..", "frontend", "public", "logonr.jpg"),
-    ]
-    logo_path = None
-    for pth in candidate_paths:
-        if os.path.exists(pth):
-            logo_path = pth
-            break
-    if logo_path:
-        p.drawImage(ImageReader(logo_path), logo_x, logo_y, width=logo_width, height=logo_height, mask='auto')
-    else:
-        logger.warning(f"Logo not found. Tried: {candidate_paths}")
-
-    # Addresses and info
-    y -= 2 * line_height
-    left_col_y = y
-    right_col_y = y
-    # LEFT: Supplier
-    p.setFont("Helvetica-Bold", 11)
-    p.drawString(left, left_col_y, "NEXT NR–GIE")
-    p.setFont("Helvetica", 10)
-    p.drawString(left, left_col_y - 15, "2 Rue Des Frênes")
-    p.drawString(left, left_col_y - 30, "91100 Corbeil-Essonnes, FR")
-    p.drawString(left, left_col_y - 45, "nextrngie@gmail.com")
-    p.drawString(left, left_col_y - 60, "93060154700019")
-    p.drawString(left, left_col_y - 75, "Numéro de TVA: FR26930601547")
-
-    # RIGHT: Client
-    p.setFont("Helvetica-Bold", 11)
-    client_result = db.execute(select(Client).where(Client.id == contract.client_id))
-    client = client_result.scalars().first()
-    
-    if client:
-        # Draw client name with word wrapping
-        y_pos = right_col_y
-        name_text = (client.client_name or "").strip()
-        p.setFont("Helvetica-Bold", 11)
-        if name_text:
-            max_width = 200
-            words = name_text.split()
-            line = ""
-            lines = []
-            for w in words:
-                test = (line + (" " if line else "") + w)
-                if p.stringWidth(test, "Helvetica-Bold", 11) <= max_width:
-                    line = test
-                else:
-                    if line:
-                        lines.append(line)
-                    line = w
-            if line:
-                lines.append(line)
-            for ln in lines:
-                p.drawString(right, y_pos, ln)
-                y_pos -= 15
-        else:
-            p.drawString(right, y_pos, "Client")
-            y_pos -= 15
-        
-        # Details
-        p.setFont("Helvetica", 10)
-        
-        # Address (multi-line)
-        addr = getattr(client, 'client_address', None)
-        if addr:
-            for line_txt in str(addr).replace('\r\n','\n').replace('\r','\n').split('\n'):
-                if line_txt.strip():
-                    p.drawString(right, y_pos, line_txt.strip())
-                    y_pos -= 15
-        # SIRET from TSA number (if available)
-        if getattr(client, 'tsa_number', None):
-            p.drawString(right, y_pos, f"SIRET: {client.tsa_number}")
-            y_pos -= 15
-        
-        # Email (keep if available)
-        if getattr(client, 'email', None):
-            p.drawString(right, y_pos, client.email)
-            y_pos -= 15
-        
-        # TVA number
-        if getattr(client, 'tva_number', None):
-            p.drawString(right, y_pos, f"Numéro de TVA: {client.tva_number}")
-    else:
-        p.drawString(right, right_col_y, "Client")
-        p.setFont("Helvetica", 10)
-        p.drawString(right, right_col_y - 15, "")
-        p.drawString(right, right_col_y - 30, "")
-        p.drawString(right, right_col_y - 45, "")
-
-    # Chantier (site/project)
-    # Anchor the table safely below the address blocks to prevent overlap
-    # Estimate bottoms of both columns and position the table below the lowest point
-    left_bottom = left_col_y - 90
-    right_bottom = right_col_y - 120
-    y_after_blocks = min(left_bottom, right_bottom) - 10
-    chantier_y = y_after_blocks
-
-    # Add table header below chantier
-    table_y = chantier_y - 30  # Position below chantier
-    table_header_y = table_y + 20
-    
-    # Draw header baseline
-    p.setLineWidth(0.7)
-    p.line(40, table_header_y, 550, table_header_y)
-    
-    # Table headers
-    p.setFont("Helvetica-Bold", 10)
-    
-    headers = [
-        {"text": "Description", "width": 250},  
-        {"text": "Qté", "width": 70},       
-        {"text": "Prix unitaire", "width": 100},  
-        {"text": "TVA (%)", "width": 60},    
-        {"text": "Total HT", "width": 60}     
-    ]
-    
-    # Calculate total width of all headers
-    total_width = sum(header["width"] for header in headers)
-    
-    # Calculate centered position
-    page_width = 550  # Page width from 40 to 550
-    header_x = (page_width - total_width) / 2 + 40  # Centered position
-    
-    # Draw black background for entire header area
-    p.setLineWidth(0.7)
-    p.setFillColorRGB(0, 0, 0)  # Black
-    p.rect(header_x, table_header_y - 20, total_width, 20, fill=1)
-    
-    # Draw white text
-    p.setFillColorRGB(1, 1, 1)  # White
-    current_x = header_x
-    for header in headers:
-        if header["text"] == "Total HT":
-            # Right-align Total HT
-            text_width = p.stringWidth(header["text"], "Helvetica-Bold", 10)
-            p.drawString(current_x + header["width"] - text_width - 5, table_header_y - 15, header["text"])
-        else:
-            # Left-align other columns
-            p.drawString(current_x + 5, table_header_y - 15, header["text"])
-        current_x += header["width"]
-    
-    # Prepare for dynamic per-page borders
-    # Column X positions (including left and right boundaries)
-    col_x = [header_x]
-    for h in headers:
-        col_x.append(col_x[-1] + h["width"])
-    # Track top Y of the table area on the current page
-    page_top = table_header_y
-    # Stroke/text colors
-    p.setStrokeColorRGB(0, 0, 0)
-    p.setFillColorRGB(0, 0, 0)
-
-    # Helper: close current page table borders
-    def close_table_borders(top_y: float, bottom_y: float):
-        p.setLineWidth(0.7)
-        for x in col_x:  # draw all verticals including rightmost
-            p.line(x, top_y, x, bottom_y)
-        # bottom line
-        p.line(header_x, bottom_y, header_x + total_width, bottom_y)
-    
-    padding_top = 6
-    padding_bottom = 4
-    line_height = 12
-    y_position = table_header_y - 20
-    total_ht_sum = 0.0
-    tva_sum = 0.0
-
-    if factures:
-        for detail in factures:
-            desc = str(detail.description or '')
-            max_width = headers[0]["width"] - 10  # 5px padding on each side
-            # Preserve explicit newlines by splitting into paragraphs first
-            paragraphs = str(desc).replace('\r\n','\n').replace('\r','\n').split('\n')
-            lines = []
-            for para in paragraphs:
-                words = para.split()
-                if not words:
-                    # Preserve blank line
-                    lines.append('')
-                    continue
-                current_line = []
-                for word in words:
-                    test_line = ' '.join(current_line + [word])
-                    if p.stringWidth(test_line, "Helvetica", 9) <= max_width:
-                        current_line.append(word)
-                    else:
-                        if current_line:
-                            lines.append(' '.join(current_line))
-                        current_line = [word]
-                if current_line:
-                    lines.append(' '.join(current_line))
-            if not lines:
-                lines = [""]
-
-            content_height = max(len(lines) * line_height, line_height)
-            row_height = content_height + padding_top + padding_bottom
 
-            if y_position - row_height < 100:
-                close_table_borders(page_top, y_position)
-                p.showPage()
-                p.setFont("Helvetica", 10)
-                y_position = 750
-                p.setLineWidth(0.7)
-                p.setFillColorRGB(0, 0, 0)
-                p.rect(header_x, y_position, total_width, 20, fill=1)
-                p.setFillColorRGB(1, 1, 1)
-                current_x = header_x
-                for header in headers:
-                    if header["text"] == "Total HT":
-                        text_width = p.stringWidth(header["text"], "Helvetica-Bold", 10)
-                        p.drawString(current_x + header["width"] - text_width - 5, y_position - 15, header["text"])
-                    else:
-                        p.drawString(current_x + 5, y_position - 15, header["text"])
-                    current_x += header["width"]
-                y_position -= 20
-                page_top = y_position + 20
-                p.setFillColorRGB(0, 0, 0)
-
-            row_top = y_position
-            baseline = row_top - padding_top - 2
-
-            current_x = header_x
-            p.setFont("Helvetica", 9)
-            desc_y = baseline
-            for line in lines:
-                p.drawString(header_x + 5, desc_y, line)
-                desc_y -= line_height
-
-            current_x += headers[0]["width"]
-
-            qty_text = format_qty(detail.qty, getattr(detail, 'qty_unit', 'unite'))
-            qty_width = p.stringWidth(qty_text, "Helvetica", 9)
-            p.drawString(current_x + headers[1]["width"] - qty_width - 5, baseline, qty_text)
-            current_x += headers[1]["width"]
-
-            unit_price_text = f"€ {detail.unit_price:.2f}"
-            unit_price_width = p.stringWidth(unit_price_text, "Helvetica", 9)
-            p.drawString(current_x + headers[2]["width"] - unit_price_width - 5, baseline, unit_price_text)
-            current_x += headers[2]["width"]
-
-            tva_rate = detail.tva if hasattr(detail, 'tva') else 0.0
-            tva_text = f"{tva_rate:.2f}%"
-            tva_width = p.stringWidth(tva_text, "Helvetica", 9)
-            p.drawString(current_x + headers[3]["width"] - tva_width - 5, baseline, tva_text)
-            current_x += headers[3]["width"]
-
-            try:
-                row_ht = float(detail.qty or 0) * float(detail.unit_price or 0)
-            except Exception:
-                row_ht = 0.0
-            row_ht_text = f"€ {row_ht:.2f}"
-            row_ht_width = p.stringWidth(row_ht_text, "Helvetica", 9)
-            p.drawString(current_x + headers[4]["width"] - row_ht_width - 5, baseline, row_ht_text)
-
-            total_ht_sum += row_ht
-            try:
-                item_tva_rate = float(getattr(detail, 'tva', 0.0) or 0.0)
-            except Exception:
-                item_tva_rate = 0.0
-            tva_sum += row_ht * (item_tva_rate / 100.0)
-
-            line_y = row_top - row_height
-            p.setLineWidth(0.7)
-            p.line(header_x, line_y, header_x + total_width, line_y)
-            y_position = line_y
-    else:
-        total_ht_sum = 0.0
-        tva_sum = 0.0
-    
-    # Close borders for the final page section
-    close_table_borders(page_top, y_position)
-    
-    # Add totals section
-    y_position = ensure_space(y_position - 20, 160)
-    p.setFont("Helvetica-Bold", 10)
-    
-    # Total HT
-    p.drawString(header_x + 5, y_position - 15, "Total HT:")
-    total_text = f"{total_ht_sum:.2f} €"
-    total_width_text = p.stringWidth(total_text, "Helvetica-Bold", 10)
-    p.drawString(header_x + total_width - total_width_text - 5, y_position - 15, total_text)
-    
-    # Calculate total TVA from all factures (sum of qty * unit_price * tva%)
-    y_position = ensure_space(y_position - 20, 140)
-    tva_amount = tva_sum
-    p.drawString(header_x + 5, y_position - 15, "TVA:")
-    tva_text = f"{tva_amount:.2f} €"
-    tva_width_text = p.stringWidth(tva_text, "Helvetica-Bold", 10)
-    p.drawString(header_x + total_width - tva_width_text - 5, y_position - 15, tva_text)
-    
-    # Total TTC (HT + TVA)
-    y_position = ensure_space(y_position - 20, 140)
-    total_ttc = total_ht_sum + tva_amount
-    p.drawString(header_x + 5, y_position - 15, "Total TTC:")
-    ttc_text = f"{total_ttc:.2f} €"
-    ttc_width_text = p.stringWidth(ttc_text, "Helvetica-Bold", 10)
-    p.drawString(header_x + total_width - ttc_width_text - 5, y_position - 15, ttc_text)
-    
-    # Legal notes and payment details (from old working template)
-    y_position = ensure_space(y_position - 30, 200)
-    p.setFont("Helvetica", 8)
-    p.drawString(left, y_position, "TVA non applicable - Section 283 du CGI - Autoliquidation des services")
-    y_position -= 12
-    p.drawString(left, y_position, "Type de transaction : Services")
-    y_position -= 12
-    p.drawString(left, y_position, "Pas d'escompte accordé pour paiement anticipé.")
-    y_position -= 12
-    p.drawString(left, y_position, "En cas de non-paiement à la date d'échéance, des pénalités calculées à trois fois le taux d'intérêt légal seront appliquées.")
-    y_position -= 12
-    p.drawString(left, y_position, "Tout retard de paiement entraînera une indemnité forfaitaire pour frais de recouvrement de 40€.")
-    
-    # Spacing before payment details
-    y_position -= (6 * 8)
-    
-    # Payment details
-    y_position = ensure_space(y_position - 30, 150)
-    p.setFont("Helvetica-Bold", 11)
-    p.drawString(left, y_position, "Détails du paiement")
-    y_position -= 16
-    p.setFont("Helvetica", 9)
-    label_x = left
-    value_x = left + 150
-    p.drawString(label_x, y_position, "Nom du bénéficiaire")
-    p.drawString(value_x, y_position, "NEXT NR-GIE")
-    y_position -= 14
-    p.drawString(label_x, y_position, "BIC")
-    p.drawString(value_x, y_position, "CMCIFR2A")
-    y_position -= 14
-    p.drawString(label_x, y_position, "IBAN")
-    p.drawString(value_x, y_position, "FR7610278062310002236670146")
-    y_position -= 14
-    # p.drawString(label_x, y_position, "Référence")
-    # p.drawString(value_x, y_position, "QECVZDX")
+@router.get("/estimate/{contract_id}")
+def generate_estimate_pdf(
+    contract_id: int,
+    profile: str | None = None,
+    db: Session = Depends(get_db),
+    job: dict | None = Depends(job_mode)
+):
+    pdf_profile = get_profile(profile)
+    if job is not None:
+        return enqueue_response(db, "pdf.estimate", {"contract_id": contract_id, "profile": profile}, job)
+    doc = load_contract_document(db, contract_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    return _render_once_sync(("contract", pdf_profile.name, document_version(asdict(doc))), _render_contract_pdf, doc, pdf_profile)
 
-    p.save()
-    buffer.seek(0)
-    return Response(buffer.read(), media_type="application/pdf", headers={"Content-Disposition": f"inline; filename=invoice_{datetime.now().strftime('%Y%m%d')}.pdf"})
+def _render_contract_pdf(doc: ContractDocument, pdf_profile) -> Response:
+    """Invoice-style PDF listing every facture of a contract."""
+    from reportlab.lib.pagesizes import letter
+    from app.pdf.canvas import NumberedCanvas
 
+    contract, client, facture_items = doc.contract, doc.client, doc.lines
 
-@router.get("/estimate/{contract_id}")
-def generate_estimate_pdf(contract_id: int, db: Session = Depends(get_db)):
-    from reportlab.lib.utils import ImageReader
-    import os
-    
-    result = db.execute(select(Contract).where(Contract.id == contract_id))
-    contract = result.scalars().first()
-    if not contract:
-        raise HTTPException(status_code=404, detail="Contract not found")
-    
-    client_result = db.execute(select(Client).where(Client.id == contract.client_id))
-    client = client_result.scalars().first()
-    
     buffer = BytesIO()
     footer_left_text = "NEXT NR-GIE, SAS avec un capital de 5 000,00 € • 930 601 547 Evry B"
-    p = NumberedCanvas(buffer, pagesize=letter, footer_left=footer_left_text, doc_number="")
+    p = NumberedCanvas(buffer, pagesize=letter, footer_left=footer_left_text, doc_number="", profile=pdf_profile)
     
     # Page-break helper
     def ensure_space(current_y: int, min_y: int = 140) -> int:
@@ -849,11 +383,12 @@ def generate_estimate_pdf(contract_id: int, db: Session = Depends(get_db)):
     p.drawString(left, y, "Facture")
     y -= line_height * 1.5
     
-    # Invoice number (F + yyMMdd)
+    # Invoice number (F + yyMMdd of the latest facture, else of the contract date)
     p.setFont("Helvetica-Bold", 12)
     p.drawString(left, y, "Numéro de facture")
     p.setFont("Helvetica", 12)
-    invoice_no = f"F{datetime.now().strftime('%y%m%d')}"
+    issued = max((f.created_at for f in facture_items if f.created_at), default=None) or contract.date or date.today()
+    invoice_no = f"F{issued.strftime('%y%m%d')}"
     p.drawString(left + 170, y, invoice_no)
     y -= line_height
     
@@ -885,12 +420,11 @@ def generate_estimate_pdf(contract_id: int, db: Session = Depends(get_db)):
     logo_x = 440
     logo_width = 150
     logo_height = 55
-    # Use a relative path to the logo in the frontend public directory
-    logo_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "app", "static", "logonr.jpg")
-    if os.path.exists(logo_path):
-        p.drawImage(ImageReader(logo_path), logo_x, logo_y, width=logo_width, height=logo_height, mask='auto')
+    logo = logo_image(pdf_profile, logo_width, logo_height)
+    if logo:
+        p.drawImage(logo, logo_x, logo_y, width=logo_width, height=logo_height, mask='auto')
     else:
-        print(f"Logo not found at: {logo_path}")
+        logger.warning("Logo not found")
     
     # Addresses and info
     y -= 2 * line_height
@@ -966,8 +500,8 @@ def generate_estimate_pdf(contract_id: int, db: Session = Depends(get_db)):
     else:
         p.drawString(right, right_col_y, "Client")
     
-    # Chantier (site/project)
-    # chantier_y = left_col_y - 100
+    # Chantier (site/project); the label itself is currently not printed
+    chantier_y = left_col_y - 100
     # p.setFont("Helvetica-Bold", 12)
     # p.drawString(left, chantier_y, "CHANTIER Arc de seine")
     
@@ -1014,10 +548,6 @@ def generate_estimate_pdf(contract_id: int, db: Session = Depends(get_db)):
             p.drawString(current_x + 5, table_header_y - 15, header["text"])
         current_x += header["width"]
     
-    # Fetch facture items
-    facture_items = db.execute(select(Facture).where(Facture.contract_id == contract.id))
-    facture_items = facture_items.scalars().all()
-    
     # Reset fill color to black for text
     p.setFillColorRGB(0, 0, 0)
     
@@ -1173,7 +703,7 @@ def generate_estimate_pdf(contract_id: int, db: Session = Depends(get_db)):
     
     # Calculate total TVA from all factures
     y_position = ensure_space(y_position - 20, 140)
-    tva_amount = sum(item.total_ht * (getattr(item, 'tva', 0.0) / 100) for item in factures) if 'factures' in locals() else 0.0
+    tva_amount = sum(item.total_ht * ((item.tva or 0.0) / 100) for item in facture_items)
     p.drawString(header_x + 5, y_position - 15, "TVA:")
     tva_text = f"{tva_amount:.2f} €"
     tva_width_text = p.stringWidth(tva_text, "Helvetica-Bold", 10)
@@ -1228,73 +758,61 @@ def generate_estimate_pdf(contract_id: int, db: Session = Depends(get_db)):
     
     p.showPage()
     p.save()
-    buffer.seek(0)
-    return Response(buffer.read(), media_type="application/pdf", headers={"Content-Disposition": f"inline; filename=estimate_{contract.command_number}.pdf"})
+    return PDFResponse(buffer, filename=f"estimate_{contract.command_number}.pdf")
 
 @router.get("/facture/{contract_id}")
-def generate_facture_pdf_by_contract(contract_id: int, db: Session = Depends(get_db)):
+def generate_facture_pdf_by_contract(
+    contract_id: int,
+    profile: str | None = None,
+    db: Session = Depends(get_db),
+    job: dict | None = Depends(job_mode)
+):
     """
     Generate a PDF for facture by contract ID - this is what the frontend expects!
     """
+    pdf_profile = get_profile(profile)
+    if job is not None:
+        return enqueue_response(db, "pdf.facture_by_contract", {"contract_id": contract_id, "profile": profile}, job)
+
     logger.info(f"\n=== Generating Facture PDF for Contract ID: {contract_id} ===")
     
-    # Get contract data
-    contract = db.execute(select(Contract).where(Contract.id == contract_id)).scalars().first()
-    if not contract:
+    doc = load_contract_document(db, contract_id)
+    if not doc:
         logger.error(f"Contract with ID {contract_id} not found")
         raise HTTPException(status_code=404, detail="Contract not found")
-    
-    # Get client data
-    client = db.execute(select(Client).where(Client.id == contract.client_id)).scalars().first()
-    if not client:
+    if not doc.client:
         logger.error(f"Client not found for contract ID {contract_id}")
         raise HTTPException(status_code=404, detail="Client not found")
-    
-    logger.info(f"Client: {client.client_name} (ID: {client.id})")
-    
-    # Get all factures for this contract
-    factures = db.execute(
-        select(Facture)
-        .where(Facture.contract_id == contract_id)
-        .order_by(Facture.created_at)
-    ).scalars().all()
-    
+    factures = doc.lines
     if not factures:
         logger.warning(f"No factures found for contract ID {contract_id}")
         raise HTTPException(status_code=404, detail="No factures found for this contract")
     
-    # Log all facture details
-    logger.info(f"Found {len(factures)} factures:")
-    for i, facture in enumerate(factures, 1):
-        logger.info(f"\nFacture #{i}:")
-        logger.info(f"  ID: {facture.id}")
-        logger.info(f"  Description: {facture.description}")
-        logger.info(f"  Quantity: {facture.qty}")
-        logger.info(f"  Unit Price: {facture.unit_price} €")
-        logger.info(f"  TVA: {facture.tva}%")
-        logger.info(f"  Total HT: {facture.total_ht} €")
-        logger.info(f"  Created At: {facture.created_at}")
-    
     # Calculate totals
     total_ht = sum(f.total_ht for f in factures)
     total_tva = sum(f.total_ht * (f.tva / 100) for f in factures)
-    total_ttc = total_ht + total_tva
-    
-    logger.info("\n=== TOTALS ===")
-    logger.info(f"Total HT: {total_ht:.2f} €")
-    logger.info(f"Total TVA: {total_tva:.2f} €")
-    logger.info(f"Total TTC: {total_ttc:.2f} €")
-    logger.info("================\n")
+    logger.info(f"Client: {doc.client.client_name} (ID: {doc.client.id}), {len(factures)} factures, "
+                f"total HT {total_ht:.2f} €, TTC {total_ht + total_tva:.2f} €")
     
-    # Generate the PDF
-    return generate_estimate_pdf(contract_id, db)
+    # Generate the PDF (same document as /estimate/{contract_id}, so they share renders)
+    return _render_once_sync(("contract", pdf_profile.name, document_version(asdict(doc))), _render_contract_pdf, doc, pdf_profile)
 
 @router.post("/facture")
-def generate_facture_pdf(facture_data: dict, db: Session = Depends(get_db)):
+def generate_facture_pdf(
+    facture_data: dict,
+    profile: str | None = None,
+    db: Session = Depends(get_db),
+    job: dict | None = Depends(job_mode)
+):
     """
     Generate a PDF for a facture
     """
-    from reportlab.lib.utils import ImageReader
+    pdf_profile = get_profile(profile)
+    if job is not None:
+        return enqueue_response(db, "pdf.facture", dict(facture_data, profile=profile) if profile else facture_data, job)
+
+    from reportlab.lib.pagesizes import letter
+    from app.pdf.canvas import DocumentCanvas
     
     logger.info("\n=== Starting Facture PDF Generation ===")
     
@@ -1325,7 +843,14 @@ def generate_facture_pdf(facture_data: dict, db: Session = Depends(get_db)):
     logger.info("Starting PDF generation...")
     
     buffer = BytesIO()
-    p = canvas.Canvas(buffer, pagesize=letter)
+    p = DocumentCanvas(buffer, pagesize=letter, profile=pdf_profile)
+
+    # Page-break helper (same as the other generators)
+    def ensure_space(current_y: int, min_y: int = 140) -> int:
+        if current_y < min_y:
+            p.showPage()
+            return 760
+        return current_y
 
     # Margins and layout
     left = 40
@@ -1349,7 +874,9 @@ def generate_facture_pdf(facture_data: dict, db: Session = Depends(get_db)):
     p.setFont("Helvetica-Bold", 12)
     p.drawString(left, y, "Date d'émission")
     p.setFont("Helvetica", 12)
-    p.drawString(left + 170, y, f"{datetime.now().strftime('%d/%m/%Y')}")
+    # Facture creation date when the payload has it (FactureOut.created_at)
+    issued = parse_date(facture_data.get('issue_date')) or parse_date(facture_data.get('created_at')) or date.today()
+    p.drawString(left + 170, y, issued.strftime('%d/%m/%Y'))
     y -= line_height
 
     # Logo (top right)
@@ -1357,9 +884,9 @@ def generate_facture_pdf(facture_data: dict, db: Session = Depends(get_db)):
     logo_x = 440
     logo_width = 150
     logo_height = 55
-    logo_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "app", "static", "logonr.jpg")
-    if os.path.exists(logo_path):
-        p.drawImage(ImageReader(logo_path), logo_x, logo_y, width=logo_width, height=logo_height, mask='auto')
+    logo = logo_image(pdf_profile, logo_width, logo_height)
+    if logo:
+        p.drawImage(logo, logo_x, logo_y, width=logo_width, height=logo_height, mask='auto')
 
     # Addresses and info
     y -= 2 * line_height
@@ -1532,20 +1059,24 @@ def generate_facture_pdf(facture_data: dict, db: Session = Depends(get_db)):
     # p.drawString(value_x, y, "QECVZDX")
 
     p.save()
-    buffer.seek(0)
     
     # Log PDF generation completion
-    file_size = len(buffer.getvalue()) / 1024  # Size in KB
+    file_size = buffer.getbuffer().nbytes / 1024  # Size in KB
     logger.info(f"PDF generation completed. File size: {file_size:.2f} KB")
     logger.info("=== End of Facture PDF Generation ===\n")
     
-    return Response(content=buffer.getvalue(), media_type="application/pdf", headers={
+    return PDFResponse(buffer, filename=f"facture_{facture_id}.pdf", headers={
         "Cache-Control": "no-store, max-age=0",
         "Pragma": "no-cache"
     })
 
 @router.post("/devis")
-async def generate_devis_pdf(payload: dict):
+async def generate_devis_pdf(
+    payload: dict,
+    profile: str | None = None,
+    db: Session = Depends(get_db),
+    job: dict | None = Depends(job_mode)
+):
     """
     Generate a Devis PDF from a payload (client + items).
     Expected payload format:
@@ -1557,11 +1088,19 @@ async def generate_devis_pdf(payload: dict):
       ]
     }
     """
-    from reportlab.lib.utils import ImageReader
+    pdf_profile = get_profile(profile)
+    if job is not None:
+        return enqueue_response(db, "pdf.devis", dict(payload, profile=profile) if profile else payload, job)
+    key = ("devis", pdf_profile.name, document_version(payload))
+    return await _render_once(key, _render_devis_pdf, payload, pdf_profile)
+
+def _render_devis_pdf(payload: dict, pdf_profile) -> Response:
+    from reportlab.lib.pagesizes import letter
+    from app.pdf.canvas import NumberedCanvas
 
     buffer = BytesIO()
     footer_left_text = "NEXT NR-GIE, SAS avec un capital de 5 000,00 € • 930 601 547 Evry B"
-    p = NumberedCanvas(buffer, pagesize=letter, footer_left=footer_left_text, doc_number="")
+    p = NumberedCanvas(buffer, pagesize=letter, footer_left=footer_left_text, doc_number="", profile=pdf_profile)
 
     # Page-break helper
     def ensure_space(current_y: int, min_y: int = 140) -> int:
@@ -1621,14 +1160,7 @@ async def generate_devis_pdf(payload: dict):
     p.setFont("Helvetica", 12)
     
     # Get creation date from payload or use current date
-    creation_date = datetime.now()
-    if 'creation_date' in payload and payload['creation_date']:
-        try:
-            # Try to parse the date from the payload
-            creation_date = datetime.strptime(payload['creation_date'], '%Y-%m-%d')
-        except (ValueError, TypeError):
-            # If parsing fails, use current date
-            pass
+    creation_date = parse_date(payload.get('creation_date')) or date.today()
     
     p.drawString(left + 170, y, creation_date.strftime('%d/%m/%Y'))
     y -= line_height
@@ -1660,9 +1192,9 @@ async def generate_devis_pdf(payload: dict):
     logo_x = 440
     logo_width = 150
     logo_height = 55
-    logo_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "app", "static", "logonr.jpg")
-    if os.path.exists(logo_path):
-        p.drawImage(ImageReader(logo_path), logo_x, logo_y, width=logo_width, height=logo_height, mask='auto')
+    logo = logo_image(pdf_profile, logo_width, logo_height)
+    if logo:
+        p.drawImage(logo, logo_x, logo_y, width=logo_width, height=logo_height, mask='auto')
 
     # Supplier
     y -= 2 * line_height
@@ -1890,6 +1422,107 @@ async def generate_devis_pdf(payload: dict):
     p.drawString(header_x + total_width - ttc_width_text - 5, y_pos - 15, ttc_text)
 
     p.save()
-    buffer.seek(0)
-    filename = f"devis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    return Response(buffer.read(), media_type="application/pdf", headers={"Content-Disposition": f"inline; filename={filename}"})
\ No newline at end of file
+    filename = f"devis_{devis_number or creation_date.strftime('%Y%m%d')}.pdf"
+    return PDFResponse(buffer, filename=filename)
+
+
+# Receivables aging (app/crud/aging.py), for collections
+@router.get("/aging")
+def generate_aging_pdf(
+    as_of: date | None = None,
+    client_id: int | None = None,
+    profile: str | None = None,
+    db: Session = Depends(get_db),
+    job: dict | None = Depends(job_mode)
+):
+    """Aging report as PDF: every client, or the outstanding invoices of ``client_id``."""
+    from app.crud.aging import aging_report, client_aging
+
+    pdf_profile = get_profile(profile)
+    as_of = as_of or date.today()
+    if job is not None:
+        return enqueue_response(db, "pdf.aging", {
+            "as_of": as_of.isoformat(), "client_id": client_id, "profile": profile,
+        }, job)
+    if client_id is None:
+        report = aging_report(db, as_of)
+    else:
+        report = client_aging(db, client_id, as_of)
+        if report is None:
+            raise HTTPException(status_code=404, detail="Client not found")
+    key = ("aging", client_id, pdf_profile.name, document_version(report))
+    return _render_once_sync(key, _render_aging_pdf, report, client_id, pdf_profile)
+
+
+def _render_aging_pdf(report: dict, client_id, pdf_profile) -> Response:
+    """Table of outstanding balances by days past due, repeated header on each page."""
+    from reportlab.lib.pagesizes import landscape, letter
+    from app.crud.aging import BUCKET_LABELS, BUCKETS
+    from app.pdf.canvas import NumberedCanvas
+
+    buffer = BytesIO()
+    as_of = report["as_of"]
+    p = NumberedCanvas(buffer, pagesize=landscape(letter), footer_left="NEXT NR-GIE • Balance âgée des créances",
+                       doc_number=as_of.strftime('%d/%m/%Y'), profile=pdf_profile)
+    left, right, top, bottom = 40, 752, 560, 60
+    buckets = [name for name, _, _ in BUCKETS]
+
+    def money(value):
+        return f"{value:,.2f} €".replace(",", " ")
+
+    if client_id is None:
+        title = "Balance âgée des créances"
+        columns = [("Client", left), ("Factures", 300)] + [
+            (BUCKET_LABELS[name], 370 + i * 64) for i, name in enumerate(buckets)] + [("Total", right)]
+        rows = [[c["client_name"] or f"#{c['client_id']}", str(c["invoices"]), *(money(c[name]) for name in buckets),
+                 money(c["total"])] for c in report["clients"]]
+        totals = report["totals"]
+        total_row = ["Total", str(totals["invoices"]), *(money(totals[name]) for name in buckets),
+                     money(totals["total"])]
+    else:
+        client = report["client"]
+        title = f"Balance âgée • {client['client_name'] or client['client_id']}"
+        columns = [("Facture", left), ("Contrat", 150), ("Échéance", 300), ("Retard", 360), ("Tranche", 420),
+                   ("Montant", 560), ("Payé", 650), ("Reste dû", right)]
+        rows = [[i["invoice_number"], i["contract_number"] or "", i["due_date"].strftime('%d/%m/%Y'),
+                 f"{i['days_overdue']} j", BUCKET_LABELS[i["bucket"]], money(i["amount"]), money(i["paid_amount"]),
+                 money(i["outstanding"])] for i in report["invoices"]]
+        total_row = ["Total", "", "", "", "", "", "", money(client["total"])]
+
+    # Text columns are left-aligned at x, amounts right-aligned at x
+    text_columns = 2 if client_id is None else 5
+
+    def draw_row(values, y, bold=False):
+        p.setFont("Helvetica-Bold" if bold else "Helvetica", 9)
+        for index, (value, (_, x)) in enumerate(zip(values, columns)):
+            if index < text_columns:
+                p.drawString(x, y, str(value)[:45])
+            else:
+                p.drawRightString(x, y, str(value))
+
+    def start_page():
+        p.setFont("Helvetica-Bold", 16)
+        p.drawString(left, top, title)
+        p.setFont("Helvetica", 10)
+        p.drawString(left, top - 18, f"Au {as_of.strftime('%d/%m/%Y')}")
+        y = top - 44
+        draw_row([name for name, _ in columns], y, bold=True)
+        p.line(left, y - 4, right, y - 4)
+        return y - 18
+
+    y = start_page()
+    for values in rows:
+        if y < bottom:
+            p.showPage()
+            y = start_page()
+        draw_row(values, y)
+        y -= 14
+    if y < bottom:
+        p.showPage()
+        y = start_page()
+    p.line(left, y + 10, right, y + 10)
+    draw_row(total_row, y - 4, bold=True)
+
+    p.save()
+    suffix = f"_{client_id}" if client_id is not None else ""
+    return PDFResponse(buffer, filename=f"aging{suffix}_{as_of.isoformat()}.pdf")
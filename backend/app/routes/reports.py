@@ -0,0 +1,104 @@
+import csv
+import io
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session
+
+from app.core.admission import admit
+from app.core.database import get_db
+from app.crud.aging import BUCKET_LABELS, BUCKETS, aging_report, client_aging
+from app.crud.rollups import month_of, monthly_report
+from app.pdf.responses import content_disposition
+from app.schemas.report import AgingReport, ClientAgingReport, MonthlyReport
+
+# Financial reports: monthly figures from the rollup tables (app.crud.rollups),
+# receivables aging from one grouped query (app.crud.aging)
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+DEFAULT_MONTHS = 12
+
+
+def _month(value: str, name: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be a month, YYYY-MM")
+
+
+@router.get("/monthly", response_model=MonthlyReport)
+def get_monthly_report(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    client_id: Optional[int] = None,
+    by_client: bool = False,
+    db: Session = Depends(get_db),
+):
+    """Revenue HT, TVA per rate, TTC, invoiced, paid and outstanding per month, ``start`` to ``end`` (YYYY-MM).
+
+    Defaults to the last 12 months. ``by_client=true`` adds the figures per
+    client, ``client_id`` keeps one client.
+    """
+    end_month = _month(end, "end") if end else month_of(date.today())
+    if start:
+        start_month = _month(start, "start")
+    else:
+        months_back = end_month.year * 12 + end_month.month - DEFAULT_MONTHS
+        start_month = date(months_back // 12, months_back % 12 + 1, 1)
+    if start_month > end_month:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return monthly_report(db, start_month, end_month, client_id=client_id, by_client=by_client)
+
+
+@router.get("/aging", response_model=AgingReport)
+def get_aging_report(as_of: Optional[date] = None, db: Session = Depends(get_db)):
+    """Outstanding balance per client by days past due (not due, 0-30, 31-60, 61-90, 90+) at ``as_of`` (today)."""
+    return aging_report(db, as_of or date.today())
+
+
+def _client_aging_or_404(db: Session, client_id: int, as_of: date) -> dict:
+    report = client_aging(db, client_id, as_of)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Client not found")
+    return report
+
+
+def _csv_response(filename: str, header, rows) -> Response:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return Response(
+        buffer.getvalue(), media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": content_disposition(filename, "attachment")},
+    )
+
+
+# A file export: counts against the export limits like the other bulk endpoints
+@router.get("/aging.csv", dependencies=[Depends(admit("export"))])
+def export_aging_csv(as_of: Optional[date] = None, client_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """The aging report as CSV: one line per client, or per invoice of ``client_id``."""
+    as_of = as_of or date.today()
+    buckets = [name for name, _, _ in BUCKETS]
+    labels = [BUCKET_LABELS[name] for name in buckets]
+    if client_id is None:
+        report = aging_report(db, as_of)
+        rows = [[c["client_id"], c["client_name"], c["invoices"], *(c[name] for name in buckets), c["total"]]
+                for c in report["clients"]]
+        totals = report["totals"]
+        rows.append(["", "Total", totals["invoices"], *(totals[name] for name in buckets), totals["total"]])
+        return _csv_response(f"aging_{as_of}.csv",
+                             ["client_id", "client", "invoices", *labels, "total"], rows)
+    report = _client_aging_or_404(db, client_id, as_of)
+    rows = [[i["invoice_number"], i["contract_number"], i["due_date"], i["days_overdue"], BUCKET_LABELS[i["bucket"]],
+             i["amount"], i["paid_amount"], i["outstanding"]] for i in report["invoices"]]
+    return _csv_response(f"aging_{client_id}_{as_of}.csv",
+                         ["invoice", "contract", "due_date", "days_overdue", "bucket", "amount", "paid", "outstanding"],
+                         rows)
+
+
+@router.get("/aging/{client_id}", response_model=ClientAgingReport)
+def get_client_aging(client_id: int, as_of: Optional[date] = None, db: Session = Depends(get_db)):
+    """One client's aging buckets and outstanding invoices, oldest due first."""
+    return _client_aging_or_404(db, client_id, as_of or date.today())
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.sync import delta_response, sync_window
+from app.crud.read_models import list_salaries
 from app.schemas.salary import SalaryCreate, SalaryOut
 from app.models.salary import Salary
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
 
 router = APIRouter(prefix="/salaries", tags=["salaries"])
 
@@ -21,9 +23,12 @@ def add_salary(salary: SalaryCreate, db: Session = Depends(get_db)):
     return db_salary
 
 @router.get("/", response_model=List[SalaryOut])
-def get_salaries(db: Session = Depends(get_db)):
-    result = db.execute(select(Salary).order_by(Salary.created_at.desc()))
-    return result.scalars().all()
+def get_salaries(since: Optional[str] = None, db: Session = Depends(get_db)):
+    """All salaries; with ``since`` (a watermark, or 0) only the changes, see ``app.core.sync``."""
+    if since is None:
+        return list_salaries(db)
+    window = sync_window(since)
+    return delta_response(db, Salary, list_salaries(db, window.lower), SalaryOut, window)
 
 @router.get("/{salary_id}", response_model=SalaryOut)
 def get_salary(salary_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,49 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import date
+
+from app.schemas.client import ClientOut
+from app.schemas.contract_detail import ContractDetailOut
+from app.schemas.estimate import EstimateOut
+from app.schemas.facture import Facture
+from app.schemas.invoice import InvoiceOut
+
+
+class ContractRef(BaseModel):
+    id: int
+    command_number: str
+    name: Optional[str] = None
+    price: float
+    date: date
+    client_id: int
+
+    class Config:
+        from_attributes = True
+
+
+class BalanceBootstrap(BaseModel):
+    # Rows carry client_name and contract_number, no client/contract lookups needed
+    invoices: List[InvoiceOut]
+    # ?since= watermark of these invoices, to apply change events with GET /invoices/?since=
+    watermark: str
+
+
+class FacturesBootstrap(BaseModel):
+    contracts: List[ContractRef]
+    invoices: List[InvoiceOut]
+    # Factures of the invoiced contracts; invoice_id groups them per invoice
+    factures: List[Facture]
+
+
+class DevisBootstrap(BaseModel):
+    clients: List[ClientOut]
+    contracts: List[ContractRef]
+    estimates: List[EstimateOut]
+    # Items per estimate id
+    items: Dict[int, List[ContractDetailOut]]
+
+
+class DashboardBootstrap(BaseModel):
+    stats: Dict[str, int]
+    recent_activity: List[dict]
+    contract_growth: List[dict]
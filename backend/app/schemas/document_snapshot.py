@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+
+class InvoiceIssue(BaseModel):
+    """Printed values to freeze; omitted ones come from the invoice as for /pdf/invoice."""
+    invoice_number: Optional[str] = None
+    issue_date: Optional[date] = None
+    expiration_date: Optional[date] = None
+
+class DocumentSnapshotOut(BaseModel):
+    id: int
+    document_type: str
+    document_id: int
+    content_sha256: Optional[str] = None
+    content_size: Optional[int] = None
+    profile: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+        from_attributes = True
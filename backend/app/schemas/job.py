@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class JobCreate(BaseModel):
+    kind: str
+    payload: dict = {}
+    priority: int = 0
+    max_attempts: Optional[int] = None
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = None
+    result_filename: Optional[str] = None
+    result_size: Optional[int] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Set once the job has succeeded
+    result_url: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+        from_attributes = True
+
+class ScheduledTaskOut(BaseModel):
+    name: str
+    locked_by: Optional[str] = None
+    locked_until: Optional[datetime] = None
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_result: Optional[dict] = None
+    last_error: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+        from_attributes = True
@@ -0,0 +1,83 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+
+
+class TvaTotal(BaseModel):
+    rate: float  # percent
+    total_ht: float
+    tva: float
+
+
+class ReportFigures(BaseModel):
+    # Factures of the period
+    total_ht: float
+    tva: List[TvaTotal]
+    total_tva: float
+    total_ttc: float
+    # Invoices issued in the period (amounts HT, like the invoices)
+    invoices: int
+    invoiced: float
+    paid: float
+    outstanding: float
+
+
+class ClientFigures(ReportFigures):
+    client_id: int
+    client_name: Optional[str] = None
+
+
+class MonthFigures(ReportFigures):
+    month: str  # YYYY-MM
+    clients: Optional[List[ClientFigures]] = None
+
+
+class MonthlyReport(BaseModel):
+    start: str
+    end: str
+    months: List[MonthFigures]
+    totals: ReportFigures
+    # Per client over the whole range, with ?by_client=true
+    clients: Optional[List[ClientFigures]] = None
+
+
+class AgingBuckets(BaseModel):
+    # Outstanding balance by days past due
+    current: float  # not due yet
+    days_0_30: float
+    days_31_60: float
+    days_61_90: float
+    days_90_plus: float
+    total: float
+    invoices: int
+
+
+class AgingClient(AgingBuckets):
+    client_id: int
+    client_name: Optional[str] = None
+
+
+class AgingReport(BaseModel):
+    as_of: date
+    clients: List[AgingClient]
+    totals: AgingBuckets
+
+
+class AgingInvoice(BaseModel):
+    id: int
+    invoice_number: str
+    contract_id: int
+    contract_number: Optional[str] = None
+    due_date: date
+    status: Optional[str] = None
+    amount: float
+    paid_amount: float
+    outstanding: float
+    days_overdue: int  # negative: not due yet
+    bucket: str
+
+
+class ClientAgingReport(BaseModel):
+    as_of: date
+    client: AgingClient
+    invoices: List[AgingInvoice]
@@ -0,0 +1,160 @@
+"""Production server: gunicorn managing a pool of uvicorn workers.
+
+Run with ``python -m app.server``. All options come from the ``SERVER_*`` and
+``WEB_CONCURRENCY`` settings in ``app.core.config``.
+
+- The worker count defaults to ``WORKERS_PER_CORE`` x the CPUs this process
+  may use (CPU affinity and the cgroup quota, so it respects container limits).
+- With ``SERVER_PRELOAD`` the app and ReportLab are imported once in the
+  master and shared copy-on-write by the workers.
+- Workers are recycled after ``SERVER_MAX_REQUESTS`` requests (plus jitter).
+- SIGTERM/SIGQUIT/SIGHUP drain in-flight requests for up to
+  ``SERVER_GRACEFUL_TIMEOUT`` seconds before workers are stopped. SIGHUP
+  restarts the workers; with preload on, new code only takes effect after a
+  full restart of the master (e.g. redeploying the container). Open change
+  event streams are ended first, so the browsers reconnect to another worker.
+- More than one worker requires a shared change event fan-out
+  (``EVENTS_SHARED_DIR`` or ``EVENTS_FANOUT``, see ``app.core.events``).
+"""
+import math
+import os
+import sys
+
+from gunicorn.app.base import BaseApplication
+from gunicorn.arbiter import Arbiter
+from uvicorn import Server as UvicornServer
+from uvicorn.workers import UvicornWorker
+
+from app.core.config import settings
+
+
+def _cgroup_cpu_limit():
+    """CPU quota from cgroup v2 ``cpu.max`` or v1 ``cfs_quota_us``, if any."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as fh:
+            quota, period = fh.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as fh:
+            quota = int(fh.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as fh:
+            period = int(fh.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return max(1, cpus)
+
+
+def worker_count() -> int:
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    workers = max(2, int(available_cpus() * settings.WORKERS_PER_CORE))
+    if settings.MAX_WORKERS > 0:
+        workers = min(workers, settings.MAX_WORKERS)
+    return workers
+
+
+class _Server(UvicornServer):
+    async def shutdown(self, sockets=None):
+        # uvicorn waits for open connections before the lifespan shutdown: end the event streams first
+        from app.core.events import broker
+        broker.close()
+        await super().shutdown(sockets=sockets)
+
+
+class Worker(UvicornWorker):
+    """Uvicorn worker that bounds its own shutdown by the gunicorn graceful timeout."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = self.cfg.graceful_timeout
+
+    async def _serve(self) -> None:
+        self.config.app = self.wsgi
+        server = _Server(config=self.config)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
+
+
+def _post_fork(server, worker):
+    # Connections must never be shared across processes; drop any pooled in the master
+    from app.core.database import engine
+    engine.dispose(close=False)
+
+
+def options() -> dict:
+    return {
+        "bind": settings.SERVER_BIND,
+        "workers": worker_count(),
+        "worker_class": f"{Worker.__module__}.{Worker.__qualname__}",
+        "preload_app": settings.SERVER_PRELOAD,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "timeout": settings.SERVER_TIMEOUT,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+        "keepalive": settings.SERVER_KEEPALIVE,
+        "loglevel": settings.SERVER_LOG_LEVEL,
+        "accesslog": "-",
+        "errorlog": "-",
+        "forwarded_allow_ips": "*",
+        "post_fork": _post_fork,
+    }
+
+
+class Server(BaseApplication):
+    def __init__(self, opts: dict):
+        self.opts = opts
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.opts.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+
+        if self.cfg.preload_app:
+            # Pay for ReportLab once in the master instead of on each worker's first PDF
+            from app.pdf import import_renderer
+            import_renderer()
+        return app
+
+
+def check_events_fanout(workers: int):
+    """Refuse several workers whose change events would stay in the worker that made the write."""
+    from app.core.events import shared_fanout
+
+    if workers > 1 and settings.EVENTS_ENABLED and not shared_fanout():
+        raise SystemExit(
+            f"{workers} workers but change events are not shared: open tabs would miss the writes served "
+            "by the other workers. Set EVENTS_SHARED_DIR (or EVENTS_FANOUT), or EVENTS_ENABLED=false."
+        )
+
+
+def main():
+    opts = options()
+    check_events_fanout(opts["workers"])
+    Server(opts).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""Performance benchmarks for the API and PDF hot paths.
+
+Run from the ``backend`` directory, for example::
+
+    python -m benchmarks.run --scale small
+    python -m benchmarks.run --database-url sqlite:///bench.db --scale large --reset
+
+See ``benchmarks/run.py`` for the available scenarios and options.
+"""
@@ -0,0 +1,82 @@
+"""Admission control under a burst of PDF requests.
+
+One "impatient" user fires ``--clicks`` concurrent invoice PDF requests (the
+repeated "view PDF" click) while ``--others`` other users open one invoice
+each. Reports the status codes per kind of user, latency of the others and
+the admission counters; the impatient user should get 429/503 while the
+others are still served and renders never exceed the concurrency limit::
+
+    python -m benchmarks.admission --scale tiny
+    python -m benchmarks.admission --clicks 50 --others 5 --shared-dir /tmp/admission
+"""
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+
+from .metrics import summarize_ms
+from .run import DEFAULT_DATABASE_URL
+
+
+async def burst(app, clicks: int, others: int, n_contracts: int) -> dict:
+    from app.utils.security import create_access_token
+    from .asgi import lifespan, request
+
+    def auth(user: str) -> dict:
+        return {"Authorization": f"Bearer {create_access_token({'sub': user})}"}
+
+    async def timed(path, headers):
+        start = time.perf_counter()
+        response = await request(app, "GET", path, headers=headers)
+        return response.status, time.perf_counter() - start
+
+    async with lifespan(app):
+        impatient = [timed("/api/pdf/invoice/1", auth("impatient@example.com")) for _ in range(clicks)]
+        polite = [
+            timed(f"/api/pdf/invoice/{1 + i % n_contracts}", auth(f"user{i}@example.com"))
+            for i in range(others)
+        ]
+        results = await asyncio.gather(*impatient, *polite)
+        metrics = (await request(app, "GET", "/api/metrics/")).json()
+    return {
+        "impatient": Counter(status for status, _ in results[:clicks]),
+        "others": Counter(status for status, _ in results[clicks:]),
+        "others_latency": summarize_ms([seconds for _, seconds in results[clicks:]]),
+        "admission": metrics["admission"],
+    }
+
+
+def main(argv=None):
+    from .seed import add_volume_arguments, prepare, volumes_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    add_volume_arguments(parser)
+    parser.add_argument("--clicks", type=int, default=30, help="concurrent requests of the impatient user")
+    parser.add_argument("--others", type=int, default=5, help="other users opening one invoice each")
+    parser.add_argument("--shared-dir", help="use the shared (multi-worker) mode with this directory")
+    args = parser.parse_args(argv)
+
+    # Before prepare(): settings are read when the app's modules are imported
+    os.environ.setdefault("PDF_SQL_LOGGING", "false")
+    os.environ["ADMISSION_ENABLED"] = "true"
+    if args.shared_dir:
+        os.environ["ADMISSION_SHARED_DIR"] = args.shared_dir
+    volumes = volumes_from_args(args)
+    prepare(args.database_url, volumes, args.reset, args.seed)
+    from app.core.config import settings
+    from app.main import app
+
+    result = asyncio.run(burst(app, args.clicks, args.others, volumes.clients * volumes.contracts_per_client))
+    print(f"impatient user ({args.clicks} requests): {dict(sorted(result['impatient'].items()))}")
+    print(f"other users ({args.others} requests):    {dict(sorted(result['others'].items()))}"
+          f"  p50 {result['others_latency']['p50_ms']:.1f} ms  max {result['others_latency']['max_ms']:.1f} ms")
+    pdf = result["admission"]["policies"]["pdf"]
+    print(f"pdf policy: {pdf}")
+    print(f"peak renders in flight {pdf['peak_in_flight']} (limit {settings.ADMISSION_PDF_CONCURRENCY}), "
+          f"shared={result['admission']['shared']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Aging report from one grouped query vs bucketing the invoice list client-side.
+
+Times ``GET /api/reports/aging`` (cold, after every write, and from the
+cache) and ``GET /api/reports/aging/{client_id}`` against what a client
+without the endpoint does: fetch ``GET /api/invoices/`` and the contracts,
+then bucket the open invoices itself. Both must give the same figures, and
+after a payment through the API the report must change with it::
+
+    python -m benchmarks.aging --scale small
+    python -m benchmarks.aging --scale medium --repeat 5
+"""
+import argparse
+import asyncio
+import os
+import time
+from collections import defaultdict
+from datetime import date
+
+from .metrics import summarize_ms
+from .run import DEFAULT_DATABASE_URL
+
+
+def bucket_client_side(invoices: list, contracts: list, as_of: date) -> dict:
+    """``{client_id: figures}`` from the API list payloads, as a dashboard would compute it."""
+    from app.crud.aging import BUCKETS, OPEN_STATUSES, bucket_of
+
+    client_of = {contract["id"]: contract["client_id"] for contract in contracts}
+    clients = defaultdict(lambda: dict.fromkeys([name for name, _, _ in BUCKETS] + ["total"], 0.0))
+    for invoice in invoices:
+        outstanding = invoice["amount"] - (invoice["paid_amount"] or 0)
+        if invoice["status"] not in OPEN_STATUSES or outstanding <= 0:
+            continue
+        figures = clients[client_of[invoice["contract_id"]]]
+        figures[bucket_of((as_of - date.fromisoformat(invoice["due_date"][:10])).days)] += outstanding
+        figures["total"] += outstanding
+    return clients
+
+
+def differences(report: dict, computed: dict) -> list:
+    from app.crud.aging import BUCKETS
+
+    names = [name for name, _, _ in BUCKETS] + ["total"]
+    found = {client["client_id"]: client for client in report["clients"]}
+    problems = []
+    for client_id in sorted(set(found) | set(computed)):
+        a, b = found.get(client_id, dict.fromkeys(names, 0.0)), computed.get(client_id, dict.fromkeys(names, 0.0))
+        for name in names:
+            if abs(a[name] - b[name]) > 0.011:
+                problems.append(f"client {client_id} {name}: report {a[name]} vs client-side {b[name]:.2f}")
+    return problems
+
+
+async def measure(app, repeat: int) -> dict:
+    from .asgi import lifespan, request
+
+    async def get(path, **params):
+        response = await request(app, "GET", path, params=params or None)
+        if response.status != 200:
+            raise SystemExit(f"GET {path}: HTTP {response.status} {response.body[:200]}")
+        return response.json()
+
+    async def timed(samples, coroutine):
+        start = time.perf_counter()
+        result = await coroutine
+        samples.append(time.perf_counter() - start)
+        return result
+
+    as_of = date.today()
+    timings = {"cold": [], "cached": [], "client": [], "client_side": []}
+    checks = []
+    async with lifespan(app):
+        for _ in range(repeat):
+            # A payment on the invoice touched last moves the watermark, so the next read recomputes
+            report = await timed(timings["cold"], get("/api/reports/aging"))
+            await timed(timings["cached"], get("/api/reports/aging"))
+            if report["clients"]:
+                await timed(timings["client"], get(f"/api/reports/aging/{report['clients'][0]['client_id']}"))
+            invoices = await timed(timings["client_side"], get("/api/invoices/"))
+            start = time.perf_counter()
+            contracts = await get("/api/contracts/")
+            computed = bucket_client_side(invoices, contracts, as_of)
+            timings["client_side"][-1] += time.perf_counter() - start
+            checks.append(("figures", differences(report, computed)))
+
+            invoice = next((i for i in invoices if i["status"] == "partial" or i["status"] == "unpaid"), None)
+            if invoice is None:
+                break
+            paid = round((invoice["paid_amount"] or 0) + min(10.0, invoice["amount"] - (invoice["paid_amount"] or 0)), 2)
+            response = await request(app, "PUT", f"/api/invoices/{invoice['id']}", json_body={"paid_amount": paid})
+            if response.status != 200:
+                raise SystemExit(f"PUT /api/invoices/{invoice['id']}: HTTP {response.status}")
+            after = await get("/api/reports/aging")
+            checks.append(("after payment", differences(after, bucket_client_side(
+                await get("/api/invoices/"), contracts, as_of))))
+            if after == report:
+                checks.append(("after payment", ["report unchanged by the payment"]))
+        stats = (await get("/api/metrics/")).get("aging_cache")
+    return {**{name: summarize_ms(samples) for name, samples in timings.items() if samples},
+            "checks": checks, "cache": stats}
+
+
+def main(argv=None):
+    from .seed import add_volume_arguments, prepare, volumes_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    add_volume_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=10, help="report requests timed, one payment between each")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("PDF_SQL_LOGGING", "false")
+    prepare(args.database_url, volumes_from_args(args), args.reset, args.seed)
+    from app.main import app
+
+    report = asyncio.run(measure(app, args.repeat))
+    for name, label in (("cold", "aging report, after a write"), ("cached", "aging report, cached"),
+                        ("client", "aging of one client"), ("client_side", "invoice list bucketed client-side")):
+        if name in report:
+            print(f"{label:36} p50 {report[name]['p50_ms']} ms, p95 {report[name]['p95_ms']} ms")
+    print(f"cache: {report['cache']}")
+    problems = [f"{label}: {problem}" for label, found in report["checks"] for problem in found]
+    print(f"{len(report['checks'])} checks, {len(problems)} differences")
+    for problem in problems[:10]:
+        print(f"  {problem}")
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
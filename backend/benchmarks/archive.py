@@ -0,0 +1,96 @@
+"""Invoice list before and after archiving the closed invoices.
+
+Seeds its own database (the mover deletes from ``invoices`` and
+``factures``), times ``GET /api/invoices/`` and reports the hot row counts,
+runs the archive mover (``app.jobs.archive``) and times the list again, hot
+and with ``?include_archived=true``, which must return the rows of before::
+
+    python -m benchmarks.archive --scale small
+    python -m benchmarks.archive --scale medium --after-days 30 --batch-size 200
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from sqlalchemy import func, select
+
+from .metrics import summarize_ms
+
+DEFAULT_DATABASE_URL = "sqlite:///./bench_archive.db"
+
+
+async def time_list(app, repeat: int, **params):
+    from .asgi import request
+
+    samples, rows = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = await request(app, "GET", "/api/invoices/", params=params or None)
+        samples.append(time.perf_counter() - start)
+        if response.status != 200:
+            raise SystemExit(f"GET /api/invoices/: HTTP {response.status}")
+        rows = response.json()
+    return summarize_ms(samples), rows
+
+
+def table_counts() -> dict:
+    from app.core.database import SessionLocal
+    from app.models import Facture, FactureArchive, Invoice, InvoiceArchive
+
+    with SessionLocal() as db:
+        return {model.__tablename__: db.scalar(select(func.count()).select_from(model))
+                for model in (Invoice, Facture, InvoiceArchive, FactureArchive)}
+
+
+async def measure(app, repeat: int, after_days: int, batch_size: int) -> dict:
+    from app.jobs.archive import run
+
+    from .asgi import lifespan
+
+    async with lifespan(app):
+        before, rows_before = await time_list(app, repeat)
+        counts_before = table_counts()
+        moved = await asyncio.to_thread(run, after_days, batch_size)
+        hot, rows_hot = await time_list(app, repeat)
+        unified, rows_all = await time_list(app, repeat, include_archived="true")
+    key = lambda row: row["id"]
+    return {
+        "before": before, "hot": hot, "unified": unified, "moved": moved,
+        "counts_before": counts_before, "counts_after": table_counts(),
+        "rows": (len(rows_before), len(rows_hot), len(rows_all)),
+        "unified_matches": sorted(rows_all, key=key) == sorted(rows_before, key=key),
+    }
+
+
+def main(argv=None):
+    from .seed import add_volume_arguments, prepare, volumes_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_ARCHIVE_DATABASE_URL", DEFAULT_DATABASE_URL))
+    add_volume_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=20, help="list requests per measurement")
+    parser.add_argument("--after-days", type=int, default=0, help="archive paid invoices due more than N days ago")
+    parser.add_argument("--batch-size", type=int, default=500, help="invoices per mover transaction")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("PDF_SQL_LOGGING", "false")
+    # Always reseeded: a previous run left its invoices archived
+    prepare(args.database_url, volumes_from_args(args), True, args.seed)
+    from app.main import app
+
+    report = asyncio.run(measure(app, args.repeat, args.after_days, args.batch_size))
+    print(f"tables before: {report['counts_before']}")
+    print(f"archived: {report['moved']}")
+    print(f"tables after:  {report['counts_after']}")
+    rows_before, rows_hot, rows_all = report["rows"]
+    print(f"GET /api/invoices/ before: {rows_before} rows, p50 {report['before']['p50_ms']} ms")
+    print(f"GET /api/invoices/ after:  {rows_hot} rows, p50 {report['hot']['p50_ms']} ms")
+    print(f"?include_archived=true:    {rows_all} rows, p50 {report['unified']['p50_ms']} ms, "
+          f"{'same rows as before' if report['unified_matches'] else 'ROWS DIFFER FROM BEFORE'}")
+    if not report["unified_matches"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Minimal in-process ASGI client.
+
+Requests are delivered straight to the application callable, so timings
+include routing, dependencies, database work and serialization but no socket
+or HTTP parsing overhead. It has no dependencies beyond the standard library.
+"""
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlencode
+
+
+@dataclass
+class AsgiResponse:
+    status: int
+    headers: dict = field(default_factory=dict)
+    body: bytes = b""
+
+    def json(self):
+        return json.loads(self.body)
+
+
+async def request(app, method: str, path: str, *, params: Optional[dict] = None,
+                  json_body=None, headers: Optional[dict] = None) -> AsgiResponse:
+    """Send one HTTP request to ``app`` and collect the full response."""
+    body = b""
+    raw_headers = [(b"host", b"bench.local")]
+    for key, value in (headers or {}).items():
+        raw_headers.append((key.lower().encode("latin-1"), str(value).encode("latin-1")))
+    if json_body is not None:
+        body = json.dumps(json_body).encode()
+        raw_headers.append((b"content-type", b"application/json"))
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method.upper(),
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(params or {}, doseq=True).encode(),
+        "root_path": "",
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench.local", 80),
+    }
+
+    request_sent = False
+    response = AsgiResponse(status=0)
+    chunks = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Block like a real server would until the client disconnects
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response.status = message["status"]
+            response.headers = {
+                k.decode("latin-1"): v.decode("latin-1") for k, v in message.get("headers", [])
+            }
+        elif message["type"] == "http.response.body":
+            chunks.append(bytes(message.get("body", b"")))
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # ServerErrorMiddleware re-raises after sending its 500 response;
+        # a real server would log it and keep serving, so do the same.
+        if not response.status:
+            response.status = 500
+    response.body = b"".join(chunks)
+    return response
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Run the application's lifespan startup/shutdown around a block."""
+    startup_done = asyncio.Event()
+    shutdown_done = asyncio.Event()
+    queue: asyncio.Queue = asyncio.Queue()
+    await queue.put({"type": "lifespan.startup"})
+
+    async def receive():
+        return await queue.get()
+
+    async def send(message):
+        if message["type"].startswith("lifespan.startup"):
+            startup_done.set()
+        elif message["type"].startswith("lifespan.shutdown"):
+            shutdown_done.set()
+
+    task = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, receive, send))
+    await startup_done.wait()
+    try:
+        yield
+    finally:
+        await queue.put({"type": "lifespan.shutdown"})
+        await shutdown_done.wait()
+        await task
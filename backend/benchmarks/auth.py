@@ -0,0 +1,81 @@
+"""Per-request cost of the authentication dependency.
+
+Sends ``--requests`` sequential requests to a cheap endpoint (``--path``)
+in three modes and reports throughput and time per request:
+
+* ``anonymous``: no token;
+* ``token_cached``: a valid bearer token, token and user caches warm;
+* ``token_uncached``: the same token with both caches disabled, i.e. a JWT
+  decode and a user SELECT on every request.
+
+::
+
+    python -m benchmarks.auth --scale tiny --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from .run import DEFAULT_DATABASE_URL
+
+BENCH_USER = "bench@example.test"  # seeded by benchmarks.seed
+
+
+async def measure(app, path: str, n: int) -> dict:
+    from app.core import auth
+    from app.core.config import settings
+    from app.utils.security import create_access_token
+    from .asgi import lifespan, request
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': BENCH_USER})}"}
+    modes = {
+        "anonymous": (None, False, True),
+        "token_cached": (headers, True, True),
+        "token_uncached": (headers, True, False),
+    }
+    results = {}
+    async with lifespan(app):
+        for mode, (mode_headers, required, cached) in modes.items():
+            settings.AUTH_REQUIRED = required
+            auth.token_cache.max_entries = settings.AUTH_TOKEN_CACHE_SIZE if cached else 0
+            settings.AUTH_USER_CACHE_TTL = 60 if cached else -1
+            auth.token_cache.clear()
+            auth.user_cache.clear()
+            for _ in range(20):  # warm-up, fills the caches
+                await request(app, "GET", path, headers=mode_headers)
+            start = time.perf_counter()
+            for _ in range(n):
+                response = await request(app, "GET", path, headers=mode_headers)
+                if response.status != 200:
+                    raise SystemExit(f"{mode}: GET {path} returned HTTP {response.status}")
+            elapsed = time.perf_counter() - start
+            results[mode] = {"requests_per_s": round(n / elapsed), "us_per_request": round(elapsed / n * 1e6, 1)}
+    return results
+
+
+def main(argv=None):
+    from .seed import add_volume_arguments, prepare, volumes_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    add_volume_arguments(parser)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--path", default="/api/metrics/", help="endpoint to call (cheap, so auth dominates)")
+    args = parser.parse_args(argv)
+
+    # Before prepare(): settings are read when the app's modules are imported
+    os.environ.setdefault("PDF_SQL_LOGGING", "false")
+    volumes = volumes_from_args(args)
+    prepare(args.database_url, volumes, args.reset, args.seed)
+    from app.main import app
+
+    results = asyncio.run(measure(app, args.path, args.requests))
+    base = results["anonymous"]["us_per_request"]
+    print(f"{'mode':<16}{'req/s':>9}{'us/req':>9}{'auth us':>9}")
+    for mode, r in results.items():
+        print(f"{mode:<16}{r['requests_per_s']:>9}{r['us_per_request']:>9.1f}{r['us_per_request'] - base:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Single-flight coalescing of identical concurrent requests.
+
+``--users`` concurrent requests for the same document (a shared invoice, a
+contract estimate, a saved estimate) and for the dashboard widgets, run with
+coalescing off and then on. Reports wall time, renders/queries actually run
+and the coalescing ratio per endpoint::
+
+    python -m benchmarks.coalescing --scale tiny --users 10
+    python -m benchmarks.coalescing --shared-dir /tmp/singleflight
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from .run import DEFAULT_DATABASE_URL
+
+ENDPOINTS = (
+    ("invoice", "pdf", "/api/pdf/invoice/1"),
+    ("estimate", "pdf", "/api/pdf/estimate/1"),
+    ("saved_estimate", "pdf", "/api/pdf/estimates/1"),
+    ("dashboard_stats", "dashboard", "/api/dashboard/stats"),
+    ("dashboard_activity", "dashboard", "/api/dashboard/recent-activity"),
+)
+
+
+async def measure(app, users: int) -> dict:
+    from app.core.config import settings
+    from app.core.singleflight import FLIGHTS
+    from app.pdf.cache import pdf_cache
+    from .asgi import lifespan, request
+
+    results = {}
+    async with lifespan(app):
+        for name, group, path in ENDPOINTS:
+            await request(app, "GET", path)  # warm-up outside the measurement
+            for enabled in (False, True):
+                settings.SINGLEFLIGHT_ENABLED = enabled
+                pdf_cache.clear()
+                before = FLIGHTS[group].stats()
+                start = time.perf_counter()
+                responses = await asyncio.gather(*(request(app, "GET", path) for _ in range(users)))
+                elapsed = time.perf_counter() - start
+                after = FLIGHTS[group].stats()
+                statuses = {r.status for r in responses}
+                if statuses != {200}:
+                    raise SystemExit(f"GET {path}: HTTP {sorted(statuses)}")
+                if len({r.body for r in responses}) != 1:
+                    raise SystemExit(f"GET {path}: concurrent responses differ")
+                results[(name, enabled)] = {
+                    "wall_ms": round(elapsed * 1000, 1),
+                    "executions": after["executions"] - before["executions"],
+                    "coalesced": after["coalesced"] - before["coalesced"],
+                }
+        metrics = (await request(app, "GET", "/api/metrics/")).json()
+    return {"results": results, "singleflight": metrics["singleflight"]}
+
+
+def main(argv=None):
+    from .seed import add_volume_arguments, prepare, volumes_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    add_volume_arguments(parser)
+    parser.add_argument("--users", type=int, default=10, help="concurrent identical requests per endpoint")
+    parser.add_argument("--shared-dir", help="also coalesce through this directory (cross-worker mode)")
+    args = parser.parse_args(argv)
+
+    # Before prepare(): settings are read when the app's modules are imported
+    os.environ.setdefault("PDF_SQL_LOGGING", "false")
+    if args.shared_dir:
+        os.environ["SINGLEFLIGHT_SHARED_DIR"] = args.shared_dir
+    volumes = volumes_from_args(args)
+    prepare(args.database_url, volumes, args.reset, args.seed)
+    from app.main import app
+
+    report = asyncio.run(measure(app, args.users))
+    print(f"{'endpoint':<20}{'off ms':>9}{'on ms':>9}{'runs off':>10}{'runs on':>9}{'coalesced':>11}")
+    for name, _, _ in ENDPOINTS:
+        off, on = report["results"][(name, False)], report["results"][(name, True)]
+        print(f"{name:<20}{off['wall_ms']:>9.1f}{on['wall_ms']:>9.1f}{off['executions']:>10}"
+              f"{on['executions']:>9}{on['coalesced']:>11}")
+    for group, stats in report["singleflight"].items():
+        print(f"{group}: coalescing ratio {stats['coalescing_ratio']} over {stats['calls']} calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Change events (``GET /api/events``) vs refetching the invoice list.
+
+Opens ``--subscribers`` SSE streams on the app, then updates factures one at
+a time and reports how long the ``change`` event takes to reach every
+stream, the write latency with those streams open, and the bytes a tab
+receives per change: the event plus the ``?since=`` delta of the invoice
+list, against a full ``GET /api/invoices/`` refetch::
+
+    python -m benchmarks.events --scale tiny --subscribers 50 --writes 50
+    python -m benchmarks.events --shared-dir /tmp/events   # cross-worker fan-out
+
+It then turns ``AUTH_REQUIRED`` on and checks that a stream opens with a
+ticket from ``POST /api/events/ticket`` (and gets events) but not without
+one, and that tickets and access tokens cannot stand in for each other.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from .metrics import summarize_ms
+from .run import DEFAULT_DATABASE_URL
+
+
+async def open_stream(app, path: str, chunks: asyncio.Queue, disconnect: asyncio.Event):
+    """Run a streaming GET on ``app``, putting each body chunk on ``chunks`` until ``disconnect``."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": [(b"host", b"bench.local")],
+        "client": ("127.0.0.1", 50000), "server": ("bench.local", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.put_nowait(message["body"])
+
+    await app(scope, receive, send)
+
+
+async def measure(app, subscribers: int, writes: int) -> dict:
+    from .asgi import lifespan, request
+
+    async with lifespan(app):
+        factures = (await request(app, "GET", "/api/factures/contract/1")).json()
+        if not factures:
+            raise SystemExit("contract 1 has no factures; seed with a larger --scale")
+        facture = factures[0]
+        full = await request(app, "GET", "/api/invoices/")
+        watermark = (await request(app, "GET", "/api/invoices/", params={"since": "0"})).json()["watermark"]
+
+        disconnect = asyncio.Event()
+        queues = [asyncio.Queue() for _ in range(subscribers)]
+        tasks = [asyncio.create_task(open_stream(app, "/api/events?entities=invoices,factures", q, disconnect))
+                 for q in queues]
+        for q in queues:
+            await q.get()  # the retry: preamble, i.e. subscribed
+
+        delivery, write_ms, event_bytes, delta_bytes = [], [], 0, 0
+        for i in range(writes):
+            start = time.perf_counter()
+            response = await request(app, "PUT", f"/api/factures/{facture['id']}",
+                                     json_body={"description": f"{facture['description'][:40]} #{i}"})
+            written = time.perf_counter()
+            if response.status != 200:
+                raise SystemExit(f"PUT facture: HTTP {response.status}")
+            # A write commits more than once (facture, then its invoice): drain every event of this write
+            received = [await q.get() for q in queues]
+            delivery.append(time.perf_counter() - written)
+            write_ms.append(written - start)
+            await asyncio.sleep(0.01)
+            for q in queues:
+                while not q.empty():
+                    q.get_nowait()
+            event_bytes += len(received[0])
+            delta = await request(app, "GET", "/api/invoices/", params={"since": watermark})
+            watermark = delta.json()["watermark"]
+            delta_bytes += len(delta.body)
+
+        disconnect.set()
+        await asyncio.gather(*tasks)
+    return {
+        "delivery": summarize_ms(delivery),
+        "write": summarize_ms(write_ms),
+        "event_bytes": event_bytes // max(writes, 1),
+        "delta_bytes": delta_bytes // max(writes, 1),
+        "refetch_bytes": len(full.body),
+    }
+
+
+async def check_auth(app) -> list:
+    """``(label, ok)`` for the stream authentication, with ``AUTH_REQUIRED`` on."""
+    from app.core.config import settings
+    from app.utils.security import create_access_token
+
+    from .asgi import lifespan, request
+    from .auth import BENCH_USER
+
+    token = create_access_token({"sub": BENCH_USER})
+    bearer = {"Authorization": f"Bearer {token}"}
+
+    async def status(method, path, **kwargs):
+        return (await asyncio.wait_for(request(app, method, path, **kwargs), 5)).status
+
+    required, settings.AUTH_REQUIRED = settings.AUTH_REQUIRED, True
+    checks = []
+    try:
+        async with lifespan(app):
+            checks.append(("stream without a ticket: 401", await status("GET", "/api/events") == 401))
+            ticket = (await request(app, "POST", "/api/events/ticket", headers=bearer)).json()["ticket"]
+            checks.append(("ticket minted with a ticket: 401",
+                           await status("POST", "/api/events/ticket", params={"ticket": ticket}) == 401))
+            checks.append(("ticket as a bearer token: 401", await status(
+                "GET", "/api/invoices/", headers={"Authorization": f"Bearer {ticket}"}) == 401))
+            checks.append(("access token as a ticket: 401",
+                           await status("GET", "/api/events", params={"ticket": token}) == 401))
+
+            factures = (await request(app, "GET", "/api/factures/contract/1", headers=bearer)).json()
+            disconnect, chunks = asyncio.Event(), asyncio.Queue()
+            stream = asyncio.create_task(open_stream(app, f"/api/events?entities=factures&ticket={ticket}",
+                                                     chunks, disconnect))
+            opened = b"retry:" in await asyncio.wait_for(chunks.get(), 5)
+            await request(app, "PUT", f"/api/factures/{factures[0]['id']}", headers=bearer,
+                          json_body={"description": f"{factures[0]['description'][:40]} (auth)"})
+            received = b"event: change" in await asyncio.wait_for(chunks.get(), 5)
+            checks.append(("stream with a ticket gets change events", opened and received))
+            disconnect.set()
+            await stream
+    finally:
+        settings.AUTH_REQUIRED = required
+    return checks
+
+
+def main(argv=None):
+    from .seed import add_volume_arguments, prepare, volumes_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    add_volume_arguments(parser)
+    parser.add_argument("--subscribers", type=int, default=50, help="open event streams")
+    parser.add_argument("--writes", type=int, default=50, help="facture updates")
+    parser.add_argument("--shared-dir", help="fan events out through this directory (cross-worker mode)")
+    args = parser.parse_args(argv)
+
+    # Before prepare(): settings are read when the app's modules are imported
+    os.environ.setdefault("PDF_SQL_LOGGING", "false")
+    if args.shared_dir:
+        os.environ["EVENTS_SHARED_DIR"] = args.shared_dir
+    prepare(args.database_url, volumes_from_args(args), args.reset, args.seed)
+    from app.main import app
+
+    report = asyncio.run(measure(app, args.subscribers, args.writes))
+    print(f"event delivery to {args.subscribers} streams: p50 {report['delivery']['p50_ms']} ms, "
+          f"p95 {report['delivery']['p95_ms']} ms")
+    print(f"facture update with the streams open: p50 {report['write']['p50_ms']} ms")
+    print(f"bytes per change: event {report['event_bytes']} + delta {report['delta_bytes']} "
+          f"vs full invoice refetch {report['refetch_bytes']}")
+
+    checks = asyncio.run(check_auth(app))
+    for label, ok in checks:
+        print(f"{'ok  ' if ok else 'FAIL'} {label}")
+    if not all(ok for _, ok in checks):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Golden-file check of byte-stable PDF output.
+
+Fixed payloads (a devis and a facture with explicit dates) are rendered per
+profile and their sha256 compared with ``benchmarks/golden/pdf_sha256.json``;
+seeded invoices and estimates are rendered twice and must come out
+byte-identical. Exits with status 1 on any difference::
+
+    python -m benchmarks.golden --scale tiny
+    python -m benchmarks.golden --update   # after an intended output change
+
+Hashes depend on the ReportLab and Pillow versions and, for the ``archive``
+profile, on the Liberation Sans files it embeds; all are recorded with them.
+A hash recorded with other versions or fonts is not compared (the render is
+still checked twice). After an upgrade, check the documents and run
+``--update``. ``test_pdf_golden.py`` runs the same checks under pytest.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+
+from .run import DEFAULT_DATABASE_URL, _devis_items
+
+GOLDEN_FILE = os.path.join(os.path.dirname(__file__), "golden", "pdf_sha256.json")
+PROFILES = ("screen", "email", "archive")
+
+
+def fixtures():
+    """``(name, method, path, params, body)`` of the documents with a golden hash."""
+    items = _devis_items(random.Random(0), n=25)
+    devis = {
+        "name": "",
+        "devis_number": "DEV-GOLDEN",
+        "creation_date": "2025-01-15",
+        "expiration": "2025-02-14",
+        "client": {
+            "name": "Client Golden",
+            "email": "golden@example.com",
+            "phone": "01 23 45 67 89",
+            "tva": "FR00123456789",
+            "tsa_number": "123 456 789 00012",
+            "client_address": "1 rue de la Paix, 75002 Paris",
+        },
+        "items": items,
+    }
+    facture = {
+        "id": 42,
+        "contract_id": 7,
+        "description": "Fourniture et pose tableau electrique",
+        "qty": 3,
+        "qty_unit": "unite",
+        "unit_price": 450.0,
+        "tva": 20.0,
+        "total_ht": 1350.0,
+        "client_name": "Client Golden",
+        "created_at": "2025-01-15T09:30:00",
+    }
+    for profile in PROFILES:
+        yield f"devis.{profile}", "POST", "/api/pdf/devis", {"profile": profile}, devis
+        yield f"facture.{profile}", "POST", "/api/pdf/facture", {"profile": profile}, facture
+
+
+def archive_fonts() -> str:
+    """Hash of the font files the archive profile embeds here; ``standard`` when there are none."""
+    from app.pdf.profiles import archive_font_files
+
+    files = archive_font_files()
+    if not files:
+        return "standard"
+    digest = hashlib.sha256()
+    for base_font in sorted(files):
+        with open(files[base_font], "rb") as fh:
+            digest.update(fh.read())
+    return digest.hexdigest()[:16]
+
+
+def versions() -> dict:
+    import PIL
+    import reportlab
+
+    return {"reportlab": reportlab.Version, "pillow": PIL.__version__, "archive_fonts": archive_fonts()}
+
+
+def load_golden() -> dict:
+    with open(GOLDEN_FILE) as fh:
+        return json.load(fh)
+
+
+def comparable(golden: dict, name: str) -> bool:
+    """Whether the recorded hash of ``name`` was made with the libraries (and fonts) used here."""
+    recorded, current = golden.get("versions", {}), versions()
+    keys = ("reportlab", "pillow", "archive_fonts") if name.endswith(".archive") else ("reportlab", "pillow")
+    return all(recorded.get(key) == current[key] for key in keys)
+
+
+async def check(app, n_contracts: int, update: bool) -> int:
+    from .asgi import lifespan, request
+
+    async def render(method, path, params=None, body=None) -> bytes:
+        response = await request(app, method, path, params=params, json_body=body)
+        if response.status != 200:
+            raise SystemExit(f"{method} {path}: HTTP {response.status}")
+        return response.body
+
+    failures = 0
+    hashes = {}
+    async with lifespan(app):
+        for name, method, path, params, body in fixtures():
+            first = await render(method, path, params, body)
+            second = await render(method, path, params, body)
+            hashes[name] = hashlib.sha256(first).hexdigest()
+            if first != second:
+                print(f"FAIL {name}: two renders differ")
+                failures += 1
+        for contract_id in sorted({1, (n_contracts + 1) // 2, n_contracts}):
+            for path in (f"/api/pdf/invoice/{contract_id}", f"/api/pdf/estimate/{contract_id}"):
+                if await render("GET", path) != await render("GET", path):
+                    print(f"FAIL {path}: two renders differ")
+                    failures += 1
+
+    if update:
+        os.makedirs(os.path.dirname(GOLDEN_FILE), exist_ok=True)
+        with open(GOLDEN_FILE, "w") as fh:
+            json.dump({"versions": versions(), "sha256": hashes}, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+        print(f"Golden hashes written to {GOLDEN_FILE}")
+        return failures
+
+    golden = load_golden()
+    if golden.get("versions") != versions():
+        print(f"note: golden hashes were recorded with {golden.get('versions')}, running {versions()}")
+    for name, digest in hashes.items():
+        expected = golden["sha256"].get(name)
+        if not comparable(golden, name):
+            print(f"skip {name}: recorded with other versions or fonts")
+        elif digest != expected:
+            print(f"FAIL {name}: sha256 {digest[:16]}... expected {(expected or 'nothing')[:16]}...")
+            failures += 1
+        else:
+            print(f"ok   {name}")
+    return failures
+
+
+def main(argv=None):
+    from .seed import add_volume_arguments, prepare, volumes_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    add_volume_arguments(parser)
+    parser.add_argument("--update", action="store_true", help="record the current hashes as the golden ones")
+    args = parser.parse_args(argv)
+
+    # Before prepare(): settings are read when the app's database module is imported
+    os.environ.setdefault("PDF_SQL_LOGGING", "false")
+    volumes = volumes_from_args(args)
+    prepare(args.database_url, volumes, args.reset, args.seed)
+    from app.main import app
+
+    failures = asyncio.run(check(app, volumes.clients * volumes.contracts_per_client, args.update))
+    if failures:
+        print(f"{failures} check(s) failed")
+        sys.exit(1)
+    print("All PDF outputs are byte-stable")
+
+
+if __name__ == "__main__":
+    main()
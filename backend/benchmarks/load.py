@@ -0,0 +1,365 @@
+"""Concurrency / load-test harness.
+
+Simulates many staff members at once with scripted user journeys:
+
+* ``balance``: open the Balance page (invoices, clients and contracts in parallel)
+* ``add_facture``: add a facture line to a shared "hot" contract, then reload its lines
+* ``print_invoice``: render an invoice PDF
+* ``print_devis``: render a devis PDF from a payload
+
+Each virtual user picks journeys at random (weighted by ``--mix``) until the
+run ends. The target is either the app in-process (default, fully offline) or
+a running server given with ``--url``::
+
+    python -m benchmarks.load --users 20 --duration 30
+    python -m benchmarks.load --url http://127.0.0.1:8000 --database-url mysql+pymysql://... --users 50
+
+The report gives throughput, latency percentiles and error rates per
+operation, timings and lock/deadlock failures of ``crud.create_facture``
+(in-process only) and the database's own lock wait / deadlock counters
+(MySQL/InnoDB) sampled before and after the run.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlencode
+
+from .metrics import max_rss_kb, summarize_ms
+from .run import DEFAULT_DATABASE_URL, RESULTS_DIR, git_revision, redact
+
+DEFAULT_MIX = "balance=3,add_facture=4,print_invoice=3,print_devis=1"
+
+# MySQL error codes and SQLite messages that mean "blocked by another writer"
+LOCK_WAIT_CODES = {1205}
+DEADLOCK_CODES = {1213}
+
+
+def classify_error(exc) -> str:
+    """Map a database exception to lock_wait / deadlock / pool_timeout / error."""
+    from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeout
+
+    if isinstance(exc, PoolTimeout):
+        return "pool_timeout"
+    if isinstance(exc, DBAPIError):
+        orig = getattr(exc, "orig", None)
+        code = orig.args[0] if orig is not None and orig.args and isinstance(orig.args[0], int) else None
+        if code in DEADLOCK_CODES:
+            return "deadlock"
+        if code in LOCK_WAIT_CODES:
+            return "lock_wait"
+        message = str(orig or exc).lower()
+        if "deadlock" in message:
+            return "deadlock"
+        if "database is locked" in message or "lock wait timeout" in message:
+            return "lock_wait"
+    return "error"
+
+
+class Stats:
+    """Thread-safe collector of per-operation latencies and outcomes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(lambda: defaultdict(int))
+
+    def record(self, op: str, seconds: float, outcome):
+        with self._lock:
+            self.latencies[op].append(seconds)
+            self.outcomes[op][str(outcome)] += 1
+
+    def report(self, elapsed: float) -> dict:
+        out = {}
+        for op in sorted(self.latencies):
+            samples = self.latencies[op]
+            outcomes = dict(self.outcomes[op])
+            failures = sum(n for k, n in outcomes.items() if not (k.startswith("2") or k == "ok"))
+            entry = summarize_ms(samples)
+            entry.update({
+                "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0,
+                "error_rate": round(failures / len(samples), 4) if samples else 0,
+                "outcomes": outcomes,
+            })
+            out[op] = entry
+        return out
+
+
+def instrument_create_facture(stats: Stats):
+    """Wrap ``crud.create_facture`` to time it and classify its failures."""
+    from app import crud
+
+    original = crud.create_facture
+
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            return original(*args, **kwargs)
+        except ValueError:
+            outcome = "rejected"
+            raise
+        except Exception as exc:
+            outcome = classify_error(exc)
+            raise
+        finally:
+            stats.record("crud.create_facture", time.perf_counter() - start, outcome)
+
+    crud.create_facture = timed
+    return lambda: setattr(crud, "create_facture", original)
+
+
+def innodb_lock_counters(engine) -> dict:
+    """Row lock waits and deadlocks from InnoDB, or ``{}`` on other databases."""
+    if engine.dialect.name != "mysql":
+        return {}
+    from sqlalchemy import text
+
+    counters = {}
+    try:
+        with engine.connect() as conn:
+            for name, value in conn.execute(text(
+                "SHOW GLOBAL STATUS WHERE Variable_name IN "
+                "('Innodb_row_lock_waits', 'Innodb_row_lock_time', 'Innodb_row_lock_current_waits')"
+            )):
+                counters[name.lower()] = int(value)
+            row = conn.execute(text(
+                "SELECT COUNT FROM information_schema.INNODB_METRICS WHERE NAME = 'lock_deadlocks'"
+            )).first()
+            if row is not None:
+                counters["innodb_deadlocks"] = int(row[0])
+    except Exception as exc:
+        counters["error"] = str(exc)
+    return counters
+
+
+class InProcessTarget:
+    def __init__(self, app):
+        self.app = app
+
+    async def send(self, method, path, params=None, json_body=None):
+        from .asgi import request
+
+        response = await request(self.app, method, path, params=params, json_body=json_body)
+        return response.status, response.body
+
+
+class HttpTarget:
+    def __init__(self, base_url: str, workers: int, timeout: float):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def _send_blocking(self, method, path, params, json_body):
+        url = self.base_url + path + (f"?{urlencode(params, doseq=True)}" if params else "")
+        data, headers = None, {}
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        req = urllib.request.Request(url, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return resp.status, resp.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.read()
+        except Exception as exc:
+            return type(exc).__name__, b""
+
+    async def send(self, method, path, params=None, json_body=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._send_blocking, method, path, params, json_body)
+
+
+def _facture_line(rng, contract_id):
+    qty, unit_price, tva = rng.randint(1, 5), round(rng.uniform(5, 200), 2), 20.0
+    return {
+        "contract_id": contract_id,
+        "description": f"Ligne saisie {rng.randint(1, 10**6)}",
+        "qty": qty,
+        "qty_unit": "unite",
+        "unit_price": unit_price,
+        "tva": tva,
+        "total_ht": round(qty * unit_price * (1 + tva / 100), 2),
+    }
+
+
+class Journeys:
+    def __init__(self, target, stats: Stats, ctx: dict):
+        self.target = target
+        self.stats = stats
+        self.ctx = ctx
+
+    async def step(self, op, method, path, params=None, json_body=None):
+        start = time.perf_counter()
+        status, _ = await self.target.send(method, path, params, json_body)
+        self.stats.record(op, time.perf_counter() - start, status)
+        return status
+
+    async def balance(self, rng):
+        # The page fires these three requests in parallel on mount
+        await asyncio.gather(
+            self.step("GET /invoices", "GET", "/api/invoices/"),
+            self.step("GET /clients", "GET", "/api/clients/"),
+            self.step("GET /contracts", "GET", "/api/contracts/"),
+        )
+
+    async def add_facture(self, rng):
+        contract_id = self.ctx["hot_contract_id"]
+        await self.step("POST /factures", "POST", "/api/factures/", json_body=_facture_line(rng, contract_id))
+        await self.step("GET /factures/contract", "GET", f"/api/factures/contract/{contract_id}")
+
+    async def print_invoice(self, rng):
+        # Mostly the shared invoice, sometimes a random one
+        invoice_id = self.ctx["hot_invoice_id"] if rng.random() < 0.5 else rng.randint(1, self.ctx["contracts"])
+        await self.step("GET /pdf/invoice", "GET", f"/api/pdf/invoice/{invoice_id}")
+
+    async def print_devis(self, rng):
+        items = [{
+            "description": f"Fourniture {i}", "qty": 2, "qty_unit": "unite",
+            "unit_price": 100.0, "tva": 20.0, "total_ht": 200.0,
+        } for i in range(rng.randint(5, 40))]
+        await self.step("POST /pdf/devis", "POST", "/api/pdf/devis", json_body={
+            "name": "Devis 001 - Client Charge", "client": {"name": "Client Charge"}, "items": items,
+        })
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        if part.strip():
+            name, _, weight = part.partition("=")
+            mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+async def run_load(target, stats, ctx, mix, users, duration, ramp, think_ms, seed_value):
+    journeys = Journeys(target, stats, ctx)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    for name in names:
+        if not hasattr(journeys, name):
+            raise SystemExit(f"unknown journey: {name}")
+    deadline = time.perf_counter() + ramp + duration
+
+    async def user(index):
+        rng = random.Random(seed_value + index)
+        await asyncio.sleep(ramp * index / max(users, 1))
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            await getattr(journeys, name)(rng)
+            stats.record(f"journey:{name}", time.perf_counter() - start, "ok")
+            if think_ms:
+                await asyncio.sleep(rng.uniform(0, think_ms) / 1000.0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(users)))
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    from .seed import add_volume_arguments, describe, prepare, volumes_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--url", help="base URL of a running server (default: drive the app in-process)")
+    add_volume_arguments(parser)
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of steady load")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which users start")
+    parser.add_argument("--think-ms", type=float, default=50.0, help="max random pause between journeys")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"journey weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--timeout", type=float, default=60.0, help="HTTP timeout in --url mode")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/load_<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    volumes = volumes_from_args(args)
+    engine, _ = prepare(args.database_url, volumes, args.reset, args.seed)
+
+    n_contracts = volumes.clients * volumes.contracts_per_client
+    # The seeded benchmark contract (and its invoice) is the shared hot row
+    ctx = {"contracts": n_contracts, "hot_contract_id": n_contracts + 1, "hot_invoice_id": n_contracts + 1}
+    mix = parse_mix(args.mix)
+    stats = Stats()
+    restore = None
+
+    if args.url:
+        target = HttpTarget(args.url, workers=args.users * 3, timeout=args.timeout)
+    else:
+        from app.main import app
+
+        target = InProcessTarget(app)
+        restore = instrument_create_facture(stats)
+
+    async def go():
+        if args.url:
+            return await run_load(target, stats, ctx, mix, args.users, args.duration, args.ramp, args.think_ms, args.seed)
+        from .asgi import lifespan
+
+        async with lifespan(target.app):
+            return await run_load(target, stats, ctx, mix, args.users, args.duration, args.ramp, args.think_ms, args.seed)
+
+    locks_before = innodb_lock_counters(engine)
+    try:
+        elapsed = asyncio.run(go())
+    finally:
+        if restore:
+            restore()
+    locks_after = innodb_lock_counters(engine)
+
+    operations = stats.report(elapsed)
+    lock_failures = defaultdict(int)
+    for entry in operations.values():
+        for outcome, n in entry["outcomes"].items():
+            if outcome in ("lock_wait", "deadlock", "pool_timeout"):
+                lock_failures[outcome] += n
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "git_revision": git_revision(),
+            "target": args.url or "in-process",
+            "database_url": redact(args.database_url),
+            "volumes": describe(volumes),
+            "users": args.users,
+            "duration_s": round(elapsed, 2),
+            "mix": mix,
+            "max_rss_kb": max_rss_kb(),
+        },
+        "operations": operations,
+        "lock_failures": dict(lock_failures),
+        "database_lock_counters": {
+            key: locks_after[key] - locks_before.get(key, 0)
+            for key in locks_after if isinstance(locks_after[key], int)
+        },
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, "load_" + datetime.utcnow().strftime("%Y%m%d_%H%M%S") + ".json")
+    with open(output, "w") as fh:
+        json.dump(report, fh, indent=2)
+
+    header = f"{'operation':<28}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}  outcomes"
+    print(header)
+    print("-" * len(header))
+    for op, r in operations.items():
+        print(f"{op:<28}{r['throughput_rps']:>9.2f}{r.get('p50_ms', 0):>10.1f}{r.get('p95_ms', 0):>10.1f}"
+              f"{r.get('p99_ms', 0):>10.1f}{r['error_rate']:>9.1%}  {r['outcomes']}")
+    print(f"\nLock failures: {report['lock_failures'] or 'none'}")
+    if report["database_lock_counters"]:
+        print(f"InnoDB counters during run: {report['database_lock_counters']}")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Memory and time of long documents rendered with NumberedCanvas.
+
+Draws synthetic table pages (no database needed) and reports the Python
+heap peak (tracemalloc) for increasing page counts; the per-page cost should
+stay flat as documents grow::
+
+    python -m benchmarks.pdf_memory
+    python -m benchmarks.pdf_memory --pages 10,100,500,1000 --lines 45
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from io import BytesIO
+
+
+def render(pages: int, lines_per_page: int) -> bytes:
+    from reportlab.lib.pagesizes import letter
+    from app.pdf.canvas import NumberedCanvas
+
+    buffer = BytesIO()
+    p = NumberedCanvas(buffer, pagesize=letter, footer_left="NEXT NR-GIE benchmark", doc_number="BENCH-001")
+    for page in range(pages):
+        y = 750
+        p.setFont("Helvetica-Bold", 12)
+        p.drawString(40, y, f"Page {page + 1}")
+        p.setFont("Helvetica", 9)
+        for line in range(lines_per_page):
+            y -= 14
+            p.drawString(40, y, f"Ligne {line + 1} fourniture et pose materiel electrique")
+            p.drawRightString(450, y, f"{(line + 1) * 12.5:.2f} €")
+            p.line(40, y - 3, 550, y - 3)
+        if page < pages - 1:
+            p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def measure(pages: int, lines_per_page: int) -> dict:
+    render(1, lines_per_page)  # imports and font setup outside the measurement
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        size = len(render(pages, lines_per_page))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    elapsed = time.perf_counter() - start
+    return {
+        "pages": pages,
+        "seconds": round(elapsed, 3),
+        "peak_kb": round(peak / 1024, 1),
+        "peak_kb_per_page": round(peak / 1024 / pages, 2),
+        "pdf_kb": round(size / 1024, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="10,100,500", help="comma separated page counts")
+    parser.add_argument("--lines", type=int, default=45, help="table lines per page")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = [measure(int(n), args.lines) for n in args.pages.split(",")]
+    print(f"{'pages':>6}{'seconds':>10}{'peak KiB':>12}{'KiB/page':>10}{'PDF KiB':>10}")
+    for r in results:
+        print(f"{r['pages']:>6}{r['seconds']:>10.3f}{r['peak_kb']:>12.1f}{r['peak_kb_per_page']:>10.2f}{r['pdf_kb']:>10.1f}")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
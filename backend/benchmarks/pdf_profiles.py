@@ -0,0 +1,97 @@
+"""Size and render time of the PDF output profiles.
+
+Renders the same representative documents (seeded invoices and contract
+estimates, plus a 20-line devis) once per profile through the app and
+reports mean bytes and latency per profile and document type::
+
+    python -m benchmarks.pdf_profiles --scale small
+    python -m benchmarks.pdf_profiles --profiles screen,email --documents 20 --output profiles.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from .metrics import summarize_ms
+from .run import DEFAULT_DATABASE_URL, _devis_items
+
+
+def _documents(rng, n_contracts: int, count: int):
+    ids = rng.sample(range(1, n_contracts + 1), min(count, n_contracts))
+    docs = [("invoice", "GET", f"/api/pdf/invoice/{i}", None) for i in ids]
+    docs += [("estimate", "GET", f"/api/pdf/estimate/{i}", None) for i in ids]
+    docs.append(("devis", "POST", "/api/pdf/devis", {
+        "name": "Devis benchmark",
+        "devis_number": "DEV-BENCH",
+        "client": {"name": "Client Benchmark", "email": "bench@example.com"},
+        "items": _devis_items(rng),
+    }))
+    return docs
+
+
+async def measure(app, profiles, documents, rounds: int) -> dict:
+    from .asgi import lifespan, request
+
+    results = {}
+    async with lifespan(app):
+        for profile in profiles:
+            per_kind = {}
+            for kind, method, path, body in documents:
+                # First render warms the profile (logo resampling, font registration)
+                await request(app, method, path, params={"profile": profile}, json_body=body)
+                for _ in range(rounds):
+                    start = time.perf_counter()
+                    response = await request(app, method, path, params={"profile": profile}, json_body=body)
+                    elapsed = time.perf_counter() - start
+                    if response.status != 200:
+                        raise SystemExit(f"{method} {path}?profile={profile}: HTTP {response.status}")
+                    entry = per_kind.setdefault(kind, {"bytes": [], "seconds": []})
+                    entry["bytes"].append(len(response.body))
+                    entry["seconds"].append(elapsed)
+            results[profile] = {
+                kind: {
+                    "documents": len(entry["bytes"]),
+                    "mean_bytes": round(sum(entry["bytes"]) / len(entry["bytes"])),
+                    **{k: v for k, v in summarize_ms(entry["seconds"]).items() if k in ("p50_ms", "p95_ms")},
+                }
+                for kind, entry in per_kind.items()
+            }
+    return results
+
+
+def main(argv=None):
+    from .seed import add_volume_arguments, prepare, volumes_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    add_volume_arguments(parser)
+    parser.add_argument("--profiles", default="screen,email,archive")
+    parser.add_argument("--documents", type=int, default=10, help="invoices and estimates rendered per profile")
+    parser.add_argument("--rounds", type=int, default=3, help="timed renders per document")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    # Before prepare(): settings are read when the app's database module is imported
+    os.environ.setdefault("PDF_SQL_LOGGING", "false")
+    volumes = volumes_from_args(args)
+    prepare(args.database_url, volumes, args.reset, args.seed)
+    from app.main import app
+
+    rng = random.Random(args.seed)
+    documents = _documents(rng, volumes.clients * volumes.contracts_per_client, args.documents)
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    results = asyncio.run(measure(app, profiles, documents, args.rounds))
+
+    print(f"{'profile':<10}{'document':<10}{'mean KiB':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for profile, kinds in results.items():
+        for kind, r in kinds.items():
+            print(f"{profile:<10}{kind:<10}{r['mean_bytes'] / 1024:>10.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""ORM instances vs column-projected read models for the list endpoints.
+
+Loads each list both ways, as the endpoints did before (``db.query(Model)``
+plus relationship access) and through ``app.crud.read_models``, validates
+the rows with the endpoint's response schema and reports time and Python
+heap peak (tracemalloc), normalised per 10k rows::
+
+    python -m benchmarks.read_models --scale small
+    python -m benchmarks.read_models --scale medium --repeat 3
+"""
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, lazyload
+
+from .run import DEFAULT_DATABASE_URL
+
+
+def _orm_contracts(db):
+    from app.models import Contract
+
+    rows = db.query(Contract).options(lazyload(Contract.client)).all()
+    for row in rows:
+        row.client  # lazy load per contract, as ContractOut serialization did
+    return rows
+
+
+def _orm_invoices(db):
+    from app.models import Contract, Invoice
+
+    return (
+        db.query(Invoice)
+        .options(joinedload(Invoice.contract).joinedload(Contract.client), joinedload(Invoice.factures))
+        .all()
+    )
+
+
+def _orm_estimates(db):
+    from app.models import Client, Estimate
+
+    rows = db.query(Estimate).all()
+    for row in rows:
+        db.query(Client).filter(Client.id == row.client_id).first()
+    return rows
+
+
+def _dto_factures(db):
+    from app.crud.read_models import FACTURE_COLUMNS, FactureRow
+
+    return [FactureRow._make(row) for row in db.execute(select(*FACTURE_COLUMNS))]
+
+
+def scenarios():
+    from app.crud import read_models
+    from app.models import Client, Facture
+    from app.schemas.client import ClientOut
+    from app.schemas.contract import ContractOut
+    from app.schemas.estimate import EstimateOut
+    from app.schemas.facture import Facture as FactureOut
+    from app.schemas.invoice import InvoiceOut
+
+    return {
+        "clients": (ClientOut, lambda db: db.query(Client).all(), read_models.list_clients),
+        "contracts": (ContractOut, _orm_contracts, read_models.list_contracts),
+        "invoices": (InvoiceOut, _orm_invoices, None),
+        "estimates": (EstimateOut, _orm_estimates, read_models.list_estimates),
+        "factures": (FactureOut, lambda db: db.query(Facture).all(), _dto_factures),
+    }
+
+
+def _invoice_dicts(rows):
+    # The old endpoint built one dict per invoice from the loaded graph
+    return [
+        {
+            "id": i.id, "invoice_number": i.invoice_number, "contract_id": i.contract_id,
+            "amount": float(sum((f.total_ht or 0.0) for f in i.factures)), "due_date": i.due_date,
+            "status": i.status or "unpaid", "paid_amount": float(i.paid_amount or 0.0),
+            "created_at": i.created_at,
+            "client_id": i.contract.client.id if i.contract and i.contract.client else None,
+            "client_name": i.contract.client.client_name if i.contract and i.contract.client else None,
+            "contract_number": i.contract.command_number if i.contract else None,
+        }
+        for i in rows
+    ]
+
+
+def measure(load, schema, name: str, mode: str) -> dict:
+    from pydantic import TypeAdapter
+    from app.core.database import SessionLocal
+
+    adapter = TypeAdapter(List[schema])
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with SessionLocal() as db:
+            rows = load(db)
+            if name == "invoices" and mode == "orm":
+                rows = _invoice_dicts(rows)
+            adapter.validate_python(rows, from_attributes=True)
+            count = len(rows)
+            _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    elapsed = time.perf_counter() - start
+    per = 10_000 / count if count else 0.0
+    return {
+        "rows": count,
+        "ms_per_10k": round(elapsed * 1000 * per, 1),
+        "peak_kb_per_10k": round(peak / 1024 * per, 1),
+    }
+
+
+def main(argv=None):
+    from .seed import add_volume_arguments, prepare, volumes_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    add_volume_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per list and mode (best is kept)")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("PDF_SQL_LOGGING", "false")
+    prepare(args.database_url, volumes_from_args(args), args.reset, args.seed)
+    from app.crud import read_models
+
+    print(f"{'list':<11}{'rows':>8}{'ORM ms':>9}{'DTO ms':>9}{'ORM KiB':>10}{'DTO KiB':>10}   (per 10k rows)")
+    for name, (schema, orm, dto) in scenarios().items():
+        dto = dto or read_models.list_invoices
+        best = {}
+        for mode, load in (("orm", orm), ("dto", dto)):
+            runs = [measure(load, schema, name, mode) for _ in range(args.repeat)]
+            best[mode] = min(runs, key=lambda r: r["ms_per_10k"])
+            best[mode]["peak_kb_per_10k"] = min(r["peak_kb_per_10k"] for r in runs)
+        print(f"{name:<11}{best['dto']['rows']:>8}{best['orm']['ms_per_10k']:>9.1f}{best['dto']['ms_per_10k']:>9.1f}"
+              f"{best['orm']['peak_kb_per_10k']:>10.0f}{best['dto']['peak_kb_per_10k']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
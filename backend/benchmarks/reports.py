@@ -0,0 +1,170 @@
+"""Monthly report from the rollup tables vs aggregating the factures and invoices.
+
+Times ``GET /api/reports/monthly`` over the whole history, for all clients
+and for one, against reading ``factures`` and ``invoices`` (archive included)
+to compute the same figures. It then writes through the API (facture create, update and
+delete, a payment, a contract moved to another client, an invoice deleted
+with its factures, archiving) and checks after each write that the
+incrementally maintained report still equals the scan::
+
+    python -m benchmarks.reports --scale small
+    python -m benchmarks.reports --scale medium --repeat 5
+"""
+import argparse
+import asyncio
+import os
+import time
+from collections import defaultdict
+
+from .metrics import summarize_ms
+from .run import DEFAULT_DATABASE_URL
+
+START = "2000-01"
+FIGURES = ("total_ht", "total_tva", "invoices", "invoiced", "paid", "outstanding")
+
+
+def scan(db) -> dict:
+    """``{(month, client_id): figures}`` aggregated from the source rows, as without rollups."""
+    from sqlalchemy import select
+
+    from app.crud.archive import all_factures, all_invoices
+    from app.models import Contract
+
+    totals = defaultdict(lambda: dict.fromkeys(FIGURES, 0.0))
+    factures, invoices = all_factures(), all_invoices()
+    for created_at, client_id, tva, total_ht in db.execute(
+        select(factures.c.created_at, Contract.client_id, factures.c.tva, factures.c.total_ht)
+        .join(Contract, Contract.id == factures.c.contract_id)
+    ):
+        figures = totals[(created_at.strftime("%Y-%m"), client_id)]
+        figures["total_ht"] += total_ht
+        figures["total_tva"] += total_ht * tva / 100
+    for created_at, client_id, amount, paid in db.execute(
+        select(invoices.c.created_at, Contract.client_id, invoices.c.amount, invoices.c.paid_amount)
+        .join(Contract, Contract.id == invoices.c.contract_id)
+    ):
+        figures = totals[(created_at.strftime("%Y-%m"), client_id)]
+        paid = float(paid or 0)
+        figures["invoices"] += 1
+        figures["invoiced"] += amount
+        figures["paid"] += paid
+        figures["outstanding"] += max(amount - paid, 0)
+    return totals
+
+
+def flatten(report: dict) -> dict:
+    return {
+        (month["month"], client["client_id"]): {name: client[name] for name in FIGURES}
+        for month in report["months"] for client in month["clients"]
+    }
+
+
+def differences(report: dict, scanned: dict) -> list:
+    found = flatten(report)
+    problems = []
+    for key in sorted(set(found) | set(scanned)):
+        a, b = found.get(key, dict.fromkeys(FIGURES, 0.0)), scanned.get(key, dict.fromkeys(FIGURES, 0.0))
+        for name in FIGURES:
+            if abs(a[name] - b[name]) > 0.011:
+                problems.append(f"{key} {name}: rollup {a[name]} vs scan {b[name]:.2f}")
+    return problems
+
+
+async def measure(app, repeat: int) -> dict:
+    from app.core.database import SessionLocal
+    from app.jobs.archive import run as archive
+
+    from .asgi import lifespan, request
+
+    async def report(**params):
+        params = {"start": START, "by_client": "true", **params}
+        response = await request(app, "GET", "/api/reports/monthly", params=params)
+        if response.status != 200:
+            raise SystemExit(f"GET /api/reports/monthly: HTTP {response.status} {response.body[:200]}")
+        return response.json()
+
+    async def call(method, path, body=None, expect=(200, 201, 204)):
+        response = await request(app, method, path, json_body=body)
+        if response.status not in expect:
+            raise SystemExit(f"{method} {path}: HTTP {response.status} {response.body[:200]}")
+        return response.json() if response.body else None
+
+    def scanned():
+        with SessionLocal() as db:
+            return scan(db)
+
+    checks = []
+
+    async def check(label):
+        problems = differences(await report(), scanned())
+        checks.append((label, problems))
+
+    async with lifespan(app):
+        timings = {"all": [], "client": [], "scan": []}
+        for _ in range(repeat):
+            for name, params in (("all", {"by_client": "false"}), ("client", {"client_id": 1})):
+                start = time.perf_counter()
+                await report(**params)
+                timings[name].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            scanned()
+            timings["scan"].append(time.perf_counter() - start)
+        await check("seeded")
+
+        contract = (await call("POST", "/api/contracts/", {
+            "command_number": "BENCH-REPORT", "price": 10_000_000, "date": "2026-01-01",
+            "deadline": "2027-01-01", "client_id": 1,
+        }))
+        facture = await call("POST", "/api/factures/", {
+            "contract_id": contract["id"], "description": "Report check", "qty": 2, "unit_price": 50.0,
+            "tva": 20.0, "total_ht": 120.0,
+        })
+        await check("facture created")
+        await call("PUT", f"/api/factures/{facture['id']}", {"qty": 4, "unit_price": 50.0, "total_ht": 220.0, "tva": 10.0})
+        await check("facture updated")
+        second = await call("POST", "/api/factures/", {
+            "contract_id": contract["id"], "description": "Report check 2", "qty": 1, "unit_price": 30.0,
+            "tva": 5.5, "total_ht": 31.65,
+        })
+        await call("DELETE", f"/api/factures/{second['id']}")
+        await check("facture deleted")
+        await call("PUT", f"/api/invoices/{facture['invoice_id']}", {"paid_amount": 120.0})
+        await check("payment")
+        await call("PUT", f"/api/contracts/{contract['id']}", {**contract, "client_id": 2})
+        await check("contract moved to another client")
+        await call("DELETE", f"/api/invoices/{facture['invoice_id']}")
+        await check("invoice deleted with its factures")
+        await asyncio.to_thread(archive, 0, 500)
+        await check("archived")
+    return {**{name: summarize_ms(samples) for name, samples in timings.items()}, "checks": checks}
+
+
+def main(argv=None):
+    from .seed import add_volume_arguments, prepare, volumes_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    add_volume_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=10, help="report requests and scans timed")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("PDF_SQL_LOGGING", "false")
+    prepare(args.database_url, volumes_from_args(args), args.reset, args.seed)
+    from app.main import app
+
+    report = asyncio.run(measure(app, args.repeat))
+    for name, label in (("all", "report, every month"), ("client", "report, one client"),
+                        ("scan", "reading factures and invoices")):
+        print(f"{label:32} p50 {report[name]['p50_ms']} ms, p95 {report[name]['p95_ms']} ms")
+    failed = False
+    for label, problems in report["checks"]:
+        print(f"{'ok  ' if not problems else 'FAIL'} {label}")
+        for problem in problems[:5]:
+            print(f"     {problem}")
+        failed = failed or bool(problems)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""Benchmark runner for the API and PDF hot paths.
+
+Seeds a database with synthetic data (see ``benchmarks/seed.py``), then drives
+the FastAPI app in-process through a fixed set of scenarios and reports, per
+scenario, p50/p95 latency, SQL statements per request and peak Python memory.
+Results are written as JSON so runs can be compared over time::
+
+    python -m benchmarks.run --scale small
+    python -m benchmarks.run --scale large --reset --database-url mysql+pymysql://root:@localhost/bench
+    python -m benchmarks.run --only pdf_invoice,list_invoices --baseline benchmarks/results/<old>.json
+    python -m benchmarks.run --scale tiny --only pdf_invoice,pdf_estimate --check
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from .metrics import QueryCounter, max_rss_kb, summarize_ms
+
+DEFAULT_DATABASE_URL = "sqlite:///./bench.db"
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable  # (rng, ctx) -> (method, path, params, json_body)
+    iterations: int = 30
+    heavy: bool = False  # heavy scenarios run fewer iterations by default
+    max_queries: Optional[int] = None  # SQL budget per request, enforced with --check
+
+
+def _devis_items(rng, n=20):
+    items = []
+    for i in range(n):
+        qty, unit_price = rng.randint(1, 20), round(rng.uniform(10, 900), 2)
+        items.append({
+            "description": f"Ligne {i + 1} fourniture et pose materiel electrique",
+            "qty": qty,
+            "qty_unit": "unite",
+            "unit_price": unit_price,
+            "tva": 20.0,
+            "total_ht": round(qty * unit_price, 2),
+        })
+    return items
+
+
+def _devis_query(items):
+    params = {"devis_number": "DEV-BENCH", "creation_date": "2025-01-15", "client[name]": "Client Benchmark"}
+    for i, item in enumerate(items):
+        for key, value in item.items():
+            params[f"items[{i}][{key}]"] = value
+    return params
+
+
+SCENARIOS = [
+    Scenario("list_invoices", lambda rng, ctx: ("GET", "/api/invoices/", None, None), heavy=True, max_queries=1),
+    Scenario("list_clients", lambda rng, ctx: ("GET", "/api/clients/", None, None), heavy=True, max_queries=1),
+    Scenario("list_client_names_page", lambda rng, ctx: (
+        "GET", "/api/clients/", {"fields": "id,client_name", "sort": "client_name", "limit": 50}, None), max_queries=1),
+    Scenario("sync_invoices", lambda rng, ctx: (
+        "GET", "/api/invoices/", {"since": (datetime.utcnow() - timedelta(minutes=1)).isoformat() + "Z"}, None),
+        max_queries=3),
+    Scenario("list_contracts", lambda rng, ctx: ("GET", "/api/contracts/", None, None), heavy=True, max_queries=1),
+    Scenario("get_contract", lambda rng, ctx: (
+        "GET", f"/api/contracts/{rng.randint(1, ctx['contracts'])}", None, None), max_queries=1),
+    Scenario("bootstrap_balance", lambda rng, ctx: ("GET", "/api/bootstrap/balance", None, None),
+             heavy=True, max_queries=1),
+    Scenario("bootstrap_factures", lambda rng, ctx: ("GET", "/api/bootstrap/factures", None, None),
+             heavy=True, max_queries=3),
+    Scenario("bootstrap_devis", lambda rng, ctx: ("GET", "/api/bootstrap/devis", None, None),
+             heavy=True, max_queries=4),
+    Scenario("create_facture", lambda rng, ctx: ("POST", "/api/factures/", None, {
+        "contract_id": ctx["bench_contract_id"],
+        "description": "Benchmark line",
+        "qty": 1,
+        "qty_unit": "unite",
+        "unit_price": 10.0,
+        "tva": 20.0,
+        "total_ht": 12.0,
+    })),
+    Scenario("dashboard_stats", lambda rng, ctx: ("GET", "/api/dashboard/stats", None, None)),
+    # Read from the rollup tables: queued months check, revenue, receivables
+    Scenario("report_monthly", lambda rng, ctx: ("GET", "/api/reports/monthly", None, None), max_queries=3),
+    Scenario("report_monthly_by_client", lambda rng, ctx: (
+        "GET", "/api/reports/monthly", {"start": "2000-01", "by_client": "true"}, None), heavy=True, max_queries=3),
+    # Aging: the data watermark, then the grouped query on a miss (one query on a hit)
+    Scenario("report_aging", lambda rng, ctx: ("GET", "/api/reports/aging", None, None), max_queries=2),
+    Scenario("report_aging_client", lambda rng, ctx: (
+        "GET", f"/api/reports/aging/{rng.randint(1, 5)}", None, None), max_queries=3),
+    Scenario("dashboard_recent_activity", lambda rng, ctx: ("GET", "/api/dashboard/recent-activity", None, None)),
+    Scenario("dashboard_contract_growth", lambda rng, ctx: ("GET", "/api/dashboard/contract-growth", None, None)),
+    # PDF documents are loaded by app.pdf.loaders: a joined header query plus the lines
+    # (invoices first look for an issue snapshot, hence 3)
+    Scenario("pdf_invoice", lambda rng, ctx: (
+        "GET", f"/api/pdf/invoice/{rng.randint(1, ctx['contracts'] - 1)}", None, None), max_queries=3),
+    # Issued invoice: one snapshot lookup, the PDF comes from the document store
+    Scenario("pdf_invoice_issued", lambda rng, ctx: (
+        "GET", f"/api/pdf/invoice/{ctx['issued_invoice_id']}", None, None), max_queries=1),
+    Scenario("pdf_estimate", lambda rng, ctx: (
+        "GET", f"/api/pdf/estimate/{rng.randint(1, ctx['contracts'])}", None, None), max_queries=2),
+    Scenario("pdf_saved_estimate", lambda rng, ctx: (
+        "GET", f"/api/pdf/estimates/{rng.randint(1, ctx['estimates'])}", None, None), max_queries=2),
+    Scenario("pdf_facture_by_contract", lambda rng, ctx: (
+        "GET", f"/api/pdf/facture/{rng.randint(1, ctx['contracts'])}", None, None), max_queries=2),
+    Scenario("pdf_facture", lambda rng, ctx: ("POST", "/api/pdf/facture", None, {
+        "id": rng.randint(1, 10_000),
+        "contract_id": 1,
+        "description": "Fourniture et pose\nTableau electrique",
+        "qty": 3,
+        "unit_price": 150.0,
+        "tva": 20.0,
+        "total_ht": 540.0,
+        "client_name": "Client Benchmark",
+    }), max_queries=0),
+    Scenario("pdf_devis", lambda rng, ctx: ("POST", "/api/pdf/devis", None, {
+        "name": "Devis 001 - Client Benchmark",
+        "client": {"name": "Client Benchmark", "client_address": "1 rue du Test\n75000 Paris"},
+        "items": _devis_items(rng),
+    }), max_queries=0),
+    Scenario("pdf_generate_devis", lambda rng, ctx: (
+        "GET", "/api/pdf/generate_devis", _devis_query(_devis_items(rng)), None), max_queries=0),
+    Scenario("pdf_generate_devis_lookup", lambda rng, ctx: ("GET", "/api/pdf/generate_devis", {
+        "devis_number": f"DEV-{rng.randint(1, ctx['estimates']):07d}",
+        "contract_id": rng.randint(1, ctx["contracts"]),
+    }, None), max_queries=2),
+    Scenario("pdf_aging", lambda rng, ctx: ("GET", "/api/pdf/aging", None, None), max_queries=2),
+    Scenario("pdf_aging_client", lambda rng, ctx: (
+        "GET", "/api/pdf/aging", {"client_id": rng.randint(1, 5)}, None), max_queries=3),
+]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def redact(url: str) -> str:
+    if "@" in url and "://" in url:
+        scheme, rest = url.split("://", 1)
+        return f"{scheme}://***@{rest.split('@', 1)[1]}"
+    return url
+
+
+async def _run_scenario(app, scenario, ctx, counter, iterations, warmup, memory_iterations, seed_value):
+    from .asgi import request
+
+    rng = random.Random(seed_value)
+    statuses = {}
+
+    async def one():
+        method, path, params, body = scenario.build(rng, ctx)
+        return await request(app, method, path, params=params, json_body=body)
+
+    for _ in range(warmup):
+        await one()
+
+    durations, queries, sizes = [], [], []
+    counter.reset()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = await one()
+        durations.append(time.perf_counter() - start)
+        queries.append(counter.reset())
+        sizes.append(len(response.body))
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+
+    # Separate pass so tracemalloc overhead does not distort the timings
+    tracemalloc.start()
+    try:
+        for _ in range(memory_iterations):
+            tracemalloc.reset_peak()
+            await one()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = summarize_ms(durations)
+    result.update({
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else 0,
+        "max_queries": max(queries) if queries else 0,
+        "peak_mem_kb": round(peak / 1024, 1),
+        "mean_response_bytes": int(sum(sizes) / len(sizes)) if sizes else 0,
+        "status_codes": {str(k): v for k, v in sorted(statuses.items())},
+    })
+    return result
+
+
+def check_results(scenarios, results) -> list:
+    """SQL budget and server error violations, as printable messages."""
+    failures = []
+    for scenario in scenarios:
+        r = results.get(scenario.name)
+        if not r:
+            continue
+        if scenario.max_queries is not None and r["max_queries"] > scenario.max_queries:
+            failures.append(f"{scenario.name}: {r['max_queries']} queries per request, budget {scenario.max_queries}")
+        errors = sum(n for code, n in r["status_codes"].items() if code.startswith("5"))
+        if errors:
+            failures.append(f"{scenario.name}: {errors} server errors")
+    return failures
+
+
+def _print_table(results, baseline=None):
+    header = f"{'scenario':<28}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'peak KiB':>11}  status"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        line = (f"{name:<28}{r.get('p50_ms', 0):>10.2f}{r.get('p95_ms', 0):>10.2f}"
+                f"{r.get('queries_per_request', 0):>9}{r.get('peak_mem_kb', 0):>11.1f}  {r.get('status_codes')}")
+        old = (baseline or {}).get(name)
+        if old and old.get("p50_ms"):
+            delta = (r.get("p50_ms", 0) - old["p50_ms"]) / old["p50_ms"] * 100
+            line += f"  p50 {delta:+.1f}% vs baseline"
+        print(line)
+
+
+def main(argv=None):
+    from .seed import add_volume_arguments, describe, prepare, volumes_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    add_volume_arguments(parser)
+    parser.add_argument("--only", help="comma separated scenario names")
+    parser.add_argument("--iterations", type=int, help="timed iterations per scenario")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--memory-iterations", type=int, default=3)
+    parser.add_argument("--sql-echo", action="store_true", help="keep SQLAlchemy echo enabled")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="previous result file to compare against")
+    parser.add_argument("--check", action="store_true",
+                        help="exit with an error if a scenario exceeds its SQL budget or returns a 5xx")
+    args = parser.parse_args(argv)
+
+    volumes = volumes_from_args(args)
+    engine, seeded_counts = prepare(args.database_url, volumes, args.reset, args.seed, args.sql_echo)
+
+    from app.main import app
+
+    n_contracts = volumes.clients * volumes.contracts_per_client
+    ctx = {"contracts": n_contracts, "bench_contract_id": n_contracts + 1, "estimates": volumes.estimates,
+           "issued_invoice_id": n_contracts}
+    selected = SCENARIOS
+    if args.only:
+        wanted = {s.strip() for s in args.only.split(",") if s.strip()}
+        unknown = wanted - {s.name for s in SCENARIOS}
+        if unknown:
+            parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+        selected = [s for s in SCENARIOS if s.name in wanted]
+
+    counter = QueryCounter(engine)
+
+    async def run_all():
+        from .asgi import lifespan, request
+
+        results = {}
+        async with lifespan(app):
+            # Idempotent; gives pdf_invoice_issued its snapshot
+            await request(app, "POST", f"/api/invoices/{ctx['issued_invoice_id']}/issue")
+            with counter.attached():
+                for scenario in selected:
+                    iterations = args.iterations or (5 if scenario.heavy else scenario.iterations)
+                    warmup = min(args.warmup, 1) if scenario.heavy else args.warmup
+                    results[scenario.name] = await _run_scenario(
+                        app, scenario, ctx, counter, iterations, warmup, args.memory_iterations, args.seed
+                    )
+                    print(f"  {scenario.name}: p50={results[scenario.name].get('p50_ms')}ms")
+        return results
+
+    results = asyncio.run(run_all())
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "git_revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "database_url": redact(args.database_url),
+            "volumes": describe(volumes),
+            "seeded": seeded_counts,
+            "max_rss_kb": max_rss_kb(),
+        },
+        "scenarios": results,
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, datetime.utcnow().strftime("%Y%m%d_%H%M%S") + ".json")
+    with open(output, "w") as fh:
+        json.dump(report, fh, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh).get("scenarios")
+    print()
+    _print_table(results, baseline)
+    print(f"\nResults written to {output}")
+
+    if args.check:
+        failures = check_results(selected, results)
+        for failure in failures:
+            print(f"CHECK FAILED: {failure}")
+        if failures:
+            sys.exit(1)
+        print("All checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""Synthetic data generator for benchmarks.
+
+Rows are generated deterministically from a seed and written with bulk
+``INSERT`` statements (executemany in batches), so hundreds of thousands of
+factures can be loaded in seconds instead of going through the ORM one object
+at a time like ``add_sample_data.py`` does.
+"""
+import os
+import random
+import time
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, func, select
+from sqlalchemy.orm import Session
+
+# Contracts priced at or above this value skip the "exceeds contract amount"
+# check in crud.create_facture, so write scenarios can add lines forever.
+BENCH_CONTRACT_PRICE = 1_000_000.0
+
+WORDS = (
+    "pose fourniture cablage tableau electrique eclairage chantier installation "
+    "maintenance reprise gaine prise interrupteur luminaire coffret disjoncteur "
+    "raccordement mise en service controle etude plan reseau batiment niveau"
+).split()
+UNITS = ("unite", "ensemble", "m")
+TVA_RATES = (0.0, 5.5, 10.0, 20.0)
+
+
+@dataclass
+class Volumes:
+    clients: int = 1_000
+    contracts_per_client: int = 2
+    factures: int = 10_000
+    estimates: int = 500
+    items_per_estimate: int = 8
+    salaries: int = 200
+    misc: int = 200
+
+
+SCALES = {
+    "tiny": Volumes(clients=50, factures=500, estimates=20, salaries=20, misc=20),
+    "small": Volumes(),
+    "medium": Volumes(clients=10_000, factures=100_000, estimates=5_000, salaries=1_000, misc=1_000),
+    "large": Volumes(clients=50_000, factures=500_000, estimates=20_000, salaries=5_000, misc=5_000),
+}
+
+
+def _text(rng: random.Random, min_words: int = 3, max_words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))).capitalize()
+
+
+def _batched(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _bulk_insert(conn, model, rows, batch_size):
+    count = 0
+    for batch in _batched(rows, batch_size):
+        conn.execute(insert(model), batch)
+        count += len(batch)
+    return count
+
+
+def reset_schema(engine):
+    """Drop and recreate every table registered on the models metadata."""
+    from app.models import Base
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def is_seeded(engine) -> bool:
+    from app.models import Client
+
+    with engine.connect() as conn:
+        return bool(conn.execute(select(func.count()).select_from(Client)).scalar())
+
+
+def seed(engine, volumes: Volumes, seed_value: int = 42, batch_size: int = 5_000) -> dict:
+    """Populate an empty database and return the number of rows per table.
+
+    Primary keys are assigned here rather than by the database so that child
+    rows can reference their parents without reading anything back.
+    """
+    from app.models import (
+        Base, User, Client, Contract, ContractDetail, Facture, Invoice, Estimate, Salary, Misc
+    )
+
+    rng = random.Random(seed_value)
+    Base.metadata.create_all(bind=engine)
+    today = date.today()
+    now = datetime.utcnow().replace(microsecond=0)
+    n_contracts = volumes.clients * volumes.contracts_per_client
+    counts = {}
+
+    def clients():
+        for i in range(1, volumes.clients + 1):
+            created = now - timedelta(days=rng.randint(0, 3 * 365))
+            yield {
+                "id": i,
+                "client_number": f"CLT-{i:07d}",
+                "client_name": f"{_text(rng, 1, 3)} SAS {i}",
+                "email": f"client{i}@example.test",
+                "phone": f"+331{rng.randint(10_000_000, 99_999_999)}",
+                "tva_number": f"FR{rng.randint(10**10, 10**11 - 1)}",
+                "tsa_number": f"{rng.randint(10**13, 10**14 - 1)}",
+                "contact_person": _text(rng, 2, 2).title(),
+                "contact_person_phone": f"+336{rng.randint(10_000_000, 99_999_999)}",
+                "contact_person_designation": rng.choice(("Gerant", "Directeur", "Acheteur")),
+                "client_address": f"{rng.randint(1, 200)} rue {_text(rng, 1, 2)}\n{rng.randint(10, 95)}000 Ville",
+                "owner_id": 1,
+                "created_at": created,
+                "updated_at": created,
+            }
+
+    def contracts():
+        for i in range(1, n_contracts + 1):
+            start = today - timedelta(days=rng.randint(0, 3 * 365))
+            created = datetime.combine(start, datetime.min.time())
+            yield {
+                "id": i,
+                "command_number": f"CMD-{i:08d}",
+                "price": round(rng.uniform(5_000, 200_000), 2),
+                "date": start,
+                "deadline": start + timedelta(days=rng.randint(15, 180)),
+                "guarantee_percentage": rng.choice((None, 5.0, 10.0)),
+                "name": _text(rng, 2, 5),
+                "client_id": (i - 1) % volumes.clients + 1,
+                "created_at": created,
+            }
+        # Dedicated contract used by the write scenarios
+        yield {
+            "id": n_contracts + 1,
+            "command_number": "CMD-BENCH",
+            "price": BENCH_CONTRACT_PRICE,
+            "date": today,
+            "deadline": today + timedelta(days=365),
+            "guarantee_percentage": None,
+            "name": "Benchmark contract",
+            "client_id": 1,
+            "created_at": now,
+        }
+
+    def invoices():
+        # One invoice per contract, as crud.create_facture does on first line
+        for i in range(1, n_contracts + 2):
+            status = rng.choice(("unpaid", "unpaid", "partial", "paid"))
+            yield {
+                "id": i,
+                "invoice_number": f"INV-{i:08d}",
+                "contract_id": i,
+                "amount": 0.0,
+                "due_date": today + timedelta(days=rng.randint(-120, 60)),
+                "status": status,
+                "paid_amount": 0.0,
+                "created_at": now - timedelta(days=rng.randint(0, 3 * 365)),
+            }
+
+    def factures():
+        for i in range(1, volumes.factures + 1):
+            contract_id = rng.randint(1, n_contracts)
+            qty = float(rng.randint(1, 50))
+            unit_price = round(rng.uniform(5, 2_000), 2)
+            tva = rng.choice(TVA_RATES)
+            yield {
+                "id": i,
+                "contract_id": contract_id,
+                "invoice_id": contract_id,
+                "description": _text(rng, 3, 30),
+                "qty": qty,
+                "qty_unit": rng.choice(UNITS),
+                "unit_price": unit_price,
+                "tva": tva,
+                "total_ht": round(qty * unit_price * (1 + tva / 100), 2),
+                "created_at": now - timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60)),
+            }
+
+    def estimates():
+        for i in range(1, volumes.estimates + 1):
+            created = today - timedelta(days=rng.randint(0, 365))
+            yield {
+                "id": i,
+                "estimate_number": f"DEV-{i:07d}",
+                "client_id": rng.randint(1, volumes.clients),
+                "amount": 0.0,
+                "status": rng.choice(("draft", "sent", "accepted")),
+                "creation_date": created,
+                "expiration_date": created + timedelta(days=30),
+            }
+
+    def estimate_items():
+        item_id = 1
+        for estimate_id in range(1, volumes.estimates + 1):
+            for _ in range(volumes.items_per_estimate):
+                qty = rng.randint(1, 20)
+                unit_price = round(rng.uniform(10, 1_500), 2)
+                yield {
+                    "id": item_id,
+                    "estimate_id": estimate_id,
+                    "description": _text(rng, 3, 25),
+                    "qty": qty,
+                    "qty_unit": rng.choice(UNITS),
+                    "unit_price": unit_price,
+                    "tva": 0.0,
+                    "total_ht": round(qty * unit_price, 2),
+                }
+                item_id += 1
+
+    def salaries():
+        for i in range(1, volumes.salaries + 1):
+            days, leaves, per_day = rng.randint(18, 23), rng.randint(0, 3), round(rng.uniform(80, 250), 2)
+            yield {
+                "id": i,
+                "employee_name": _text(rng, 2, 2).title(),
+                "working_days": days,
+                "leaves": leaves,
+                "salary_per_day": per_day,
+                "total_salary": (days - leaves) * per_day,
+            }
+
+    def misc():
+        for i in range(1, volumes.misc + 1):
+            yield {
+                "id": i,
+                "description": _text(rng, 2, 8),
+                "price": round(rng.uniform(5, 500), 2),
+                "units": rng.randint(1, 10),
+            }
+
+    with engine.begin() as conn:
+        counts["users"] = _bulk_insert(conn, User, [{
+            "id": 1,
+            "email": "bench@example.test",
+            "hashed_password": "!",
+            "full_name": "Benchmark User",
+        }], batch_size)
+        counts["clients"] = _bulk_insert(conn, Client, clients(), batch_size)
+        counts["contracts"] = _bulk_insert(conn, Contract, contracts(), batch_size)
+        counts["invoices"] = _bulk_insert(conn, Invoice, invoices(), batch_size)
+        counts["factures"] = _bulk_insert(conn, Facture, factures(), batch_size)
+        counts["estimates"] = _bulk_insert(conn, Estimate, estimates(), batch_size)
+        counts["contract_details"] = _bulk_insert(conn, ContractDetail, estimate_items(), batch_size)
+        counts["salaries"] = _bulk_insert(conn, Salary, salaries(), batch_size)
+        counts["miscellaneous"] = _bulk_insert(conn, Misc, misc(), batch_size)
+
+        # Keep invoice amounts consistent with their lines, like the write path does
+        totals = (
+            select(func.coalesce(func.sum(Facture.total_ht), 0.0))
+            .where(Facture.invoice_id == Invoice.id)
+            .scalar_subquery()
+        )
+        conn.execute(Invoice.__table__.update().values(amount=totals))
+
+    # Report rollups, as python -m app.jobs.rollups does after loading data outside the app
+    from app.crud.rollups import data_range, rebuild
+
+    with Session(engine) as db:
+        bounds = data_range(db)
+        if bounds:
+            rebuild(db, *bounds)
+
+    return counts
+
+
+def describe(volumes: Volumes) -> dict:
+    return asdict(volumes)
+
+
+def prepare(database_url: str, volumes: Volumes, reset: bool = False, seed_value: int = 42, echo: bool = False):
+    """Point the app at ``database_url`` and seed it if needed.
+
+    Settings are read when ``app.core.database`` is first imported, so this
+    must run before anything imports the application. Returns the app engine
+    and the seeded row counts (``None`` when existing data was reused).
+    """
+    os.environ["DATABASE_URL"] = database_url
+    # Benchmarks send many requests from one caller; benchmarks.admission turns it back on
+    os.environ.setdefault("ADMISSION_ENABLED", "false")
+    # A sweep starting under the timed requests would change rows and their query counts; benchmarks.sweep runs it
+    os.environ.setdefault("SCHEDULER_ENABLED", "false")
+    from app.core.database import engine
+    from app.models import Base
+
+    engine.echo = echo
+    if reset:
+        reset_schema(engine)
+    else:
+        # Tables added since the database was seeded
+        Base.metadata.create_all(bind=engine)
+    counts = None
+    if reset or not is_seeded(engine):
+        start = time.perf_counter()
+        counts = seed(engine, volumes, seed_value=seed_value)
+        print(f"Seeded {counts} in {time.perf_counter() - start:.1f}s")
+    return engine, counts
+
+
+def volumes_from_args(args) -> Volumes:
+    """Volumes for ``--scale`` with the ``--clients``/``--factures`` overrides applied."""
+    overrides = {k: v for k, v in (("clients", args.clients), ("factures", args.factures)) if v}
+    return Volumes(**{**describe(SCALES[args.scale]), **overrides})
+
+
+def add_volume_arguments(parser):
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--clients", type=int, help="override the number of clients")
+    parser.add_argument("--factures", type=int, help="override the number of factures")
+    parser.add_argument("--reset", action="store_true", help="drop and reseed the database")
+    parser.add_argument("--seed", type=int, default=42)
@@ -0,0 +1,147 @@
+"""Cold start benchmark: time from process launch to the first 200 on ``/``.
+
+Two modes:
+
+* in-process (default): a fresh interpreter imports ``app.main``, runs the
+  lifespan startup and serves ``GET /`` through the ASGI callable. The child
+  also reports import time and whether ReportLab got loaded.
+* ``--uvicorn``: starts ``uvicorn app.main:app`` and polls ``/`` over HTTP.
+
+::
+
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --uvicorn --runs 5
+    PDF_WARMUP=true python -m benchmarks.startup
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+
+from .metrics import summarize_ms
+from .run import DEFAULT_DATABASE_URL, RESULTS_DIR, git_revision, redact
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+from app.main import app
+t_import = time.perf_counter()
+from benchmarks.asgi import lifespan, request
+
+async def first_request():
+    async with lifespan(app):
+        t_started = time.perf_counter()
+        response = await request(app, "GET", "/")
+        return t_started, response.status
+
+t_started, status = asyncio.run(first_request())
+t_done = time.perf_counter()
+print(json.dumps({
+    "status": status,
+    "import_ms": (t_import - t0) * 1000,
+    "lifespan_ms": (t_started - t_import) * 1000,
+    "first_request_ms": (t_done - t_started) * 1000,
+    "reportlab_loaded": "reportlab" in sys.modules,
+    "modules_loaded": len(sys.modules),
+}))
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_in_process(env) -> dict:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    # The JSON line is the last thing printed; earlier output may be app logging
+    child = json.loads(proc.stdout.strip().splitlines()[-1])
+    child["wall_s"] = wall
+    return child
+
+
+def run_uvicorn(env, timeout: float = 60.0) -> dict:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    if resp.status == 200:
+                        return {"status": 200, "wall_s": time.perf_counter() - start}
+            except Exception:
+                time.sleep(0.01)
+        raise RuntimeError(f"no 200 from {url} within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--uvicorn", action="store_true", help="measure a real uvicorn process over HTTP")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/startup_<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, DATABASE_URL=args.database_url, PYTHONDONTWRITEBYTECODE="0")
+    runner = run_uvicorn if args.uvicorn else run_in_process
+    runner(env)  # populate bytecode caches so every timed run is a comparable cold start
+
+    runs = [runner(env) for _ in range(args.runs)]
+    summary = {"time_to_first_200": summarize_ms([r["wall_s"] for r in runs])}
+    for key in ("import_ms", "lifespan_ms", "first_request_ms"):
+        if key in runs[0]:
+            summary[key] = summarize_ms([r[key] / 1000.0 for r in runs])
+    if "reportlab_loaded" in runs[0]:
+        summary["reportlab_loaded"] = runs[0]["reportlab_loaded"]
+        summary["modules_loaded"] = runs[0]["modules_loaded"]
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "git_revision": git_revision(),
+            "mode": "uvicorn" if args.uvicorn else "in-process",
+            "database_url": redact(args.database_url),
+            "pdf_warmup": os.getenv("PDF_WARMUP", "false"),
+            "runs": args.runs,
+        },
+        "summary": summary,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, "startup_" + datetime.utcnow().strftime("%Y%m%d_%H%M%S") + ".json")
+    with open(output, "w") as fh:
+        json.dump(report, fh, indent=2)
+
+    ttf = summary["time_to_first_200"]
+    print(f"time to first 200: p50={ttf['p50_ms']:.1f}ms p95={ttf['p95_ms']:.1f}ms over {args.runs} runs")
+    if "import_ms" in summary:
+        print(f"import app.main: p50={summary['import_ms']['p50_ms']:.1f}ms, "
+              f"reportlab loaded at startup: {summary['reportlab_loaded']}, modules: {summary['modules_loaded']}")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Status sweep: set-based batches vs updating the rows one by one through the ORM.
+
+Seeds its own database (the sweep changes statuses), times flipping the
+overdue invoices and expired estimates row by row (rolled back) and with
+``app.jobs.sweep`` in batches of ``--batch-size``, then checks that:
+
+- nothing is left to flip and a second sweep changes no row;
+- the dashboard's ``invoices_due`` and the aging report are the same before and after;
+- an overdue invoice whose due date is moved forward is reopened by the next sweep;
+- of ``--workers`` schedulers polling at once, exactly one runs the due sweep::
+
+    python -m benchmarks.sweep --scale small
+    python -m benchmarks.sweep --scale medium --batch-size 1000 --workers 8
+"""
+import argparse
+import asyncio
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+
+DEFAULT_DATABASE_URL = "sqlite:///./bench_sweep.db"
+
+
+def pending(db, today) -> dict:
+    from app.crud.sweep import SWEEPS
+
+    return {item.name: db.scalar(select(func.count()).select_from(item.model).where(item.condition(today)))
+            for item in SWEEPS}
+
+
+def row_by_row(today) -> float:
+    """Time loading every row to flip and updating it through the ORM, then roll back."""
+    from app.core.database import SessionLocal
+    from app.crud.sweep import SWEEPS
+
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        for item in SWEEPS:
+            for row in db.scalars(select(item.model).where(item.condition(today))):
+                row.status = "overdue" if item.name == "invoices_overdue" else "expired"
+        db.flush()
+        elapsed = time.perf_counter() - start
+        db.rollback()
+    return elapsed
+
+
+def elect(workers: int) -> list:
+    """Make the sweep due, start ``workers`` schedulers at once; returns the names of those that ran it."""
+    from sqlalchemy import update
+
+    from app.core.database import SessionLocal
+    from app.core.scheduler import Scheduler
+    from app.models import ScheduledTask
+
+    with SessionLocal() as db:
+        db.execute(update(ScheduledTask).values(last_started_at=None, locked_by=None, locked_until=None))
+        db.commit()
+    barrier, ran = threading.Barrier(workers), []
+
+    def poll(index):
+        scheduler = Scheduler(name=f"worker-{index}")
+        barrier.wait()
+        if "sweep" in scheduler.run_due():
+            ran.append(scheduler.name)
+
+    threads = [threading.Thread(target=poll, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return ran
+
+
+async def measure(app, batch_size: int, workers: int) -> dict:
+    from app.core.database import SessionLocal
+    from app.jobs.sweep import run
+
+    from .asgi import lifespan, request
+
+    async def get(path):
+        response = await request(app, "GET", path)
+        if response.status != 200:
+            raise SystemExit(f"GET {path}: HTTP {response.status} {response.body[:200]}")
+        return response.json()
+
+    today = date.today()
+    checks = []
+    async with lifespan(app):
+        with SessionLocal() as db:
+            before = pending(db, today)
+        stats_before, aging_before = await get("/api/dashboard/stats"), await get("/api/reports/aging")
+        ormtime = await asyncio.to_thread(row_by_row, today)
+        start = time.perf_counter()
+        counts = await asyncio.to_thread(run, today, batch_size)
+        sweeptime = time.perf_counter() - start
+        with SessionLocal() as db:
+            after = pending(db, today)
+        checks.append(("nothing left to flip", [f"{name}: {n}" for name, n in after.items() if n]))
+        flipped = {name: counts[name] for name in before}
+        checks.append(("every pending row flipped", [] if flipped == before else [f"{flipped} vs {before}"]))
+        again = await asyncio.to_thread(run, today, batch_size)
+        checks.append(("second sweep is a no-op", [f"{name}: {again[name]}" for name in before if again[name]]))
+        stats_after, aging_after = await get("/api/dashboard/stats"), await get("/api/reports/aging")
+        checks.append(("dashboard invoices_due unchanged", [] if stats_after["invoices_due"] == stats_before[
+            "invoices_due"] else [f"{stats_before['invoices_due']} -> {stats_after['invoices_due']}"]))
+        checks.append(("aging report unchanged", [] if aging_after["totals"] == aging_before["totals"] else [
+            f"{aging_before['totals']} -> {aging_after['totals']}"]))
+
+        invoices = await get("/api/invoices/")
+        overdue = next((i for i in invoices if i["status"] == "overdue"), None)
+        if overdue is not None:
+            later = (today + timedelta(days=30)).isoformat()
+            response = await request(app, "PUT", f"/api/invoices/{overdue['id']}", json_body={"due_date": later})
+            if response.status != 200:
+                raise SystemExit(f"PUT /api/invoices/{overdue['id']}: HTTP {response.status}")
+            reopened = await asyncio.to_thread(run, today, batch_size)
+            status = next(i["status"] for i in await get("/api/invoices/") if i["id"] == overdue["id"])
+            checks.append(("due date moved forward reopens", [] if reopened["invoices_reopened"] == 1 and status in (
+                "unpaid", "partial") else [f"reopened {reopened['invoices_reopened']}, status {status}"]))
+
+        ran = await asyncio.to_thread(elect, workers)
+        checks.append((f"one of {workers} schedulers ran the sweep", [] if len(ran) == 1 else [f"ran: {ran}"]))
+        tasks = await get("/api/jobs/scheduled")
+    return {"before": before, "counts": counts, "orm_s": ormtime, "sweep_s": sweeptime,
+            "invoices_due": stats_after["invoices_due"], "checks": checks, "tasks": tasks}
+
+
+def main(argv=None):
+    from .seed import add_volume_arguments, prepare, volumes_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_SWEEP_DATABASE_URL", DEFAULT_DATABASE_URL))
+    add_volume_arguments(parser)
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per sweep transaction")
+    parser.add_argument("--workers", type=int, default=4, help="schedulers competing for the sweep")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("PDF_SQL_LOGGING", "false")
+    # Always reseeded: a previous run left the statuses flipped
+    prepare(args.database_url, volumes_from_args(args), True, args.seed)
+    from app.main import app
+
+    report = asyncio.run(measure(app, args.batch_size, args.workers))
+    print(f"to flip: {report['before']}")
+    print(f"row by row through the ORM: {report['orm_s'] * 1000:.1f} ms (rolled back)")
+    print(f"set-based sweep:            {report['sweep_s'] * 1000:.1f} ms, {report['counts']}")
+    print(f"dashboard invoices_due: {report['invoices_due']}")
+    print(f"scheduled tasks: {[(t['name'], t['locked_by'], t['last_result']) for t in report['tasks']]}")
+    failed = False
+    for label, problems in report["checks"]:
+        print(f"{'ok  ' if not problems else 'FAIL'} {label}")
+        for problem in problems[:5]:
+            print(f"     {problem}")
+        failed = failed or bool(problems)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
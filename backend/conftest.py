@@ -0,0 +1,55 @@
+"""pytest setup: the application tests run against a seeded SQLite database.
+
+Settings are read when ``app.core.database`` is first imported, which some
+test modules do while being collected, so the environment is set before
+collection. ``TEST_DATABASE_URL`` points the tests at another database.
+"""
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+_TEST_DIR = tempfile.mkdtemp(prefix="backend-tests-")
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", f"sqlite:///{os.path.join(_TEST_DIR, 'test.db')}")
+
+
+def pytest_configure(config):
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    # All requests come from one caller, and a sweep would change rows under the tests
+    os.environ["ADMISSION_ENABLED"] = "false"
+    os.environ["SCHEDULER_ENABLED"] = "false"
+    os.environ["PDF_LOG_FILE"] = ""
+    os.environ["DOCUMENT_STORE_DIR"] = os.path.join(_TEST_DIR, "document_store")
+    os.environ["JOB_RESULT_DIR"] = os.path.join(_TEST_DIR, "job_results")
+
+
+@pytest.fixture(scope="session")
+def seeded():
+    """The app engine and the volumes of the ``tiny`` benchmark data set, seeded once per session."""
+    from benchmarks.seed import SCALES, prepare
+
+    volumes = SCALES["tiny"]
+    engine, _ = prepare(TEST_DATABASE_URL, volumes, reset=True)
+    return engine, volumes
+
+
+@pytest.fixture(scope="session")
+def app(seeded):
+    from app.main import app
+
+    return app
+
+
+@pytest.fixture(scope="session")
+def run_app(app):
+    """``run_app(coro_fn)``: ``await coro_fn()`` inside the app's lifespan, from a sync test."""
+    from benchmarks.asgi import lifespan
+
+    def run(coro_fn):
+        async def main():
+            async with lifespan(app):
+                return await coro_fn()
+        return asyncio.run(main())
+
+    return run
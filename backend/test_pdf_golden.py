@@ -0,0 +1,53 @@
+"""Byte-stable PDF output, against ``benchmarks/golden/pdf_sha256.json``.
+
+The fixed devis and facture payloads of ``benchmarks.golden`` are rendered
+in every profile (screen, email, archive) and must match their recorded
+sha256; seeded invoices and estimates must render twice to the same bytes.
+After an intended output change, run ``python -m benchmarks.golden --update``.
+"""
+import hashlib
+
+import pytest
+
+from benchmarks.golden import comparable, fixtures, load_golden
+
+FIXTURES = list(fixtures())
+
+
+def _render_twice(app, run_app, method, path, params=None, body=None):
+    from benchmarks.asgi import request
+
+    async def render():
+        bodies = []
+        for _ in range(2):
+            response = await request(app, method, path, params=params, json_body=body)
+            assert response.status == 200, f"{method} {path}: HTTP {response.status} {response.body[:200]}"
+            bodies.append(response.body)
+        return bodies
+
+    return run_app(render)
+
+
+def test_golden_file_covers_every_fixture():
+    assert {name for name, *_ in FIXTURES} <= set(load_golden()["sha256"])
+    assert {name.split(".")[1] for name, *_ in FIXTURES} == {"screen", "email", "archive"}
+
+
+@pytest.mark.parametrize("name,method,path,params,body", FIXTURES, ids=[f[0] for f in FIXTURES])
+def test_pdf_matches_golden_hash(name, method, path, params, body, app, run_app):
+    first, second = _render_twice(app, run_app, method, path, params, body)
+    assert first == second, f"{name}: two renders differ"
+    golden = load_golden()
+    if not comparable(golden, name):
+        pytest.skip(f"{name}: golden hash recorded with {golden['versions']}")
+    assert hashlib.sha256(first).hexdigest() == golden["sha256"][name]
+
+
+@pytest.mark.parametrize("document", ["invoice", "estimate"])
+@pytest.mark.parametrize("profile", ["screen", "email", "archive"])
+def test_seeded_documents_render_byte_identical(document, profile, seeded, app, run_app):
+    _, volumes = seeded
+    contracts = volumes.clients * volumes.contracts_per_client
+    for contract_id in sorted({1, (contracts + 1) // 2, contracts}):
+        first, second = _render_twice(app, run_app, "GET", f"/api/pdf/{document}/{contract_id}", {"profile": profile})
+        assert first == second, f"{document} {contract_id} ({profile}): two renders differ"
@@ -0,0 +1,55 @@
+"""SQL statements per ``/pdf/*`` request, against the budgets of ``benchmarks.run``.
+
+Each PDF scenario is sent a few times on the seeded database, from the
+first (cold) request on; every request must stay within ``max_queries``.
+"""
+import random
+
+import pytest
+
+from benchmarks.metrics import QueryCounter
+from benchmarks.run import SCENARIOS
+
+PDF_SCENARIOS = [s for s in SCENARIOS if s.name.startswith("pdf_")]
+REQUESTS_PER_SCENARIO = 3
+
+
+@pytest.fixture(scope="module")
+def ctx(app, seeded, run_app):
+    from benchmarks.asgi import request
+
+    _, volumes = seeded
+    contracts = volumes.clients * volumes.contracts_per_client
+    ctx = {"contracts": contracts, "bench_contract_id": contracts + 1, "estimates": volumes.estimates,
+           "issued_invoice_id": contracts}
+
+    async def issue():
+        response = await request(app, "POST", f"/api/invoices/{ctx['issued_invoice_id']}/issue")
+        assert response.status in (200, 201), response.body[:200]
+
+    run_app(issue)
+    return ctx
+
+
+@pytest.mark.parametrize("scenario", PDF_SCENARIOS, ids=lambda s: s.name)
+def test_pdf_query_budget(scenario, app, seeded, ctx, run_app):
+    from benchmarks.asgi import request
+
+    engine, _ = seeded
+    rng = random.Random(0)
+    counter = QueryCounter(engine)
+
+    async def send():
+        counts = []
+        with counter.attached():
+            for _ in range(REQUESTS_PER_SCENARIO):
+                method, path, params, body = scenario.build(rng, ctx)
+                counter.reset()
+                response = await request(app, method, path, params=params, json_body=body)
+                assert response.status == 200, f"{method} {path}: HTTP {response.status} {response.body[:200]}"
+                counts.append(counter.reset())
+        return counts
+
+    counts = run_app(send)
+    assert max(counts) <= scenario.max_queries, (
+        f"{scenario.name}: {counts} queries per request, budget {scenario.max_queries}")
@@ -61,6 +61,55 @@ export const getPdfUrl = (endpoint) => {
   return url;
 };
 
+// Server-sent change events (GET /api/events): onChange({ at, changes }) after each commit touching
+// one of `entities` (table names), onResync() when events were missed. Returns a function closing the stream.
+// EventSource cannot send the Authorization header, so each connection opens with a short-lived ticket from
+// POST /api/events/ticket; when the server refuses a reconnect (expired ticket), a new one is minted.
+export const subscribeChanges = (entities, onChange, onResync) => {
+  if (typeof window.EventSource === 'undefined') return () => {};
+  let source = null;
+  let retry = null;
+  let closed = false;
+
+  const open = async (reopened) => {
+    let ticket = null;
+    try {
+      ticket = (await api.post('events/ticket')).data.ticket;
+    } catch (err) {
+      console.warn('Could not get a change stream ticket:', err);
+    }
+    if (closed) return;
+    const query = `entities=${entities.join(',')}${ticket ? `&ticket=${encodeURIComponent(ticket)}` : ''}`;
+    source = new EventSource(`${getApiUrl('events/')}?${query}`);
+    source.addEventListener('change', (e) => {
+      try {
+        onChange(JSON.parse(e.data));
+      } catch (err) {
+        console.warn('Ignoring malformed change event:', err);
+      }
+    });
+    source.addEventListener('resync', () => onResync && onResync());
+    source.addEventListener('open', () => {
+      // A new stream starts after whatever happened while it was down
+      if (reopened && onResync) onResync();
+      reopened = false;
+    });
+    source.onerror = () => {
+      // CLOSED: the server answered with an error (e.g. 401), the browser will not retry on its own
+      if (source.readyState === window.EventSource.CLOSED && !closed) {
+        retry = setTimeout(() => open(true), 3000);
+      }
+    };
+  };
+
+  open(false);
+  return () => {
+    closed = true;
+    clearTimeout(retry);
+    if (source) source.close();
+  };
+};
+
 const defaultHeaders = {
   'Content-Type': 'application/json',
 };
@@ -1,5 +1,5 @@
-import React, { useEffect, useState } from 'react';
-import api, { getApiUrl } from '../config/api';
+import React, { useEffect, useRef, useState } from 'react';
+import api, { getApiUrl, subscribeChanges } from '../config/api';
 import { useTranslation } from 'react-i18next';
 import DeleteIcon from '@mui/icons-material/Delete';
 import VisibilityIcon from '@mui/icons-material/Visibility';
@@ -163,7 +163,6 @@ const Balance = () => {
   const location = useLocation();
 
   const [invoices, setInvoices] = useState([]);
-  const [clients, setClients] = useState([]);
   const [search, setSearch] = useState('');
   const [statusFilter, setStatusFilter] = useState('all');
   const [loading, setLoading] = useState(false);
@@ -171,25 +170,31 @@ const Balance = () => {
   const [page, setPage] = useState(1);
   const [perPage] = useState(10);
 
+  // ?since= watermark of the invoices shown, advanced by each pushed change
+  const watermarkRef = useRef(null);
+
   useEffect(() => {
     fetchInvoices();
-    fetchClients();
-    fetchContracts();
+    // Pushed changes: fetch only the invoices changed since the watermark instead of the whole list
+    const applyChanges = async () => {
+      if (!watermarkRef.current) return;
+      try {
+        const res = await api.get('invoices/', { params: { since: watermarkRef.current } });
+        const { changed = [], deleted = [], watermark } = res.data || {};
+        watermarkRef.current = watermark;
+        const updated = new Map(changed.map(inv => [inv.id, inv]));
+        setInvoices(prev => {
+          const kept = prev.filter(inv => !deleted.includes(inv.id)).map(inv => updated.get(inv.id) || inv);
+          const known = new Set(kept.map(inv => inv.id));
+          return [...kept, ...changed.filter(inv => !known.has(inv.id))];
+        });
+      } catch (err) {
+        console.error('Failed to apply invoice changes:', err);
+      }
+    };
+    return subscribeChanges(['invoices', 'factures', 'contracts', 'clients'], applyChanges, fetchInvoices);
   }, []);
 
-  const [contracts, setContracts] = useState([]);
-
-  const fetchContracts = async () => {
-    let tempPriceSet = false;
-    let originalPrice;
-    try {
-      const res = await api.get('contracts/');
-      setContracts(res.data || []);
-    } catch {
-      setContracts([]);
-    }
-  };
-
   // Helper: detect localStorage invoices reliably (case-insensitive 'inv-')
   const isLocalStorageInvoice = (id) => {
     if (!id) return false;
@@ -200,9 +205,11 @@ const Balance = () => {
   const fetchInvoices = async () => {
     setLoading(true);
     try {
-      // Fetch ONLY backend invoices (authoritative source, no localStorage)
-      const res = await api.get('invoices/');
-      const backendInvoices = Array.isArray(res.data) ? res.data : [];
+      // Fetch ONLY backend invoices (authoritative source, no localStorage).
+      // Rows already carry client_name and contract_number: no clients/contracts lists needed
+      const res = await api.get('bootstrap/balance');
+      const backendInvoices = Array.isArray(res.data?.invoices) ? res.data.invoices : [];
+      watermarkRef.current = res.data?.watermark || null;
       setInvoices(backendInvoices);
     } catch (err) {
       console.error('Failed to fetch invoices:', err);
@@ -211,27 +218,14 @@ const Balance = () => {
       setLoading(false);
     }
   };
-  
-  const fetchClients = async () => {
-    try {
-      const res = await api.get('clients/');
-      setClients(res.data);
-    } catch {
-      setClients([]);
-    }
-  };
 
   // Filtering logic with null checks
   const filtered = invoices.filter(inv => {
     if (!inv) return false;
     
-    // Safely get client name (from client_id)
-    const client = clients.find(c => c && c.id === inv.client_id);
-    const clientName = (client?.client_name || '').toLowerCase();
-    
-    // Also try to get contract name (from contract_id)
-    const contract = contracts.find(c => c && String(c.id) === String(inv.contract_id));
-    const contractName = (contract?.command_number || '').toLowerCase();
+    // Client and contract names are joined in by the backend
+    const clientName = (inv.client_name || '').toLowerCase();
+    const contractName = (inv.contract_number || '').toLowerCase();
     
     // Safely get invoice number
     const invoiceNumber = (inv.invoice_number || '').toLowerCase();
@@ -282,9 +276,15 @@ const Balance = () => {
   const generateLocalInvoicePDF = async (invoice) => {
     let tempPriceSet = false;
     let originalPrice;
-    const contract = contracts.find(c => String(c.id) === String(invoice.contract_id));
     const items = invoice.items || [];
-    
+    let contract = null;
+    try {
+      const res = await api.get(`contracts/${invoice.contract_id}`);
+      contract = res.data;
+    } catch {
+      contract = null;
+    }
+
     if (!contract) {
       setToast('Contract not found');
       setTimeout(() => setToast(''), 2500);
@@ -692,7 +692,6 @@ const Balance = () => {
                   </TableRow>
                 )}
                 {paged.map((inv, index) => {
-                  const client = clients.find(c => c.id === inv.client_id);
                   const status = getStatus(inv.amount, inv.paid_amount || 0, inv.status);
                   const derivedPaid = typeof inv.paid_amount === 'number' ? inv.paid_amount : (
                     status === 'paid' ? inv.amount : status === 'partial' ? (inv.amount / 2) : 0
@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useMemo } from 'react';
 import { useTranslation } from 'react-i18next';
-import api, { getApiUrl } from '../config/api';
+import api, { getApiUrl, subscribeChanges } from '../config/api';
 import {
   Box, Typography, Grid, Card, CardContent, Paper, Fade, Zoom,
   useTheme, alpha, styled, CircularProgress, Chip
@@ -130,27 +130,21 @@ const Dashboard = () => {
   }, [recentActivity]);
   
   useEffect(() => {
-    // Fetch real dashboard stats
-    const fetchStats = async () => {
-      setLoadingStats(true);
+    // Stats, recent activity and contract growth in one request
+    const fetchDashboard = async (quiet = false) => {
+      if (!quiet) {
+        setLoadingStats(true);
+        setLoadingRecent(true);
+        setLoadingGrowth(true);
+      }
       try {
-        const res = await api.get(getApiUrl('dashboard/stats/'));
+        const res = await api.get(getApiUrl('bootstrap/dashboard'));
+        const data = res.data || {};
         setStats(prevStats => prevStats.map(stat => ({
           ...stat,
-          value: res.data[stat.label] || '0'
+          value: (data.stats || {})[stat.label] || '0'
         })));
-      } catch (err) {
-        console.error('Error fetching stats:', err);
-      } finally {
-        setLoadingStats(false);
-      }
-    };
-    // Fetch recent activity
-    const fetchRecentActivity = async () => {
-      setLoadingRecent(true);
-      try {
-        const res = await api.get(getApiUrl('dashboard/recent-activity/'));
-        const activities = res.data.map(item => ({
+        const activities = (data.recent_activity || []).map(item => ({
           id: item.id,
           type: item.type || 'Recent',
           name: item.name || `Activity ${item.id}`,
@@ -158,27 +152,11 @@ const Dashboard = () => {
           description: item.description || ''
         }));
         setRecentActivity(activities);
+        setContractGrowth(data.contract_growth || []);
       } catch (err) {
-        console.error('Error fetching recent activity:', err);
+        console.error('Error fetching dashboard:', err);
         // Return empty array to show empty state
         setRecentActivity([]);
-      } finally {
-        setLoadingRecent(false);
-      }
-    };
-    fetchStats();
-    fetchRecentActivity();
-  }, []);
-
-  // Fetch contract growth data
-  useEffect(() => {
-    const fetchContractGrowth = async () => {
-      setLoadingGrowth(true);
-      try {
-        const response = await api.get(getApiUrl('dashboard/contract-growth/'));
-        setContractGrowth(response.data);
-      } catch (error) {
-        console.error('Error fetching contract growth data:', error);
         // Set some sample data if API fails
         const currentDate = new Date();
         const months = [];
@@ -191,11 +169,26 @@ const Dashboard = () => {
         }
         setContractGrowth(months);
       } finally {
+        setLoadingStats(false);
+        setLoadingRecent(false);
         setLoadingGrowth(false);
       }
     };
-
-    fetchContractGrowth();
+    fetchDashboard();
+    // Pushed changes to what the dashboard counts: refresh it once they settle, without spinners
+    let refreshTimer = null;
+    const unsubscribe = subscribeChanges(
+      ['clients', 'contracts', 'invoices', 'salaries'],
+      () => {
+        clearTimeout(refreshTimer);
+        refreshTimer = setTimeout(() => fetchDashboard(true), 1000);
+      },
+      () => fetchDashboard(true)
+    );
+    return () => {
+      clearTimeout(refreshTimer);
+      unsubscribe();
+    };
   }, []);
 
 
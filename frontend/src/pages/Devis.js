@@ -222,42 +222,34 @@ const Devis = () => {
     return token ? { Authorization: `Bearer ${token}` } : {};
   }, []);
 
-  // Load clients and contracts
-  useEffect(() => {
-    const load = async () => {
-      try {
-        const [clientsRes, contractsRes] = await Promise.all([
-          api.get('clients/', { headers: authHeaders }),
-          api.get('contracts/', { headers: authHeaders })
-        ]);
-
-        const formattedClients = (clientsRes.data || []).map(c => ({
-          value: c.id,
-          label: c.client_name || `Client #${c.client_number}`
-        }));
-        setClients(formattedClients);
-        const map = {};
-        (clientsRes.data || []).forEach(c => { map[c.id] = c; });
-        setClientsById(map);
-        setContracts(contractsRes.data || []);
-      } catch (e) {
-        console.error('Failed to load clients/contracts', e);
-        setError(t('error_loading_data'));
-      }
-    };
-    load();
-  }, [authHeaders, t]);
-
-  // Fetch estimates list from the backend (items loaded lazily on expand)
+  // Backend items -> UI items
+  const formatItems = (items) => (Array.isArray(items) ? items : []).map(item => ({
+    ...item,
+    id: `item-${item.id}`,
+    qty: parseFloat(item.qty) || 0,
+    unit_price: parseFloat(item.unit_price) || 0,
+    tva: parseFloat(item.tva) || 0,
+    total_ht: parseFloat(item.total_ht) || 0
+  }));
+
+  // Load the whole screen (clients, contracts, estimates and their items) in one request
   const fetchEstimates = async () => {
     try {
       setLoading(true);
-      
-      // Fetch all estimates using the configured axios instance (trailing slash to avoid redirects)
-      const estimatesRes = await api.get('estimates/', { headers: authHeaders });
-      
-      // Map estimates to the expected format; items will be fetched on demand
-      const estimatesMapped = estimatesRes.data.map((estimate) => ({
+      const res = await api.get('bootstrap/devis', { headers: authHeaders });
+      const data = res.data || {};
+
+      const clientList = data.clients || [];
+      setClients(clientList.map(c => ({
+        value: c.id,
+        label: c.client_name || `Client #${c.client_number}`
+      })));
+      const map = {};
+      clientList.forEach(c => { map[c.id] = c; });
+      setClientsById(map);
+      setContracts(data.contracts || []);
+
+      const estimatesMapped = (data.estimates || []).map((estimate) => ({
         id: `devis-${estimate.id}`,
         backendId: estimate.id,
         name: estimate.estimate_number || `Devis-${estimate.id}`,
@@ -268,32 +260,17 @@ const Devis = () => {
         amount: parseFloat(estimate.amount) || 0,
         createdAt: estimate.created_at
       }));
-
-      // Update estimates in state
       setCreatedDevis(estimatesMapped);
 
-      // Background prefetch: load items for each estimate so counts/lists appear across devices
-      // Do not block UI; errors are swallowed and logged by fetchItemsForDevis
-      ;(async () => {
-        try {
-          const loads = await Promise.all(
-            (estimatesMapped || []).map(async (e) => {
-              const items = await fetchItemsForDevis(e);
-              return [e.id, items];
-            })
-          );
-          setItemsByDevis((prev) => {
-            const next = { ...prev };
-            loads.forEach(([id, items]) => {
-              next[id] = items;
-            });
-            return next;
-          });
-        } catch (_) {
-          // no-op; per-estimate errors are already logged
-        }
-      })();
-
+      // Items come keyed by estimate id, so counts/lists appear across devices
+      const items = data.items || {};
+      setItemsByDevis((prev) => {
+        const next = { ...prev };
+        estimatesMapped.forEach((e) => {
+          next[e.id] = formatItems(items[e.backendId]);
+        });
+        return next;
+      });
     } catch (error) {
       console.error('Error fetching estimates:', error);
       setError(t('error_loading_estimates') || 'Failed to load estimates');
@@ -315,17 +292,7 @@ const Devis = () => {
       const res = await api.get(url, { headers: authHeaders });
       console.log('API response for items:', res.data);
       
-      const items = Array.isArray(res.data) ? res.data : [];
-      console.log('Processed items:', items);
-      
-      return items.map(item => ({
-        ...item,
-        id: `item-${item.id}`,
-        qty: parseFloat(item.qty) || 0,
-        unit_price: parseFloat(item.unit_price) || 0,
-        tva: parseFloat(item.tva) || 0,
-        total_ht: parseFloat(item.total_ht) || 0
-      }));
+      return formatItems(res.data);
     } catch (e) {
       console.error('Error fetching items for devis:', e);
       console.warn(`Failed to load items for devis ${devis.backendId}`);
@@ -451,10 +418,11 @@ const Devis = () => {
   }, [authHeaders, selectedContractId, t]);
 
   
-  // Fetch estimates after clients/contracts load
+  // Load the screen on mount
   useEffect(() => {
     fetchEstimates();
-  }, [clients.length]);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [authHeaders]);
 
   // Auto-calc total_ht with TVA
   const handleDetailsChange = (e) => {
@@ -1474,7 +1442,12 @@ const Devis = () => {
                               
                               // Log the payload and URL for debugging
                               console.log('Full Payload:', JSON.stringify(payload, null, 2));
-                              const pdfUrl = `${getApiUrl('pdf/generate_devis/')}?${queryParams.toString()}`;
+                              // Saved devis are rendered server-side from the database by id (short URL,
+                              // cacheable); the query-string form is only needed for devis not saved yet
+                              const savedId = row.backendId || (row.id?.startsWith('devis-b-') ? parseInt(row.id.slice(8), 10) : null);
+                              const pdfUrl = savedId
+                                ? getApiUrl(`pdf/estimates/${savedId}`)
+                                : `${getApiUrl('pdf/generate_devis/')}?${queryParams.toString()}`;
                               console.log('PDF Generation URL:', pdfUrl);
                               console.log('Query Parameters:');
                               queryParams.forEach((value, key) => {
@@ -1484,7 +1457,8 @@ const Devis = () => {
                               // Make GET request with query parameters
                               const res = await api.get(pdfUrl, { 
                                 responseType: 'blob',
-                                headers: { 
+                                // Saved devis carry an ETag, so let the browser revalidate its cached copy
+                                headers: savedId ? { 'Accept': 'application/pdf' } : { 
                                   'Accept': 'application/pdf',
                                   'Cache-Control': 'no-cache, no-store, must-revalidate',
                                   'Pragma': 'no-cache',
@@ -174,65 +174,9 @@ const Factures = () => {
   const [currentPage, setCurrentPage] = useState(1);
   const itemsPerPage = 5;
 
-  // Fetch contracts and cache by id
-  const fetchContracts = async () => {
-    try {
-      setLoading(true);
-      const res = await api.get('contracts/');
-      const data = Array.isArray(res.data) ? res.data : [];
-      setContracts(data);
-      const map = {};
-      data.forEach(c => { map[c.id] = c; });
-      setContractsById(map);
-    } catch (err) {
-      setError(t('contracts_fetch_error') || 'Failed to fetch contracts');
-      setTimeout(() => setError(''), 3000);
-    } finally {
-      setLoading(false);
-    }
-  };
-
   // Do not use local overrides; always rely on backend values for cross-device consistency
   const getInvoiceOverrides = () => ({})
 
-  // Fetch invoices from the backend
-  const fetchInvoices = async () => {
-    try {
-      setLoading(true);
-      const response = await api.get('invoices/');
-      const invoices = Array.isArray(response.data) ? response.data : [];
-      
-      // Transform using ONLY backend fields
-      const formattedInvoices = invoices.map(b => {
-        const issue = b.created_at ? String(b.created_at).split('T')[0] : undefined;
-        const exp = b.due_date || undefined;
-        return {
-          id: `inv-${b.id}`,
-          backendId: b.id,
-          contractId: b.contract_id,
-          name: b.invoice_number || `INV-${b.id}`,
-          issue_date: issue,
-          expiration_date: exp,
-          date: issue,
-          dueDate: exp,
-          createdAt: b.created_at || new Date().toISOString()
-        };
-      });
-      
-      setCreatedInvoices(formattedInvoices);
-      
-      // Also fetch and set the items for each invoice
-      await syncInvoicesFromBackend();
-      
-    } catch (error) {
-      console.error('Error fetching invoices:', error);
-      setToast(t('invoices_fetch_error') || 'Failed to load invoices');
-      setTimeout(() => setToast(''), 3000);
-    } finally {
-      setLoading(false);
-    }
-  };
-
   // Calculate invoice total from local items
   const calculateInvoiceTotal = (invoiceId) => {
     const items = itemsByInvoice[invoiceId] || [];
@@ -318,7 +262,6 @@ const Factures = () => {
         });
         // Re-sync fresh data from backend
         await syncInvoicesFromBackend();
-        await fetchContracts();
         setToast(t('item_updated') || 'Item updated successfully!');
         setTimeout(() => setToast(''), 2500);
       } else {
@@ -343,7 +286,6 @@ const Factures = () => {
       if (backendId) {
         await api.delete(getApiUrl(`factures/${backendId}`));
         await syncInvoicesFromBackend();
-        await fetchContracts();
         setToast(t('item_deleted') || 'Item deleted successfully!');
         setTimeout(() => setToast(''), 2500);
       } else {
@@ -716,7 +658,7 @@ const Factures = () => {
     }
 
     // Refresh derived totals (e.g., Balance widgets that depend on backend)
-    try { await fetchContracts(); } catch {}
+    try { await syncInvoicesFromBackend(); } catch {}
 
     setToast(t('invoice_deleted') || 'Invoice deleted successfully!');
     setTimeout(() => setToast(''), 2500);
@@ -791,27 +733,23 @@ const Factures = () => {
 
   // Fetch data on mount
   useEffect(() => {
-    const fetchData = async () => {
-      await fetchContracts();
-      await fetchInvoices();
-    };
-    fetchData();
-  }, []);
-
-  // Sync invoices and items from backend so old invoices appear across devices
-  useEffect(() => {
-    // Only run after contracts have been fetched at least once
-    if (!contracts || contracts.length >= 0) {
-      syncInvoicesFromBackend();
-    }
+    syncInvoicesFromBackend();
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [contracts.length]);
+  }, []);
 
+  // Sync contracts, invoices and items from backend so old invoices appear across devices
   const syncInvoicesFromBackend = async () => {
     try {
-      // 1) Fetch all backend invoices
-      const invRes = await api.get('invoices/');
-      const backendInvoices = Array.isArray(invRes.data) ? invRes.data : [];
+      setLoading(true);
+      // 1) One request for the whole screen: contracts, invoices and the factures of invoiced contracts
+      const res = await api.get('bootstrap/factures');
+      const data = res.data || {};
+      const contractList = Array.isArray(data.contracts) ? data.contracts : [];
+      const byId = {};
+      contractList.forEach(c => { byId[c.id] = c; });
+      setContracts(contractList);
+      setContractsById(byId);
+      const backendInvoices = Array.isArray(data.invoices) ? data.invoices : [];
 
       // 2) Build local createdInvoices entries from backend
       const mapped = backendInvoices.map(b => {
@@ -832,34 +770,21 @@ const Factures = () => {
       // Use ONLY backend data, no local merge to avoid ghost invoices
       setCreatedInvoices(mapped);
 
-      // 3) Fetch factures per contract and assign items per invoice
-      const contractIds = [...new Set(backendInvoices.map(b => b.contract_id))];
-      const itemsMap = {};
-      for (const cid of contractIds) {
-        try {
-          const fRes = await api.get(`factures/contract/${cid}/`);
-          const list = Array.isArray(fRes.data) ? fRes.data : [];
-          // Group by invoice_id
-          const byInvoice = list.reduce((acc, f) => {
-            const key = f.invoice_id ? `inv-b-${f.invoice_id}` : `contract-${cid}-noinv`;
-            // Use accumulator's existing items, not stale state
-            if (!acc[key]) acc[key] = [];
-            acc[key].push({
-              description: f.description,
-              qty: f.qty,
-              qty_unit: f.qty_unit || 'unite',
-              unit_price: f.unit_price,
-              tva: f.tva,
-              total_ht: Number.isFinite(f.total_ht) ? Number(f.total_ht.toFixed(2)) : 0,
-              backendFactureId: f.id
-            });
-            return acc;
-          }, {});
-          Object.assign(itemsMap, byInvoice);
-        } catch (e) {
-          // continue with others
-        }
-      }
+      // 3) Assign factures to their invoice
+      const itemsMap = (Array.isArray(data.factures) ? data.factures : []).reduce((acc, f) => {
+        const key = f.invoice_id ? `inv-b-${f.invoice_id}` : `contract-${f.contract_id}-noinv`;
+        if (!acc[key]) acc[key] = [];
+        acc[key].push({
+          description: f.description,
+          qty: f.qty,
+          qty_unit: f.qty_unit || 'unite',
+          unit_price: f.unit_price,
+          tva: f.tva,
+          total_ht: Number.isFinite(f.total_ht) ? Number(f.total_ht.toFixed(2)) : 0,
+          backendFactureId: f.id
+        });
+        return acc;
+      }, {});
 
       // Also mirror backend-keyed items to any local invoice IDs that share the same backendId
       Object.keys(itemsMap).forEach(key => {
@@ -879,6 +804,8 @@ const Factures = () => {
       setItemsByInvoice(itemsMap);
     } catch (e) {
       // Best-effort sync; ignore errors to keep UI responsive
+    } finally {
+      setLoading(false);
     }
 
   };
@@ -978,7 +905,6 @@ const Factures = () => {
 
           // Re-sync from backend to get fresh data (no local state manipulation)
           await syncInvoicesFromBackend();
-          await fetchContracts();
 
           // Show success toast
           setToast(t('item_added') || 'Item added successfully!');